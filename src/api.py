@@ -1,15 +1,18 @@
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from pydantic import BaseModel
 from typing import Dict, List
 from src.kombyphantike import KombyphantikeEngine
 from src.audio import generate_audio
 from src.models import ConstellationGraph
+from src.config import TRACE_DUMPS, TRACES_DIR
+from src.tracing import span, start_trace
 import re
 import logging
 from pathlib import Path
 import os
 import json
+from datetime import datetime
 from dotenv import load_dotenv
 from google import genai
 from google.genai import types
@@ -33,8 +36,34 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Trace-File"],
 )
 
+# Tracing: every response carries a Server-Timing header (stage + DB call totals).
+# With dumps enabled (TRACE_DUMPS / KOMBYPHANTIKE_TRACE_DUMPS=1, off by default), a request
+# sending "X-Kombyphantike-Trace: 1" also gets a Chrome-trace JSON written to TRACES_DIR.
+TRACE_HEADER = "x-kombyphantike-trace"
+DUMP_TRACES = os.environ.get("KOMBYPHANTIKE_TRACE_DUMPS", "1" if TRACE_DUMPS else "0") == "1"
+
+
+@app.middleware("http")
+async def server_timing(request: Request, call_next):
+    with start_trace(f"{request.method} {request.url.path}") as trace:
+        # Wall time only: CPU on the event-loop thread includes other requests' work
+        with span("request", category="http", cpu=False, path=request.url.path):
+            response = await call_next(request)
+
+    response.headers["Server-Timing"] = trace.server_timing()
+
+    if DUMP_TRACES and request.headers.get(TRACE_HEADER, "").lower() in ("1", "true", "chrome"):
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", request.url.path).strip("_") or "root"
+        trace_path = trace.dump(TRACES_DIR / f"{stamp}_{slug}.json")
+        response.headers["X-Trace-File"] = trace_path.name
+
+    return response
+
+
 # 2. Engine Lifecycle
 engine = None
 
@@ -82,30 +111,34 @@ def call_gemini(prompt_text: str):
         raise Exception("Google API Key missing")
 
     try:
-        client = genai.Client(api_key=api_key)
-        response = client.models.generate_content(
-            model="gemini-2.5-flash",  # Stable model
-            contents=prompt_text,
-            config=types.GenerateContentConfig(
-                response_mime_type="application/json",
-                safety_settings=[
-                    types.SafetySetting(
-                        category="HARM_CATEGORY_HARASSMENT", threshold="BLOCK_NONE"
-                    ),
-                    types.SafetySetting(
-                        category="HARM_CATEGORY_HATE_SPEECH", threshold="BLOCK_NONE"
-                    ),
-                    types.SafetySetting(
-                        category="HARM_CATEGORY_SEXUALLY_EXPLICIT",
-                        threshold="BLOCK_NONE",
-                    ),
-                    types.SafetySetting(
-                        category="HARM_CATEGORY_DANGEROUS_CONTENT",
-                        threshold="BLOCK_NONE",
-                    ),
-                ],
-            ),
-        )
+        # GEMINI_BASE_URL points the client at a stand-in (see src/stand_ins.py)
+        base_url = os.environ.get("GEMINI_BASE_URL")
+        http_options = types.HttpOptions(base_url=base_url) if base_url else None
+        client = genai.Client(api_key=api_key, http_options=http_options)
+        with span("gemini.generate_content", category="http"):
+            response = client.models.generate_content(
+                model="gemini-2.5-flash",  # Stable model
+                contents=prompt_text,
+                config=types.GenerateContentConfig(
+                    response_mime_type="application/json",
+                    safety_settings=[
+                        types.SafetySetting(
+                            category="HARM_CATEGORY_HARASSMENT", threshold="BLOCK_NONE"
+                        ),
+                        types.SafetySetting(
+                            category="HARM_CATEGORY_HATE_SPEECH", threshold="BLOCK_NONE"
+                        ),
+                        types.SafetySetting(
+                            category="HARM_CATEGORY_SEXUALLY_EXPLICIT",
+                            threshold="BLOCK_NONE",
+                        ),
+                        types.SafetySetting(
+                            category="HARM_CATEGORY_DANGEROUS_CONTENT",
+                            threshold="BLOCK_NONE",
+                        ),
+                    ],
+                ),
+            )
         if not response.text:
             raise ValueError("Empty response from AI")
 
@@ -283,7 +316,8 @@ async def speak(request: SpeakRequest):
     try:
         # Calls ElevenLabs via src.audio
         # REMOVED 'await' because generate_audio is synchronous
-        audio_base64 = generate_audio(request.text)
+        with span("elevenlabs.text_to_speech", category="http"):
+            audio_base64 = generate_audio(request.text)
         
         # Ensure the prefix is correct for the frontend
         if not audio_base64.startswith("data:audio"):
@@ -7,7 +7,18 @@ from elevenlabs.client import ElevenLabs
 
 load_dotenv()
 
-client = ElevenLabs(api_key=os.environ.get("ELEVENLABS_API_KEY"))
+# ELEVENLABS_BASE_URL points the client at a stand-in (see src/stand_ins.py).
+# Passed as an environment: the client's own base_url option forces https and drops the port.
+base_url = os.environ.get("ELEVENLABS_BASE_URL")
+if base_url:
+    from elevenlabs.environment import ElevenLabsEnvironment
+
+    client = ElevenLabs(
+        api_key=os.environ.get("ELEVENLABS_API_KEY"),
+        environment=ElevenLabsEnvironment(base=base_url, wss=base_url.replace("http", "ws", 1)),
+    )
+else:
+    client = ElevenLabs(api_key=os.environ.get("ELEVENLABS_API_KEY"))
 
 def generate_audio(text: str) -> str:
     try:
@@ -0,0 +1,340 @@
+"""Offline benchmarks for the engine hot paths, compared with a stored baseline."""
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import logging
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from src.beta_code import BetaCodeConverter
+from src.config import DATA_DIR
+from src.database import DatabaseManager
+from src.memory_lexicon import MemoryLexicon
+from src.kombyphantike import KombyphantikeEngine
+from src.knot_loader import KnotLoader
+from src.scale_fixtures import KELLY_POS_COL, ScaleFixtureGenerator
+
+logger = logging.getLogger(__name__)
+
+BENCH_DIR = DATA_DIR / "benchmarks"
+BASELINE_FILE = BENCH_DIR / "baseline.json"
+RESULTS_FILE = BENCH_DIR / "latest.json"
+
+SIZES = {"small": 1_000, "medium": 10_000, "large": 50_000}
+SEED = 13
+THEME = "fate"
+REGRESSION_THRESHOLD = 0.25  # +25% on the median is a regression
+
+POS_COL = KELLY_POS_COL
+MIGRATION_DIR = Path(__file__).resolve().parent / "migration"
+
+BETA_MAP = {
+    "a": "α", "b": "β", "g": "γ", "d": "δ", "e": "ε", "z": "ζ", "h": "η", "q": "θ",
+    "i": "ι", "k": "κ", "l": "λ", "m": "μ", "n": "ν", "c": "ξ", "o": "ο", "p": "π",
+    "r": "ρ", "s": "σ", "t": "τ", "u": "υ", "f": "φ", "x": "χ", "y": "ψ", "w": "ω",
+    "a/": "ά", "e/": "έ", "h/": "ή", "i/": "ί", "o/": "ό", "u/": "ύ", "w/": "ώ",
+}
+
+
+# Post-ingestion migrations that shape the serving schema: (script, entry point)
+SERVING_MIGRATIONS = [
+    ("8_index_query_plans.py", "create_indexes"),
+    ("9_build_form_index.py", "build_form_index"),
+    ("10_encode_morphology_features.py", "encode_morphology_features"),
+    ("11_pack_paradigms.py", "pack_paradigms"),
+]
+
+
+def apply_serving_migrations(db_path):
+    """Brings the fixture to the production serving schema (indexes, form index)."""
+    for script, entry in SERVING_MIGRATIONS:
+        spec = importlib.util.spec_from_file_location(Path(script).stem, MIGRATION_DIR / script)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        getattr(module, entry)(Path(db_path))
+
+
+class SyntheticFixture:
+    """A deterministic lexicon on disk (see src.scale_fixtures) plus the frames the Weaver reads."""
+
+    def __init__(self, n_lemmas, seed=SEED, workdir=None):
+        self.n_lemmas = n_lemmas
+        self.workdir = Path(workdir or tempfile.mkdtemp(prefix="komby_bench_"))
+        generator = ScaleFixtureGenerator(
+            n_lemmas=n_lemmas, seed=seed, out_dir=self.workdir, vector_dim=0
+        )
+        generator.build()
+        apply_serving_migrations(generator.db_path)
+        self.db_path = generator.db_path
+        self.lemmas = list(zip(generator.lemma_text, generator.lemma_pos))
+        self.form_to_lemma = self._load_forms()
+        self.kelly = self._load_kelly(generator.kelly_path)
+        self.knots = pd.read_csv(generator.knots_path, dtype=str, keep_default_na=False)
+
+    def _load_forms(self):
+        conn = sqlite3.connect(self.db_path)
+        rows = conn.execute(
+            "SELECT f.form_text, l.lemma_text FROM forms f JOIN lemmas l ON f.lemma_id = l.id ORDER BY f.id"
+        ).fetchall()
+        conn.close()
+        form_to_lemma = {}
+        for form, lemma in rows:
+            form_to_lemma.setdefault(form, lemma)
+        return form_to_lemma
+
+    def _load_kelly(self, path):
+        # Same pre-processing as KombyphantikeEngine.__init__
+        kelly = pd.read_csv(path, dtype=str)
+        kelly["ID"] = pd.to_numeric(kelly["ID"], errors="coerce")
+        kelly["Freq_Score"] = 1 - (kelly["ID"] / kelly["ID"].max())
+        kelly["Similarity_Score"] = pd.to_numeric(
+            kelly["Similarity_Score"], errors="coerce"
+        ).fillna(0)
+        return kelly
+
+    def sample_lemmas(self, k):
+        rng = random.Random(SEED + k)
+        return [self.lemmas[rng.randrange(len(self.lemmas))][0] for _ in range(k)]
+
+    def sentence(self, n_words=12):
+        rng = random.Random(SEED + n_words)
+        forms = list(self.form_to_lemma)
+        return " ".join(forms[rng.randrange(len(forms))] for _ in range(n_words))
+
+
+# --- OFFLINE TOKENIZER (stands in for spaCy so the benchmark needs no models) ---
+class _SyntheticMorph(dict):
+    def to_dict(self):
+        return dict(self)
+
+
+class _SyntheticToken:
+    def __init__(self, text, lemma):
+        self.text = text
+        self.lemma_ = lemma
+        self.pos_ = "NOUN"
+        self.tag_ = "NOUN"
+        self.dep_ = "dep"
+        self.is_alpha = text.isalpha()
+        self.morph = _SyntheticMorph(Case="Nom", Number="Sing")
+
+
+class SyntheticTokenizer:
+    def __init__(self, form_to_lemma):
+        self.form_to_lemma = form_to_lemma
+
+    def __call__(self, text):
+        return [_SyntheticToken(t, self.form_to_lemma.get(t, t)) for t in text.split()]
+
+
+def build_engine(fixture):
+    """Assembles a KombyphantikeEngine over the fixture without loading any models."""
+    engine = KombyphantikeEngine.__new__(KombyphantikeEngine)
+    engine.kelly = fixture.kelly.copy()
+    engine.knot_loader = KnotLoader.__new__(KnotLoader)
+    engine.knot_loader.knots = fixture.knots.copy()
+    engine.db = DatabaseManager(db_path=fixture.db_path)
+    engine.pos_col = POS_COL
+    engine.gender_map = {}
+    engine.progress = {}
+    engine.nlp_el = SyntheticTokenizer(fixture.form_to_lemma)
+    engine.nlp_en = engine.nlp_el
+    engine.use_transformer = False
+    engine.vectors = None
+    return engine
+
+
+def build_converter():
+    """BetaCodeConverter with a minimal built-in table (no mapping files needed)."""
+    converter = BetaCodeConverter.__new__(BetaCodeConverter)
+    converter.BETA_TO_UNICODE = dict(BETA_MAP)
+    converter.UNICODE_TO_BETA = {v: k for k, v in BETA_MAP.items()}
+    converter._max_beta_key_len = max(len(k) for k in BETA_MAP)
+    return converter
+
+
+# --- CASES ---
+def build_cases(fixture, engine, converter):
+    """Returns {case_name: (callable, ops_per_call)}."""
+    sample = fixture.sample_lemmas(200)
+    words_df = engine.select_words(THEME, 30)
+    hero = words_df["Lemma"].iloc[0]
+    hero_row = words_df.iloc[0]
+    corpus = []
+    for ex_str in engine.kelly["Modern_Examples"]:
+        corpus.extend(str(ex_str).split(" || "))
+    sentence = fixture.sentence()
+    beta_words = [converter.to_beta_code(w) for w in sample]
+    memory = MemoryLexicon(fixture.db_path)
+
+    def db_loop(method):
+        def run():
+            for lemma in sample:
+                method(lemma)
+
+        return run
+
+    return {
+        "compile_curriculum": (lambda: engine.compile_curriculum(THEME, 20), 1),
+        "select_words": (lambda: engine.select_words(THEME, 30), 1),
+        "expand_word_pool": (lambda: engine._expand_word_pool(words_df), 1),
+        "expand_word_pool.complex": (lambda: engine._expand_word_pool(words_df, "complex"), 1),
+        "select_strategic_knots": (lambda: engine.select_strategic_knots(words_df, 5), 1),
+        "tokenize": (lambda: engine._tokenize(sentence, "el"), 1),
+        "get_modern_context": (lambda: engine._get_modern_context(hero, hero_row, corpus), 1),
+        "db.get_paradigm": (db_loop(engine.db.get_paradigm), len(sample)),
+        "db.get_metadata": (db_loop(engine.db.get_metadata), len(sample)),
+        "db.get_relations": (db_loop(engine.db.get_relations), len(sample)),
+        "db.select_words": (lambda: engine.db.select_words(THEME, 0, 100, 120), 1),
+        "memory.get_paradigm": (db_loop(memory.get_paradigm), len(sample)),
+        "memory.get_metadata": (db_loop(memory.get_metadata), len(sample)),
+        "memory.get_relations": (db_loop(memory.get_relations), len(sample)),
+        "memory.select_words": (lambda: memory.select_words(THEME, 0, 100, 120), 1),
+        "beta_code.to_beta_code": (lambda: [converter.to_beta_code(w) for w in sample], len(sample)),
+        "beta_code.to_greek": (lambda: [converter.to_greek(b) for b in beta_words], len(sample)),
+        "beta_code.canonicalize": (lambda: [converter.canonicalize(b) for b in beta_words], len(sample)),
+    }
+
+
+def time_case(func, ops, repeat):
+    """Runs func once to warm up, then `repeat` times; returns per-op milliseconds."""
+    func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000.0 / ops)
+    return {
+        "median_ms": round(statistics.median(samples), 4),
+        "min_ms": round(min(samples), 4),
+        "mean_ms": round(statistics.fmean(samples), 4),
+        "stdev_ms": round(statistics.stdev(samples), 4) if len(samples) > 1 else 0.0,
+        "ops": ops,
+        "repeat": repeat,
+    }
+
+
+def run_benchmarks(sizes, repeat=5, cases=None):
+    results = {}
+    converter = build_converter()
+    for size in sizes:
+        n_lemmas = SIZES[size]
+        logger.info(f"Building '{size}' fixture ({n_lemmas} lemmas)...")
+        with tempfile.TemporaryDirectory(prefix="komby_bench_") as tmp:
+            fixture = SyntheticFixture(n_lemmas, workdir=tmp)
+            engine = build_engine(fixture)
+            # The Weaver is chatty; silence it while timing.
+            with contextlib.redirect_stdout(io.StringIO()):
+                size_cases = build_cases(fixture, engine, converter)
+                results[size] = {}
+                for name, (func, ops) in size_cases.items():
+                    if cases and name not in cases:
+                        continue
+                    results[size][name] = time_case(func, ops, repeat)
+            engine.db.close()
+        for name, stats in results[size].items():
+            logger.info(f"  {size:<7} {name:<26} {stats['median_ms']:>10.4f} ms/op")
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": SEED,
+            "sizes": {s: SIZES[s] for s in sizes},
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, threshold=REGRESSION_THRESHOLD):
+    """
+    Compares median timings with the baseline.
+    Returns a list of rows: (size, case, baseline_ms, current_ms, ratio, status).
+    """
+    rows = []
+    for size, cases in current["results"].items():
+        base_cases = baseline.get("results", {}).get(size, {})
+        for name, stats in cases.items():
+            base = base_cases.get(name)
+            if not base:
+                rows.append((size, name, None, stats["median_ms"], None, "NEW"))
+                continue
+            ratio = stats["median_ms"] / base["median_ms"] if base["median_ms"] else 1.0
+            if ratio > 1 + threshold:
+                status = "REGRESSION"
+            elif ratio < 1 - threshold:
+                status = "IMPROVED"
+            else:
+                status = "OK"
+            rows.append((size, name, base["median_ms"], stats["median_ms"], ratio, status))
+    return rows
+
+
+def print_comparison(rows):
+    print(f"{'SIZE':<8}{'CASE':<28}{'BASELINE':>12}{'CURRENT':>12}{'RATIO':>8}  STATUS")
+    for size, name, base, cur, ratio, status in rows:
+        base_str = f"{base:.4f}" if base is not None else "-"
+        ratio_str = f"{ratio:.2f}x" if ratio is not None else "-"
+        print(f"{size:<8}{name:<28}{base_str:>12}{cur:>12.4f}{ratio_str:>8}  {status}")
+
+
+def save_json(data, path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Kombyphantike hot-path benchmarks")
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=list(SIZES))
+    parser.add_argument("--cases", nargs="+", help="Only run these cases")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", type=Path, default=RESULTS_FILE)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_FILE)
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    logging.getLogger("src.kombyphantike").setLevel(logging.WARNING)
+    logging.getLogger("src.scale_fixtures").setLevel(logging.WARNING)
+
+    current = run_benchmarks(args.sizes, repeat=args.repeat, cases=args.cases)
+    save_json(current, args.output)
+    logger.info(f"Results saved to {args.output}")
+
+    if args.update_baseline:
+        save_json(current, args.baseline)
+        logger.info(f"Baseline updated: {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        logger.warning(f"No baseline at {args.baseline}. Run with --update-baseline.")
+        return 0
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    rows = compare(current, baseline, args.threshold)
+    print_comparison(rows)
+
+    regressions = [r for r in rows if r[5] == "REGRESSION"]
+    if regressions:
+        logger.warning(f"{len(regressions)} regression(s) above +{args.threshold:.0%}.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
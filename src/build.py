@@ -0,0 +1,330 @@
+"""Incremental build of the lexicon: runs the stale stages of the ETL DAG."""
+
+import argparse
+import hashlib
+import importlib
+import importlib.util
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+from src.config import (
+    BASE_DIR,
+    DICT_DIR,
+    DRILLS_FILE,
+    KAIKKI_EL_FILE,
+    KAIKKI_EN_FILE,
+    KELLY_FILE,
+    LSJ_ORACLE_FILE,
+    OUTPUT_FILE,
+    PROCESSED_DIR,
+    SERVING_DB_FILE,
+)
+
+logger = logging.getLogger(__name__)
+
+SRC_DIR = BASE_DIR / "src"
+MIGRATION_DIR = SRC_DIR / "migration"
+LSJ_XML_DIR = DICT_DIR / "lsj_xml"
+BUILD_DB_FILE = PROCESSED_DIR / "kombyphantike_v2.db"
+STATE_FILE = PROCESSED_DIR / "build_state.json"
+HASH_CHUNK = 1 << 20
+
+
+class Stage:
+    def __init__(self, name, target, inputs=(), outputs=(), writes=(), deps=(), code=()):
+        """target: (migration script, entry point) or (module, callable), called without arguments."""
+        self.name = name
+        self.target = target
+        self.inputs = [Path(p) for p in inputs]
+        self.outputs = [Path(p) for p in outputs]
+        self.writes = [Path(p) for p in writes]
+        self.deps = list(deps)
+        script = target[0]
+        if script.endswith(".py"):
+            own = [MIGRATION_DIR / script, SRC_DIR / "bulk_load.py"]  # Every migration loads through it
+        elif script.startswith("src."):
+            own = [SRC_DIR / (script[len("src."):].replace(".", "/") + ".py")]
+        else:
+            own = []
+        self.code = own + [Path(p) for p in code]
+
+
+def _src(*names):
+    return [SRC_DIR / name for name in names]
+
+
+PIPELINE_CODE = _src(
+    "config.py", "ingestion_hybrid.py", "kaikki_scanner.py", "noun_declension_extractor.py",
+    "enrichment_el.py", "enrichment_lsj.py", "analysis.py", "lemmatizer.py", "beta_code.py",
+)
+
+# The default DAG. Migration 7 (paid translation API) stays a manual step.
+STAGES = [
+    Stage("lsj_oracle", ("src.build", "build_lsj_oracle"), inputs=[LSJ_XML_DIR], outputs=[LSJ_ORACLE_FILE],
+          code=_src("lsj_fuzzy_indexer.py", "beta_code.py")),
+    Stage("drills", ("src.build", "generate_drills"), inputs=[KELLY_FILE, KAIKKI_EL_FILE], outputs=[DRILLS_FILE],
+          code=_src("drill_generator.py", "kaikki_scanner.py")),
+    Stage("pipeline", ("src.main", "run_pipeline"), inputs=[KELLY_FILE, KAIKKI_EL_FILE, KAIKKI_EN_FILE],
+          outputs=[OUTPUT_FILE], deps=["lsj_oracle"], code=PIPELINE_CODE),
+    Stage("lsj_deep", ("1_ingest_lsj_deep.py", "ingest_lsj"), inputs=[LSJ_XML_DIR], writes=[BUILD_DB_FILE],
+          code=_src("beta_code.py", "lsj_tables.py")),
+    Stage("link", ("2_master_ingestion_linker.py", "main"), writes=[BUILD_DB_FILE], deps=["lsj_deep"],
+          code=_src("beta_code.py", "lsj_tables.py")),
+    Stage("hydrate", ("3_hydrate_lemmas.py", "hydrate_lemmas"), inputs=[OUTPUT_FILE], writes=[BUILD_DB_FILE],
+          deps=["link", "pipeline"]),
+    Stage("morphology", ("4_parse_greek_morphology.py", "parse_greek_morphology"), writes=[BUILD_DB_FILE],
+          deps=["hydrate"]),
+    Stage("kds", ("5_infer_difficulty_scores.py", "infer_difficulty_scores"), inputs=[OUTPUT_FILE],
+          writes=[BUILD_DB_FILE], deps=["morphology"]),
+    Stage("propagate", ("6_propagate_metadata.py", "propagate_metadata"), writes=[BUILD_DB_FILE], deps=["kds"]),
+    Stage("kaikki_delta", ("12_ingest_kaikki_delta.py", "ingest_kaikki_delta"), inputs=[KAIKKI_EL_FILE],
+          writes=[BUILD_DB_FILE], deps=["propagate"],
+          code=_src("kaikki_scanner.py", "ingestion_hybrid.py", "noun_declension_extractor.py")),
+    Stage("indexes", ("8_index_query_plans.py", "create_indexes"), writes=[BUILD_DB_FILE], deps=["kaikki_delta"]),
+    Stage("form_index", ("9_build_form_index.py", "build_form_index"), writes=[BUILD_DB_FILE], deps=["indexes"],
+          code=_src("morphology.py")),
+    Stage("features", ("10_encode_morphology_features.py", "encode_morphology_features"), writes=[BUILD_DB_FILE],
+          deps=["form_index"], code=_src("morphology.py")),
+    Stage("paradigms", ("11_pack_paradigms.py", "pack_paradigms"), writes=[BUILD_DB_FILE], deps=["features"],
+          code=_src("morphology.py")),
+    Stage("publish", ("src.publish", "publish_snapshot"), inputs=[BUILD_DB_FILE], outputs=[SERVING_DB_FILE],
+          deps=["paradigms"], code=_src("morphology.py")),
+]
+
+
+def build_lsj_oracle():
+    from src.lsj_fuzzy_indexer import build_index
+
+    build_index()
+
+
+def generate_drills():
+    from src.drill_generator import DrillGenerator
+
+    DrillGenerator().run()
+
+
+def resolve_target(target):
+    """Imports the stage's script or module and returns its entry point."""
+    script, entry = target
+    if script.endswith(".py"):
+        spec = importlib.util.spec_from_file_location(Path(script).stem, MIGRATION_DIR / script)
+        module = importlib.util.module_from_spec(spec)
+        # Registered so a migration's process pool can pickle its workers by reference
+        sys.modules[spec.name] = module
+        spec.loader.exec_module(module)
+    else:
+        module = importlib.import_module(script)
+    return getattr(module, entry)
+
+
+def run_target(target):
+    """Worker: calls the stage's entry point."""
+    resolve_target(target)()
+
+
+class FileHasher:
+    """SHA-256 of files and directories, cached by (size, mtime_ns) across builds."""
+
+    def __init__(self, cache=None):
+        self.cache = cache if cache is not None else {}
+
+    def file(self, path) -> str:
+        stat = path.stat()
+        cached = self.cache.get(str(path))
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+                digest.update(chunk)
+        self.cache[str(path)] = [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+        return digest.hexdigest()
+
+    def path(self, path) -> str:
+        """Content hash of a file, a directory tree ("missing" when absent)."""
+        if path.is_dir():
+            digest = hashlib.sha256()
+            for child in sorted(p for p in path.rglob("*") if p.is_file()):
+                digest.update(f"{child.relative_to(path).as_posix()}\0{self.file(child)}\0".encode())
+            return digest.hexdigest()
+        if path.exists():
+            return self.file(path)
+        return "missing"
+
+
+class Builder:
+    def __init__(self, stages=STAGES, state_file=STATE_FILE, workers=None):
+        self.stages = {stage.name: stage for stage in stages}
+        self.state_file = Path(state_file)
+        self.workers = workers or os.cpu_count() or 1
+        self.state = {"stages": {}, "files": {}}
+        if self.state_file.exists():
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                self.state.update(json.load(f))
+        self.hasher = FileHasher(self.state["files"])
+        self.keys = {}
+        self.fingerprints = {}
+
+    def closure(self, targets=None) -> list:
+        """The requested stages and everything they depend on, in declaration order."""
+        if not targets:
+            return list(self.stages)
+        wanted = set()
+        pending = list(targets)
+        while pending:
+            name = pending.pop()
+            if name not in self.stages:
+                raise KeyError(f"Unknown stage: {name}")
+            if name not in wanted:
+                wanted.add(name)
+                pending.extend(self.stages[name].deps)
+        return [name for name in self.stages if name in wanted]
+
+    def key(self, name) -> str:
+        """Hash of the stage's code, inputs and dep fingerprints (deps must be settled)."""
+        stage = self.stages[name]
+        digest = hashlib.sha256(name.encode())
+        for path in stage.code:
+            digest.update(self.hasher.path(path).encode())
+        for path in stage.inputs:
+            digest.update(f"{path.name}\0{self.hasher.path(path)}".encode())
+        for dep in stage.deps:
+            digest.update(f"{dep}\0{self.fingerprints[dep]}".encode())
+        return digest.hexdigest()
+
+    def fingerprint(self, name) -> str:
+        stage = self.stages[name]
+        if not stage.outputs:
+            # A shared database cannot be compared by content: every run is a new state
+            return f"{self.keys[name]}:{time.time_ns()}"
+        digest = hashlib.sha256()
+        for path in stage.outputs:
+            digest.update(self.hasher.path(path).encode())
+        return digest.hexdigest()
+
+    def is_fresh(self, name) -> bool:
+        stage = self.stages[name]
+        recorded = self.state["stages"].get(name, {})
+        if recorded.get("key") != self.keys[name]:
+            return False
+        return all(path.exists() for path in stage.outputs + stage.writes)
+
+    def settle(self, name, seconds, report):
+        """Records a finished stage: its key, fingerprint and timing."""
+        self.fingerprints[name] = self.fingerprint(name)
+        self.state["stages"][name] = {
+            "key": self.keys[name],
+            "fingerprint": self.fingerprints[name],
+            "seconds": round(seconds, 3),
+            "finished": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        report[name] = ("ran", seconds)
+        self.save()
+
+    def save(self):
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        pending = self.state_file.with_name(self.state_file.name + ".tmp")
+        with open(pending, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(pending, self.state_file)
+
+    def plan(self, targets=None, force=False) -> list:
+        """Stages a build would run, assuming each rerun changes its fingerprint."""
+        stale = []
+        for name in self.closure(targets):
+            self.keys[name] = self.key(name)
+            if force or any(dep in stale for dep in self.stages[name].deps) or not self.is_fresh(name):
+                stale.append(name)
+                self.fingerprints[name] = f"stale:{name}"
+            else:
+                self.fingerprints[name] = self.state["stages"][name]["fingerprint"]
+        return stale
+
+    def build(self, targets=None, force=False) -> dict:
+        """
+        Runs every stale stage, independent ones in parallel.
+        Returns {stage: (status, seconds)} with status ran / skipped / failed / blocked.
+        """
+        order = self.closure(targets)
+        report = {}
+        waiting = list(order)
+        running = {}
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            while waiting or running:
+                progressed = False
+                for name in list(waiting):
+                    deps = self.stages[name].deps
+                    if any(report.get(dep, ("",))[0] in ("failed", "blocked") for dep in deps):
+                        waiting.remove(name)
+                        report[name] = ("blocked", 0.0)
+                        progressed = True
+                        continue
+                    if any(dep not in report for dep in deps):
+                        continue
+                    waiting.remove(name)
+                    progressed = True
+                    self.keys[name] = self.key(name)
+                    if not force and self.is_fresh(name):
+                        self.fingerprints[name] = self.state["stages"][name]["fingerprint"]
+                        report[name] = ("skipped", 0.0)
+                        continue
+                    logger.info(f"[build] {name} ...")
+                    running[executor.submit(run_target, self.stages[name].target)] = (name, time.perf_counter())
+
+                if not running:
+                    if not progressed:
+                        raise ValueError(f"Stages wait on undeclared or later stages: {waiting}")
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name, started = running.pop(future)
+                    seconds = time.perf_counter() - started
+                    try:
+                        future.result()
+                    except (Exception, SystemExit) as e:  # Some scripts exit() on bad input
+                        logger.error(f"[build] {name} failed after {seconds:.1f}s: {e}")
+                        report[name] = ("failed", seconds)
+                        continue
+                    self.settle(name, seconds, report)
+        self.save()
+        return {name: report[name] for name in order}
+
+
+def print_report(report):
+    print(f"{'stage':<14}{'status':<10}{'seconds':>10}")
+    for name, (status, seconds) in report.items():
+        print(f"{name:<14}{status:<10}{seconds:>10.1f}")
+    total = sum(seconds for _, seconds in report.values())
+    print(f"{'total':<24}{total:>10.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Incremental build of the lexicon")
+    parser.add_argument("targets", nargs="*", help="Stages to bring up to date (default: all)")
+    parser.add_argument("--force", action="store_true", help="Rebuild the targets and their deps regardless")
+    parser.add_argument("--dry-run", action="store_true", help="List the stages that would run")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--state", type=Path, default=STATE_FILE)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    builder = Builder(state_file=args.state, workers=args.workers)
+    if args.dry_run:
+        for name in builder.plan(args.targets, force=args.force):
+            print(name)
+        builder.save()  # Keep the file hashes just computed
+        return 0
+
+    report = builder.build(args.targets, force=args.force)
+    print_report(report)
+    return 1 if any(status == "failed" for status, _ in report.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
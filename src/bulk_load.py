@@ -0,0 +1,203 @@
+"""Shared helpers for the migrations to bulk-load rows into SQLite."""
+
+import logging
+import sqlite3
+import time
+from contextlib import contextmanager
+from itertools import islice
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 10_000  # Rows per executemany call
+
+# No fsync, in-memory journal: the build database is rebuilt from the raw
+# dictionaries, so a crash costs a rerun, not data
+BULK_PRAGMAS = [
+    ("synchronous", "OFF"),
+    ("journal_mode", "MEMORY"),
+    ("temp_store", "MEMORY"),
+    ("cache_size", "-262144"),  # KiB: 256 MiB page cache
+]
+
+
+def connect(db_path):
+    """Opens the database with the bulk-load PRAGMAs applied."""
+    conn = sqlite3.connect(db_path)
+    for name, value in BULK_PRAGMAS:
+        conn.execute(f"PRAGMA {name} = {value}")
+    return conn
+
+
+@contextmanager
+def phase(conn, name):
+    """
+    One transaction around a migration step; yields a cursor. Commits on
+    success, rolls everything back (DDL included) on error. A transaction
+    already open on the connection is joined rather than nested.
+    """
+    start = time.perf_counter()
+    if not conn.in_transaction:
+        conn.execute("BEGIN")
+    cursor = conn.cursor()
+    try:
+        yield cursor
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+    logger.info(f"{name}: {time.perf_counter() - start:.2f}s")
+
+
+def _batches(rows, batch_size):
+    rows = iter(rows)
+    while batch := list(islice(rows, batch_size)):
+        yield batch
+
+
+def insert_many(cursor, table, columns, rows, verb="INSERT", batch_size=BATCH_SIZE) -> int:
+    """
+    Inserts rows (tuples in `columns` order, from any iterable) with batched
+    executemany. verb: "INSERT", "INSERT OR IGNORE" or "INSERT OR REPLACE".
+    Returns the number of rows sent.
+    """
+    sql = f"{verb} INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})"
+    count = 0
+    for batch in _batches(rows, batch_size):
+        cursor.executemany(sql, batch)
+        count += len(batch)
+    return count
+
+
+def upsert(cursor, table, columns, rows, key, update=None, batch_size=BATCH_SIZE) -> int:
+    """
+    INSERT ... ON CONFLICT(key) DO UPDATE through batched executemany.
+    key: the conflict target (a UNIQUE or PRIMARY KEY column list).
+    update: column -> SQL expression for the update arm. Defaults to
+        `excluded.<column>` for every non-key column.
+    Returns the number of rows sent.
+    """
+    if update is None:
+        update = {column: f"excluded.{column}" for column in columns if column not in key}
+    assignments = ", ".join(f"{column} = {expression}" for column, expression in update.items())
+    verb = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})"
+    sql = f"{verb} ON CONFLICT({', '.join(key)}) DO UPDATE SET {assignments}"
+    count = 0
+    for batch in _batches(rows, batch_size):
+        cursor.executemany(sql, batch)
+        count += len(batch)
+    return count
+
+
+def stage(cursor, name, columns, rows, batch_size=BATCH_SIZE) -> int:
+    """
+    (Re)creates the TEMP table `name` and loads rows into it.
+    columns: column name -> declared type (e.g. {"id": "INTEGER PRIMARY KEY"}).
+    Rows keep their load order in rowid. Returns the number of rows loaded.
+    """
+    cursor.execute(f"DROP TABLE IF EXISTS temp.{name}")
+    definitions = ", ".join(f"{column} {kind}" for column, kind in columns.items())
+    cursor.execute(f"CREATE TEMP TABLE {name} ({definitions})")
+    return insert_many(cursor, f"temp.{name}", list(columns), rows, batch_size=batch_size)
+
+
+@contextmanager
+def deferred_indexes(cursor, *tables):
+    """
+    Drops the explicit indexes of `tables` for the duration of a bulk load and
+    recreates them from their stored SQL afterwards. Inside a phase, the
+    rollback restores them on error. Around several phases (a checkpointed
+    load), the drops commit at once and an interrupted load leaves the
+    indexes to be recreated by the rerun.
+    """
+    placeholders = ", ".join("?" for _ in tables)
+    indexes = cursor.execute(
+        f"SELECT name, sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL "
+        f"AND tbl_name IN ({placeholders})",
+        tables,
+    ).fetchall()
+    for name, _ in indexes:
+        cursor.execute(f"DROP INDEX {name}")
+    yield
+    for _, sql in indexes:
+        cursor.execute(sql)
+
+
+class Checkpoint:
+    """
+    Progress of one migration, by step: the last committed position (a key or
+    batch number, any SQLite value) and whether the step is finished.
+
+        checkpoint = Checkpoint(conn, "4_parse_greek_morphology")
+        for batch in batches_after(checkpoint.position("forms")):
+            with phase(conn, "Batch") as cursor:
+                ...  # idempotent writes for this batch
+                checkpoint.advance(cursor, "forms", batch.last_key)
+        checkpoint.clear()  # completed: the next run starts fresh
+
+    resume=False forgets earlier progress and starts over.
+    """
+
+    TABLE = "migration_checkpoints"
+
+    def __init__(self, conn, migration, resume=True):
+        self.conn = conn
+        self.migration = migration
+        conn.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {self.TABLE} (
+                migration TEXT NOT NULL,
+                step TEXT NOT NULL,
+                position,
+                done INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (migration, step)
+            ) WITHOUT ROWID
+            """
+        )
+        if not resume:
+            conn.execute(f"DELETE FROM {self.TABLE} WHERE migration = ?", (migration,))
+        conn.commit()
+        state = self.conn.execute(
+            f"SELECT step, position, done FROM {self.TABLE} WHERE migration = ?", (migration,)
+        ).fetchall()
+        if state:
+            logger.info(f"Resuming {migration}: " + ", ".join(
+                f"{step} {'done' if done else f'at {position}'}" for step, position, done in state
+            ))
+
+    def position(self, step, default=None):
+        """Last committed position of `step`, or default when it has not started."""
+        row = self.conn.execute(
+            f"SELECT position FROM {self.TABLE} WHERE migration = ? AND step = ?", (self.migration, step)
+        ).fetchone()
+        return default if row is None or row[0] is None else row[0]
+
+    def is_done(self, step) -> bool:
+        row = self.conn.execute(
+            f"SELECT done FROM {self.TABLE} WHERE migration = ? AND step = ?", (self.migration, step)
+        ).fetchone()
+        return bool(row and row[0])
+
+    def advance(self, cursor, step, position):
+        """Records `position` in the caller's transaction, so it commits with the batch."""
+        cursor.execute(
+            f"""
+            INSERT INTO {self.TABLE} (migration, step, position) VALUES (?, ?, ?)
+            ON CONFLICT(migration, step) DO UPDATE SET position = excluded.position
+            """,
+            (self.migration, step, position),
+        )
+
+    def finish(self, cursor, step):
+        """Marks `step` complete, in the caller's transaction."""
+        cursor.execute(
+            f"""
+            INSERT INTO {self.TABLE} (migration, step, done) VALUES (?, ?, 1)
+            ON CONFLICT(migration, step) DO UPDATE SET done = 1
+            """,
+            (self.migration, step),
+        )
+
+    def clear(self):
+        """Forgets the migration's progress once it has completed."""
+        with phase(self.conn, f"Clearing {self.migration} checkpoint") as cursor:
+            cursor.execute(f"DELETE FROM {self.TABLE} WHERE migration = ?", (self.migration,))
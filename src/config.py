@@ -8,6 +8,10 @@ DATA_DIR = BASE_DIR / "data"
 DICT_DIR = DATA_DIR / "dictionaries"
 PROCESSED_DIR = DATA_DIR / "processed"
 SESSIONS_DIR = DATA_DIR / "sessions"
+TRACES_DIR = DATA_DIR / "traces"  # Chrome-trace dumps (created on demand)
+# Whether the API may dump Chrome traces at all (see src/api.py).
+# The KOMBYPHANTIKE_TRACE_DUMPS environment variable ("1"/"0") overrides it.
+TRACE_DUMPS = False
 
 PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
 SESSIONS_DIR.mkdir(parents=True, exist_ok=True)
@@ -22,8 +26,20 @@ OUTPUT_FILE = PROCESSED_DIR / "kelly.csv"
 KAIKKI_EL_FILE = DICT_DIR / "kaikki-el.jsonl"  # The Master Source
 KAIKKI_EN_FILE = DICT_DIR / "kaikki-en.jsonl"  # The Translation Source
 LSJ_INDEX_FILE = DICT_DIR / "lsj_index.json"
+LSJ_ORACLE_FILE = DICT_DIR / "lsj_oracle.db"  # Keyed store written by lsj_fuzzy_indexer
 
-# 4. Drills & Knots
+# 4. Read-only serving snapshot of the lexicon (python -m src.publish)
+SERVING_DB_FILE = PROCESSED_DIR / "kombyphantike_serving.db"
+# Whether DatabaseManager() / MemoryLexicon() default to the snapshot instead of the build database.
+# The KOMBYPHANTIKE_SERVE_SNAPSHOT environment variable ("1"/"0") overrides it.
+# The snapshot is opened immutable: re-publish and restart after running migrations.
+SERVE_SNAPSHOT = False
+
+# Lexicon backend behind the engine: "sqlite" (DatabaseManager) or "memory" (MemoryLexicon).
+# The KOMBYPHANTIKE_LEXICON environment variable overrides it at engine start-up.
+LEXICON_BACKEND = "sqlite"
+
+# 5. Drills & Knots
 DRILLS_FILE = PROCESSED_DIR / "modern_drills.csv"
 KNOTS_PATH = DICT_DIR / "knots.csv"
 
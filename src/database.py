@@ -1,21 +1,222 @@
 import json
 import logging
+import os
 import sqlite3
+import unicodedata
+from pathlib import Path
 
-from src.config import PROCESSED_DIR
+from src.config import PROCESSED_DIR, SERVE_SNAPSHOT, SERVING_DB_FILE
+from src.morphology import COLUMNS, FEATURES, PACK_WIDTH, feature_bit, pack_tags_json
+from src.relation_graph import RelationGraph
+from src.tracing import traced
 
 logger = logging.getLogger(__name__)
 
+# Memory-map up to this many bytes of a read-only snapshot
+MMAP_SIZE = 1 << 30
+
+# Column-wise result of expand_relations (the last three also come from get_expansion_details)
+EXPANSION_COLUMNS = ["seed", "lemma", "relation_type", "pos", "modern_def", "etymology_text"]
+EXPANSION_DETAILS = EXPANSION_COLUMNS[3:]
+# lemmas columns the set-based expand_relations reads (details + ranking)
+EXPANSION_LEMMA_COLUMNS = EXPANSION_DETAILS + ["frequency_score"]
+
+
+def normalize_form(text: str) -> str:
+    """Key for the reverse form index: NFC + lowercase (Python handles final sigma)."""
+    return unicodedata.normalize("NFC", text or "").strip().lower()
+
+
+def pack_paradigm(cells) -> bytes:
+    """[(form_text, tags_json), ...] -> compact UTF-8 blob of [[form, [tags...]], ...]."""
+    table = []
+    for form_text, tags_json in cells:
+        try:
+            tags = json.loads(tags_json) if tags_json else []
+        except ValueError:
+            tags = []
+        table.append([form_text, tags])
+    return json.dumps(table, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def unpack_paradigm(blob: bytes) -> list:
+    """Inverse of pack_paradigm: the whole table is decoded in one call."""
+    return json.loads(blob)
+
+
+def default_db_path():
+    """
+    The database to open when no path is given: the build database, or the
+    serving snapshot when SERVE_SNAPSHOT (or KOMBYPHANTIKE_SERVE_SNAPSHOT) is on.
+    """
+    build_db = PROCESSED_DIR / "kombyphantike_v2.db"
+    if os.environ.get("KOMBYPHANTIKE_SERVE_SNAPSHOT", "1" if SERVE_SNAPSHOT else "0") != "1":
+        return build_db
+    if not SERVING_DB_FILE.exists():
+        raise FileNotFoundError(f"Serving snapshot not found at {SERVING_DB_FILE} (run python -m src.publish)")
+    if build_db.exists() and build_db.stat().st_mtime > SERVING_DB_FILE.stat().st_mtime:
+        logger.warning(f"{SERVING_DB_FILE} is older than {build_db}; re-run python -m src.publish")
+    return SERVING_DB_FILE
+
+
+def _lower(text):
+    """SQL py_lower(): Python's lowercase (SQLite's lower() only folds ASCII)."""
+    return text.lower() if isinstance(text, str) else text
+
 
 class DatabaseManager:
-    def __init__(self):
-        self.db_path = PROCESSED_DIR / "kombyphantike_v2.db"
+    def __init__(self, db_path=None, read_only=None):
+        if db_path is None:
+            db_path = default_db_path()
+            if read_only is None:
+                # Published by src/publish.py; never written after publication
+                read_only = db_path == SERVING_DB_FILE
+        self.db_path = db_path
+        self.read_only = bool(read_only)
         # check_same_thread=False allows FastAPI to use the connection across requests
-        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        if self.read_only:
+            uri = f"{Path(self.db_path).resolve().as_uri()}?mode=ro&immutable=1"
+            self.conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            self.conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+        else:
+            self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
         self.conn.row_factory = sqlite3.Row
+        self.conn.create_function("py_lower", 1, _lower, deterministic=True)
+        self.conn.create_function("morph_pack", 1, pack_tags_json, deterministic=True)
+        # Built by migration 9; older databases fall back to scanning `forms`.
+        self.has_form_index = self._table_exists("form_index")
+        # Built by migration 10; older databases fall back to matching tag strings.
+        self.has_feature_columns = self._has_columns("forms", COLUMNS.values())
+        # Forms not encoded yet (NULL features) are read from tags_json where it was kept.
+        self.has_form_tags = self._has_columns("forms", ["tags_json"])
+        # Built by migration 11; older databases assemble paradigms from `forms`.
+        self.has_paradigm_blobs = self._table_exists("paradigm_blobs")
+        # Older databases lack some of these; expand_relations then works seed by seed.
+        self.has_expansion_columns = self._has_columns("lemmas", EXPANSION_LEMMA_COLUMNS)
+        self._relation_graph = None
+
+    def _table_exists(self, name: str) -> bool:
+        row = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name = ?", (name,)
+        ).fetchone()
+        return row is not None
+
+    def _has_columns(self, table: str, columns) -> bool:
+        existing = {row[1] for row in self.conn.execute(f"PRAGMA table_info({table})")}
+        return bool(existing) and set(columns) <= existing
+
+    @traced("db.has_feature", category="db")
+    def has_feature(self, lemma: str, dimension: str, value: str):
+        """
+        Does any form of the lemma carry the feature? e.g. has_feature("λόγος", "number", "plural").
+        A 'form_of' headword without forms of its own is checked against its parent.
+        Returns None when no forms are found, so callers can decide how to treat missing paradigms.
+        """
+        if dimension not in FEATURES:
+            raise ValueError(f"Unknown morphology dimension: {dimension}")
+        bit = feature_bit(dimension, value)
+
+        if not self.has_feature_columns:
+            paradigm = self.get_paradigm(lemma)
+            if not paradigm:
+                return None
+            return any(value in str(f.get("tags", [])).lower() for f in paradigm)
+
+        column = COLUMNS[dimension]
+        unencoded = ""
+        if self.has_form_tags:
+            shift = list(COLUMNS).index(dimension) * PACK_WIDTH
+            # The feature index finds the unencoded rows; only those are read for tags_json
+            unencoded = f"""
+                    OR EXISTS (
+                        SELECT 1 FROM forms AS u
+                        WHERE u.lemma_id = (SELECT id FROM target) AND u.{column} IS NULL
+                          AND ((morph_pack((SELECT tags_json FROM forms WHERE id = u.id)) >> {shift}) & :bit) != 0
+                    )"""
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute(
+                f"""
+                WITH target AS (
+                    SELECT c.id FROM (
+                        SELECT id, 0 AS pref FROM lemmas WHERE lemma_text = :lemma
+                        UNION ALL
+                        SELECT l.id, 1 AS pref FROM relations r
+                        JOIN lemmas child ON r.child_lemma_id = child.id
+                        JOIN lemmas l ON r.parent_lemma_text = l.lemma_text
+                        WHERE child.lemma_text = :lemma AND r.relation_type = 'form_of'
+                    ) AS c
+                    WHERE EXISTS (SELECT 1 FROM forms WHERE lemma_id = c.id)
+                    ORDER BY c.pref LIMIT 1
+                )
+                SELECT
+                    EXISTS (SELECT 1 FROM target) AS has_forms,
+                    EXISTS (
+                        SELECT 1 FROM forms
+                        WHERE lemma_id = (SELECT id FROM target) AND ({column} & :bit) != 0
+                    ){unencoded} AS has_feature
+                """,
+                {"lemma": lemma, "bit": bit},
+            )
+            row = cursor.fetchone()
+            if not row["has_forms"]:
+                return None
+            return bool(row["has_feature"])
+        except Exception as e:
+            logger.error(f"DB Error in has_feature for '{lemma}': {e}")
+            return None
+
+    @traced("db.resolve_form", category="db")
+    def resolve_form(self, surface: str) -> list:
+        """
+        Surface form -> candidate analyses, best first:
+        [{"lemma_id", "lemma", "form", "tags"}]. One indexed lookup on form_index.
+        Inflected forms rank above bare headwords; ties go to the more frequent lemma.
+        """
+        key = normalize_form(surface)
+        if not key:
+            return []
+        try:
+            cursor = self.conn.cursor()
+            if self.has_form_index:
+                cursor.execute(
+                    """
+                    SELECT lemma_id, lemma_text, form_text, tags_json
+                    FROM form_index
+                    WHERE form_key = ?
+                    ORDER BY priority, frequency DESC
+                    """,
+                    (key,),
+                )
+            else:
+                cursor.execute(
+                    """
+                    SELECT l.id AS lemma_id, l.lemma_text, f.form_text, f.tags_json
+                    FROM forms f
+                    JOIN lemmas l ON l.id = f.lemma_id
+                    WHERE f.form_text IN (?, ?)
+                    ORDER BY l.frequency_score DESC
+                    """,
+                    (surface, key),
+                )
+            return [
+                {
+                    "lemma_id": r["lemma_id"],
+                    "lemma": r["lemma_text"],
+                    "form": r["form_text"],
+                    "tags": json.loads(r["tags_json"]) if r["tags_json"] else [],
+                }
+                for r in cursor.fetchall()
+            ]
+        except Exception as e:
+            logger.error(f"DB Error in resolve_form for '{surface}': {e}")
+            return []
 
+    @traced("db.get_paradigm", category="db")
     def get_paradigm(self, lemma: str):
         """Fetches the full grammatical table for a word, following redirects."""
+        if self.has_paradigm_blobs:
+            return self._get_packed_paradigm(lemma)
         try:
             cursor = self.conn.cursor()
             target_id = None
@@ -65,6 +266,35 @@ class DatabaseManager:
             logger.error(f"DB Error in get_paradigm for '{lemma}': {e}")
             return []
 
+    def _get_packed_paradigm(self, lemma: str):
+        """One keyed read of the materialized paradigm (see migration 11)."""
+        try:
+            row = self.conn.execute(
+                """
+                SELECT b.paradigm FROM paradigm_keys k
+                JOIN paradigm_blobs b ON b.lemma_id = k.lemma_id
+                WHERE k.key = ?
+                ORDER BY k.priority, k.frequency DESC
+                LIMIT 1
+                """,
+                (lemma,),
+            ).fetchone()
+            if not row:
+                return []
+
+            paradigm = []
+            for form_text, tags in unpack_paradigm(row["paradigm"]):
+                entry = {"form": form_text, "tags": tags}
+                if form_text == lemma:
+                    entry["is_current_form"] = True
+                paradigm.append(entry)
+            return paradigm
+
+        except Exception as e:
+            logger.error(f"DB Error in get_paradigm for '{lemma}': {e}")
+            return []
+
+    @traced("db.get_metadata", category="db")
     def get_metadata(self, lemma_text: str):
         """
         Retrieves the pre-calculated philological metadata.
@@ -102,6 +332,7 @@ class DatabaseManager:
             logger.error(f"DB Error in get_metadata for '{lemma_text}': {e}")
             return None
 
+    @traced("db.get_relations", category="db")
     def get_relations(self, lemma_text: str) -> dict:
         """Fetches synonyms, antonyms, and etymological relatives."""
         try:
@@ -129,6 +360,122 @@ class DatabaseManager:
             logger.error(f"DB Error in get_relations for '{lemma_text}': {e}")
             return {}
 
+    @traced("db.expand_relations", category="db")
+    def expand_relations(self, seeds, relation_types, limit: int, exclude=()) -> dict:
+        """
+        Related words for a whole seed set in one joined query, column-wise:
+        {"seed", "lemma", "relation_type", "pos", "modern_def", "etymology_text"}.
+        Seeds are never returned, nor words whose lowercase is in `exclude` (lowercased
+        by the caller, e.g. the whole word pool). A word related to several seeds goes
+        to the first of them. Each seed keeps its `limit` most frequent relatives.
+        """
+        seeds = list(dict.fromkeys(seeds))
+        if not self.has_expansion_columns:
+            return self._expand_relations_per_seed(seeds, relation_types, limit, exclude)
+        columns = {c: [] for c in EXPANSION_COLUMNS}
+        cursor = self.conn.execute(
+            """
+            WITH seeds AS (
+                SELECT CAST(key AS INTEGER) AS seed_pos, value AS lemma_text FROM json_each(:seeds)
+            ),
+            candidates AS (
+                SELECT s.seed_pos, s.lemma_text AS seed, r.parent_lemma_text AS lemma,
+                       MIN(r.relation_type) AS relation_type
+                FROM seeds s
+                JOIN lemmas c ON c.lemma_text = s.lemma_text
+                JOIN relations r ON r.child_lemma_id = c.id
+                WHERE r.relation_type IN (SELECT value FROM json_each(:types))
+                  AND r.parent_lemma_text NOT IN (SELECT lemma_text FROM seeds)
+                  AND py_lower(r.parent_lemma_text) NOT IN (SELECT value FROM json_each(:exclude))
+                GROUP BY s.seed_pos, r.parent_lemma_text
+            ),
+            claimed AS (
+                SELECT cand.*, t.pos, t.modern_def, t.etymology_text, t.frequency_score,
+                       ROW_NUMBER() OVER (PARTITION BY cand.lemma ORDER BY cand.seed_pos) AS claim
+                FROM candidates cand
+                LEFT JOIN lemmas t ON t.lemma_text = cand.lemma
+            ),
+            ranked AS (
+                SELECT *, ROW_NUMBER() OVER (
+                    PARTITION BY seed_pos ORDER BY frequency_score DESC, lemma
+                ) AS rank
+                FROM claimed
+                WHERE claim = 1
+            )
+            SELECT seed, lemma, relation_type, pos, modern_def, etymology_text
+            FROM ranked
+            WHERE rank <= :limit
+            ORDER BY seed_pos, rank
+            """,
+            {
+                "seeds": json.dumps(seeds, ensure_ascii=False),
+                "types": json.dumps(list(relation_types)),
+                "exclude": json.dumps(sorted(exclude), ensure_ascii=False),
+                "limit": limit,
+            },
+        )
+        for row in cursor.fetchall():
+            for c in EXPANSION_COLUMNS:
+                columns[c].append(row[c])
+        return columns
+
+    def _expand_relations_per_seed(self, seeds, relation_types, limit, exclude) -> dict:
+        """expand_relations for databases without EXPANSION_LEMMA_COLUMNS: get_relations per seed."""
+        columns = {c: [] for c in EXPANSION_COLUMNS}
+        skip = set(seeds)
+        for seed in seeds:
+            candidates = {}
+            for rtype, words in self.get_relations(seed).items():
+                if rtype not in relation_types:
+                    continue
+                for word in words:
+                    if word in skip or word.lower() in exclude:
+                        continue
+                    candidates[word] = min(rtype, candidates.get(word, rtype))
+            skip.update(candidates)
+
+            rows = self.conn.execute(
+                "SELECT * FROM lemmas WHERE lemma_text IN (SELECT value FROM json_each(?))",
+                (json.dumps(list(candidates), ensure_ascii=False),),
+            ).fetchall()
+            found = {row["lemma_text"]: dict(row) for row in rows}
+            frequency = {w: found.get(w, {}).get("frequency_score") for w in candidates}
+            # Most frequent first (unknown frequency last), then by text
+            ranked = sorted(candidates, key=lambda w: (frequency[w] is None, -(frequency[w] or 0.0), w))
+            for word in ranked[:limit]:
+                columns["seed"].append(seed)
+                columns["lemma"].append(word)
+                columns["relation_type"].append(candidates[word])
+                for c in EXPANSION_DETAILS:
+                    columns[c].append(found.get(word, {}).get(c))
+        return columns
+
+    @traced("db.get_expansion_details", category="db")
+    def get_expansion_details(self, lemmas) -> dict:
+        """{lemma_text: {"pos", "modern_def", "etymology_text"}} for many lemmas in one query."""
+        try:
+            cursor = self.conn.execute(
+                """
+                SELECT lemma_text, pos, modern_def, etymology_text FROM lemmas
+                WHERE lemma_text IN (SELECT value FROM json_each(?))
+                """,
+                (json.dumps(list(lemmas), ensure_ascii=False),),
+            )
+            return {
+                row["lemma_text"]: {c: row[c] for c in EXPANSION_DETAILS}
+                for row in cursor.fetchall()
+            }
+        except Exception as e:
+            logger.error(f"DB Error in get_expansion_details: {e}")
+            return {}
+
+    def relation_graph(self) -> RelationGraph:
+        """CSR graph of the whole relations table, compiled on first use (see src/relation_graph.py)."""
+        if self._relation_graph is None:
+            self._relation_graph = RelationGraph.from_connection(self.conn)
+        return self._relation_graph
+
+    @traced("db.select_words", category="db")
     def select_words(self, theme: str, min_kds: int, max_kds: int, limit: int) -> list:
         """Thematic search constrained by the KDS (Pedagogical Filter)."""
         try:
@@ -1,7 +1,7 @@
 import pandas as pd
-import json
 import logging
 from src.config import KELLY_FILE, KAIKKI_EL_FILE, DRILLS_FILE
+from src.kaikki_scanner import SCAN_WORKERS, KaikkiScanner
 
 logging.basicConfig(level=logging.INFO, format="%(message)s")
 logger = logging.getLogger("DrillGen")
@@ -134,30 +134,36 @@ class DrillGenerator:
                 }
             )
 
-    def run(self):
-        logger.info(f"Scanning Kaikki-EL for {len(self.targets)} words...")
-
-        with open(KAIKKI_EL_FILE, "r", encoding="utf-8") as f:
-            for line in f:
-                try:
-                    entry = json.loads(line)
-                    word = entry.get("word")
-                    if word not in self.targets:
-                        continue
+    def consume(self, entry):
+        """Kaikki-EL consumer: collects drills for one entry."""
+        try:
+            word = entry.get("word")
+            if word not in self.targets:
+                return
 
-                    pos = entry.get("pos")
-                    if pos == "verb":
-                        self.extract_verb(entry)
-                    elif pos == "noun":
-                        self.extract_noun(entry)
+            pos = entry.get("pos")
+            if pos == "verb":
+                self.extract_verb(entry)
+            elif pos == "noun":
+                self.extract_noun(entry)
 
-                except:
-                    continue
+        except:
+            return
 
+    def save(self):
         df = pd.DataFrame(self.drills).drop_duplicates()
         df.to_csv(DRILLS_FILE, index=False, encoding="utf-8-sig")
         logger.info(f"Generated {len(df)} drills. Saved to {DRILLS_FILE}")
 
+    def run(self):
+        logger.info(f"Scanning Kaikki-EL for {len(self.targets)} words...")
+
+        scanner = KaikkiScanner(KAIKKI_EL_FILE, workers=SCAN_WORKERS)
+        scanner.register(self.consume, self.targets)
+        scanner.scan()
+
+        self.save()
+
 
 if __name__ == "__main__":
     gen = DrillGenerator()
@@ -1,25 +1,47 @@
 import pandas as pd
-import logging, json, unicodedata
-from src.config import DICT_DIR
+import logging, json, sqlite3, unicodedata
+from functools import lru_cache
+from src.config import LSJ_INDEX_FILE, LSJ_ORACLE_FILE
 from src.beta_code import BetaCodeConverter
 
 logger = logging.getLogger(__name__)
 
+EMPTY = {"def": "", "aor": "", "cit": ""}
+CACHE_SIZE = 4096  # Recently used oracle entries kept per enricher
+
 
 class LSJEnricher:
-    def __init__(self):
-        self.index_path = DICT_DIR / "lsj_index.json"
+    def __init__(self, oracle_path=None):
+        self.oracle_path = oracle_path or LSJ_ORACLE_FILE
+        self.index_path = LSJ_INDEX_FILE  # Legacy whole-index JSON
         self.converter = BetaCodeConverter()
         self.lsj_data = {}
+        self.conn = None
+        self._lookup = lru_cache(maxsize=CACHE_SIZE)(self._fetch)
         self._load_index()
 
     def _load_index(self):
-        if self.index_path.exists():
+        """Opens the keyed oracle store; nothing is read until the first lookup."""
+        if self.oracle_path.exists():
+            uri = f"{self.oracle_path.resolve().as_uri()}?mode=ro&immutable=1"
+            self.conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        elif self.index_path.exists():
+            logger.warning("LSJ Oracle store not found; loading the legacy JSON index.")
             with open(self.index_path, "r", encoding="utf-8") as f:
                 self.lsj_data = json.load(f)
         else:
             logger.warning("LSJ Index not found. Run 'src/lsj_fuzzy_indexer.py' first.")
 
+    def _fetch(self, query_key):
+        if self.conn is None:
+            return self.lsj_data.get(query_key, EMPTY)
+        row = self.conn.execute(
+            "SELECT def, aor, cit, original_key FROM oracle WHERE key = ?", (query_key,)
+        ).fetchone()
+        if row is None:
+            return EMPTY
+        return {"def": row[0], "aor": row[1], "cit": row[2], "original_key": row[3]}
+
     def sanitize_greek(self, word):
         """Removes Macrons (¯) and Breves (˘)."""
         if not word:
@@ -38,6 +60,7 @@ class LSJEnricher:
     def get_data(self, ag_word):
         """
         Returns dict with 'def', 'aor', 'cit'.
+        Keys are looked up lazily in the oracle store; recent lookups are LRU-cached.
         """
         if not ag_word or pd.isna(ag_word):
             return {"def": "", "aor": "", "cit": ""}
@@ -51,7 +74,7 @@ class LSJEnricher:
         # 3. Canonicalize
         query_key = self.converter.canonicalize(beta_key)
 
-        return self.lsj_data.get(query_key, {"def": "", "aor": "", "cit": ""})
+        return self._lookup(query_key)
 
     def enrich(self, df: pd.DataFrame) -> pd.DataFrame:
         logger.info("Querying LSJ for Definitions, Morphology, and Poetry...")
@@ -9,6 +9,7 @@ from src.config import (
     COL_LEMMA,
     PROCESSED_DIR,
 )
+from src.kaikki_scanner import SCAN_WORKERS, KaikkiScanner
 from src.noun_declension_extractor import ParadigmExtractor
 
 logging.basicConfig(level=logging.INFO, format="%(message)s")
@@ -21,6 +22,18 @@ class HybridIngestor:
         self.kelly_df = None
         self.target_lemmas = set()
         self.master_lookup = {}
+        self.hellenic_count = 0
+        self.english_hits = 0
+        # (word, field) -> texts already in master_lookup[word][field], for O(1) dedup
+        self.seen = {}
+
+    def add_unique(self, word, field, text, item=None):
+        """Appends item (default: text) to master_lookup[word][field] unless text is already there."""
+        seen = self.seen.setdefault((word, field), set())
+        if text in seen:
+            return
+        seen.add(text)
+        self.master_lookup[word][field].append(text if item is None else item)
 
     def normalize(self, text):
         if not text:
@@ -57,129 +70,132 @@ class HybridIngestor:
             logger.error(f"Kelly Load Failed: {e}")
             exit()
 
-    def scan_hellenic_core(self):
-        """Pass 1: Scan Kaikki-EL for Structure"""
-        logger.info(f"Scanning Hellenic Core ({KAIKKI_EL_FILE})...")
-
-        count = 0
-        with open(KAIKKI_EL_FILE, "r", encoding="utf-8") as f:
-            for line in f:
-                try:
-                    entry = json.loads(line)
-                    if entry.get("lang_code") != "el":
-                        continue
-
-                    word = self.normalize(entry.get("word"))
-                    if word not in self.target_lemmas:
-                        continue
-
-                    # INITIALIZE IF NEW
-                    if word not in self.master_lookup:
-                        self.master_lookup[word] = {
-                            "lemma": word,
-                            "pos": entry.get("pos"),
-                            "etymology_text_el": entry.get("etymology_text", ""),
-                            # forms handled by ParadigmExtractor
-                            "senses_el": [],
-                            "senses_en": [],
-                            "examples": [],
-                            "synonyms": [],
-                        }
-                    else:
-                        # MERGE ETYMOLOGY IF MISSING
-                        if not self.master_lookup[word][
-                            "etymology_text_el"
-                        ] and entry.get("etymology_text"):
-                            self.master_lookup[word]["etymology_text_el"] = entry.get(
-                                "etymology_text"
-                            )
-
-                    # ALWAYS APPEND DATA
-                    for sense in entry.get("senses", []):
-                        tags = sense.get("tags", []) + sense.get("raw_tags", [])
-                        for gloss in sense.get("glosses", []):
-                            # Avoid duplicates
-                            exists = any(
-                                s["text"] == gloss
-                                for s in self.master_lookup[word]["senses_el"]
-                            )
-                            if not exists:
-                                self.master_lookup[word]["senses_el"].append(
-                                    {"text": gloss, "tags": tags}
-                                )
-
-                        # EXTRACT EXAMPLES
-                        for ex in sense.get("examples", []):
-                            text = ex.get("text", "")
-                            text = text.replace("'''", "")
-                            if (
-                                text
-                                and text not in self.master_lookup[word]["examples"]
-                            ):
-                                self.master_lookup[word]["examples"].append(text)
-
-                    if "synonyms" in entry:
-                        for syn in entry["synonyms"]:
-                            if (
-                                "word" in syn
-                                and syn["word"]
-                                not in self.master_lookup[word]["synonyms"]
-                            ):
-                                self.master_lookup[word]["synonyms"].append(syn["word"])
-
-                    count += 1
-                except:
-                    continue
-
-        logger.info(f"Hellenic Pass Complete. Processed {count} entries.")
-
-    def scan_english_gloss(self):
-        """Pass 2: Scan Kaikki-EN for English Definitions"""
-        logger.info(f"Scanning English Gloss ({KAIKKI_EN_FILE})...")
-
-        hits = 0
-        with open(KAIKKI_EN_FILE, "r", encoding="utf-8") as f:
-            for line in f:
-                try:
-                    entry = json.loads(line)
-                    if entry.get("lang_code") != "el":
-                        continue
-
-                    word = self.normalize(entry.get("word"))
-                    if word not in self.master_lookup:
-                        continue
-
-                    for sense in entry.get("senses", []):
-                        tags = sense.get("tags", []) + sense.get("raw_tags", [])
-                        for gloss in sense.get("glosses", []):
-                            exists = any(
-                                s["text"] == gloss
-                                for s in self.master_lookup[word]["senses_en"]
-                            )
-                            if not exists:
-                                self.master_lookup[word]["senses_en"].append(
-                                    {"text": gloss, "tags": tags}
-                                )
-
-                    if "sounds" in entry and "sounds" not in self.master_lookup[word]:
-                        self.master_lookup[word]["sounds"] = entry["sounds"]
-
-                    hits += 1
-                except:
-                    continue
-
-        logger.info(f"English Pass Complete. Enriched {hits} words.")
-
-    def run(self):
+    def consume_hellenic(self, entry):
+        """Kaikki-EL consumer: merges one entry into the master lookup."""
+        try:
+            if entry.get("lang_code") != "el":
+                return
+
+            word = self.normalize(entry.get("word"))
+            if word not in self.target_lemmas:
+                return
+
+            # INITIALIZE IF NEW
+            if word not in self.master_lookup:
+                self.master_lookup[word] = {
+                    "lemma": word,
+                    "pos": entry.get("pos"),
+                    "etymology_text_el": entry.get("etymology_text", ""),
+                    # forms handled by ParadigmExtractor
+                    "senses_el": [],
+                    "senses_en": [],
+                    "examples": [],
+                    "synonyms": [],
+                }
+            else:
+                # MERGE ETYMOLOGY IF MISSING
+                if not self.master_lookup[word][
+                    "etymology_text_el"
+                ] and entry.get("etymology_text"):
+                    self.master_lookup[word]["etymology_text_el"] = entry.get(
+                        "etymology_text"
+                    )
+
+            # ALWAYS APPEND DATA
+            for sense in entry.get("senses", []):
+                tags = sense.get("tags", []) + sense.get("raw_tags", [])
+                for gloss in sense.get("glosses", []):
+                    # Avoid duplicates
+                    self.add_unique(word, "senses_el", gloss, {"text": gloss, "tags": tags})
+
+                # EXTRACT EXAMPLES
+                for ex in sense.get("examples", []):
+                    text = ex.get("text", "")
+                    text = text.replace("'''", "")
+                    if text:
+                        self.add_unique(word, "examples", text)
+
+            if "synonyms" in entry:
+                for syn in entry["synonyms"]:
+                    if "word" in syn:
+                        self.add_unique(word, "synonyms", syn["word"])
+
+            self.hellenic_count += 1
+        except:
+            return
+
+    def consume_english(self, entry):
+        """Kaikki-EN consumer: adds English glosses and sounds to known words."""
+        try:
+            if entry.get("lang_code") != "el":
+                return
+
+            word = self.normalize(entry.get("word"))
+            if word not in self.master_lookup:
+                return
+
+            for sense in entry.get("senses", []):
+                tags = sense.get("tags", []) + sense.get("raw_tags", [])
+                for gloss in sense.get("glosses", []):
+                    self.add_unique(word, "senses_en", gloss, {"text": gloss, "tags": tags})
+
+            if "sounds" in entry and "sounds" not in self.master_lookup[word]:
+                self.master_lookup[word]["sounds"] = entry["sounds"]
+
+            self.english_hits += 1
+        except:
+            return
+
+    def scan_hellenic_core(self, consumers=(), path=None, words=None, workers=1):
+        """
+        Pass 1: Scan Kaikki-EL for Structure.
+        Extra consumers (paradigms, drills, ...) ride along on the same read of the dump,
+        given as (consumer, headwords it uses or None) pairs.
+        words: read only these headwords through the dump's offset index (small/debug runs).
+        workers: parse byte ranges of the dump in that many processes.
+        """
+        path = path or KAIKKI_EL_FILE
+        logger.info(f"Scanning Hellenic Core ({path})...")
+
+        self.hellenic_count = 0
+        scanner = KaikkiScanner(path, words=words, workers=workers)
+        scanner.register(self.consume_hellenic, self.target_lemmas)
+        for consumer, interest in consumers:
+            scanner.register(consumer, interest)
+        scanner.scan()
+
+        logger.info(f"Hellenic Pass Complete. Processed {self.hellenic_count} entries.")
+
+    def scan_english_gloss(self, path=None, words=None, workers=1):
+        """Pass 2: Scan Kaikki-EN for English Definitions (words, workers: as in scan_hellenic_core)"""
+        path = path or KAIKKI_EN_FILE
+        logger.info(f"Scanning English Gloss ({path})...")
+
+        self.english_hits = 0
+        scanner = KaikkiScanner(path, words=words, workers=workers)
+        scanner.register(self.consume_english, set(self.master_lookup))
+        scanner.scan()
+
+        logger.info(f"English Pass Complete. Enriched {self.english_hits} words.")
+
+    def run(self, consumers=(), workers=SCAN_WORKERS):
+        """
+        Full rebuild: one read of each dump, parsed across `workers` processes. Paradigms, and
+        any extra Kaikki-EL (consumer, headwords) pairs (e.g. DrillGenerator.consume with its
+        targets), share the Hellenic pass.
+        """
         self.load_kelly()
-        self.scan_hellenic_core()
-        self.scan_english_gloss()
 
         # Integrate ParadigmExtractor
         logger.info("Extracting Paradigms via ParadigmExtractor...")
         extractor = ParadigmExtractor()
-        # Optimization: ParadigmExtractor re-loads targets, which is fine but we could pass them if we changed API
-        paradigms = extractor.extract_all()
+        extractor.load_targets()
+        self.scan_hellenic_core(
+            consumers=[(extractor.consume, extractor.target_lemmas), *consumers],
+            workers=workers,
+        )
+        self.scan_english_gloss(workers=workers)
+        paradigms = extractor.paradigms
 
         with open(PARADIGMS_FILE, "w", encoding="utf-8") as f:
             json.dump(paradigms, f, ensure_ascii=False, indent=2)
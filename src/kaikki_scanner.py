@@ -0,0 +1,299 @@
+"""Reads a Kaikki JSONL dump once and hands each entry to every registered consumer."""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK = 1 << 20
+INDEX_VERSION = "2"  # Bumped when the sidecar layout changes; older sidecars are rebuilt
+CHUNK_BYTES = 32 << 20  # Byte range handed to one parse task
+BATCH_LINES = 10_000  # Lines parsed per batch in a serial scan
+SCAN_WORKERS = os.cpu_count() or 1
+
+# Every "word" field of a raw line: the headword, plus synonyms / related words (a superset)
+WORD_FIELD = re.compile(rb'"word"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+
+def index_key(word):
+    """Index key of a headword: NFC, stripped (as HybridIngestor.normalize)."""
+    if not word:
+        return ""
+    return unicodedata.normalize("NFC", str(word).strip())
+
+
+def file_digest(path) -> str:
+    """SHA-256 of the whole file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def mentions(line, keys) -> bool:
+    """Cheap pre-parse test: does any "word" field of the raw line normalize to one of keys?"""
+    for raw in WORD_FIELD.findall(line):
+        try:
+            word = json.loads(b'"' + raw + b'"') if b"\\" in raw else raw.decode("utf-8")
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            continue
+        if index_key(word) in keys:
+            return True
+    return False
+
+
+def parse_lines(lines, keys=None):
+    """
+    Raw lines -> (entries, skipped). With keys, only entries whose headword
+    (index_key) is among them are kept; the rest are mostly rejected unparsed.
+    """
+    entries = []
+    skipped = 0
+    for line in lines:
+        if not line.strip():
+            continue
+        if keys is not None and not mentions(line, keys):
+            continue
+        try:
+            entry = json.loads(line)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            skipped += 1
+            continue
+        if keys is not None and index_key(entry.get("word")) not in keys:
+            continue
+        entries.append(entry)
+    return entries, skipped
+
+
+def byte_ranges(path, chunk_bytes=CHUNK_BYTES) -> list:
+    """Cuts the file into [start, end) ranges of about chunk_bytes, each ending just after a newline."""
+    size = os.path.getsize(path)
+    ranges = []
+    start = 0
+    with open(path, "rb") as f:
+        while start < size:
+            f.seek(min(start + chunk_bytes, size))
+            f.readline()  # Move to the end of the line the cut falls in
+            end = min(f.tell(), size)
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+_worker_keys = None
+
+
+def _init_worker(keys):
+    global _worker_keys
+    _worker_keys = keys
+
+
+def parse_range(path, start, end):
+    """Worker: parses the lines of one byte range (filtered by the pool's keys)."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        return parse_lines(f.read(end - start).splitlines(keepends=True), _worker_keys)
+
+
+class KaikkiIndex:
+    """
+    word -> [(offset, length, digest)] over one dump, kept in a SQLite sidecar
+    (`<dump>.idx` by default). digest is a hash of the entry's raw line, for
+    entry-level diffs between dump releases.
+
+    The sidecar records the dump's size, mtime and SHA-256. A size mismatch
+    means stale. A matching mtime is trusted. Otherwise the hash decides, so
+    a copied or touched dump is not re-indexed needlessly.
+    """
+
+    def __init__(self, dump_path, index_path=None):
+        self.dump_path = Path(dump_path)
+        self.index_path = Path(index_path) if index_path else self.dump_path.with_name(self.dump_path.name + ".idx")
+
+    def is_valid(self) -> bool:
+        if not self.index_path.exists():
+            return False
+        stat = self.dump_path.stat()
+        try:
+            conn = sqlite3.connect(self.index_path)
+            try:
+                meta = dict(conn.execute("SELECT key, value FROM meta").fetchall())
+            finally:
+                conn.close()
+        except sqlite3.DatabaseError:
+            return False
+        if meta.get("version") != INDEX_VERSION or meta.get("size") != str(stat.st_size):
+            return False
+        if meta.get("mtime_ns") == str(stat.st_mtime_ns):
+            return True
+        return meta.get("sha256") == file_digest(self.dump_path)
+
+    def ensure(self):
+        """Builds the index unless a valid one exists. Returns self."""
+        if not self.is_valid():
+            self.build()
+        return self
+
+    def build(self):
+        """One pass over the dump, recording where each entry's line starts and ends."""
+        logger.info(f"Indexing {self.dump_path} ...")
+        stat = self.dump_path.stat()
+        digest = hashlib.sha256()
+        rows = []
+        offset = 0
+        with open(self.dump_path, "rb") as f:
+            for line in f:
+                digest.update(line)
+                try:
+                    word = index_key(json.loads(line).get("word"))
+                except (json.JSONDecodeError, UnicodeDecodeError, AttributeError):
+                    word = ""
+                if word:
+                    rows.append((word, offset, len(line), hashlib.blake2b(line, digest_size=16).hexdigest()))
+                offset += len(line)
+
+        pending = self.index_path.with_name(self.index_path.name + ".tmp")
+        pending.unlink(missing_ok=True)
+        conn = sqlite3.connect(pending)
+        try:
+            conn.execute("PRAGMA journal_mode = OFF")
+            conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+            conn.execute(
+                "CREATE TABLE entries (word TEXT NOT NULL, offset INTEGER NOT NULL, length INTEGER NOT NULL, digest TEXT)"
+            )
+            conn.executemany("INSERT INTO entries (word, offset, length, digest) VALUES (?, ?, ?, ?)", rows)
+            conn.execute("CREATE INDEX idx_entries_word ON entries (word)")
+            conn.executemany(
+                "INSERT INTO meta (key, value) VALUES (?, ?)",
+                [
+                    ("version", INDEX_VERSION),
+                    ("size", str(stat.st_size)),
+                    ("mtime_ns", str(stat.st_mtime_ns)),
+                    ("sha256", digest.hexdigest()),
+                ],
+            )
+            conn.commit()
+        finally:
+            conn.close()
+        os.replace(pending, self.index_path)
+        logger.info(f"Indexed {len(rows)} entries into {self.index_path}")
+
+    def offsets(self, words) -> list:
+        """(offset, length) of every line for `words`, in file order."""
+        keys = sorted({index_key(w) for w in words} - {""})
+        conn = sqlite3.connect(f"{self.index_path.resolve().as_uri()}?mode=ro", uri=True)
+        try:
+            conn.execute("CREATE TEMP TABLE wanted (word TEXT PRIMARY KEY)")
+            conn.executemany("INSERT INTO wanted (word) VALUES (?)", ((k,) for k in keys))
+            return conn.execute(
+                "SELECT e.offset, e.length FROM entries e JOIN wanted w ON w.word = e.word ORDER BY e.offset"
+            ).fetchall()
+        finally:
+            conn.close()
+
+    def word_digests(self) -> dict:
+        """word -> one hash over the digests of all its entries, in file order."""
+        conn = sqlite3.connect(f"{self.index_path.resolve().as_uri()}?mode=ro", uri=True)
+        try:
+            rows = conn.execute("SELECT word, digest FROM entries ORDER BY word, offset").fetchall()
+        finally:
+            conn.close()
+        digests = {}
+        for word, digest in rows:
+            digests[word] = digests.get(word, "") + digest
+        return {word: hashlib.blake2b(joined.encode(), digest_size=16).hexdigest() for word, joined in digests.items()}
+
+    def read(self, words):
+        """Yields the raw JSON lines for `words`, in file order, by seeking to each."""
+        with open(self.dump_path, "rb") as f:
+            for offset, length in self.offsets(words):
+                f.seek(offset)
+                yield f.read(length)
+
+
+class KaikkiScanner:
+    def __init__(self, path, words=None, workers=1, chunk_bytes=CHUNK_BYTES):
+        """
+        words: only entries for these headwords. Serial scans fetch them through the
+            KaikkiIndex; parallel scans use them as the pre-parse filter. None reads the whole dump.
+        workers: processes parsing byte ranges in parallel (1: parse in this process).
+        """
+        self.path = path
+        self.words = words
+        self.workers = workers
+        self.chunk_bytes = chunk_bytes
+        self.consumers = []
+        self.interests = []
+
+    def register(self, consumer, words=None):
+        """
+        Adds a consumer for the next scan; returns it unchanged.
+        words: the headwords it uses, if known (None: it wants every entry).
+        """
+        self.consumers.append(consumer)
+        self.interests.append(words)
+        return consumer
+
+    def keys(self):
+        """Index keys every wanted entry must match, or None when some consumer wants everything."""
+        if self.words is not None:
+            return frozenset(index_key(w) for w in self.words)
+        if not self.interests or any(words is None for words in self.interests):
+            return None
+        return frozenset(index_key(w) for words in self.interests for w in words)
+
+    def batches(self):
+        """Yields (entries, skipped) batches in file order."""
+        keys = self.keys()
+        if self.workers > 1:
+            ranges = byte_ranges(self.path, self.chunk_bytes)
+            # A bounded window of ranges in flight keeps unconsumed results small
+            window = self.workers * 2
+            with ProcessPoolExecutor(
+                max_workers=min(self.workers, max(len(ranges), 1)),
+                initializer=_init_worker,
+                initargs=(keys,),
+            ) as executor:
+                for i in range(0, len(ranges), window):
+                    starts, ends = zip(*ranges[i : i + window])
+                    yield from executor.map(parse_range, [self.path] * len(starts), starts, ends)
+            return
+
+        if self.words is not None:
+            lines = KaikkiIndex(self.path).ensure().read(self.words)
+            yield from self._batched(lines, keys)
+            return
+        # Binary lines go straight to json.loads, without a separate text decode
+        with open(self.path, "rb") as f:
+            yield from self._batched(f, keys)
+
+    @staticmethod
+    def _batched(lines, keys):
+        lines = iter(lines)
+        while batch := list(islice(lines, BATCH_LINES)):
+            yield parse_lines(batch, keys)
+
+    def scan(self) -> int:
+        """Streams the dump once through every consumer. Returns the number of dispatched entries."""
+        parsed = 0
+        skipped = 0
+        for entries, bad in self.batches():
+            skipped += bad
+            parsed += len(entries)
+            for entry in entries:
+                for consumer in self.consumers:
+                    consumer(entry)
+
+        if skipped:
+            logger.warning(f"Skipped {skipped} unparseable lines in {self.path}")
+        logger.info(f"Scanned {parsed} entries from {self.path} for {len(self.consumers)} consumers.")
+        return parsed
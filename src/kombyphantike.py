@@ -12,10 +12,12 @@ import os
 import warnings
 from datetime import datetime
 from collections import Counter
-from src.config import PROCESSED_DIR, DATA_DIR
+from src.config import PROCESSED_DIR, DATA_DIR, LEXICON_BACKEND
 from src.knot_loader import KnotLoader
 from src.database import DatabaseManager
+from src.memory_lexicon import MemoryLexicon
 from src.models import ConstellationNode, ConstellationLink, ConstellationGraph
+from src.tracing import traced
 
 # Suppress warnings
 os.environ["TF_CPP_MIN_LOG_LEVEL"] = "3"
@@ -59,6 +61,25 @@ MORPH_MAP = {
     "Part": "Participle",
 }
 
+# Relation types that feed the word-pool expansion
+EXPANSION_TYPES = ("synonyms", "related", "derived")
+
+# Complex-mode pool expansion: relation hops, and new neighbours taken per word, hop and type
+COMPLEX_HOPS = 2
+COMPLEX_FANOUT = {"synonyms": 2, "related": 2, "derived": 3}
+
+
+def _greek_pos(pos_raw):
+    """Lexicon POS (e.g. "verb", "adj") -> the Greek label used by Kelly. Unknown -> noun."""
+    pos_raw = (pos_raw or "").lower()
+    if "verb" in pos_raw:
+        return "Ρήμα"
+    if "adj" in pos_raw:
+        return "Επίθετο"
+    if "adv" in pos_raw:
+        return "Επίρρημα"
+    return "Ουσιαστικό"
+
 
 class KombyphantikeEngine:
     def __init__(self):
@@ -66,8 +87,14 @@ class KombyphantikeEngine:
         self.kelly = pd.read_csv(KELLY_PATH, dtype=str)
         self.knot_loader = KnotLoader()
 
-        # Initialize Database Manager
-        self.db = DatabaseManager()
+        # Initialize the lexicon backend (SQLite by default, or the in-memory arrays)
+        backend = os.environ.get("KOMBYPHANTIKE_LEXICON", LEXICON_BACKEND)
+        if backend == "memory":
+            self.db = MemoryLexicon()
+        elif backend == "sqlite":
+            self.db = DatabaseManager()
+        else:
+            raise ValueError(f"Unknown lexicon backend: {backend}")
 
         # DYNAMIC COLUMN DETECTION
         self.pos_col = next(
@@ -155,6 +182,7 @@ class KombyphantikeEngine:
             print(f"Transliteration Error: {e}")
             return text
 
+    @traced()
     def _tokenize(self, text: str, lang: str) -> list:
         """
         Helper: Tokenizes text into structured objects.
@@ -165,11 +193,10 @@ class KombyphantikeEngine:
         if not model:
             return []
 
-        # Common auxiliaries to check if Spacy gets confused (e.g. lemma "είναι" -> "είμαι")
-        AUXILIARIES = ["είμαι", "έχω"]
-
         doc = model(text)
         tokens = []
+        # (lemma, fallback text) -> (paradigm, metadata): a word repeated in the text is looked up once
+        entries = {}
         for token in doc:
             # Process Morphology
             morph_dict = {}
@@ -199,19 +226,27 @@ class KombyphantikeEngine:
                 else token.text,
             }
 
-            # 1. Trust Spacy's lemma first
+            # 1. Resolve the surface form through the reverse form index (one lookup).
+            # spaCy's lemma only breaks ties between homographs, or stands in for
+            # forms the lexicon does not know.
             lemma = token.lemma_
-            paradigm = self.db.get_paradigm(lemma)
-
-            # Fallback: Try lowercase lemma
-            if paradigm is None:
-                paradigm = self.db.get_paradigm(lemma.lower())
-
-            # Metadata Injection from DB
-            metadata = self.db.get_metadata(lemma)
-            if not metadata:
-                # Fallback: Look up by lower text
-                metadata = self.db.get_metadata(token.text.lower())
+            candidates = self.db.resolve_form(token.text)
+            if candidates:
+                match = next((c for c in candidates if c["lemma"] == lemma), candidates[0])
+                lemma = match["lemma"]
+                token_dict["lemma"] = lemma
+                token_dict["form_tags"] = match["tags"]
+
+            # Without candidates the metadata may come from the token's own lowercase text
+            entry_key = (lemma, None if candidates else token.text.lower())
+            if entry_key not in entries:
+                # Metadata Injection from DB
+                metadata = self.db.get_metadata(lemma)
+                if not metadata and not candidates:
+                    # Fallback: Look up by lower text
+                    metadata = self.db.get_metadata(token.text.lower())
+                entries[entry_key] = (self.db.get_paradigm(lemma), metadata)
+            paradigm, metadata = entries[entry_key]
 
             if metadata:
                 # We prioritize Ancient Context and Etymology from DB.
@@ -229,27 +264,6 @@ class KombyphantikeEngine:
                 # Since we still have self.kelly, we *could* look it up, but it's slow.
                 token_dict["semantic_shift"] = ""
 
-            # 2. Fallback / Correction for Auxiliary Irregulars
-            # If paradigm missing OR lemma is suspiciously "είναι" (which is a form, not lemma)
-            if paradigm is None or lemma in ["είναι", "ήταν"]:
-                text_lower = token.text.lower()
-                for aux in AUXILIARIES:
-                    aux_paradigm = self.db.get_paradigm(aux)
-                    if aux_paradigm:
-                        # Paradigm is list of {form, tags}
-                        forms = aux_paradigm
-
-                        # Check if text exists as a form
-                        found = any(f.get("form") == text_lower for f in forms)
-                        if found:
-                            paradigm = aux_paradigm
-                            token_dict["lemma"] = aux
-                            break
-
-            # 3. Last Resort: Try looking up by text.lower() (if un-lemmatized input matches a lemma key)
-            if paradigm is None:
-                paradigm = self.db.get_paradigm(token.text.lower())
-
             token_dict["has_paradigm"] = paradigm is not None and len(paradigm) > 0
             token_dict["paradigm"] = paradigm
 
@@ -292,6 +306,7 @@ class KombyphantikeEngine:
     def get_knot_usage(self, knot_id):
         return self.progress.get(f"KNOT_{knot_id}", {}).get("count", 0)
 
+    @traced()
     def select_words(self, theme, target_word_count, target_level="Any", complexity="lucid"):
         print(f"Curating ~{target_word_count} words for theme: '{theme}' (Level: {target_level})...")
 
@@ -457,6 +472,7 @@ class KombyphantikeEngine:
 
         return final_selection
 
+    @traced()
     def select_strategic_knots(self, words_df, target_knot_count):
         knot_counts = Counter()
         knot_map = {}
@@ -529,82 +545,66 @@ class KombyphantikeEngine:
 
         return top_morpho + top_syntax
 
+    @traced()
     def _expand_word_pool(self, words_df, complexity="lucid"):
         print("Expanding word pool with semantic relations...")
-        new_rows = []
+        seeds = [lemma for lemma in words_df["Lemma"] if lemma]
         original_lemmas = set(words_df["Lemma"].str.lower())
 
         # Complexity Limit
         RELATIONS_LIMIT = 2
+        graph = None
         if complexity == "complex":
             RELATIONS_LIMIT = 6
-            # TODO: implementing deeper etymological links for complex mode.
-            # Currently we just increase the limit of fetched relations.
-
-        for _, row in words_df.iterrows():
-            lemma = row["Lemma"]
-            if not lemma: continue
-
-            relations = self.db.get_relations(lemma)
-            # Flatten interesting relations
-            candidates = []
-            for rtype in ["synonyms", "related", "derived"]:
-                 candidates.extend(relations.get(rtype, []))
-
-            # Deduplicate and filter existing
-            candidates = list(set(candidates))
-            candidates = [c for c in candidates if c.lower() not in original_lemmas]
-
-            # Limit
-            candidates = candidates[:RELATIONS_LIMIT]
-
-            for new_word in candidates:
-                new_row = None
-
-                # Get Metadata for POS
-                meta = self.db.get_metadata(new_word)
-                pos_raw = meta.get("pos", "noun") # Default to noun if unknown?
-
-                # Map to Greek POS for consistency with generate_ai_instruction
-                pos_greek = "Ουσιαστικό"
-                if pos_raw and "verb" in pos_raw.lower(): pos_greek = "Ρήμα"
-                elif pos_raw and "adj" in pos_raw.lower(): pos_greek = "Επίθετο"
-                elif pos_raw and "adv" in pos_raw.lower(): pos_greek = "Επίρρημα"
-                elif pos_raw and "noun" in pos_raw.lower(): pos_greek = "Ουσιαστικό"
-
-                # Create a minimal row matching the schema required by generate_ai_instruction
-                # It primarily needs 'Lemma' and self.pos_col
-                new_row = row.copy() # Copy structure
-                new_row["Lemma"] = new_word
-                new_row[self.pos_col] = pos_greek
-                # Clear other fields to avoid confusion
-                new_row["Modern_Examples"] = ""
-                new_row["Greek_Def"] = ""
-                new_row["Modern_Def"] = ""
-
-                # Try to fetch definition from DB if available
-                if meta.get("definition"):
-                     new_row["Modern_Def"] = meta["definition"]
-
-                # Try to fetch etymology
-                if meta.get("etymology_text"):
-                    new_row["Etymology"] = meta["etymology_text"]
-                else:
-                    new_row["Etymology"] = ""
-
-                if new_row is not None:
-                    new_rows.append(new_row)
-
-                original_lemmas.add(new_word.lower()) # prevent re-adding
-
-        if new_rows:
-            expansion_df = pd.DataFrame(new_rows)
-            # Combine and return
-            print(f"Added {len(expansion_df)} related words to the pool.")
-            return pd.concat([words_df, expansion_df], ignore_index=True)
-
-        return words_df
+            graph = self.db.relation_graph()
+
+        if graph is not None and len(graph):
+            # Deeper etymological links: one multi-hop pass over the CSR relation graph
+            hits = graph.expand(seeds, hops=COMPLEX_HOPS, fanout=COMPLEX_FANOUT)
+            found = {
+                "seed": [h.seed for h in hits],
+                "lemma": [h.lemma for h in hits],
+                "relation_type": [h.relation_type for h in hits],
+            }
+            details = self.db.get_expansion_details(found["lemma"])
+            for column in ("pos", "modern_def", "etymology_text"):
+                found[column] = [details.get(w, {}).get(column) for w in found["lemma"]]
+        else:
+            # One joined query for the whole seed set: relations, POS and definitions.
+            # The pool is excluded up front, so case variants do not eat into a seed's limit.
+            found = self.db.expand_relations(
+                seeds, EXPANSION_TYPES, RELATIONS_LIMIT, exclude=original_lemmas
+            )
 
+        # Case-insensitive filter against the pool, then the per-seed limit
+        keep = []
+        taken = Counter()
+        for i, (seed, new_word) in enumerate(zip(found["seed"], found["lemma"])):
+            if new_word.lower() in original_lemmas or taken[seed] >= RELATIONS_LIMIT:
+                continue
+            taken[seed] += 1
+            keep.append(i)
+        if not keep:
+            return words_df
+
+        # Build the new rows column-wise; other fields are copied from each word's seed
+        seed_rows = {}
+        for position, lemma in enumerate(words_df["Lemma"]):
+            seed_rows.setdefault(lemma, position)
+        expansion_df = words_df.iloc[[seed_rows[found["seed"][i]] for i in keep]].reset_index(drop=True)
+        expansion_df["Lemma"] = [found["lemma"][i] for i in keep]
+        # Map to Greek POS for consistency with generate_ai_instruction
+        expansion_df[self.pos_col] = [_greek_pos(found["pos"][i]) for i in keep]
+        # Clear other fields to avoid confusion
+        expansion_df["Modern_Examples"] = ""
+        expansion_df["Greek_Def"] = ""
+        expansion_df["Modern_Def"] = [found["modern_def"][i] or "" for i in keep]
+        expansion_df["Etymology"] = [found["etymology_text"][i] or "" for i in keep]
+
+        print(f"Added {len(expansion_df)} related words to the pool.")
+        return pd.concat([words_df, expansion_df], ignore_index=True)
+
+    @traced()
     def compile_curriculum(self, theme, target_sentences, target_level="Any", complexity="lucid"):
         """
         THE CORE LOGIC.
@@ -622,14 +622,7 @@ class KombyphantikeEngine:
 
         # 1. Index Corpus for Context
         print("Indexing Corpus for Cross-Reference...")
-        corpus = []
-        valid_examples = self.kelly[
-            self.kelly["Modern_Examples"].notna()
-            & (self.kelly["Modern_Examples"] != "")
-        ]
-        for ex_str in valid_examples["Modern_Examples"]:
-            corpus.extend(str(ex_str).split(" || "))
-        print(f"Corpus Size: {len(corpus)} sentences.")
+        corpus = self._index_corpus()
 
         # 2. Select Words & Knots
         words_df = self.select_words(theme, target_word_count, target_level, complexity)
@@ -680,6 +673,34 @@ class KombyphantikeEngine:
         ))
         added_node_ids.add(center_id)
 
+        self._weave_graph(
+            theme, selected_knots, words_df, corpus, nodes, links, added_node_ids,
+            center_id, SENTENCES_PER_KNOT,
+        )
+
+        # --- GOLDEN PATH LOGIC ---
+        golden_path = self._golden_path(nodes, links, center_id)
+
+        return ConstellationGraph(nodes=nodes, links=links, golden_path=golden_path)
+
+    @traced()
+    def _index_corpus(self):
+        corpus = []
+        valid_examples = self.kelly[
+            self.kelly["Modern_Examples"].notna()
+            & (self.kelly["Modern_Examples"] != "")
+        ]
+        for ex_str in valid_examples["Modern_Examples"]:
+            corpus.extend(str(ex_str).split(" || "))
+        print(f"Corpus Size: {len(corpus)} sentences.")
+        return corpus
+
+    @traced()
+    def _weave_graph(
+        self, theme, selected_knots, words_df, corpus, nodes, links, added_node_ids,
+        center_id, sentences_per_knot,
+    ):
+        """Adds a lemma node and its rule nodes per knot, appending to nodes and links."""
         used_heroes = set()
 
         for knot in selected_knots:
@@ -721,7 +742,7 @@ class KombyphantikeEngine:
                 continue
 
             # Create Nodes
-            for i in range(SENTENCES_PER_KNOT):
+            for i in range(sentences_per_knot):
                 row_data = None
 
                 hero = next(
@@ -766,7 +787,7 @@ class KombyphantikeEngine:
                         "lemma": hero,
                         "english_meaning": hero_row.get("English_Meaning") or hero_row.get("Definition"),
                         "pos": hero_row.get("POS"),
-                        "etymology": hero_row.get("Etymology"),
+                        "etymology": hero_row.get("Etymology") if pd.notna(hero_row.get("Etymology")) else None,
                         "frequency_score": hero_row.get("Frequency_Score"), # Or whatever your column name is
                         "kds_score": hero_row.get("KDS_Score", 50)
                     }
@@ -796,7 +817,8 @@ class KombyphantikeEngine:
                     # Link Word -> Rule
                     links.append(ConstellationLink(source=word_id, target=rule_id, value=0.5))
 
-        # --- GOLDEN PATH LOGIC ---
+    @traced()
+    def _golden_path(self, nodes, links, center_id):
         # 1. Start with Center
         golden_path = [center_id]
 
@@ -823,22 +845,16 @@ class KombyphantikeEngine:
             ]
             golden_path.extend(child_rules)
 
-        return ConstellationGraph(nodes=nodes, links=links, golden_path=golden_path)
+        return golden_path
 
+    @traced()
     def _check_paradigm_for_plural(self, lemma):
-        paradigm = self.db.get_paradigm(lemma)
-        if not paradigm:
+        has_plural = self.db.has_feature(lemma, "number", "plural")
+        if has_plural is None:
             return True  # Benefit of doubt
+        return has_plural
 
-        # Paradigm is list of {form, tags}
-        return any(
-            "plural" in str(f.get("tags", [])).lower()
-            # "raw_tags" is not currently returned by get_paradigm, but we could add it if needed.
-            # get_paradigm returns "tags" which parses "tags_json".
-            # If tags_json contained raw tags (it usually does as a list of strings), this works.
-            for f in paradigm
-        )
-
+    @traced()
     def _get_modern_context(self, hero, hero_row, corpus):
         # 1. Own Examples
         raw_mod = hero_row.get("Modern_Examples", "")
@@ -883,6 +899,7 @@ class KombyphantikeEngine:
 
         return "NO_CONTEXT_FOUND"
 
+    @traced()
     def generate_ai_instruction(self, theme, count, words_df, target_level="Any", complexity="lucid"):
         pool_text = []
         for pos, group in words_df.groupby(self.pos_col):
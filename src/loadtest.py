@@ -0,0 +1,292 @@
+"""End-to-end load test of the API against the local stand-ins."""
+
+import argparse
+import json
+import logging
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import requests
+
+from src.config import DATA_DIR
+from src.stand_ins import start_elevenlabs, start_gemini
+
+logger = logging.getLogger(__name__)
+
+RESULTS_FILE = DATA_DIR / "benchmarks" / "loadtest_latest.json"
+ENDPOINTS = ["draft_curriculum", "fill_curriculum", "speak", "relations"]
+DEFAULT_THEMES = ["fate", "sea", "war", "love", "light", "city"]
+READY_TIMEOUT = 180.0
+REQUEST_TIMEOUT = 120.0
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class Recorder:
+    """Thread-safe sink for (endpoint, latency, ok) samples."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = {name: [] for name in ENDPOINTS}
+        self.errors = {name: 0 for name in ENDPOINTS}
+
+    def record(self, endpoint, latency_ms, ok):
+        with self._lock:
+            self.samples[endpoint].append(latency_ms)
+            if not ok:
+                self.errors[endpoint] += 1
+
+    def summary(self, elapsed):
+        report = {}
+        for name in ENDPOINTS:
+            values = sorted(self.samples[name])
+            report[name] = {
+                "requests": len(values),
+                "errors": self.errors[name],
+                "throughput_rps": round(len(values) / elapsed, 3) if elapsed else 0.0,
+                "p50_ms": _round(percentile(values, 50)),
+                "p95_ms": _round(percentile(values, 95)),
+                "p99_ms": _round(percentile(values, 99)),
+                "max_ms": _round(values[-1] if values else None),
+            }
+        return report
+
+
+def _round(value):
+    return round(value, 2) if value is not None else None
+
+
+class Learner:
+    """One virtual user walking draft -> fill -> speak -> relations in a loop."""
+
+    def __init__(self, base_url, recorder, themes, seed, sentence_count=3):
+        self.base_url = base_url
+        self.recorder = recorder
+        self.themes = themes
+        self.rng = random.Random(seed)
+        self.sentence_count = sentence_count
+        self.session = requests.Session()
+
+    def _call(self, endpoint, method, path, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = self.session.request(
+                method, self.base_url + path, timeout=REQUEST_TIMEOUT, **kwargs
+            )
+            ok = response.status_code == 200
+        except requests.RequestException:
+            response, ok = None, False
+        self.recorder.record(endpoint, (time.perf_counter() - start) * 1000.0, ok)
+        return response.json() if ok else None
+
+    def run_session(self):
+        theme = self.rng.choice(self.themes)
+        graph = self._call(
+            "draft_curriculum",
+            "POST",
+            "/draft_curriculum",
+            json={"theme": theme, "sentence_count": self.sentence_count},
+        )
+        if not graph:
+            return
+
+        nodes = graph.get("nodes", [])
+        filled = self._call(
+            "fill_curriculum",
+            "POST",
+            "/fill_curriculum",
+            json={"worksheet_data": nodes, "instruction_text": f"Theme: {theme}"},
+        )
+
+        sentence = None
+        for node in (filled or {}).get("worksheet_data", []):
+            sentence = (node.get("data") or {}).get("target_sentence")
+            if sentence:
+                break
+        self._call("speak", "POST", "/speak", json={"text": sentence or theme})
+
+        lemmas = [n["label"] for n in nodes if n.get("type") == "lemma"]
+        if lemmas:
+            self._call("relations", "GET", f"/relations/{self.rng.choice(lemmas)}")
+
+    def run_until(self, deadline):
+        while time.perf_counter() < deadline:
+            self.run_session()
+        self.session.close()
+
+
+def run_level(base_url, concurrency, duration, themes, seed):
+    recorder = Recorder()
+    start = time.perf_counter()
+    deadline = start + duration
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [
+            pool.submit(Learner(base_url, recorder, themes, seed + i).run_until, deadline)
+            for i in range(concurrency)
+        ]
+        for future in futures:
+            future.result()
+    elapsed = time.perf_counter() - start
+    return {"elapsed_s": round(elapsed, 2), "endpoints": recorder.summary(elapsed)}
+
+
+# --- APP PROCESS ---
+def serve_offline(host, port, n_lemmas):
+    """Runs src.api over the benchmark's offline engine (executed in the app subprocess)."""
+    import uvicorn
+
+    from src import api
+    from src.benchmark import SyntheticFixture, build_engine
+
+    workdir = tempfile.mkdtemp(prefix="komby_loadtest_")
+    engine = build_engine(SyntheticFixture(n_lemmas, workdir=workdir))
+    # The startup hook constructs the engine; hand it the prebuilt one instead.
+    api.KombyphantikeEngine = lambda: engine
+    uvicorn.run(api.app, host=host, port=port, log_level="warning")
+
+
+def launch_app(args, port, gemini_url, elevenlabs_url):
+    env = dict(os.environ)
+    env.update(
+        {
+            "GEMINI_BASE_URL": gemini_url,
+            "ELEVENLABS_BASE_URL": elevenlabs_url,
+            "GOOGLE_API_KEY": env.get("GOOGLE_API_KEY") or "stand-in",
+            "ELEVENLABS_API_KEY": env.get("ELEVENLABS_API_KEY") or "stand-in",
+        }
+    )
+    if args.engine == "real":
+        cmd = [sys.executable, "-m", "uvicorn", "src.api:app", "--host", "127.0.0.1",
+               "--port", str(port), "--workers", str(args.workers), "--log-level", "warning"]
+    else:
+        cmd = [sys.executable, "-m", "src.loadtest", "serve", "--port", str(port),
+               "--lemmas", str(args.lemmas)]
+    return subprocess.Popen(cmd, env=env, cwd=Path(__file__).resolve().parent.parent)
+
+
+def wait_ready(base_url, process, timeout=READY_TIMEOUT):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"App exited during startup (code {process.returncode}).")
+        try:
+            if requests.get(base_url + "/openapi.json", timeout=2).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    raise TimeoutError(f"App not ready after {timeout:.0f}s")
+
+
+# --- REPORTING ---
+def print_report(results):
+    print(f"{'CONC':>5}  {'ENDPOINT':<18}{'REQS':>7}{'ERR':>6}{'RPS':>9}{'P50':>10}{'P95':>10}{'P99':>10}")
+    for level in results["levels"]:
+        for name, stats in level["endpoints"].items():
+            cells = [
+                f"{stats[k]:.1f}" if stats[k] is not None else "-"
+                for k in ("p50_ms", "p95_ms", "p99_ms")
+            ]
+            print(
+                f"{level['concurrency']:>5}  {name:<18}{stats['requests']:>7}{stats['errors']:>6}"
+                f"{stats['throughput_rps']:>9.2f}{cells[0]:>10}{cells[1]:>10}{cells[2]:>10}"
+            )
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if argv[:1] == ["serve"]:
+        parser = argparse.ArgumentParser(description="Serve the API over an offline engine")
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, required=True)
+        parser.add_argument("--lemmas", type=int, default=10_000)
+        args = parser.parse_args(argv[1:])
+        serve_offline(args.host, args.port, args.lemmas)
+        return 0
+
+    parser = argparse.ArgumentParser(description="Kombyphantike API load test")
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 4, 16])
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds per level")
+    parser.add_argument("--engine", choices=["offline", "real"], default="offline")
+    parser.add_argument("--lemmas", type=int, default=10_000, help="Offline lexicon size")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers (real engine)")
+    parser.add_argument("--themes", nargs="+", default=DEFAULT_THEMES)
+    parser.add_argument("--gemini-latency-ms", type=float, default=1500.0)
+    parser.add_argument("--elevenlabs-latency-ms", type=float, default=400.0)
+    parser.add_argument("--jitter-ms", type=float, default=100.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=13)
+    parser.add_argument("--output", type=Path, default=RESULTS_FILE)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    gemini = start_gemini(args.gemini_latency_ms, args.jitter_ms, args.error_rate, args.seed)
+    elevenlabs = start_elevenlabs(
+        args.elevenlabs_latency_ms, args.jitter_ms, args.error_rate, args.seed + 1
+    )
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    process = launch_app(args, port, gemini.url, elevenlabs.url)
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "engine": args.engine,
+            "lemmas": args.lemmas if args.engine == "offline" else None,
+            "duration_s": args.duration,
+            "gemini_latency_ms": args.gemini_latency_ms,
+            "elevenlabs_latency_ms": args.elevenlabs_latency_ms,
+            "jitter_ms": args.jitter_ms,
+            "error_rate": args.error_rate,
+        },
+        "levels": [],
+    }
+    try:
+        wait_ready(base_url, process)
+        logger.info(f"App ready at {base_url}")
+        for concurrency in args.concurrency:
+            logger.info(f"Running {concurrency} learner(s) for {args.duration:.0f}s...")
+            level = run_level(base_url, concurrency, args.duration, args.themes, args.seed)
+            level["concurrency"] = concurrency
+            results["levels"].append(level)
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        gemini.stop()
+        elevenlabs.stop()
+
+    print_report(results)
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    logger.info(f"Results saved to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,20 @@
 import xml.etree.ElementTree as ET
 import json
 import logging
+import os
 import re
-from src.config import DICT_DIR
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from src.config import DICT_DIR, LSJ_ORACLE_FILE
 from src.beta_code import BetaCodeConverter
 
 logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 logger = logging.getLogger(__name__)
 
 LSJ_DIR = DICT_DIR / "lsj_xml"
-OUTPUT_INDEX = DICT_DIR / "lsj_index.json"
+OUTPUT_INDEX = LSJ_ORACLE_FILE
+ORACLE_FIELDS = ["def", "aor", "cit", "original_key"]
 ABBREV_FILE = DICT_DIR / "abbreviations.json"
 
 # --- TIER DEFINITIONS ---
@@ -136,9 +141,17 @@ def get_author_tier(author_str):
     return 4
 
 
-def extract_definition_flow(entry, converter):
+def waterfall_key(x):
+    return (
+        x["tier"],  # 1 is best
+        not x["has_trans"],  # False (Has) is best
+        -x["length"],  # Longest is best
+    )
+
+
+def extract_definition_flow(entry, converter, senses=None):
     def_parts = []
-    for sense in entry.findall(".//sense"):
+    for sense in entry.findall(".//sense") if senses is None else senses:
         for child in sense:
             if child.tag == "tr" and child.text:
                 def_parts.append(child.text.strip().strip(",;"))
@@ -173,7 +186,7 @@ def get_text_between_siblings(start_node, end_node, parent):
     return " ".join(text_parts).replace(" ,", ",").replace(" .", ".")
 
 
-def extract_citation_candidates(entry, converter, fallback_def=""):
+def extract_citation_candidates(entry, converter, fallback_def="", senses=None):
     candidates = []
 
     # STRATEGY 1: CIT (Explicit Citation Blocks)
@@ -216,7 +229,7 @@ def extract_citation_candidates(entry, converter, fallback_def=""):
     # This fixes cases where the definition is global but citation is local
     last_trans = fallback_def
 
-    for sense in entry.findall(".//sense"):
+    for sense in entry.findall(".//sense") if senses is None else senses:
         children = list(sense)
         for i, child in enumerate(children):
 
@@ -294,90 +307,109 @@ def extract_citation_candidates(entry, converter, fallback_def=""):
                     )
 
     # THE WATERFALL SORT
-    candidates.sort(
-        key=lambda x: (
-            x["tier"],  # 1 is best
-            not x["has_trans"],  # False (Has) is best
-            -x["length"],  # Longest is best
-        )
-    )
+    candidates.sort(key=waterfall_key)
 
     # Filter Garbage
     final = [c for c in candidates if c["tier"] < 5 and c["length"] > 0]
     return final
 
 
-def build_index():
-    print(f"--- STARTING WATERFALL LSJ INDEXING ---")
-    if not LSJ_DIR.exists():
-        return
+class _MemoConverter:
+    """Per-worker memo of the Beta Code conversions (quotes and keys repeat across entries)."""
+
+    def __init__(self, converter):
+        self.converter = converter
+        self.to_greek = lru_cache(maxsize=65536)(converter.to_greek)
+        self.canonicalize = lru_cache(maxsize=65536)(converter.canonicalize)
+
+
+_worker_converter = None
+
+
+def _init_worker(converter):
+    global _worker_converter
+    _worker_converter = _MemoConverter(converter)
+
+
+def extract_entries(xml_file, converter=None):
+    """
+    One volume -> partial index: [(canon_key, key, def, aor, cits)] in document order.
+    Returns (file name, entries, error message or None).
+    """
+    converter = converter or _worker_converter
+    entries = []
+    try:
+        root = ET.parse(xml_file).getroot()
+        for entry in root.findall(".//entryFree"):
+            key = entry.get("key")
+            if not key:
+                continue
+
+            canon_key = converter.canonicalize(key)
+            if not canon_key:
+                continue
+
+            senses = entry.findall(".//sense")
+            raw_def = extract_definition_flow(entry, converter, senses)
+            final_def = clean_definition(raw_def)
+            aorist_form = extract_aorist(entry, converter)
+
+            # PASS THE DEFINITION AS FALLBACK
+            cit_candidates = extract_citation_candidates(
+                entry, converter, final_def, senses
+            )
 
-    converter = BetaCodeConverter()
+            if not final_def and not aorist_form and not cit_candidates:
+                continue
+            entries.append((canon_key, key, final_def, aorist_form, cit_candidates))
+    except Exception as e:
+        return xml_file.name, entries, str(e)
+    return xml_file.name, entries, None
+
+
+def merge_partials(partials):
+    """
+    Folds partial indexes (in file order) into one. Colliding keys are merged as before;
+    their candidates are sorted once per key at the end (stable, so ties keep file order).
+    """
     lsj_index = {}
-    xml_files = list(LSJ_DIR.glob("*.xml"))
-    logger.info(f"Found {len(xml_files)} XML files.")
-
-    for xml_file in xml_files:
-        try:
-            tree = ET.parse(xml_file)
-            root = tree.getroot()
-
-            for entry in root.findall(".//entryFree"):
-                key = entry.get("key")
-                if not key:
-                    continue
-
-                canon_key = converter.canonicalize(key)
-                if not canon_key:
-                    continue
-
-                raw_def = extract_definition_flow(entry, converter)
-                final_def = clean_definition(raw_def)
-                aorist_form = extract_aorist(entry, converter)
-
-                # PASS THE DEFINITION AS FALLBACK
-                cit_candidates = extract_citation_candidates(
-                    entry, converter, final_def
-                )
-
-                if not final_def and not aorist_form and not cit_candidates:
-                    continue
-
-                if canon_key not in lsj_index:
-                    lsj_index[canon_key] = {
-                        "def": final_def,
-                        "aor": aorist_form,
-                        "cits_list": cit_candidates,
-                        "original_key": key,
-                    }
+    collided = set()
+    for entries in partials:
+        for canon_key, key, final_def, aorist_form, cit_candidates in entries:
+            if canon_key not in lsj_index:
+                lsj_index[canon_key] = {
+                    "def": final_def,
+                    "aor": aorist_form,
+                    "cits_list": list(cit_candidates),
+                    "original_key": key,
+                }
+                continue
+
+            existing = lsj_index[canon_key]
+            if final_def:
+                if not existing["def"]:
+                    existing["def"] = final_def
+                elif final_def not in existing["def"]:
+                    existing["def"] += " | " + final_def
+
+            if aorist_form and aorist_form != existing["aor"]:
+                if existing["aor"]:
+                    existing["aor"] += " / " + aorist_form
                 else:
-                    existing = lsj_index[canon_key]
-                    if final_def:
-                        if not existing["def"]:
-                            existing["def"] = final_def
-                        elif final_def not in existing["def"]:
-                            existing["def"] += " | " + final_def
-
-                    if aorist_form and aorist_form != existing["aor"]:
-                        if existing["aor"]:
-                            existing["aor"] += " / " + aorist_form
-                        else:
-                            existing["aor"] = aorist_form
-
-                    existing["cits_list"].extend(cit_candidates)
-                    existing["cits_list"].sort(
-                        key=lambda x: (x["tier"], not x["has_trans"], -x["length"])
-                    )
+                    existing["aor"] = aorist_form
 
-                    if key not in existing["original_key"]:
-                        existing["original_key"] += "; " + key
+            existing["cits_list"].extend(cit_candidates)
+            collided.add(canon_key)
 
-            logger.info(f"Processed {xml_file.name}...")
+            if key not in existing["original_key"]:
+                existing["original_key"] += "; " + key
 
-        except Exception as e:
-            logger.error(f"Error parsing {xml_file.name}: {e}")
+    for canon_key in collided:
+        lsj_index[canon_key]["cits_list"].sort(key=waterfall_key)
+    return lsj_index
 
-    print("Curating Gallery...")
+
+def curate_gallery(lsj_index):
     for k, v in lsj_index.items():
         candidates = v.pop("cits_list", [])
         if not candidates:
@@ -405,11 +437,89 @@ def build_index():
             seen_authors.add(main_author)
 
         v["cit"] = " | ".join(gallery)
+    return lsj_index
+
+
+def write_oracle(lsj_index, output_path=OUTPUT_INDEX):
+    """
+    Writes the index as a keyed SQLite store (one row per canonical key, clustered on the key)
+    that LSJEnricher reads lazily. Rows go in key order; the file is swapped in atomically.
+    """
+    pending = output_path.with_name(output_path.name + ".tmp")
+    pending.unlink(missing_ok=True)
+    conn = sqlite3.connect(pending)
+    try:
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute(
+            """
+            CREATE TABLE oracle (
+                key TEXT PRIMARY KEY,
+                def TEXT,
+                aor TEXT,
+                cit TEXT,
+                original_key TEXT
+            ) WITHOUT ROWID
+            """
+        )
+        conn.executemany(
+            "INSERT INTO oracle (key, def, aor, cit, original_key) VALUES (?, ?, ?, ?, ?)",
+            (
+                (k, *(lsj_index[k].get(field, "") for field in ORACLE_FIELDS))
+                for k in sorted(lsj_index)
+            ),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(pending, output_path)
+
+
+def build_index(lsj_dir=LSJ_DIR, output_path=OUTPUT_INDEX, workers=None, converter=None, json_path=None):
+    """
+    Volumes are extracted in parallel worker processes; the partial indexes are merged
+    in sorted file order, so the same input always produces a byte-identical index.
+    The oracle store goes to `output_path`; `json_path` also dumps the legacy JSON.
+    """
+    print(f"--- STARTING WATERFALL LSJ INDEXING ---")
+    if not lsj_dir.exists():
+        return
+
+    converter = converter or BetaCodeConverter()
+    workers = workers or os.cpu_count() or 1
+    xml_files = sorted(lsj_dir.glob("*.xml"))
+    logger.info(f"Found {len(xml_files)} XML files ({workers} workers).")
+
+    if workers > 1 and len(xml_files) > 1:
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(xml_files)),
+            initializer=_init_worker,
+            initargs=(converter,),
+        ) as executor:
+            results = list(executor.map(extract_entries, xml_files))
+    else:
+        memo = _MemoConverter(converter)
+        results = [extract_entries(xml_file, memo) for xml_file in xml_files]
+
+    partials = []
+    for name, entries, error in results:
+        if error:
+            logger.error(f"Error parsing {name}: {error}")
+        else:
+            logger.info(f"Processed {name}...")
+        partials.append(entries)
+    lsj_index = merge_partials(partials)
+
+    print("Curating Gallery...")
+    curate_gallery(lsj_index)
 
-    with open(OUTPUT_INDEX, "w", encoding="utf-8") as f:
-        json.dump(lsj_index, f, ensure_ascii=False, indent=2)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    write_oracle(lsj_index, output_path)
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(lsj_index, f, ensure_ascii=False, indent=2)
 
-    logger.info(f"Saved to {OUTPUT_INDEX}")
+    logger.info(f"Saved {len(lsj_index)} keys to {output_path}")
+    return lsj_index
 
 
 if __name__ == "__main__":
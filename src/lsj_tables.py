@@ -0,0 +1,158 @@
+"""LSJ entries stored as rows of senses and citations."""
+
+import json
+import logging
+
+from src.bulk_load import insert_many
+
+logger = logging.getLogger(__name__)
+
+# --- TIER DEFINITIONS (The Waterfall) ---
+TIER_GOD = [
+    "Soph.",
+    "S.",
+    "Aesch.",
+    "A.",
+    "Eur.",
+    "E.",
+    "Hom.",
+    "Il.",
+    "Od.",
+    "Pind.",
+    "Pi.",
+    "Hes.",
+]
+TIER_PHIL = ["Pl.", "Arist.", "X.", "Epicur.", "Stoic."]
+TIER_HIST = ["Hdt.", "Th.", "D.H.", "Plb.", "Xen."]
+
+# Column -> declared type, in row order (also the staging layout)
+SENSE_COLUMNS = {
+    "sense_index": "INTEGER NOT NULL",
+    "sense_ref": "TEXT",
+    "definition": "TEXT",
+}
+CITATION_COLUMNS = {
+    "sense_index": "INTEGER NOT NULL",
+    "citation_index": "INTEGER NOT NULL",
+    "greek": "TEXT",
+    "translation": "TEXT",
+    "author": "TEXT",
+    "work": "TEXT",
+    "bibl": "TEXT NOT NULL",
+    "main_author": "TEXT NOT NULL",
+    "author_tier": "INTEGER NOT NULL",
+    "has_translation": "INTEGER NOT NULL",
+    "word_count": "INTEGER NOT NULL",
+}
+
+
+def get_author_tier(author_str):
+    if not author_str:
+        return 4
+    for a in TIER_GOD:
+        if a in author_str:
+            return 1
+    for a in TIER_PHIL:
+        if a in author_str:
+            return 2
+    for a in TIER_HIST:
+        if a in author_str:
+            return 3
+    return 4
+
+
+def create_tables(cursor):
+    """lsj_senses and lsj_citations, keyed by entry and position."""
+    columns = ", ".join(f"{name} {kind}" for name, kind in SENSE_COLUMNS.items())
+    cursor.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS lsj_senses (
+            entry_id INTEGER NOT NULL, {columns},
+            PRIMARY KEY (entry_id, sense_index),
+            FOREIGN KEY(entry_id) REFERENCES lsj_entries(id)
+        ) WITHOUT ROWID
+        """
+    )
+    columns = ", ".join(f"{name} {kind}" for name, kind in CITATION_COLUMNS.items())
+    cursor.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS lsj_citations (
+            entry_id INTEGER NOT NULL, {columns},
+            PRIMARY KEY (entry_id, sense_index, citation_index),
+            FOREIGN KEY(entry_id) REFERENCES lsj_entries(id)
+        ) WITHOUT ROWID
+        """
+    )
+    # Gallery candidates already in waterfall order, so ranking needs no sort
+    cursor.execute(
+        """
+        CREATE INDEX IF NOT EXISTS lsj_citations_waterfall ON lsj_citations (
+            entry_id, author_tier, has_translation DESC, word_count DESC,
+            sense_index, citation_index, main_author
+        ) WHERE author_tier < 5 AND word_count > 0
+        """
+    )
+
+
+def entry_rows(entry_data):
+    """Parsed entry_json -> (sense rows, citation rows), in SENSE_COLUMNS / CITATION_COLUMNS order."""
+    senses = []
+    citations = []
+    for sense_index, sense in enumerate(entry_data.get("senses", [])):
+        senses.append((sense_index, sense.get("id"), sense.get("definition", "")))
+        for citation_index, cit in enumerate(sense.get("citations", [])):
+            quote = cit.get("greek", "")
+            trans = cit.get("translation", "")
+            author = cit.get("author", "")
+            bibl = f"{author} {cit.get('work', '')}".strip()
+            citations.append(
+                (
+                    sense_index,
+                    citation_index,
+                    quote,
+                    trans,
+                    author or None,
+                    cit.get("work"),
+                    bibl,
+                    bibl.split()[0] if bibl else "Unknown",
+                    get_author_tier(author),
+                    int(bool(trans)),
+                    len(quote.split()) if quote else 0,
+                )
+            )
+    return senses, citations
+
+
+def backfill(cursor) -> int:
+    """
+    Normalizes every entry of a database ingested before these tables
+    existed, parsing each entry_json once. Migration 1 keeps the tables in
+    step from then on, so a populated lsj_senses means there is nothing to do.
+    Returns the number of entries normalized.
+    """
+    create_tables(cursor)
+    if cursor.execute("SELECT 1 FROM lsj_senses LIMIT 1").fetchone():
+        return 0
+    pending = cursor.execute(
+        """
+        SELECT e.id, e.entry_json FROM lsj_entries e
+        WHERE e.entry_json IS NOT NULL AND e.entry_json != ''
+        """
+    ).fetchall()
+    sense_rows = []
+    citation_rows = []
+    for entry_id, entry_json in pending:
+        try:
+            senses, citations = entry_rows(json.loads(entry_json))
+        except (json.JSONDecodeError, AttributeError):
+            continue
+        sense_rows.extend((entry_id, *row) for row in senses)
+        citation_rows.extend((entry_id, *row) for row in citations)
+    for table, columns, rows in (
+        ("lsj_senses", SENSE_COLUMNS, sense_rows),
+        ("lsj_citations", CITATION_COLUMNS, citation_rows),
+    ):
+        insert_many(cursor, table, ["entry_id", *columns], rows, verb="INSERT OR REPLACE")
+    if pending:
+        logger.info(f"Normalized {len(pending)} LSJ entries into lsj_senses / lsj_citations.")
+    return len(pending)
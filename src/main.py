@@ -2,6 +2,7 @@ from src.ingestion_hybrid import HybridIngestor
 from src.enrichment_el import HellenicEnricher
 from src.enrichment_lsj import LSJEnricher
 from src.analysis import Analyzer
+from src.kaikki_scanner import SCAN_WORKERS
 from src.config import (
     KELLY_FILE,
     KAIKKI_EL_FILE,
@@ -53,8 +54,12 @@ def run_pipeline():
         print(f"Filtered to {len(ingestor.target_lemmas)} words.")
 
     # Now run the scans (they will only scan the target lemmas)
-    ingestor.scan_hellenic_core()
-    ingestor.scan_english_gloss()
+    # Debug runs seek straight to their few targets through the dumps' offset indexes;
+    # full runs parse the dumps across every core
+    words = ingestor.target_lemmas if DEBUG_MODE else None
+    workers = 1 if DEBUG_MODE else SCAN_WORKERS
+    ingestor.scan_hellenic_core(words=words, workers=workers)
+    ingestor.scan_english_gloss(words=words, workers=workers)
     # ingestor.bridge_gap_fallback() # Disabled
     # ingestor.save_paradigms()  #Disabled
 
@@ -0,0 +1,522 @@
+"""In-memory, array-backed lexicon with the same lookups as DatabaseManager."""
+
+import json
+import logging
+import sqlite3
+import string
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from src.database import (
+    EXPANSION_COLUMNS,
+    EXPANSION_DETAILS,
+    default_db_path,
+    normalize_form,
+    unpack_paradigm,
+)
+from src.morphology import FEATURES, encode_tags, feature_bit
+from src.publish import SERVING_COLUMNS
+from src.relation_graph import RelationGraph
+from src.tracing import traced
+
+logger = logging.getLogger(__name__)
+
+LEMMA_COLUMNS = SERVING_COLUMNS["lemmas"]
+THEME_COLUMNS = ["lemma_text", "modern_def", "ancient_definitions"]
+
+# Candidate ranking inside one form key (same as migration 9)
+PRIORITY_FORM = 0
+PRIORITY_HEADWORD = 1
+PRIORITY_FORM_OF = 2
+
+# SQLite's LIKE folds ASCII case only
+_ASCII_FOLD = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+class _Interner:
+    """value -> dense int id, in first-seen order."""
+
+    def __init__(self):
+        self.ids = {}
+        self.values = []
+
+    def __call__(self, value):
+        i = self.ids.get(value)
+        if i is None:
+            i = self.ids[value] = len(self.values)
+            self.values.append(value)
+        return i
+
+    def intern_all(self, values):
+        """Bulk __call__: new values are added once, ids come back as an int32 array."""
+        ids = self.ids
+        for value in dict.fromkeys(values):
+            if value not in ids:
+                ids[value] = len(self.values)
+                self.values.append(value)
+        return np.fromiter(map(ids.__getitem__, values), dtype=np.int32, count=len(values))
+
+    def ranks(self):
+        """Sort rank of every id (code-point order, like SQLite's BINARY collation)."""
+        order = sorted(range(len(self.values)), key=self.values.__getitem__)
+        ranks = np.empty(len(order), dtype=np.int32)
+        ranks[order] = np.arange(len(order), dtype=np.int32)
+        return ranks
+
+
+def _float_array(values):
+    return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+
+
+class MemoryLexicon:
+    def __init__(self, db_path=None):
+        if db_path is None:
+            db_path = default_db_path()
+        self.db_path = Path(db_path)
+        if not self.db_path.exists():
+            raise FileNotFoundError(f"Database not found at {self.db_path}")
+
+        start = time.perf_counter()
+        self._strings = _Interner()
+        self._tags = _Interner()
+        self._relation_graph = None
+        conn = sqlite3.connect(f"{self.db_path.resolve().as_uri()}?mode=ro", uri=True)
+        try:
+            self._load_lemmas(conn)
+            self._load_forms(conn)
+            self._load_relations(conn)
+        finally:
+            conn.close()
+        self._build_resolve_index()
+        self.load_seconds = time.perf_counter() - start
+
+        footprint = self.memory_footprint()
+        logger.info(
+            f"MemoryLexicon: {len(self._lemma_ids)} lemmas, {len(self._form_string)} forms, "
+            f"{len(self._rel_target)} relations in {self.load_seconds:.2f}s "
+            f"({footprint['total'] / 1e6:.1f} MB)"
+        )
+
+    # --- LOADING ---
+    def _columns(self, conn, table):
+        return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+    def _load_lemmas(self, conn):
+        available = self._columns(conn, "lemmas")
+        self._lemma_columns = [c for c in LEMMA_COLUMNS if c in available]
+        rows = conn.execute(
+            f"SELECT {', '.join(self._lemma_columns)} FROM lemmas ORDER BY id"
+        ).fetchall()
+        n = len(rows)
+        self._meta = {
+            column: [row[i] for row in rows] for i, column in enumerate(self._lemma_columns)
+        }
+        for column in LEMMA_COLUMNS:
+            self._meta.setdefault(column, [None] * n)
+
+        self._lemma_ids = np.fromiter(self._meta["id"], dtype=np.int64, count=n)
+        self._lemma_index = {}
+        for i, text in enumerate(self._meta["lemma_text"]):
+            self._lemma_index.setdefault(text, i)
+        self._kds = _float_array(self._meta["kds_score"])
+        self._frequency = _float_array(self._meta["frequency_score"])
+
+        # select_words walks lemmas by ascending KDS (ties by id, like idx_lemmas_kds)
+        scored = np.flatnonzero(~np.isnan(self._kds))
+        self._kds_order = scored[np.lexsort((self._lemma_ids[scored], self._kds[scored]))]
+        self._kds_sorted = self._kds[self._kds_order]
+
+        # Theme search text in the same order, ASCII-folded like LIKE; "\x00" separates
+        # fields and "\x01" lemmas, so a plain needle never matches across either.
+        texts = [
+            "\x00".join(
+                str(v).translate(_ASCII_FOLD)
+                for v in (self._meta[c][i] for c in THEME_COLUMNS)
+                if v is not None
+            )
+            for i in self._kds_order
+        ]
+        self._theme_starts = np.cumsum([0] + [len(t) + 1 for t in texts], dtype=np.int64)
+        self._theme_text = "\x01".join(texts) + "\x01"
+
+    def _lemma_positions(self, db_ids):
+        """DB lemma ids -> lemma indexes (-1 where the lemma does not exist)."""
+        db_ids = np.asarray(db_ids, dtype=np.int64)
+        if not len(self._lemma_ids):
+            return np.full(len(db_ids), -1, dtype=np.int64)
+        pos = np.searchsorted(self._lemma_ids, db_ids)
+        pos = np.minimum(pos, len(self._lemma_ids) - 1)
+        return np.where(self._lemma_ids[pos] == db_ids, pos, -1)
+
+    def _read_cells(self, conn):
+        """(lemma_ids, form_texts, tags_jsons) in paradigm order, from forms or packed blobs."""
+        if "form_text" in self._columns(conn, "forms"):
+            rows = conn.execute(
+                """
+                SELECT lemma_id, form_text, COALESCE(tags_json, '[]') FROM forms
+                WHERE form_text IS NOT NULL
+                ORDER BY lemma_id, id
+                """
+            ).fetchall()
+        elif self._columns(conn, "paradigm_blobs"):
+            rows = [
+                (lemma_id, form_text, json.dumps(tags, ensure_ascii=False))
+                for lemma_id, blob in conn.execute(
+                    "SELECT lemma_id, paradigm FROM paradigm_blobs ORDER BY lemma_id"
+                )
+                for form_text, tags in unpack_paradigm(blob)
+                if form_text is not None
+            ]
+        else:
+            rows = []
+        return tuple(zip(*rows)) or ((), (), ())
+
+    def _load_forms(self, conn):
+        self._empty_tags = self._tags("[]")  # headword / redirect candidates carry no tags
+        lemma_ids, form_texts, tags_jsons = self._read_cells(conn)
+
+        lemma_pos = self._lemma_positions(lemma_ids)
+        keep = lemma_pos >= 0
+        self._form_lemma = lemma_pos[keep].astype(np.int32)
+        self._form_string = self._strings.intern_all(form_texts)[keep]
+        self._form_tags = self._tags.intern_all(tags_jsons)[keep]
+
+        # Rows arrive grouped by lemma: offset/count per lemma index
+        bounds = np.searchsorted(self._form_lemma, np.arange(len(self._lemma_ids) + 1))
+        self._form_offset = bounds[:-1].astype(np.int64)
+        self._form_count = np.diff(bounds).astype(np.int32)
+
+        self._tagsets = []
+        masks = {dim: [] for dim in FEATURES}
+        for tags_json in self._tags.values:
+            try:
+                tags = json.loads(tags_json)
+            except ValueError:
+                tags = []
+            if not isinstance(tags, list):
+                tags = []
+            self._tagsets.append(tuple(tags))
+            for dim, mask in encode_tags(tags).items():
+                masks[dim].append(mask)
+        self._tag_masks = {dim: np.array(values, dtype=np.uint8) for dim, values in masks.items()}
+
+    def _load_relations(self, conn):
+        types = _Interner()
+        rows = conn.execute(
+            "SELECT child_lemma_id, parent_lemma_text, relation_type FROM relations ORDER BY child_lemma_id, id"
+        ).fetchall()
+        child_ids, parents, kinds = tuple(zip(*rows)) or ((), (), ())
+
+        child_pos = self._lemma_positions(child_ids)
+        keep = child_pos >= 0
+        self._rel_child = child_pos[keep].astype(np.int32)
+        self._rel_target = self._strings.intern_all(parents)[keep]
+        self._rel_type = types.intern_all(kinds).astype(np.int16)[keep]
+        self._rel_types = types.values
+        self._rel_offset = np.searchsorted(
+            self._rel_child, np.arange(len(self._lemma_ids) + 1)
+        ).astype(np.int64)
+
+        # form_of headword -> most frequent parent that has forms (-1: none)
+        self._redirect = np.full(len(self._lemma_ids), -1, dtype=np.int32)
+        form_of = types.ids.get("form_of", -1)
+        self._form_of_edges = np.flatnonzero(self._rel_type == form_of)
+        for k in self._form_of_edges:
+            child = self._rel_child[k]
+            parent = self._lemma_index.get(self._strings.values[self._rel_target[k]])
+            if parent is None or not self._form_count[parent]:
+                continue
+            current = self._redirect[child]
+            if current < 0 or self._frequency[parent] > self._frequency[current]:
+                self._redirect[child] = parent
+
+    def _build_resolve_index(self):
+        strings = self._strings
+        form_key = strings.intern_all(list(map(normalize_form, strings.values)))
+        lemma_text = self._meta["lemma_text"]
+        is_form_of_child = np.zeros(len(lemma_text), dtype=bool)
+        is_form_of_child[self._rel_child[self._form_of_edges]] = True
+        heads = np.flatnonzero(~is_form_of_child)
+        redirects = [
+            (int(self._rel_child[k]), self._lemma_index.get(strings.values[self._rel_target[k]]))
+            for k in self._form_of_edges
+        ]
+        redirects = [(child, parent) for child, parent in redirects if parent is not None]
+
+        keys = np.concatenate([
+            form_key[self._form_string],
+            strings.intern_all([normalize_form(lemma_text[i]) for i in heads]),
+            strings.intern_all([normalize_form(lemma_text[c]) for c, _ in redirects]),
+        ])
+        priority = np.concatenate([
+            np.full(len(self._form_string), PRIORITY_FORM, dtype=np.int8),
+            np.full(len(heads), PRIORITY_HEADWORD, dtype=np.int8),
+            np.full(len(redirects), PRIORITY_FORM_OF, dtype=np.int8),
+        ])
+        lemma = np.concatenate([
+            self._form_lemma,
+            heads.astype(np.int32),
+            np.array([p for _, p in redirects], dtype=np.int32),
+        ])
+        form = np.concatenate([
+            self._form_string,
+            strings.intern_all([lemma_text[i] for i in heads]),
+            strings.intern_all([lemma_text[c] for c, _ in redirects]),
+        ])
+        tags = np.concatenate([
+            self._form_tags,
+            np.full(len(heads) + len(redirects), self._empty_tags, dtype=np.int32),
+        ])
+
+        # form_index's primary key dedups identical candidates; then rank like its ORDER BY
+        form_rank = strings.ranks()[form]
+        tag_rank = self._tags.ranks()[tags]
+        order = np.lexsort((tag_rank, form_rank, lemma, priority, keys))
+        dup = np.zeros(len(order), dtype=bool)
+        if len(order) > 1:
+            a, b = order[1:], order[:-1]
+            dup[1:] = (
+                (keys[a] == keys[b]) & (priority[a] == priority[b]) & (lemma[a] == lemma[b])
+                & (form[a] == form[b]) & (tags[a] == tags[b])
+            )
+        unique = order[~dup]
+        frequency = self._frequency[lemma[unique]]
+        neg_frequency = np.where(np.isnan(frequency), np.inf, -frequency)
+        unique = unique[
+            np.lexsort((tag_rank[unique], form_rank[unique], self._lemma_ids[lemma[unique]],
+                        neg_frequency, priority[unique], keys[unique]))
+        ]
+        self._rk_key = keys[unique]
+        self._rk_priority = priority[unique]
+        self._rk_lemma = lemma[unique]
+        self._rk_form = form[unique]
+        self._rk_tags = tags[unique]
+
+    # --- LOOKUPS ---
+    def _candidates(self, key):
+        kid = self._strings.ids.get(key)
+        if kid is None:
+            return range(0)
+        lo = np.searchsorted(self._rk_key, kid, side="left")
+        hi = np.searchsorted(self._rk_key, kid, side="right")
+        return range(lo, hi)
+
+    def _target(self, lemma):
+        """Lemma index whose forms answer for `lemma` (direct, then form_of redirect), or -1."""
+        i = self._lemma_index.get(lemma)
+        if i is None:
+            return -1
+        if self._form_count[i]:
+            return i
+        return int(self._redirect[i])
+
+    @traced("db.resolve_form", category="db")
+    def resolve_form(self, surface: str) -> list:
+        """Same contract as DatabaseManager.resolve_form."""
+        key = normalize_form(surface)
+        if not key:
+            return []
+        strings, lemma_text = self._strings.values, self._meta["lemma_text"]
+        return [
+            {
+                "lemma_id": int(self._lemma_ids[self._rk_lemma[k]]),
+                "lemma": lemma_text[self._rk_lemma[k]],
+                "form": strings[self._rk_form[k]],
+                "tags": list(self._tagsets[self._rk_tags[k]]),
+            }
+            for k in self._candidates(key)
+        ]
+
+    @traced("db.get_paradigm", category="db")
+    def get_paradigm(self, lemma: str):
+        """Same contract as DatabaseManager.get_paradigm over packed paradigms (migration 11)."""
+        target = self._target(lemma)
+        if target < 0:
+            # Any member form: the most frequent lemma that has it as a cell
+            strings = self._strings.values
+            target = next(
+                (
+                    int(self._rk_lemma[k])
+                    for k in self._candidates(normalize_form(lemma))
+                    if self._rk_priority[k] == PRIORITY_FORM and strings[self._rk_form[k]] == lemma
+                ),
+                -1,
+            )
+            if target < 0:
+                return []
+
+        start = self._form_offset[target]
+        end = start + self._form_count[target]
+        paradigm = []
+        for form_id, tag_id in zip(self._form_string[start:end], self._form_tags[start:end]):
+            form_text = self._strings.values[form_id]
+            entry = {"form": form_text, "tags": list(self._tagsets[tag_id])}
+            if form_text == lemma:
+                entry["is_current_form"] = True
+            paradigm.append(entry)
+        return paradigm
+
+    @traced("db.has_feature", category="db")
+    def has_feature(self, lemma: str, dimension: str, value: str):
+        """Same contract as DatabaseManager.has_feature."""
+        if dimension not in FEATURES:
+            raise ValueError(f"Unknown morphology dimension: {dimension}")
+        bit = feature_bit(dimension, value)
+        target = self._target(lemma)
+        if target < 0:
+            return None
+        start = self._form_offset[target]
+        tags = self._form_tags[start : start + self._form_count[target]]
+        return bool(np.any(self._tag_masks[dimension][tags] & bit))
+
+    @traced("db.get_metadata", category="db")
+    def get_metadata(self, lemma_text: str):
+        """Same contract as DatabaseManager.get_metadata."""
+        i = self._lemma_index.get(lemma_text)
+        if i is None:
+            return None
+        meta = self._meta
+        return {
+            "id": meta["id"][i],
+            "lemma": meta["lemma_text"][i],
+            "pos": meta["pos"][i],
+            "ipa": meta["ipa"][i],
+            "greek_def": meta["greek_def"][i],
+            "modern_def": meta["modern_def"][i],
+            "ancient_definitions": meta["ancient_definitions"][i],
+            "ancient_citations": meta["ancient_citations"][i],
+            "lsj_id": meta["lsj_id"][i],
+            "kds_score": meta["kds_score"][i],
+        }
+
+    @traced("db.get_relations", category="db")
+    def get_relations(self, lemma_text: str) -> dict:
+        """Same contract as DatabaseManager.get_relations."""
+        i = self._lemma_index.get(lemma_text)
+        if i is None:
+            return {}
+        relations = {}
+        for k in range(self._rel_offset[i], self._rel_offset[i + 1]):
+            rtype = self._rel_types[self._rel_type[k]]
+            relations.setdefault(rtype, []).append(self._strings.values[self._rel_target[k]])
+        return relations
+
+    @traced("db.expand_relations", category="db")
+    def expand_relations(self, seeds, relation_types, limit: int, exclude=()) -> dict:
+        """Same contract as DatabaseManager.expand_relations, walked over the CSR arrays."""
+        seeds = list(dict.fromkeys(seeds))
+        seed_set = set(seeds)
+        wanted = {k for k, t in enumerate(self._rel_types) if t in set(relation_types)}
+        strings, meta = self._strings.values, self._meta
+        columns = {c: [] for c in EXPANSION_COLUMNS}
+        claimed = set()
+        for seed in seeds:
+            i = self._lemma_index.get(seed)
+            if i is None:
+                continue
+            candidates = {}
+            for k in range(self._rel_offset[i], self._rel_offset[i + 1]):
+                if self._rel_type[k] not in wanted:
+                    continue
+                word = strings[self._rel_target[k]]
+                if word in seed_set or word in claimed or word.lower() in exclude:
+                    continue
+                rtype = self._rel_types[self._rel_type[k]]
+                candidates[word] = min(rtype, candidates.get(word, rtype))
+            claimed.update(candidates)
+
+            # Most frequent first (unknown words last), then by text, like the SQL ORDER BY
+            ranked = []
+            for word, rtype in candidates.items():
+                j = self._lemma_index.get(word)
+                freq = self._frequency[j] if j is not None else np.nan
+                ranked.append((bool(np.isnan(freq)), -freq if freq == freq else 0.0, word, rtype, j))
+            ranked.sort()
+            for _, _, word, rtype, j in ranked[:limit]:
+                columns["seed"].append(seed)
+                columns["lemma"].append(word)
+                columns["relation_type"].append(rtype)
+                for c in EXPANSION_DETAILS:
+                    columns[c].append(meta[c][j] if j is not None else None)
+        return columns
+
+    @traced("db.get_expansion_details", category="db")
+    def get_expansion_details(self, lemmas) -> dict:
+        """Same contract as DatabaseManager.get_expansion_details."""
+        details = {}
+        for lemma in lemmas:
+            i = self._lemma_index.get(lemma)
+            if i is not None:
+                details[lemma] = {c: self._meta[c][i] for c in EXPANSION_DETAILS}
+        return details
+
+    def relation_graph(self) -> RelationGraph:
+        """Same contract as DatabaseManager.relation_graph, compiled from the loaded arrays."""
+        if self._relation_graph is None:
+            strings, types = self._strings.values, self._rel_types
+            self._relation_graph = RelationGraph(
+                self._meta["lemma_text"],
+                self._rel_child,
+                [strings[t] for t in self._rel_target.tolist()],
+                [types[k] for k in self._rel_type.tolist()],
+                frequency=self._frequency,
+            )
+        return self._relation_graph
+
+    @traced("db.select_words", category="db")
+    def select_words(self, theme: str, min_kds: int, max_kds: int, limit: int) -> list:
+        """
+        Same contract as DatabaseManager.select_words (ASCII-case-insensitive substring,
+        without LIKE's % and _ wildcards). One str.find pass over the KDS-ordered text.
+        """
+        needle = str(theme).translate(_ASCII_FOLD)
+        if "\x00" in needle or "\x01" in needle:
+            return []
+        lo = np.searchsorted(self._kds_sorted, min_kds, side="left")
+        hi = np.searchsorted(self._kds_sorted, max_kds, side="right")
+        stop = int(self._theme_starts[hi])
+        pos = int(self._theme_starts[lo])
+        results = []
+        while len(results) < limit:
+            pos = self._theme_text.find(needle, pos, stop)
+            if pos < 0:
+                break
+            k = int(np.searchsorted(self._theme_starts, pos, side="right")) - 1
+            i = self._kds_order[k]
+            results.append({c: self._meta[c][i] for c in self._lemma_columns})
+            pos = int(self._theme_starts[k + 1])
+        return results
+
+    # --- INTROSPECTION ---
+    def memory_footprint(self) -> dict:
+        """Approximate resident bytes per structure."""
+        arrays = [
+            self._lemma_ids, self._kds, self._frequency, self._kds_order, self._kds_sorted,
+            self._theme_starts,
+            self._form_lemma, self._form_string, self._form_tags, self._form_offset,
+            self._form_count, self._rel_child, self._rel_target, self._rel_type,
+            self._rel_offset, self._redirect, self._form_of_edges, self._rk_key, self._rk_priority,
+            self._rk_lemma, self._rk_form, self._rk_tags, *self._tag_masks.values(),
+        ]
+        strings = sum(map(sys.getsizeof, self._strings.values))
+        strings += sys.getsizeof(self._strings.values) + sys.getsizeof(self._strings.ids)
+        metadata = sum(
+            sys.getsizeof(column) + sum(sys.getsizeof(v) for v in column if v is not None)
+            for column in self._meta.values()
+        )
+        metadata += sys.getsizeof(self._lemma_index)
+        footprint = {
+            "arrays": int(sum(a.nbytes for a in arrays)),
+            "strings": strings,
+            "metadata": metadata,
+            "tagsets": sum(map(sys.getsizeof, self._tagsets)) + sys.getsizeof(self._tags.ids),
+            "theme_text": sys.getsizeof(self._theme_text),
+        }
+        footprint["total"] = sum(footprint.values())
+        return footprint
+
+    def close(self):
+        """Nothing to release; kept for interface parity with DatabaseManager."""
@@ -0,0 +1,97 @@
+import logging
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from src.bulk_load import connect, phase, stage
+from src.config import PROCESSED_DIR
+from src.morphology import COLUMNS, PACK_WIDTH, pack_tags_json
+
+# Default DB Path
+DB_PATH = PROCESSED_DIR / "kombyphantike_v2.db"
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+FEATURE_INDEX = "idx_forms_lemma_features"
+
+
+def encode_morphology_features(db_path=DB_PATH, lemma_ids=None):
+    """
+    Encodes forms.tags_json into integer bitmask columns (f_case, f_number, f_gender,
+    f_tense, f_voice, f_mood, f_person; see src/morphology.py) and indexes them
+    behind lemma_id, so per-lemma feature checks are a single covering-index probe.
+    Forms inserted afterwards (migrations 4 and 12) read NULL until encoded.
+    Re-run after migration 4 rewrites `forms`.
+    lemma_ids: only encode the forms of these lemmas, e.g. those touched by a
+    Kaikki delta (a database without the columns is left as it is).
+    """
+    if not db_path.exists():
+        logging.error(f"Database not found at {db_path}")
+        return
+
+    conn = connect(db_path)
+    conn.create_function("morph_pack", 1, pack_tags_json, deterministic=True)
+    cursor = conn.cursor()
+
+    cursor.execute("PRAGMA table_info(forms)")
+    # column -> NOT NULL flag
+    existing = {row[1]: row[3] for row in cursor.fetchall()}
+    if not existing:
+        logging.error("Table 'forms' not found. Skipping migration.")
+        conn.close()
+        return
+
+    if lemma_ids is not None and not set(COLUMNS.values()) <= existing.keys():
+        logging.info("No feature columns to update. Skipping migration.")
+        conn.close()
+        return
+
+    with phase(conn, "Encoding morphology features") as cursor:
+        if lemma_ids is None:
+            # Deferred: the feature index is rebuilt once below instead of updated row by row
+            cursor.execute(f"DROP INDEX IF EXISTS {FEATURE_INDEX}")
+            # NULL marks a form inserted since the last encoding; DatabaseManager reads its
+            # tags_json instead. Earlier runs declared the columns NOT NULL DEFAULT 0.
+            for column in COLUMNS.values():
+                if existing.get(column) == 1:
+                    logging.info(f"Dropping NOT NULL column {column} to re-add it as nullable.")
+                    cursor.execute(f"ALTER TABLE forms DROP COLUMN {column}")
+                if existing.get(column) != 0:
+                    logging.info(f"Adding column {column} (INTEGER) to forms table.")
+                    cursor.execute(f"ALTER TABLE forms ADD COLUMN {column} INTEGER")
+
+        # One JSON parse per row: pack all masks, then unpack with shifts.
+        mask = (1 << PACK_WIDTH) - 1
+        assignments = ",\n            ".join(
+            f"{column} = (packed.p >> {i * PACK_WIDTH}) & {mask}"
+            for i, column in enumerate(COLUMNS.values())
+        )
+        logging.info("Encoding tags_json into feature columns...")
+        scope = ""
+        if lemma_ids is not None:
+            stage(cursor, "scoped_lemmas", {"id": "INTEGER PRIMARY KEY"}, ((i,) for i in set(lemma_ids)))
+            scope = " WHERE lemma_id IN (SELECT id FROM temp.scoped_lemmas)"
+        cursor.execute(
+            f"""
+            UPDATE forms
+            SET {assignments}
+            FROM (SELECT id, morph_pack(tags_json) AS p FROM forms{scope}) AS packed
+            WHERE forms.id = packed.id
+            """
+        )
+        updated = cursor.rowcount
+
+        if lemma_ids is None:
+            cursor.execute(
+                f"CREATE INDEX {FEATURE_INDEX} ON forms(lemma_id, {', '.join(COLUMNS.values())})"
+            )
+            cursor.execute("ANALYZE forms")
+    conn.close()
+    logging.info(f"Done. Encoded {updated} forms.")
+
+
+if __name__ == "__main__":
+    encode_morphology_features()
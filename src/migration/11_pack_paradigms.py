@@ -0,0 +1,156 @@
+import logging
+import sys
+from itertools import groupby
+from pathlib import Path
+
+# Add project root to path
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from src.bulk_load import connect, insert_many, phase, stage
+from src.config import PROCESSED_DIR
+from src.database import pack_paradigm
+
+# Default DB Path
+DB_PATH = PROCESSED_DIR / "kombyphantike_v2.db"
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+BATCH_SIZE = 10_000
+
+# Key ranking inside one lookup string
+PRIORITY_LEMMA = 0  # the lemma's own headword
+PRIORITY_FORM_OF = 1  # a 'form_of' headword without forms, redirected to its parent
+PRIORITY_MEMBER = 2  # any cell of the paradigm
+
+
+def pack_paradigms(db_path=DB_PATH, lemma_ids=None):
+    """
+    Materializes every lemma's paradigm into one packed blob (paradigm_blobs, keyed by
+    lemma id) plus a lookup table from headwords, 'form_of' headwords and member forms
+    to that id (paradigm_keys, WITHOUT ROWID). get_paradigm then reads a single row.
+    Rebuilt from scratch; re-run after migration 4 rewrites `forms`.
+    lemma_ids: only repack these lemmas and their keys, e.g. those touched by a
+    Kaikki delta (a database without the tables is left as it is).
+    """
+    if not db_path.exists():
+        logging.error(f"Database not found at {db_path}")
+        return
+
+    conn = connect(db_path)
+    cursor = conn.cursor()
+
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+    tables = {row[0] for row in cursor.fetchall()}
+    if not {"lemmas", "forms", "relations"} <= tables:
+        logging.error("Tables 'lemmas'/'forms'/'relations' not found. Skipping migration.")
+        conn.close()
+        return
+
+    if lemma_ids is not None and not {"paradigm_blobs", "paradigm_keys"} <= tables:
+        logging.info("No packed paradigms to update. Skipping migration.")
+        conn.close()
+        return
+
+    def scoped(column):
+        return "" if lemma_ids is None else f" AND {column} IN (SELECT id FROM temp.scoped_lemmas)"
+
+    # Redirects are keyed by the child's headword but point at the parent's id
+    redirect_scope = "" if lemma_ids is None else (
+        "AND (parent.id IN (SELECT id FROM temp.scoped_lemmas) OR child.id IN (SELECT id FROM temp.scoped_lemmas))"
+    )
+
+    with phase(conn, "Packing paradigms") as cursor:
+        if lemma_ids is None:
+            cursor.execute("DROP TABLE IF EXISTS paradigm_keys")
+            cursor.execute("DROP TABLE IF EXISTS paradigm_blobs")
+        else:
+            stage(cursor, "scoped_lemmas", {"id": "INTEGER PRIMARY KEY"}, ((i,) for i in set(lemma_ids)))
+            # A scoped form_of headword may have gained or lost forms of its own
+            cursor.execute(
+                """
+                DELETE FROM paradigm_keys
+                WHERE lemma_id IN (SELECT id FROM temp.scoped_lemmas)
+                   OR (priority = ? AND key IN (
+                       SELECT lemma_text FROM lemmas WHERE id IN (SELECT id FROM temp.scoped_lemmas)
+                   ))
+                """,
+                (PRIORITY_FORM_OF,),
+            )
+            cursor.execute("DELETE FROM paradigm_blobs WHERE lemma_id IN (SELECT id FROM temp.scoped_lemmas)")
+        cursor.execute(
+            "CREATE TABLE IF NOT EXISTS paradigm_blobs (lemma_id INTEGER PRIMARY KEY, paradigm BLOB NOT NULL)"
+        )
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS paradigm_keys (
+                key TEXT NOT NULL,
+                priority INTEGER NOT NULL,
+                lemma_id INTEGER NOT NULL,
+                frequency REAL,
+                PRIMARY KEY (key, priority, lemma_id)
+            ) WITHOUT ROWID
+            """
+        )
+
+        logging.info("Packing paradigms...")
+        scope = "" if lemma_ids is None else " WHERE lemma_id IN (SELECT id FROM temp.scoped_lemmas)"
+        rows = conn.execute(
+            f"SELECT lemma_id, form_text, tags_json FROM forms{scope} ORDER BY lemma_id, id"
+        )
+        n_blobs = insert_many(
+            cursor,
+            "paradigm_blobs",
+            ["lemma_id", "paradigm"],
+            (
+                (lemma_id, pack_paradigm((form, tags) for _, form, tags in cells))
+                for lemma_id, cells in groupby(rows, key=lambda r: r[0])
+            ),
+            batch_size=BATCH_SIZE,
+        )
+
+        logging.info("Keying headwords, form_of redirects and member forms...")
+        cursor.execute(
+            f"""
+            INSERT OR IGNORE INTO paradigm_keys (key, priority, lemma_id, frequency)
+            SELECT l.lemma_text, ?, l.id, l.frequency_score
+            FROM lemmas l
+            JOIN paradigm_blobs b ON b.lemma_id = l.id{scoped("l.id")}
+            """,
+            (PRIORITY_LEMMA,),
+        )
+        cursor.execute(
+            f"""
+            INSERT OR IGNORE INTO paradigm_keys (key, priority, lemma_id, frequency)
+            SELECT child.lemma_text, ?, parent.id, parent.frequency_score
+            FROM relations r
+            JOIN lemmas child ON child.id = r.child_lemma_id
+            JOIN lemmas parent ON parent.lemma_text = r.parent_lemma_text
+            JOIN paradigm_blobs b ON b.lemma_id = parent.id
+            WHERE r.relation_type = 'form_of'
+              AND NOT EXISTS (SELECT 1 FROM paradigm_blobs own WHERE own.lemma_id = child.id)
+              {redirect_scope}
+            """,
+            (PRIORITY_FORM_OF,),
+        )
+        cursor.execute(
+            f"""
+            INSERT OR IGNORE INTO paradigm_keys (key, priority, lemma_id, frequency)
+            SELECT f.form_text, ?, l.id, l.frequency_score
+            FROM forms f
+            JOIN lemmas l ON l.id = f.lemma_id
+            WHERE f.form_text IS NOT NULL{scoped("l.id")}
+            """,
+            (PRIORITY_MEMBER,),
+        )
+        cursor.execute("SELECT COUNT(*) FROM paradigm_keys")
+        n_keys = cursor.fetchone()[0]
+
+        if lemma_ids is None:
+            cursor.execute("ANALYZE paradigm_keys")
+    conn.close()
+    logging.info(f"Done. {n_blobs} paradigms packed under {n_keys} keys.")
+
+
+if __name__ == "__main__":
+    pack_paradigms()
@@ -0,0 +1,252 @@
+import importlib.util
+import json
+import logging
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from src.bulk_load import connect, insert_many, phase, stage, upsert
+from src.config import KAIKKI_EL_FILE, PROCESSED_DIR
+from src.ingestion_hybrid import HybridIngestor
+from src.kaikki_scanner import SCAN_WORKERS, KaikkiIndex, KaikkiScanner, index_key
+from src.noun_declension_extractor import ParadigmExtractor
+
+# Default DB Path
+DB_PATH = PROCESSED_DIR / "kombyphantike_v2.db"
+MIGRATION_DIR = Path(__file__).resolve().parent
+
+# Kaikki entry field -> relations.relation_type
+RELATION_FIELDS = ["synonyms", "derived", "related"]
+# Beyond this many changed words a filtered full scan beats one seek per entry
+SEEK_LIMIT = 50_000
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+
+def load_migration(script):
+    spec = importlib.util.spec_from_file_location(Path(script).stem, MIGRATION_DIR / script)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def ensure_schema(cursor):
+    """Kaikki-derived columns on lemmas, a source tag on forms, and the per-word hash table."""
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS lemmas (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            lemma_text TEXT NOT NULL UNIQUE
+        )
+    """
+    )
+    cursor.execute("PRAGMA table_info(lemmas)")
+    existing_columns = {row[1] for row in cursor.fetchall()}
+    for col_name in ("pos", "ipa", "greek_def", "etymology_text"):
+        if col_name not in existing_columns:
+            logging.info(f"Adding column {col_name} (TEXT) to lemmas table.")
+            cursor.execute(f"ALTER TABLE lemmas ADD COLUMN {col_name} TEXT")
+
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS forms (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            lemma_id INTEGER NOT NULL,
+            form_text TEXT NOT NULL,
+            tags_json TEXT,
+            FOREIGN KEY(lemma_id) REFERENCES lemmas(id)
+        )
+    """
+    )
+    cursor.execute("PRAGMA table_info(forms)")
+    if "source" not in {row[1] for row in cursor.fetchall()}:
+        # 'kaikki' marks the rows this migration owns (morphology parsing leaves it NULL)
+        cursor.execute("ALTER TABLE forms ADD COLUMN source TEXT")
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS relations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            child_lemma_id INTEGER NOT NULL,
+            parent_lemma_text TEXT NOT NULL,
+            relation_type TEXT,
+            FOREIGN KEY(child_lemma_id) REFERENCES lemmas(id)
+        )
+    """
+    )
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS kaikki_hashes (
+            word TEXT PRIMARY KEY,
+            digest TEXT NOT NULL
+        ) WITHOUT ROWID
+    """
+    )
+
+
+def json_tags(form):
+    """Kaikki form tags (English) and raw_tags (Greek) as one tags_json list."""
+    return json.dumps(form["tags"] + form["raw_tags"], ensure_ascii=False)
+
+
+class DeltaCollector:
+    """Kaikki-EL consumer: gathers lemma fields, forms and relations of the changed words."""
+
+    def __init__(self, words):
+        self.words = set(words)
+        # Same merging rules as the full pipeline
+        self.ingestor = HybridIngestor()
+        self.ingestor.target_lemmas = self.words
+        self.extractor = ParadigmExtractor()
+        self.extractor.target_lemmas = self.words
+        self.ipa = {}
+        self.relations = {}
+
+    def consume(self, entry):
+        if entry.get("lang_code") != "el":
+            return
+        word = index_key(entry.get("word"))
+        if word not in self.words:
+            return
+        self.ingestor.consume_hellenic(entry)
+        self.extractor.consume({**entry, "word": word})
+        for sound in entry.get("sounds", []):
+            if sound.get("ipa"):
+                self.ipa.setdefault(word, sound["ipa"])
+                break
+        related = self.relations.setdefault(word, {})
+        for field in RELATION_FIELDS:
+            for item in entry.get(field, []):
+                target = item.get("word") if isinstance(item, dict) else None
+                if target:
+                    related[(target, field)] = None
+
+    def lemma_rows(self):
+        """(lemma_text, pos, greek_def, etymology_text, ipa), greek_def as in enrichment_el."""
+        for word, data in self.ingestor.master_lookup.items():
+            glosses = [s["text"] for s in data["senses_el"]]
+            yield (
+                word,
+                data["pos"],
+                "; ".join(glosses[:2]) or None,
+                data["etymology_text_el"] or None,
+                self.ipa.get(word),
+            )
+
+
+def ingest_kaikki_delta(db_path=DB_PATH, jsonl_path=KAIKKI_EL_FILE, include_new_words=False, workers=SCAN_WORKERS):
+    """
+    Diffs a Kaikki-EL dump against the per-word content hashes of the last ingest
+    and rewrites only what changed entries derive: lemma fields (pos, greek_def,
+    etymology_text, ipa), forms (source = 'kaikki') and synonyms/derived/related
+    relations. KDS, propagated metadata, the form index, the feature columns and
+    the packed paradigms are then rebuilt for the affected lemmas only (the
+    changed ones and their form_of children).
+
+    The first run (no stored hashes) treats the whole vocabulary as changed, so
+    Kaikki's pos and greek_def replace the Kelly-hydrated ones. Rebuilding the
+    tables the hashes describe invalidates them: migration 2 drops kaikki_hashes
+    with lemmas/forms/relations, and migration 3 deletes the digests of the words
+    it re-hydrates, so the next delta restores what Kaikki derives for them.
+
+    include_new_words: also insert lemmas for dump words not yet in the database
+    (by default the delta stays within the existing vocabulary).
+    Returns {"changed", "removed", "affected"} counts.
+    """
+    index = KaikkiIndex(jsonl_path).ensure()
+    current = index.word_digests()
+
+    conn = connect(db_path)
+    with phase(conn, "Schema") as cursor:
+        ensure_schema(cursor)
+
+    stored = dict(cursor.execute("SELECT word, digest FROM kaikki_hashes").fetchall())
+    known = {row[0] for row in cursor.execute("SELECT lemma_text FROM lemmas")}
+    changed = sorted(
+        word for word, digest in current.items()
+        if stored.get(word) != digest and (include_new_words or word in known)
+    )
+    removed = sorted(set(stored) - set(current))
+    logging.info(f"Kaikki delta: {len(changed)} changed or new words, {len(removed)} removed.")
+    if not changed and not removed:
+        conn.close()
+        return {"changed": 0, "removed": 0, "affected": 0}
+
+    collector = DeltaCollector(changed)
+    scanner = KaikkiScanner(jsonl_path, words=changed, workers=workers if len(changed) > SEEK_LIMIT else 1)
+    scanner.register(collector.consume)
+    scanner.scan()
+
+    with phase(conn, "Applying Kaikki delta") as cursor:
+        upsert(
+            cursor,
+            "lemmas",
+            ["lemma_text", "pos", "greek_def", "etymology_text", "ipa"],
+            collector.lemma_rows(),
+            key=["lemma_text"],
+            update={
+                "pos": "excluded.pos",
+                "greek_def": "excluded.greek_def",
+                "etymology_text": "excluded.etymology_text",
+                "ipa": "COALESCE(excluded.ipa, lemmas.ipa)",
+            },
+        )
+
+        stage(cursor, "delta_words", {"word": "TEXT PRIMARY KEY"}, ((w,) for w in changed + removed))
+        lemma_ids = dict(
+            cursor.execute("SELECT lemma_text, id FROM lemmas WHERE lemma_text IN (SELECT word FROM temp.delta_words)")
+        )
+        touched = sorted(lemma_ids.values())
+
+        stage(cursor, "delta_lemmas", {"id": "INTEGER PRIMARY KEY"}, ((i,) for i in touched))
+        cursor.execute("DELETE FROM forms WHERE source = 'kaikki' AND lemma_id IN (SELECT id FROM temp.delta_lemmas)")
+        placeholders = ", ".join("?" for _ in RELATION_FIELDS)
+        cursor.execute(
+            f"DELETE FROM relations WHERE relation_type IN ({placeholders}) "
+            "AND child_lemma_id IN (SELECT id FROM temp.delta_lemmas)",
+            RELATION_FIELDS,
+        )
+
+        form_rows = []
+        relation_rows = []
+        for word in changed:
+            lemma_id = lemma_ids.get(word)
+            if lemma_id is None:
+                continue
+            for form in collector.extractor.paradigms.get(word, []):
+                form_rows.append((lemma_id, form["form"], json_tags(form), "kaikki"))
+            for target, field in collector.relations.get(word, {}):
+                relation_rows.append((lemma_id, target, field))
+        insert_many(cursor, "forms", ["lemma_id", "form_text", "tags_json", "source"], form_rows)
+        insert_many(cursor, "relations", ["child_lemma_id", "parent_lemma_text", "relation_type"], relation_rows)
+
+        upsert(cursor, "kaikki_hashes", ["word", "digest"], ((word, current[word]) for word in changed), key=["word"])
+        cursor.executemany("DELETE FROM kaikki_hashes WHERE word = ?", ((word,) for word in removed))
+
+        # form_of children inherit KDS and definitions from the touched lemmas
+        children = [
+            row[0]
+            for row in cursor.execute(
+                """
+                SELECT r.child_lemma_id FROM relations r
+                WHERE r.relation_type = 'form_of' AND r.parent_lemma_text IN (SELECT word FROM temp.delta_words)
+                """
+            )
+        ]
+    affected = sorted(set(touched) | set(children))
+    conn.close()
+    logging.info(f"Upserted {len(form_rows)} forms and {len(relation_rows)} relations for {len(touched)} lemmas.")
+
+    load_migration("5_infer_difficulty_scores.py").infer_difficulty_scores(db_path, lemma_ids=affected)
+    load_migration("6_propagate_metadata.py").propagate_metadata(db_path, lemma_ids=affected)
+    # The serving structures derived from forms, where this database has them
+    load_migration("9_build_form_index.py").build_form_index(db_path, lemma_ids=affected)
+    load_migration("10_encode_morphology_features.py").encode_morphology_features(db_path, lemma_ids=affected)
+    load_migration("11_pack_paradigms.py").pack_paradigms(db_path, lemma_ids=affected)
+    return {"changed": len(changed), "removed": len(removed), "affected": len(affected)}
+
+
+if __name__ == "__main__":
+    ingest_kaikki_delta()
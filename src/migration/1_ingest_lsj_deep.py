@@ -1,14 +1,17 @@
 import json
+import os
 import re
-import sqlite3
 import sys
 import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 # Add project root to path
 sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
 
 from src.beta_code import BetaCodeConverter
+from src.bulk_load import Checkpoint, connect, phase, stage
+from src.lsj_tables import CITATION_COLUMNS, SENSE_COLUMNS, create_tables, entry_rows
 
 try:
     from tqdm import tqdm
@@ -18,7 +21,8 @@ except ImportError:
 DB_PATH = Path("data/processed/kombyphantike_v2.db")
 XML_DIR = Path("data/dictionaries/lsj_xml")
 POET_AUTHORS = ["Sophocles", "Homer"]
-BATCH_SIZE = 1000  # Commit every 1000 entries
+BATCH_SIZE = 1000  # Rows per executemany into the staging table
+MIGRATION = "1_ingest_lsj_deep"  # Checkpoint key
 
 
 def strip_ns(tag):
@@ -125,136 +129,230 @@ def get_definition_text(elem, converter):
     return clean_definition_text(combined_text, converter)
 
 
-def ingest_lsj():
-    if not XML_DIR.exists():
-        print(f"Directory {XML_DIR} does not exist.")
-        return
+def parse_entry(entry, converter):
+    """
+    entryFree element -> (canonical_key, headword, entry_json, sense rows, citation rows),
+    or None without a key. The sense and citation rows are entry_json in normal form
+    (see src/lsj_tables.py).
+    """
+    # headword
+    headword = entry.get("headword")
+    if not headword:
+        for child in entry:
+            if strip_ns(child.tag) == "orth":
+                headword = child.text
+                break
+
+    # key
+    key_attr = entry.get("key")
+    canonical_key = ""
+
+    if key_attr:
+        canonical_key = converter.canonicalize(key_attr)
+    elif headword:
+        beta = converter.to_beta_code(headword)
+        canonical_key = converter.canonicalize(beta)
+
+    if not canonical_key:
+        return None
 
-    converter = BetaCodeConverter()
+    # One pre-order walk collects every sense and, for each open sense, its citations
+    # (a cit inside a nested sense belongs to the nested sense and to all its ancestors)
+    senses_list = []
+    open_senses = []
 
-    # Create DB directory if it doesn't exist
-    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+    def walk(elem):
+        tag = strip_ns(elem.tag)
+        sense = None
+        if tag == "sense":
+            sense = {
+                "id": elem.get("id") or elem.get("n"),
+                "definition": get_definition_text(elem, converter),
+                "citations": [],
+            }
+            senses_list.append(sense)
+            open_senses.append(sense)
+        elif tag == "cit" and open_senses:
+            cit_obj = process_citation(elem, converter)
+            if cit_obj:
+                for open_sense in open_senses:
+                    open_sense["citations"].append(cit_obj)
+        for child in elem:
+            walk(child)
+        if sense is not None:
+            open_senses.pop()
 
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+    walk(entry)
 
-    # Optimization: synchronous off makes writes faster (riskier, but fine for migration)
-    cursor.execute("PRAGMA synchronous = OFF")
-    cursor.execute("PRAGMA journal_mode = MEMORY")
+    entry_data = {"headword": headword, "senses": senses_list}
+    return (canonical_key, headword, json.dumps(entry_data, ensure_ascii=False), *entry_rows(entry_data))
 
-    cursor.execute(
-        """
-    CREATE TABLE IF NOT EXISTS lsj_entries (
-        id INTEGER PRIMARY KEY,
-        canonical_key TEXT UNIQUE,
-        headword TEXT,
-        entry_json TEXT
-    );
-    """
-    )
-    conn.commit()
 
-    files = sorted(list(XML_DIR.glob("*.xml")))  # Sort to ensure alpha order
-    print(f"Found {len(files)} XML files.")
+_worker_converter = None
 
-    total_inserted = 0
 
-    # Outer loop: Files
-    for file_path in tqdm(files, desc="Processing Files", unit="file"):
-        try:
-            tree = ET.parse(file_path)
-            root = tree.getroot()
+def _init_worker(converter):
+    global _worker_converter
+    _worker_converter = converter
 
-            # Find all entryFree.
-            entries = []
-            for elem in root.iter():
-                if strip_ns(elem.tag) == "entryFree":
-                    entries.append(elem)
 
-            if not entries:
+def parse_volume(file_path, converter=None):
+    """
+    Streams one LSJ volume with iterparse and returns its rows in document order.
+    Each entryFree is detached from its parent once parsed, so memory stays bounded
+    by the largest entry rather than the whole volume.
+    Returns (file name, rows, error message or None).
+    """
+    converter = converter or _worker_converter
+    rows = []
+    try:
+        parents = []
+        for event, elem in ET.iterparse(file_path, events=("start", "end")):
+            if event == "start":
+                parents.append(elem)
                 continue
+            parents.pop()
+            if strip_ns(elem.tag) != "entryFree":
+                continue
+            row = parse_entry(elem, converter)
+            if row:
+                rows.append(row)
+            elem.clear()
+            if parents:
+                parents[-1].remove(elem)
+    except Exception as e:
+        return file_path.name, rows, str(e)
+    return file_path.name, rows, None
+
+
+def ingest_lsj(db_path=DB_PATH, xml_dir=XML_DIR, workers=None, converter=None, resume=True):
+    """
+    Volumes are parsed in a process pool and applied in file order, one phase
+    per volume: its rows are staged into the TEMP table `lsj_entries_staging`
+    with batched executemany, then one INSERT OR REPLACE ... SELECT applies them
+    to `lsj_entries` (later volumes win on key collisions, as before).
+    Their senses and citations are staged alongside and replace those of the
+    entries they supersede in `lsj_senses` / `lsj_citations`.
+    Each phase checkpoints its volume, so an interrupted ingest resumes after
+    the last applied one (resume=False starts over). A volume that fails to
+    parse stops the ingest before it is applied, and a rerun retries it.
+    """
+    if not xml_dir.exists():
+        print(f"Directory {xml_dir} does not exist.")
+        return
 
-            # Inner loop: Entries (Visual Feedback)
-            file_updates = 0
-            for entry in tqdm(entries, desc=f"  Parsing {file_path.name}", leave=False):
-                # headword
-                headword = entry.get("headword")
-                if not headword:
-                    for child in entry:
-                        if strip_ns(child.tag) == "orth":
-                            headword = child.text
-                            break
-
-                # key
-                key_attr = entry.get("key")
-                canonical_key = ""
-
-                if key_attr:
-                    canonical_key = converter.canonicalize(key_attr)
-                elif headword:
-                    beta = converter.to_beta_code(headword)
-                    canonical_key = converter.canonicalize(beta)
-
-                if not canonical_key:
-                    continue
-
-                senses_list = []
-                sense_nodes = []
-                for child in entry.iter():
-                    if strip_ns(child.tag) == "sense":
-                        sense_nodes.append(child)
-
-                for sense in sense_nodes:
-                    sense_id = sense.get("id") or sense.get("n")
-                    definition = get_definition_text(sense, converter)
-                    citations = []
-                    cit_nodes = []
-                    for child in sense.iter():
-                        if strip_ns(child.tag) == "cit":
-                            cit_nodes.append(child)
-
-                    for cit in cit_nodes:
-                        cit_obj = process_citation(cit, converter)
-                        if cit_obj:
-                            citations.append(cit_obj)
-
-                    senses_list.append(
-                        {
-                            "id": sense_id,
-                            "definition": definition,
-                            "citations": citations,
-                        }
-                    )
+    converter = converter or BetaCodeConverter()
+    workers = workers or os.cpu_count() or 1
 
-                entry_data = {"headword": headword, "senses": senses_list}
+    # Create DB directory if it doesn't exist
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+
+    conn = connect(db_path)
+    checkpoint = Checkpoint(conn, MIGRATION, resume=resume)
+
+    with phase(conn, "Schema") as cursor:
+        cursor.execute(
+            """
+        CREATE TABLE IF NOT EXISTS lsj_entries (
+            id INTEGER PRIMARY KEY,
+            canonical_key TEXT UNIQUE,
+            headword TEXT,
+            entry_json TEXT
+        );
+        """
+        )
+        create_tables(cursor)
+
+    files = sorted(list(xml_dir.glob("*.xml")))  # Sort to ensure alpha order
+    applied = checkpoint.position("volumes")
+    if applied is not None:
+        files = [file_path for file_path in files if file_path.name > applied]
+    print(f"Found {len(files)} XML files to ingest ({workers} workers).")
+
+    if workers > 1 and len(files) > 1:
+        executor = ProcessPoolExecutor(
+            max_workers=min(workers, len(files)), initializer=_init_worker, initargs=(converter,)
+        )
+        # A bounded window of volumes in flight keeps parsed, unapplied rows small
+        window = workers * 2
+        volumes = (
+            volume
+            for i in range(0, len(files), window)
+            for volume in executor.map(parse_volume, files[i : i + window])
+        )
+    else:
+        executor = None
+        volumes = (parse_volume(file_path, converter) for file_path in files)
 
+    total_inserted = 0
+    try:
+        # map() yields in file order, so volumes are applied as in the serial ingest
+        for name, rows, error in tqdm(volumes, total=len(files), desc="Processing Files", unit="file"):
+            if error:
+                # Nothing of this volume is applied and the checkpoint stays before it,
+                # so the next run retries it
+                print(f"Error processing {name}: {error}")
+                raise RuntimeError(f"Could not parse LSJ volume {name}: {error}")
+            with phase(conn, f"Applying {name}") as cursor:
+                total_inserted += stage(
+                    cursor,
+                    "lsj_entries_staging",
+                    {"canonical_key": "TEXT", "headword": "TEXT", "entry_json": "TEXT"},
+                    (row[:3] for row in rows),
+                    batch_size=BATCH_SIZE,
+                )
+                # entry_row: the staging rowid of the entry a sense or citation belongs to
+                stage(
+                    cursor,
+                    "lsj_senses_staging",
+                    {"entry_row": "INTEGER NOT NULL", **SENSE_COLUMNS},
+                    ((entry_row, *sense) for entry_row, row in enumerate(rows, 1) for sense in row[3]),
+                    batch_size=BATCH_SIZE,
+                )
+                stage(
+                    cursor,
+                    "lsj_citations_staging",
+                    {"entry_row": "INTEGER NOT NULL", **CITATION_COLUMNS},
+                    ((entry_row, *cit) for entry_row, row in enumerate(rows, 1) for cit in row[4]),
+                    batch_size=BATCH_SIZE,
+                )
+                for table in ("lsj_senses", "lsj_citations"):
+                    cursor.execute(
+                        f"""
+                        DELETE FROM {table} WHERE entry_id IN (
+                            SELECT e.id FROM lsj_entries e
+                            JOIN temp.lsj_entries_staging s ON s.canonical_key = e.canonical_key
+                        )
+                        """
+                    )
                 cursor.execute(
                     """
                     INSERT OR REPLACE INTO lsj_entries (canonical_key, headword, entry_json)
-                    VALUES (?, ?, ?)
-                """,
-                    (
-                        canonical_key,
-                        headword,
-                        json.dumps(entry_data, ensure_ascii=False),
-                    ),
+                    SELECT canonical_key, headword, entry_json FROM temp.lsj_entries_staging ORDER BY rowid
+                    """
                 )
-
-                file_updates += 1
-                total_inserted += 1
-
-                # BATCH COMMIT
-                if total_inserted % BATCH_SIZE == 0:
-                    conn.commit()
-
-            # Commit end of file
-            conn.commit()
-
-        except Exception as e:
-            print(f"Error processing {file_path}: {e}")
-
-    conn.commit()
-    conn.close()
+                # Only the last staged row of a key survived the REPLACE
+                for table, columns in (("lsj_senses", SENSE_COLUMNS), ("lsj_citations", CITATION_COLUMNS)):
+                    cursor.execute(
+                        f"""
+                        INSERT INTO {table} (entry_id, {', '.join(columns)})
+                        SELECT e.id, {', '.join(f"t.{column}" for column in columns)}
+                        FROM temp.{table}_staging t
+                        JOIN (
+                            SELECT canonical_key, MAX(rowid) AS entry_row
+                            FROM temp.lsj_entries_staging GROUP BY canonical_key
+                        ) w ON w.entry_row = t.entry_row
+                        JOIN lsj_entries e ON e.canonical_key = w.canonical_key
+                        """
+                    )
+                    cursor.execute(f"DROP TABLE temp.{table}_staging")
+                cursor.execute("DROP TABLE temp.lsj_entries_staging")
+                checkpoint.advance(cursor, "volumes", name)
+        checkpoint.clear()
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        conn.close()
     print(f"Ingestion Complete. Total entries: {total_inserted}")
 
 
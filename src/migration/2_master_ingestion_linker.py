@@ -1,58 +1,24 @@
-import json
 import logging
 import re
-import sqlite3
 import sys
 from pathlib import Path
 
-try:
-    from tqdm import tqdm
-except ImportError:
-    tqdm = lambda x, **kwargs: x
-
 # Add project root to path
 sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
 from src.beta_code import BetaCodeConverter
+from src.bulk_load import Checkpoint, connect, phase
 from src.config import PROCESSED_DIR
+from src.lsj_tables import backfill
 
 # --- LOGGING ---
 logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 logger = logging.getLogger(__name__)
 
 DB_PATH = PROCESSED_DIR / "kombyphantike_v2.db"
-
-# --- TIER DEFINITIONS (The Waterfall) ---
-TIER_GOD = [
-    "Soph.",
-    "S.",
-    "Aesch.",
-    "A.",
-    "Eur.",
-    "E.",
-    "Hom.",
-    "Il.",
-    "Od.",
-    "Pind.",
-    "Pi.",
-    "Hes.",
-]
-TIER_PHIL = ["Pl.", "Arist.", "X.", "Epicur.", "Stoic."]
-TIER_HIST = ["Hdt.", "Th.", "D.H.", "Plb.", "Xen."]
-
-
-def get_author_tier(author_str):
-    if not author_str:
-        return 4
-    for a in TIER_GOD:
-        if a in author_str:
-            return 1
-    for a in TIER_PHIL:
-        if a in author_str:
-            return 2
-    for a in TIER_HIST:
-        if a in author_str:
-            return 3
-    return 4
+MIGRATION = "2_master_ingestion_linker"  # Checkpoint key
+ENRICH_BATCH = 10_000  # Lemmas enriched per committed batch
+GALLERY_SIZE = 3  # Citations shown per lemma
+ANCIENT_DEFINITIONS = 4  # Distinct sense definitions kept in ancient_definitions
 
 
 def clean_lsj_text(text):
@@ -64,12 +30,155 @@ def clean_lsj_text(text):
     return text.strip(" ;.,")
 
 
+def gallery_ctes(candidate_filter, diverse_after):
+    """
+    CTEs ranking the citations of the `linked` entries that pass candidate_filter
+    (over lsj_citations c). THE WATERFALL SORT: Tier ASC (1 is best), translated
+    first, longest quote first; ties keep entry order. `galleries` holds the first
+    GALLERY_SIZE of them ("quote 'translation' (author work)"); for entries with
+    more than diverse_after candidates, only the best citation of each main author
+    is eligible (diversity check).
+    """
+    return f"""
+ranked AS MATERIALIZED (
+    SELECT c.entry_id, c.sense_index, c.citation_index, c.main_author,
+        ROW_NUMBER() OVER (
+            PARTITION BY c.entry_id
+            ORDER BY c.author_tier, c.has_translation DESC, c.word_count DESC, c.sense_index, c.citation_index
+        ) AS rank
+    FROM lsj_citations c
+    WHERE c.entry_id IN (SELECT entry_id FROM linked) AND {candidate_filter}
+),
+-- Entries crowded enough for the diversity check...
+crowded AS (
+    SELECT entry_id FROM ranked WHERE rank = {diverse_after} + 1
+),
+-- ...where only the best citation of each main author is eligible
+diverse AS (
+    SELECT entry_id, sense_index, citation_index, ROW_NUMBER() OVER (PARTITION BY entry_id ORDER BY rank) AS pick
+    FROM (
+        SELECT *, ROW_NUMBER() OVER (PARTITION BY entry_id, main_author ORDER BY rank) AS author_rank
+        FROM ranked WHERE entry_id IN crowded
+    )
+    WHERE author_rank = 1
+),
+shown AS (
+    SELECT entry_id, sense_index, citation_index, rank AS pick FROM ranked
+    WHERE rank <= {GALLERY_SIZE} AND entry_id NOT IN crowded
+    UNION ALL
+    SELECT entry_id, sense_index, citation_index, pick FROM diverse WHERE pick <= {GALLERY_SIZE}
+),
+galleries AS (
+    SELECT p.entry_id,
+        MAX(CASE WHEN p.pick = 1 THEN x.shown END)
+            || COALESCE(' | ' || MAX(CASE WHEN p.pick = 2 THEN x.shown END), '')
+            || COALESCE(' | ' || MAX(CASE WHEN p.pick = 3 THEN x.shown END), '') AS gallery
+    FROM shown p
+    JOIN (
+        -- quote 'translation' (author work)
+        SELECT entry_id, sense_index, citation_index,
+            greek || CASE WHEN has_translation THEN ' ' || char(39) || translation || char(39) ELSE '' END
+                  || ' (' || bibl || ')' AS shown
+        FROM lsj_citations
+    ) x USING (entry_id, sense_index, citation_index)
+    GROUP BY p.entry_id
+)"""
+
+
+# Both stages run one statement per batch of lemma ids (:lo, :hi], over
+# lsj_senses / lsj_citations (author tiers come precomputed, see src/lsj_tables.py).
+LINKED_CTE = """
+linked AS (
+    SELECT l.id AS lemma_id, l.lsj_id AS entry_id
+    FROM lemmas l JOIN lsj_entries e ON l.lsj_id = e.id
+    WHERE l.id > :lo AND l.id <= :hi
+)"""
+
+# STAGE 1 (Semantics and Jewels):
+# ancient_definitions = the first ANCIENT_DEFINITIONS distinct cleaned sense definitions;
+# ancient_citations = gallery of every quoted citation, diverse past 5 candidates.
+ANCIENT_SQL = f"""
+WITH {LINKED_CTE},
+{gallery_ctes("c.greek IS NOT NULL AND c.greek != ''", 5)},
+definitions AS (
+    SELECT entry_id, definition, ROW_NUMBER() OVER (PARTITION BY entry_id ORDER BY first) AS n
+    FROM (
+        SELECT entry_id, clean_lsj_text(definition) AS definition, MIN(sense_index) AS first
+        FROM lsj_senses
+        WHERE entry_id IN (SELECT entry_id FROM linked)
+        GROUP BY entry_id, clean_lsj_text(definition)
+    )
+    WHERE definition != ''
+),
+semantics AS (
+    SELECT entry_id,
+        MAX(CASE WHEN n = 1 THEN definition END)
+            || COALESCE(' | ' || MAX(CASE WHEN n = 2 THEN definition END), '')
+            || COALESCE(' | ' || MAX(CASE WHEN n = 3 THEN definition END), '')
+            || COALESCE(' | ' || MAX(CASE WHEN n = 4 THEN definition END), '') AS definitions
+    FROM definitions
+    WHERE n <= {ANCIENT_DEFINITIONS}
+    GROUP BY entry_id
+)
+UPDATE lemmas
+SET ancient_definitions = COALESCE(s.definitions, ''), ancient_citations = COALESCE(g.gallery, '')
+FROM linked
+LEFT JOIN semantics s ON s.entry_id = linked.entry_id
+LEFT JOIN galleries g ON g.entry_id = linked.entry_id
+WHERE lemmas.id = linked.lemma_id
+"""
+
+# STAGE 2 (The Sublime Pass): garbage (tier 5, empty quotes) is filtered out.
+# etymology_text = first-sense definition | gallery; etymology_json = top candidates.
+ENRICH_SQL = f"""
+WITH {LINKED_CTE},
+{gallery_ctes("c.author_tier < 5 AND c.word_count > 0", GALLERY_SIZE)},
+sublime AS (
+    SELECT p.entry_id,
+        '[' || MAX(CASE WHEN p.rank = 1 THEN x.item END)
+            || COALESCE(', ' || MAX(CASE WHEN p.rank = 2 THEN x.item END), '')
+            || COALESCE(', ' || MAX(CASE WHEN p.rank = 3 THEN x.item END), '') || ']' AS items
+    FROM ranked p
+    JOIN (
+        -- Laid out as json.dumps would, so the column reads exactly as before
+        SELECT entry_id, sense_index, citation_index,
+            '{{"quote": ' || json_quote(greek) || ', "trans": ' || json_quote(COALESCE(translation, ''))
+            || ', "author": ' || json_quote(bibl) || ', "tier": ' || author_tier
+            || ', "length": ' || word_count
+            || ', "has_trans": ' || CASE WHEN has_translation THEN 'true' ELSE 'false' END || '}}' AS item
+        FROM lsj_citations
+    ) x USING (entry_id, sense_index, citation_index)
+    WHERE p.rank <= {GALLERY_SIZE}
+    GROUP BY p.entry_id
+),
+enriched AS (
+    SELECT linked.lemma_id AS id,
+        CASE WHEN g.entry_id IS NULL THEN d.definition
+             ELSE COALESCE(d.definition, '') || ' | ' || g.gallery
+        END AS etymology_text,
+        COALESCE(j.items, '[]') AS etymology_json
+    FROM linked
+    LEFT JOIN lsj_senses d ON d.entry_id = linked.entry_id AND d.sense_index = 0
+    LEFT JOIN galleries g ON g.entry_id = linked.entry_id
+    LEFT JOIN sublime j ON j.entry_id = linked.entry_id
+    -- Without citations, only a non-empty definition is written
+    WHERE g.entry_id IS NOT NULL OR d.definition != ''
+)
+UPDATE lemmas
+SET etymology_text = enriched.etymology_text, etymology_json = enriched.etymology_json
+FROM enriched
+WHERE lemmas.id = enriched.id
+"""
+
+
 def create_schema(cursor):
     """Refined Schema with Separated Ancient Data"""
     logger.info("Rebuilding Schema with Two-Column Ancient Data...")
     cursor.execute("DROP TABLE IF EXISTS relations")
     cursor.execute("DROP TABLE IF EXISTS forms")
     cursor.execute("DROP TABLE IF EXISTS lemmas")
+    # Migration 12's per-word digests describe rows dropped here; its next run re-ingests everything
+    cursor.execute("DROP TABLE IF EXISTS kaikki_hashes")
 
     cursor.execute("""
         CREATE TABLE lemmas (
@@ -81,6 +190,7 @@ def create_schema(cursor):
             modern_def TEXT,
             ancient_definitions TEXT, -- The "Ground" (Semantics)
             ancient_citations TEXT,   -- The "Sky" (Golden Jewels)
+            etymology_text TEXT,      -- First sense + citation gallery (stage 2)
             etymology_json TEXT,      -- Raw data for future-proofing
             lsj_id INTEGER,
             kds_score INTEGER,
@@ -107,215 +217,74 @@ class MasterIngestionLinker:
             if key:
                 self.lsj_map[key] = row_id
 
-    def ingest_stage_2(self, cursor):
-        """THE ENRICHMENT PASS: Separating Semantics from Jewels"""
-        logger.info("--- STAGE 2: THE WATERFALL ENRICHMENT ---")
-        cursor.execute(
-            "SELECT l.id, l.lsj_id, e.entry_json FROM lemmas l JOIN lsj_entries e ON l.lsj_id = e.id"
-        )
-        rows = cursor.fetchall()
-
-        updates = []
-        for lemma_id, lsj_id, entry_json_str in tqdm(rows, desc="Enriching"):
-            entry_data = json.loads(entry_json_str)
-            senses = entry_data.get("senses", [])
-
-            # 1. THE GROUND: Extract Clean Definitions
-            semantics = []
-            for sense in senses:
-                d = clean_lsj_text(sense.get("definition", ""))
-                if d and d not in semantics:
-                    semantics.append(d)
-
-            ancient_def_str = " | ".join(semantics[:4])  # Top 4 semantic meanings
+    def ingest_stage_1(self, conn, checkpoint=None):
+        """THE ENRICHMENT PASS: Separating Semantics (ancient_definitions) from Jewels (ancient_citations)"""
+        logger.info("--- STAGE 1: THE WATERFALL ENRICHMENT ---")
 
-            # 2. THE SKY: Extract and Sort Citations (Waterfall)
-            candidates = []
-            for sense in senses:
-                for cit in sense.get("citations", []):
-                    quote = cit.get("greek", "")
-                    trans = cit.get("translation", "")
-                    author = cit.get("author", "")
-                    work = cit.get("work", "")
-
-                    if not quote:
-                        continue
-
-                    tier = get_author_tier(author)
-                    candidates.append(
-                        {
-                            "quote": quote,
-                            "trans": trans,
-                            "author": f"{author} {work}".strip(),
-                            "tier": tier,
-                            "has_trans": bool(trans),
-                            "len": len(quote.split()),
-                        }
-                    )
-
-            # Waterfall Sort: Tier -> Has Translation -> Length
-            candidates.sort(key=lambda x: (x["tier"], not x["has_trans"], -x["len"]))
-
-            # Build Citation Gallery
-            gallery = []
-            seen_authors = set()
-            for c in candidates:
-                if len(gallery) >= 3:
-                    break
-                main_author = c["author"].split()[0] if c["author"] else "Unknown"
-                if main_author in seen_authors and len(candidates) > 5:
-                    continue
-
-                fmt = f"{c['quote']}"
-                if c["trans"]:
-                    fmt += f" '{c['trans']}'"
-                fmt += f" ({c['author']})"
-                gallery.append(fmt)
-                seen_authors.add(main_author)
-
-            ancient_cit_str = " | ".join(gallery)
-
-            updates.append((ancient_def_str, ancient_cit_str, lemma_id))
-
-        cursor.executemany(
-            "UPDATE lemmas SET ancient_definitions = ?, ancient_citations = ? WHERE id = ?",
-            updates,
-        )
-        cursor.connection.commit()
+        # A database ingested before lsj_senses / lsj_citations existed is normalized once
+        with phase(conn, "Normalizing LSJ entries") as cursor:
+            backfill(cursor)
+        conn.create_function("clean_lsj_text", 1, clean_lsj_text, deterministic=True)
+        self._enrich_in_batches(conn, checkpoint, "stage_1", ANCIENT_SQL)
         logger.info("Stage 1 Complete.")
 
-    def ingest_stage_2(self, cursor):
+    def ingest_stage_2(self, conn, checkpoint=None):
+        """THE SUBLIME PASS: etymology_text / etymology_json from the first sense and the best citations"""
         logger.info("--- STAGE 2: ENRICHMENT (THE SUBLIME PASS) ---")
 
-        # Select all lemmas that have an LSJ link
-        cursor.execute(
-            "SELECT l.id, l.lsj_id, e.entry_json FROM lemmas l JOIN lsj_entries e ON l.lsj_id = e.id"
-        )
-        rows = cursor.fetchall()
-
-        logger.info(f"Enriching {len(rows)} linked lemmas...")
-
-        updates = []
-        for lemma_id, lsj_id, entry_json_str in tqdm(rows, desc="Enriching"):
-            if not entry_json_str:
-                continue
-
-            try:
-                entry_data = json.loads(entry_json_str)
-            except json.JSONDecodeError:
-                continue
-
-            # Gather all citations from all senses
-            candidates = []
-            senses = entry_data.get("senses", [])
-
-            # Also extract a fallback definition from the first sense
-            fallback_def = ""
-            if senses:
-                fallback_def = senses[0].get("definition", "")
-
-            for sense in senses:
-                citations = sense.get("citations", [])
-                for cit in citations:
-                    # Check if 'greek' exists, if not skip?
-                    quote = cit.get("greek", "")
-                    trans = cit.get("translation", "")
-                    author = cit.get("author", "")
-                    work = cit.get("work", "")
-
-                    full_bibl = f"{author} {work}".strip()
-                    tier = get_author_tier(author)
-
-                    # Length in words
-                    length = len(quote.split()) if quote else 0
-
-                    candidates.append(
-                        {
-                            "quote": quote,
-                            "trans": trans,
-                            "author": full_bibl,
-                            "tier": tier,
-                            "length": length,
-                            "has_trans": bool(trans),
-                        }
-                    )
-
-            # THE WATERFALL SORT
-            # Sort by: Tier ASC (1 is best), Has Trans DESC (True is better -> False comes first in bool sort? No, False < True. We want True first. So `not has_trans` ASC), Length DESC (-length ASC)
-            candidates.sort(key=lambda x: (x["tier"], not x["has_trans"], -x["length"]))
-
-            # Filter Garbage
-            final_candidates = [
-                c for c in candidates if c["tier"] < 5 and c["length"] > 0
-            ]
-
-            if not final_candidates:
-                # If no citations, we might just keep the definition?
-                # The prompt says "update the etymology_text ... with this 'Sublime' data".
-                # If no citation, maybe just the definition?
-                if fallback_def:
-                    updates.append((fallback_def, "[]", lemma_id))
-                continue
-
-            # Build Gallery (Top 3)
-            gallery = []
-            seen_authors = set()
-
-            for cand in final_candidates:
-                if len(gallery) >= 3:
-                    break
-
-                main_author = cand["author"].split()[0] if cand["author"] else "Unknown"
-                if main_author in seen_authors and len(final_candidates) > 3:
-                    continue  # Diversity check
-
-                formatted = f"{cand['quote']}"
-                if cand["trans"]:
-                    formatted += f" '{cand['trans']}'"
-                formatted += f" ({cand['author']})"
-
-                gallery.append(formatted)
-                seen_authors.add(main_author)
-
-            # Combine Definition + Gallery
-            final_text = fallback_def
-            if gallery:
-                final_text += " | " + " | ".join(gallery)
-
-            # Prepare JSON (Sublime Data)
-            sublime_json = json.dumps(final_candidates[:3], ensure_ascii=False)
-
-            updates.append((final_text, sublime_json, lemma_id))
-
-        # Batch Update
-        logger.info(f"Updating {len(updates)} lemmas...")
-        cursor.executemany(
-            "UPDATE lemmas SET etymology_text = ?, etymology_json = ? WHERE id = ?",
-            updates,
-        )
-        cursor.connection.commit()
+        with phase(conn, "Normalizing LSJ entries") as cursor:
+            backfill(cursor)
+        self._enrich_in_batches(conn, checkpoint, "stage_2", ENRICH_SQL)
         logger.info("Stage 2 Complete.")
 
-
-def main():
+    def _enrich_in_batches(self, conn, checkpoint, step, sql):
+        """
+        Runs `sql` over the linked lemmas in batches of ENRICH_BATCH ids, one phase each.
+        With a checkpoint, each batch records its last lemma id under `step`, and a rerun
+        continues after it (re-enriching a batch is idempotent).
+        """
+        last_id = checkpoint.position(step, 0) if checkpoint else 0
+        while True:
+            # Next batch of lemmas that have an LSJ link
+            ids = conn.execute(
+                "SELECT l.id FROM lemmas l JOIN lsj_entries e ON l.lsj_id = e.id "
+                "WHERE l.id > ? ORDER BY l.id LIMIT ?",
+                (last_id, ENRICH_BATCH),
+            ).fetchall()
+            if not ids:
+                break
+            with phase(conn, f"{step} through lemma {ids[-1][0]}") as cursor:
+                cursor.execute(sql, {"lo": last_id, "hi": ids[-1][0]})
+                logger.info(f"Enriched {cursor.rowcount} of {len(ids)} linked lemmas.")
+                if checkpoint:
+                    checkpoint.advance(cursor, step, ids[-1][0])
+            last_id = ids[-1][0]
+
+
+def main(resume=True):
     if not DB_PATH.parent.exists():
         DB_PATH.parent.mkdir(parents=True, exist_ok=True)
 
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+    conn = connect(DB_PATH)
+    # Resumes after the schema step or the last committed stage 1 / stage 2 batch (resume=False to start over)
+    checkpoint = Checkpoint(conn, MIGRATION, resume=resume)
 
     linker = MasterIngestionLinker()
 
     # Setup
-    create_schema(cursor)
-    linker.load_lsj_map(cursor)
+    if not checkpoint.is_done("schema"):
+        with phase(conn, "Schema") as cursor:
+            create_schema(cursor)
+            checkpoint.finish(cursor, "schema")
+    linker.load_lsj_map(conn.cursor())
 
     # Execute
-    linker.ingest_stage_1(cursor)
-    linker.ingest_stage_2(cursor)
+    linker.ingest_stage_1(conn, checkpoint)
+    linker.ingest_stage_2(conn, checkpoint)
+    checkpoint.clear()
 
     # Optimize
-    cursor.execute("VACUUM")
+    conn.execute("VACUUM")
     conn.close()
     logger.info("Master Ingestion Complete.")
 
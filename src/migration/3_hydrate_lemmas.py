@@ -1,4 +1,3 @@
-import sqlite3
 import pandas as pd
 from tqdm import tqdm
 import sys
@@ -7,6 +6,7 @@ import logging
 
 # Ensure src is in path to import config
 sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from src.bulk_load import connect, phase, stage, upsert
 from src.config import PROCESSED_DIR
 
 DB_PATH = PROCESSED_DIR / "kombyphantike_v2.db"
@@ -26,51 +26,48 @@ def hydrate_lemmas():
         logging.error(f"Failed to read CSV: {e}")
         return
 
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-
-    # Create schema if it doesn't exist (including standard columns + new columns)
-    cursor.execute(
+    conn = connect(DB_PATH)
+
+    with phase(conn, "Schema") as cursor:
+        # Create schema if it doesn't exist (including standard columns + new columns)
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS lemmas (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                lemma_text TEXT NOT NULL UNIQUE,
+                pos TEXT,
+                ipa TEXT,
+                etymology_json TEXT,
+                modern_def TEXT,
+                greek_def TEXT,
+                shift_type TEXT,
+                semantic_warning TEXT,
+                frequency_score REAL
+            )
         """
-        CREATE TABLE IF NOT EXISTS lemmas (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            lemma_text TEXT NOT NULL UNIQUE,
-            pos TEXT,
-            ipa TEXT,
-            etymology_json TEXT,
-            modern_def TEXT,
-            greek_def TEXT,
-            shift_type TEXT,
-            semantic_warning TEXT,
-            frequency_score REAL
         )
-    """
-    )
-
-    # Check for missing columns in existing table
-    logging.info("Checking schema...")
-    cursor.execute("PRAGMA table_info(lemmas)")
-    existing_columns = {row[1] for row in cursor.fetchall()}
 
-    columns_to_add = {
-        "modern_def": "TEXT",
-        "greek_def": "TEXT",
-        "shift_type": "TEXT",
-        "semantic_warning": "TEXT",
-        "frequency_score": "REAL"
-    }
+        # Check for missing columns in existing table
+        logging.info("Checking schema...")
+        cursor.execute("PRAGMA table_info(lemmas)")
+        existing_columns = {row[1] for row in cursor.fetchall()}
 
-    for col_name, col_type in columns_to_add.items():
-        if col_name not in existing_columns:
-            logging.info(f"Adding column {col_name} ({col_type}) to lemmas table.")
-            cursor.execute(f"ALTER TABLE lemmas ADD COLUMN {col_name} {col_type}")
+        columns_to_add = {
+            "modern_def": "TEXT",
+            "greek_def": "TEXT",
+            "shift_type": "TEXT",
+            "semantic_warning": "TEXT",
+            "frequency_score": "REAL"
+        }
 
-    conn.commit()
+        for col_name, col_type in columns_to_add.items():
+            if col_name not in existing_columns:
+                logging.info(f"Adding column {col_name} ({col_type}) to lemmas table.")
+                cursor.execute(f"ALTER TABLE lemmas ADD COLUMN {col_name} {col_type}")
 
     logging.info("Hydrating lemmas...")
 
-    updates = 0
-    inserts = 0
+    rows = []
     records = df.to_dict('records')
 
     for row in tqdm(records, desc="Hydrating lemmas"):
@@ -83,49 +80,47 @@ def hydrate_lemmas():
         shift_type = row.get("Shift_Type")
         semantic_warning = row.get("Semantic_Warning")
         freq = row.get("Συχνότητα (Frequency)")
+        # We map "Μέρος του Λόγου (Part of speech)" to pos (used for new lemmas only)
+        pos = row.get("Μέρος του Λόγου (Part of speech)")
 
         # Handle NaNs
         modern_def = modern_def if not pd.isna(modern_def) else None
         greek_def = greek_def if not pd.isna(greek_def) else None
         shift_type = shift_type if not pd.isna(shift_type) else None
         semantic_warning = semantic_warning if not pd.isna(semantic_warning) else None
+        pos = pos if not pd.isna(pos) else None
 
         try:
             frequency_score = float(freq) if not pd.isna(freq) else None
         except (ValueError, TypeError):
             frequency_score = None
 
-        # Check if lemma exists
-        cursor.execute("SELECT 1 FROM lemmas WHERE lemma_text = ?", (lemma_text,))
-        exists = cursor.fetchone()
-
-        if exists:
-            cursor.execute(
-                """
-                UPDATE lemmas
-                SET modern_def = ?, greek_def = ?, shift_type = ?, semantic_warning = ?, frequency_score = ?
-                WHERE lemma_text = ?
-                """,
-                (modern_def, greek_def, shift_type, semantic_warning, frequency_score, lemma_text)
-            )
-            updates += 1
-        else:
-            # Insert new lemma
-            # We map "Μέρος του Λόγου (Part of speech)" to pos if available
-            pos = row.get("Μέρος του Λόγου (Part of speech)")
-            pos = pos if not pd.isna(pos) else None
-
-            cursor.execute(
-                """
-                INSERT INTO lemmas (lemma_text, pos, modern_def, greek_def, shift_type, semantic_warning, frequency_score)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-                """,
-                (lemma_text, pos, modern_def, greek_def, shift_type, semantic_warning, frequency_score)
-            )
-            inserts += 1
+        rows.append((lemma_text, pos, modern_def, greek_def, shift_type, semantic_warning, frequency_score))
+
+    with phase(conn, "Hydrating lemmas") as cursor:
+        cursor.execute("SELECT lemma_text FROM lemmas")
+        existing = {row[0] for row in cursor.fetchall()}
+        # Existing lemmas keep their pos; everything else is refreshed from Kelly
+        upsert(
+            cursor,
+            "lemmas",
+            ["lemma_text", "pos", "modern_def", "greek_def", "shift_type", "semantic_warning", "frequency_score"],
+            rows,
+            key=["lemma_text"],
+            update={
+                column: f"excluded.{column}"
+                for column in ("modern_def", "greek_def", "shift_type", "semantic_warning", "frequency_score")
+            },
+        )
+        # greek_def came from Kaikki (migration 12): forget those words' digests so it re-derives them
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'kaikki_hashes'")
+        if cursor.fetchone():
+            stage(cursor, "hydrated_words", {"word": "TEXT PRIMARY KEY"}, ((w,) for w in {row[0] for row in rows}))
+            cursor.execute("DELETE FROM kaikki_hashes WHERE word IN (SELECT word FROM temp.hydrated_words)")
 
-    conn.commit()
     conn.close()
+    updates = sum(1 for row in rows if row[0] in existing)
+    inserts = len({row[0] for row in rows} - existing)
     logging.info(f"Hydration complete. Updated {updates} lemmas. Inserted {inserts} lemmas.")
 
 if __name__ == "__main__":
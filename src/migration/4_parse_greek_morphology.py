@@ -1,14 +1,16 @@
 import json
 import logging
+import os
 import re
-import sqlite3
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 from tqdm import tqdm
 
 # Ensure src is in path to import config
 sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from src.bulk_load import Checkpoint, connect, deferred_indexes, insert_many, phase
 from src.config import PROCESSED_DIR
 
 # Database Path
@@ -16,6 +18,7 @@ DB_PATH = PROCESSED_DIR / "kombyphantike_v2.db"
 LOG_DIR = PROCESSED_DIR.parent / "logs"
 LOG_DIR.mkdir(parents=True, exist_ok=True)
 MISSING_PARENTS_LOG = LOG_DIR / "missing_parents.log"
+MIGRATION = "4_parse_greek_morphology"  # Checkpoint key
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
@@ -77,40 +80,96 @@ def ensure_schema(cursor):
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_forms_lemma ON forms(lemma_id)")
 
 
-def extract_person(text):
-    """Extracts person (1st, 2nd, 3rd) from text."""
-    persons = []
-    # Match α', β', γ' followed by πρόσωπο, handling both standard apostrophe and greek tonos
-    if re.search(r"[α1][\'΄ο]\s*πρόσωπο", text):
-        persons.append("1st person")
-    if re.search(r"[β2][\'΄ο]\s*πρόσωπο", text):
-        persons.append("2nd person")
-    if re.search(r"[γ3][\'΄ο]\s*πρόσωπο", text):
-        persons.append("3rd person")
-    return persons
+# Phase B, the anchor: "του <word>", "της <word>", "των <word>", "του ρήματος <word>" at the start
+# or after whitespace. It leads with the literal τ and checks the preceding character in a lookbehind,
+# so the regex engine can skip straight to candidate positions.
+ANCHOR_PATTERN = re.compile(r"τ(?<!\Sτ)(?:ου\s+ρήματος|ου|ης|ων)\s+([^\s,;]+)")
+
+# Phase C, in one scan: person markers (α', β', γ' / 1ο ... followed by πρόσωπο) and every
+# MORPH_MAP term, longest first
+TAG_PATTERN = re.compile(
+    r"([αβγ123])[\'΄ο]\s*πρόσωπο|("
+    + "|".join(re.escape(term) for term in sorted(MORPH_MAP, key=len, reverse=True))
+    + ")"
+)
+# Terms are matched as substrings, so a longer term also carries the ones inside it
+# ("αρσενικού" -> "αρσενικό", "αρσενικού", "ενικού")
+CONTAINED = {term: [t for t in MORPH_MAP if t in term] for term in MORPH_MAP}
+TERM_RANK = {term: rank for rank, term in enumerate(MORPH_MAP)}
+PERSONS = {
+    "α": "1st person", "1": "1st person",
+    "β": "2nd person", "2": "2nd person",
+    "γ": "3rd person", "3": "3rd person",
+}
+PERSON_ORDER = ["1st person", "2nd person", "3rd person"]
+
+CHUNK_ROWS = 20_000  # Definitions tagged per worker task
+WORKERS = os.cpu_count() or 1
+
+
+def tag_definition(greek_def):
+    """
+    One greek_def -> (parent lemma text, tags), or None when it names no parent.
+    Tags follow MORPH_MAP order, one per matching term, then persons.
+    """
+    # Phase A: Normalization
+    normalized_def = greek_def.lower().strip().rstrip(".;")
+
+    match = ANCHOR_PATTERN.search(normalized_def)
+    if not match:
+        return None
+
+    terms = set()
+    persons = set()
+    for person, term in TAG_PATTERN.findall(normalized_def):
+        if term:
+            terms.update(CONTAINED[term])
+        else:
+            persons.add(PERSONS[person])
+    tags = [MORPH_MAP[term] for term in sorted(terms, key=TERM_RANK.__getitem__)]
+    tags.extend(person for person in PERSON_ORDER if person in persons)
+    return match.group(1).rstrip("."), tags
 
 
-def parse_greek_morphology():
+def tag_rows(rows):
+    """Worker: (id, lemma_text, greek_def) rows -> (id, lemma_text, parent, tags) for the tagged ones."""
+    tagged = []
+    for lemma_id, lemma_text, greek_def in rows:
+        result = tag_definition(greek_def)
+        if result:
+            tagged.append((lemma_id, lemma_text, *result))
+    return tagged
+
+
+def parse_greek_morphology(workers=WORKERS, resume=True):
+    """
+    Turns morphological greek_defs ("γενική ενικού του λόγος") into form_of relations
+    and parent forms. Definitions are tagged in chunks, in a process pool when workers > 1.
+    Each chunk is loaded in its own phase and checkpointed by its last lemma id, so an
+    interrupted run resumes after the last loaded chunk (resume=False starts over).
+    """
     if not DB_PATH.exists():
         logging.error(f"Database not found at {DB_PATH}")
         return
 
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+    conn = connect(DB_PATH)
+    checkpoint = Checkpoint(conn, MIGRATION, resume=resume)
 
-    ensure_schema(cursor)
-    conn.commit()
+    with phase(conn, "Schema") as cursor:
+        ensure_schema(cursor)
 
+    last_id = checkpoint.position("lemmas", 0)
     logging.info("Fetching lemmas with greek_def...")
+    cursor = conn.cursor()
     cursor.execute(
-        "SELECT id, lemma_text, greek_def FROM lemmas WHERE greek_def IS NOT NULL"
+        "SELECT id, lemma_text, greek_def FROM lemmas WHERE greek_def IS NOT NULL AND id > ? ORDER BY id",
+        (last_id,),
     )
     rows = cursor.fetchall()
 
     logging.info(f"Found {len(rows)} lemmas to process.")
 
     missing_parents = []
-    processed_count = 0
     relations_added = 0
     forms_added = 0
 
@@ -119,74 +178,52 @@ def parse_greek_morphology():
     cursor.execute("SELECT lemma_text, id FROM lemmas")
     lemma_map = {text: pid for text, pid in cursor.fetchall()}
 
-    for lemma_id, lemma_text, greek_def in tqdm(rows, desc="Parsing Morphology"):
-        # Phase A: Normalization
-        normalized_def = greek_def.lower().strip().rstrip(".;")
-
-        # Phase B: The Anchor Catch
-        # Regex to find parent lemma
-        # Patterns: "του <word>", "της <word>", "των <word>", "του ρήματος <word>"
-        match = re.search(
-            r"(?:^|\s)(?:του\s+ρήματος|του|της|των)\s+([^\s,;]+)", normalized_def
-        )
-
-        if not match:
-            continue
-
-        parent_lemma_text = match.group(1)
-        parent_lemma_text = parent_lemma_text.rstrip(".")
-
-        # Phase C: Multi-Tag Extraction
-        tags = []
-        for greek_term, english_tag in MORPH_MAP.items():
-            if greek_term in normalized_def:
-                tags.append(english_tag)
-
-        # Add persons
-        tags.extend(extract_person(normalized_def))
-
-        # Phase D: Relational Integrity
-        # Only proceed if we found tags, otherwise it's likely a false positive anchor match in a normal definition
-        if not tags:
-            continue
-
-        parent_id = lemma_map.get(parent_lemma_text)
-
-        if parent_id:
-            # Insert into relations
-            cursor.execute(
-                """
-                INSERT INTO relations (child_lemma_id, parent_lemma_text, relation_type)
-                VALUES (?, ?, ?)
-                """,
-                (lemma_id, parent_lemma_text, "form_of"),
-            )
-            relations_added += 1
-
-            # Insert into forms
-            cursor.execute(
-                """
-                INSERT INTO forms (lemma_id, form_text, tags_json)
-                VALUES (?, ?, ?)
-                """,
-                (parent_id, lemma_text, json.dumps(tags, ensure_ascii=False)),
-            )
-            forms_added += 1
-
-        else:
-            missing_parents.append((lemma_text, parent_lemma_text))
-
-        processed_count += 1
-
-        if processed_count % 1000 == 0:
-            conn.commit()
-
-    conn.commit()
-    conn.close()
-
-    # Log missing parents
+    chunks = [rows[start : start + CHUNK_ROWS] for start in range(0, len(rows), CHUNK_ROWS)]
+    if workers > 1 and len(chunks) > 1:
+        executor = ProcessPoolExecutor(max_workers=min(workers, len(chunks)))
+        results = executor.map(tag_rows, chunks)
+    else:
+        executor = None
+        results = map(tag_rows, chunks)
+
+    try:
+        # Indexes are rebuilt once at the end. An interrupted run leaves them to the rerun
+        # (ensure_schema, migration 8).
+        with deferred_indexes(cursor, "forms", "relations"):
+            # map() keeps chunk order, so rows are inserted as a serial pass would
+            for chunk, tagged in tqdm(zip(chunks, results), total=len(chunks), desc="Parsing Morphology", unit="chunk"):
+                relation_rows = []
+                form_rows = []
+                for lemma_id, lemma_text, parent_lemma_text, tags in tagged:
+                    # Phase D: Relational Integrity
+                    # Only proceed if we found tags, otherwise it's likely a false positive anchor match in a normal definition
+                    if not tags:
+                        continue
+
+                    parent_id = lemma_map.get(parent_lemma_text)
+
+                    if parent_id:
+                        relation_rows.append((lemma_id, parent_lemma_text, "form_of"))
+                        form_rows.append((parent_id, lemma_text, json.dumps(tags, ensure_ascii=False)))
+                    else:
+                        missing_parents.append((lemma_text, parent_lemma_text))
+
+                # Phase E: the chunk's bulk load and its checkpoint commit together
+                with phase(conn, f"Loading through lemma {chunk[-1][0]}") as load:
+                    relations_added += insert_many(
+                        load, "relations", ["child_lemma_id", "parent_lemma_text", "relation_type"], relation_rows
+                    )
+                    forms_added += insert_many(load, "forms", ["lemma_id", "form_text", "tags_json"], form_rows)
+                    checkpoint.advance(load, "lemmas", chunk[-1][0])
+        checkpoint.clear()
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        conn.close()
+
+    # Log missing parents (appended to when resuming)
     if missing_parents:
-        with open(MISSING_PARENTS_LOG, "w", encoding="utf-8") as f:
+        with open(MISSING_PARENTS_LOG, "a" if last_id else "w", encoding="utf-8") as f:
             for child, parent in missing_parents:
                 f.write(f"Child: {child}, Missing Parent: {parent}\n")
         logging.warning(
@@ -1,5 +1,4 @@
 import logging
-import sqlite3
 import sys
 from pathlib import Path
 
@@ -8,11 +7,22 @@ from tqdm import tqdm
 
 # Ensure src is in path to import config
 sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from src.bulk_load import connect, phase, stage
 from src.config import PROCESSED_DIR
 
 DB_PATH = PROCESSED_DIR / "kombyphantike_v2.db"
 CSV_PATH = PROCESSED_DIR / "kelly.csv"
 
+# Relations where the child's score is worse (higher) than its parent's
+INHERITANCE_QUERY = """
+    SELECT child.id, child.kds_score, parent.kds_score
+    FROM relations r
+    JOIN lemmas child ON r.child_lemma_id = child.id
+    JOIN lemmas parent ON r.parent_lemma_text = parent.lemma_text
+    WHERE r.relation_type = 'form_of'
+      AND child.kds_score > parent.kds_score
+"""
+
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
 )
@@ -81,7 +91,11 @@ def calculate_kds(lemma_text, frequency_score, cefr_level):
     return max(1, min(100, final_score))
 
 
-def infer_difficulty_scores():
+def infer_difficulty_scores(db_path=DB_PATH, lemma_ids=None):
+    """
+    Scores every lemma, then lets form_of children inherit an easier parent score.
+    lemma_ids: only (re)score these lemmas, e.g. those touched by a Kaikki delta.
+    """
     if not CSV_PATH.exists():
         logging.error(f"Kelly CSV not found at {CSV_PATH}")
         # Proceeding without Kelly map means all fallback logic
@@ -107,78 +121,78 @@ def infer_difficulty_scores():
             logging.error(f"Failed to read CSV: {e}")
             kelly_map = {}
 
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+    conn = connect(db_path)
 
-    # 1. Add column if not exists
-    logging.info("Checking schema...")
-    cursor.execute("PRAGMA table_info(lemmas)")
-    columns = {row[1] for row in cursor.fetchall()}
+    with phase(conn, "Initial KDS") as cursor:
+        # 1. Add column if not exists
+        logging.info("Checking schema...")
+        cursor.execute("PRAGMA table_info(lemmas)")
+        columns = {row[1] for row in cursor.fetchall()}
 
-    if "kds_score" not in columns:
-        logging.info("Adding column kds_score (INTEGER) to lemmas table.")
-        cursor.execute("ALTER TABLE lemmas ADD COLUMN kds_score INTEGER")
-    else:
-        logging.info("Column kds_score already exists.")
+        if "kds_score" not in columns:
+            logging.info("Adding column kds_score (INTEGER) to lemmas table.")
+            cursor.execute("ALTER TABLE lemmas ADD COLUMN kds_score INTEGER")
+        else:
+            logging.info("Column kds_score already exists.")
 
-    # 2. Fetch all lemmas
-    logging.info("Fetching lemmas...")
-    cursor.execute("SELECT id, lemma_text, frequency_score FROM lemmas")
-    rows = cursor.fetchall()
+        # 2. Fetch all lemmas (or the requested ones)
+        logging.info("Fetching lemmas...")
+        scope = ""
+        if lemma_ids is not None:
+            stage(cursor, "scoped_lemmas", {"id": "INTEGER PRIMARY KEY"}, ((i,) for i in set(lemma_ids)))
+            scope = " WHERE id IN (SELECT id FROM temp.scoped_lemmas)"
+        cursor.execute("SELECT id, lemma_text, frequency_score FROM lemmas" + scope)
+        rows = cursor.fetchall()
 
-    logging.info(f"Found {len(rows)} lemmas. calculating scores...")
+        logging.info(f"Found {len(rows)} lemmas. calculating scores...")
 
-    updates = []
+        updates = []
 
-    for row in tqdm(rows, desc="Calculating KDS"):
-        lemma_id = row[0]
-        lemma_text = row[1]
-        frequency_score = row[2]
+        for row in tqdm(rows, desc="Calculating KDS"):
+            lemma_id = row[0]
+            lemma_text = row[1]
+            frequency_score = row[2]
 
-        cefr_level = kelly_map.get(lemma_text)
+            cefr_level = kelly_map.get(lemma_text)
 
-        score = calculate_kds(lemma_text, frequency_score, cefr_level)
-        updates.append((score, lemma_id))
+            score = calculate_kds(lemma_text, frequency_score, cefr_level)
+            updates.append((lemma_id, score))
 
-    # 3. Update in bulk
-    logging.info("Updating database...")
-    cursor.executemany("UPDATE lemmas SET kds_score = ? WHERE id = ?", updates)
-    conn.commit()  # Ensure initial scores are saved
+        # 3. Update in bulk, set-based from a staging table
+        logging.info("Updating database...")
+        stage(cursor, "kds_updates", {"id": "INTEGER PRIMARY KEY", "kds_score": "INTEGER"}, updates)
+        cursor.execute(
+            "UPDATE lemmas SET kds_score = u.kds_score FROM temp.kds_updates AS u WHERE lemmas.id = u.id"
+        )
 
     # 4. Second Pass: KDS Inheritance
     logging.info("Starting KDS Inheritance Pass...")
 
-    # Query relations where child's score is worse (higher) than parent's
-    query = """
-        SELECT child.id, child.kds_score, parent.kds_score
-        FROM relations r
-        JOIN lemmas child ON r.child_lemma_id = child.id
-        JOIN lemmas parent ON r.parent_lemma_text = parent.lemma_text
-        WHERE r.relation_type = 'form_of'
-          AND child.kds_score > parent.kds_score
-    """
-
-    cursor.execute(query)
-    inheritance_candidates = cursor.fetchall()
-
-    if inheritance_candidates:
-        logging.info(
-            f"Found {len(inheritance_candidates)} candidates for KDS inheritance."
-        )
-
-        inheritance_updates = []
-        for row in inheritance_candidates:
-            child_id = row[0]
-            parent_score = row[2]
-            inheritance_updates.append((parent_score, child_id))
-
-        logging.info(f"Applying {len(inheritance_updates)} KDS inheritance updates...")
-        cursor.executemany(
-            "UPDATE lemmas SET kds_score = ? WHERE id = ?", inheritance_updates
-        )
-        conn.commit()
-    else:
-        logging.info("No KDS inheritance updates needed.")
+    with phase(conn, "KDS inheritance") as cursor:
+        query = INHERITANCE_QUERY
+        if lemma_ids is not None:
+            query += " AND child.id IN (SELECT id FROM temp.scoped_lemmas)"
+
+        cursor.execute(query)
+        inheritance_candidates = cursor.fetchall()
+
+        if inheritance_candidates:
+            logging.info(
+                f"Found {len(inheritance_candidates)} candidates for KDS inheritance."
+            )
+
+            inheritance_updates = []
+            for row in inheritance_candidates:
+                child_id = row[0]
+                parent_score = row[2]
+                inheritance_updates.append((parent_score, child_id))
+
+            logging.info(f"Applying {len(inheritance_updates)} KDS inheritance updates...")
+            cursor.executemany(
+                "UPDATE lemmas SET kds_score = ? WHERE id = ?", inheritance_updates
+            )
+        else:
+            logging.info("No KDS inheritance updates needed.")
 
     conn.close()
     logging.info(
@@ -1,21 +1,20 @@
 import logging
-import sqlite3
 import sys
-import time
 from pathlib import Path
-from typing import Dict, List, Tuple
-
-from deep_translator import GoogleTranslator
+from typing import Dict
 
 # Add project root to path
 sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from src.bulk_load import Checkpoint, connect, phase, stage
 from src.config import DATA_DIR, PROCESSED_DIR
+from src.translation import WORKERS, TokenBucket, TranslationMemory, make_backend, memory_key, translate_batches
 
 # --- CONFIGURATION ---
 DB_PATH = PROCESSED_DIR / "kombyphantike_v2.db"
-CHECKPOINT_FILE = DATA_DIR / "logs" / "translation_checkpoint.txt"
-BATCH_SIZE = 50  # Deep Translator batch size (keep moderate to avoid IP bans)
-SLEEP_TIME = 1.0  # Respect the public endpoint
+CHECKPOINT_FILE = DATA_DIR / "logs" / "translation_checkpoint.txt"  # Legacy; read once if present
+MIGRATION = "7_translate_missing_defs"  # Checkpoint key
+BATCH_SIZE = 50  # Texts per translation request (keep moderate to avoid IP bans)
+WINDOW_BATCHES = 20  # Requests in flight per committed window of lemmas
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
@@ -24,6 +23,7 @@ logger = logging.getLogger(__name__)
 
 
 def get_checkpoint(checkpoint_path: Path) -> int:
+    """Last translated id from the legacy checkpoint file, used while the database holds none."""
     if checkpoint_path.exists():
         try:
             with open(checkpoint_path, "r") as f:
@@ -35,33 +35,43 @@ def get_checkpoint(checkpoint_path: Path) -> int:
     return 0
 
 
-def save_checkpoint(checkpoint_path: Path, last_id: int):
-    try:
-        checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(checkpoint_path, "w") as f:
-            f.write(str(last_id))
-    except Exception as e:
-        logger.error(f"Failed to save checkpoint: {e}")
-
-
-def run_migration(db_path: Path = DB_PATH, checkpoint_path: Path = CHECKPOINT_FILE):
+def run_migration(
+    db_path: Path = DB_PATH,
+    checkpoint_path: Path = CHECKPOINT_FILE,
+    backend=None,
+    workers: int = WORKERS,
+    bucket: TokenBucket = None,
+    resume: bool = True,
+):
+    """
+    Fills modern_def (English) from greek_def for lemmas that lack it.
+    Definitions go through the translation memory first; only unseen ones
+    reach the backend, on `workers` threads under a shared token bucket.
+    backend: a translation backend (default: make_backend(), per TRANSLATION_BACKEND).
+    resume=False: starts again from the first lemma (the memory is kept).
+    """
     if not db_path.exists():
         logger.error(f"Database not found at {db_path}")
         return
 
-    # Initialize Deep Translator (No API Key needed)
-    try:
-        translator = GoogleTranslator(source="el", target="en")
-        logger.info("Initialized Deep Translator (Google Engine).")
-    except Exception as e:
-        logger.error(f"Failed to initialize Translator: {e}")
-        return
+    if backend is None:
+        try:
+            backend = make_backend()
+            logger.info(f"Initialized translation backend: {backend.name}.")
+        except Exception as e:
+            logger.error(f"Failed to initialize Translator: {e}")
+            return
+    bucket = bucket or TokenBucket(capacity=workers)
 
-    conn = sqlite3.connect(db_path)
+    conn = connect(db_path)
     cursor = conn.cursor()
+    # A high-water mark, kept after completion: later runs only visit newer lemmas
+    checkpoint = Checkpoint(conn, MIGRATION, resume=resume)
+    memory = TranslationMemory(conn)
 
-    translation_cache: Dict[str, str] = {}
-    last_id = get_checkpoint(checkpoint_path)
+    last_id = checkpoint.position("lemmas")
+    if last_id is None:
+        last_id = get_checkpoint(checkpoint_path) if resume else 0
     logger.info(f"Resuming from ID: {last_id}")
 
     try:
@@ -89,80 +99,60 @@ def run_migration(db_path: Path = DB_PATH, checkpoint_path: Path = CHECKPOINT_FI
             logger.info("No targets found. Migration complete.")
             return
 
-        # 2. Batch Processing
+        # 2. Windowed Processing: each window is translated concurrently, then committed
         updated_count = 0
         failed_count = 0
-
-        for i in range(0, total_targets, BATCH_SIZE):
-            batch = targets[i : i + BATCH_SIZE]
-
-            # Prepare batch for API
-            api_batch_indices = []
-            api_batch_texts = []
-            batch_updates: List[Tuple[str, int]] = []
-
-            # Check cache first
-            for idx, (lid, g_def) in enumerate(batch):
-                if g_def in translation_cache:
-                    batch_updates.append((translation_cache[g_def], lid))
-                else:
-                    api_batch_indices.append(idx)
-                    api_batch_texts.append(g_def)
-
-            # Call API only for missing items
-            if api_batch_texts:
+        remembered_count = 0
+        window_size = BATCH_SIZE * WINDOW_BATCHES
+
+        for i in range(0, total_targets, window_size):
+            window = [(lid, memory_key(g_def)) for lid, g_def in targets[i : i + window_size]]
+            keys = list(dict.fromkeys(key for _, key in window))
+            known: Dict[str, str] = memory.lookup(keys)
+            remembered_count += len(known)
+
+            # Call the backend only for definitions the memory has never seen
+            missing = [key for key in keys if key not in known]
+            if missing:
                 logger.info(
-                    f"Translating {len(api_batch_texts)} new items in batch {i // BATCH_SIZE + 1}..."
+                    f"Translating {len(missing)} new items in window {i // window_size + 1}..."
                 )
-                try:
-                    # Deep Translator supports batch translation directly
-                    translated_texts = translator.translate_batch(api_batch_texts)
-
-                    if len(translated_texts) != len(api_batch_texts):
-                        logger.error(
-                            f"Mismatch in translation results. Expected {len(api_batch_texts)}, got {len(translated_texts)}. Skipping."
-                        )
-                        failed_count += len(api_batch_texts)
-                    else:
-                        for j, translated_text in enumerate(translated_texts):
-                            original_idx = api_batch_indices[j]
-                            original_id = batch[original_idx][0]
-                            original_g_def = batch[original_idx][1]
-
-                            if translated_text:
-                                translation_cache[original_g_def] = translated_text
-                                batch_updates.append((translated_text, original_id))
-                            else:
-                                logger.warning(
-                                    f"No translation returned for ID {original_id}"
-                                )
-                                failed_count += 1
-                except Exception as e:
-                    logger.error(f"Translation API Error processing batch: {e}")
-                    failed_count += len(api_batch_texts)
-                    # If we hit a rate limit, sleep longer
-                    time.sleep(SLEEP_TIME * 2)
-
-            # 3. Update Batch in Database
-            if batch_updates:
-                cursor.executemany(
-                    "UPDATE lemmas SET modern_def = ? WHERE id = ?", batch_updates
+                batches = [missing[j : j + BATCH_SIZE] for j in range(0, len(missing), BATCH_SIZE)]
+                for texts, translated_texts in translate_batches(backend, batches, bucket, workers=workers):
+                    if translated_texts is None:
+                        failed_count += len(texts)
+                        continue
+                    fresh = {text: t for text, t in zip(texts, translated_texts) if t}
+                    failed_count += len(texts) - len(fresh)
+                    # Remembered at once: an interrupted window loses no paid-for translation
+                    with phase(conn, f"Remembering {len(fresh)} translations") as memory_cursor:
+                        memory.store(memory_cursor, fresh, backend.name)
+                    known.update(fresh)
+
+            # 3. Update the Window in Database, together with the checkpoint
+            with phase(conn, f"Window {i // window_size + 1}") as window_cursor:
+                stage(
+                    window_cursor,
+                    "translated",
+                    {"id": "INTEGER PRIMARY KEY", "modern_def": "TEXT"},
+                    ((lid, known[key]) for lid, key in window if key in known),
+                )
+                window_cursor.execute(
+                    """
+                    UPDATE lemmas SET modern_def = t.modern_def
+                    FROM temp.translated t WHERE lemmas.id = t.id
+                    """
                 )  # Note: Updating modern_def (English)
-                conn.commit()
-                updated_count += len(batch_updates)
-                logger.info(f"  - Updated {len(batch_updates)} rows.")
-
-            # Update Checkpoint
-            if batch:
-                max_id_in_batch = batch[-1][0]
-                save_checkpoint(checkpoint_path, max_id_in_batch)
-
-            # Sleep to prevent IP ban
-            if i + BATCH_SIZE < total_targets:
-                time.sleep(SLEEP_TIME)
+                batch_updates = window_cursor.rowcount
+                window_cursor.execute("DROP TABLE temp.translated")
+                checkpoint.advance(window_cursor, "lemmas", window[-1][0])
+            if batch_updates:
+                updated_count += batch_updates
+                logger.info(f"  - Updated {batch_updates} rows.")
 
         logger.info(
-            f"Migration Complete. Updated: {updated_count}, Failed: {failed_count}."
+            f"Migration Complete. Updated: {updated_count}, Failed: {failed_count}, "
+            f"From memory: {remembered_count}."
         )
 
     except KeyboardInterrupt:
@@ -0,0 +1,78 @@
+import logging
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from src.bulk_load import connect, phase
+from src.config import PROCESSED_DIR
+
+# Default DB Path
+DB_PATH = PROCESSED_DIR / "kombyphantike_v2.db"
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+# (index name, table, columns). Column order follows the equality -> range -> payload rule,
+# so each index also covers the columns its queries read.
+INDEXES = [
+    # DatabaseManager.get_relations: WHERE child_lemma_id = ? -> relation_type, parent_lemma_text
+    # DatabaseManager.get_paradigm:  form_of redirect (child.id = r.child_lemma_id AND type = 'form_of')
+    ("idx_relations_child_type", "relations", ["child_lemma_id", "relation_type", "parent_lemma_text"]),
+    # Migrations 5 & 6: every 'form_of' row joined to child and parent lemmas
+    ("idx_relations_type_child", "relations", ["relation_type", "child_lemma_id", "parent_lemma_text"]),
+    # Reverse lookups (all children of a parent headword)
+    ("idx_relations_parent_type", "relations", ["parent_lemma_text", "relation_type"]),
+    # DatabaseManager.select_words: kds_score BETWEEN ? AND ? ORDER BY kds_score
+    ("idx_lemmas_kds", "lemmas", ["kds_score"]),
+    # DatabaseManager.get_paradigm: WHERE lemma_id = ? (created by migration 4; ensured here)
+    ("idx_forms_lemma", "forms", ["lemma_id"]),
+]
+
+
+def explain(cursor, query, params=()):
+    """Returns the EXPLAIN QUERY PLAN detail lines for a statement."""
+    cursor.execute(f"EXPLAIN QUERY PLAN {query}", params)
+    return [row[-1] for row in cursor.fetchall()]
+
+
+def create_indexes(db_path=DB_PATH):
+    """
+    Adds the secondary indexes used by DatabaseManager and the migrations,
+    then refreshes the planner statistics with ANALYZE.
+    Idempotent: existing indexes are left in place.
+    """
+    if not db_path.exists():
+        logging.error(f"Database not found at {db_path}")
+        return
+
+    conn = connect(db_path)
+
+    with phase(conn, "Creating indexes") as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+        tables = {row[0] for row in cursor.fetchall()}
+
+        created = 0
+        for name, table, columns in INDEXES:
+            if table not in tables:
+                logging.warning(f"Table '{table}' not found. Skipping {name}.")
+                continue
+            cursor.execute(f"PRAGMA table_info({table})")
+            existing = {row[1] for row in cursor.fetchall()}
+            missing = [c for c in columns if c not in existing]
+            if missing:
+                logging.warning(f"{table} lacks {missing}. Skipping {name}.")
+                continue
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table}({', '.join(columns)})")
+            created += 1
+            logging.info(f"Index ready: {name} ON {table}({', '.join(columns)})")
+
+        logging.info("Running ANALYZE...")
+        cursor.execute("ANALYZE")
+    conn.close()
+    logging.info(f"Done. {created} indexes in place.")
+
+
+if __name__ == "__main__":
+    create_indexes()
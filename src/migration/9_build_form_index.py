@@ -0,0 +1,132 @@
+import logging
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from src.bulk_load import connect, phase, stage
+from src.config import PROCESSED_DIR
+from src.database import normalize_form
+
+# Default DB Path
+DB_PATH = PROCESSED_DIR / "kombyphantike_v2.db"
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+# Candidate ranking inside one form_key
+PRIORITY_FORM = 0  # a cell of the lemma's paradigm (carries tags)
+PRIORITY_HEADWORD = 1  # the lemma's own headword
+PRIORITY_FORM_OF = 2  # a 'form_of' headword redirected to its parent
+
+
+def build_form_index(db_path=DB_PATH, lemma_ids=None):
+    """
+    Builds the reverse form index: normalized surface form -> candidate lemmas + tags.
+    Clustered on form_key (WITHOUT ROWID), so resolving a token is a single B-tree probe.
+    Rebuilt from scratch; re-run after migration 4 rewrites `forms`.
+    lemma_ids: only rebuild the entries of these lemmas, e.g. those touched by a
+    Kaikki delta (a database without the index is left as it is).
+    """
+    if not db_path.exists():
+        logging.error(f"Database not found at {db_path}")
+        return
+
+    conn = connect(db_path)
+    conn.create_function("normalize_form", 1, normalize_form, deterministic=True)
+    cursor = conn.cursor()
+
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+    tables = {row[0] for row in cursor.fetchall()}
+    if not {"lemmas", "forms"} <= tables:
+        logging.error("Tables 'lemmas'/'forms' not found. Skipping migration.")
+        conn.close()
+        return
+
+    if lemma_ids is not None and "form_index" not in tables:
+        logging.info("No form index to update. Skipping migration.")
+        conn.close()
+        return
+
+    def scoped(column):
+        return "" if lemma_ids is None else f" AND {column} IN (SELECT id FROM temp.scoped_lemmas)"
+
+    with phase(conn, "Building form index") as cursor:
+        if lemma_ids is None:
+            cursor.execute("DROP TABLE IF EXISTS form_index")
+        else:
+            stage(cursor, "scoped_lemmas", {"id": "INTEGER PRIMARY KEY"}, ((i,) for i in set(lemma_ids)))
+            cursor.execute("DELETE FROM form_index WHERE lemma_id IN (SELECT id FROM temp.scoped_lemmas)")
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS form_index (
+                form_key TEXT NOT NULL,
+                priority INTEGER NOT NULL,
+                lemma_id INTEGER NOT NULL,
+                form_text TEXT NOT NULL,
+                tags_json TEXT NOT NULL DEFAULT '[]',
+                lemma_text TEXT NOT NULL,
+                frequency REAL,
+                PRIMARY KEY (form_key, priority, lemma_id, form_text, tags_json)
+            ) WITHOUT ROWID
+            """
+        )
+
+        logging.info("Indexing paradigm forms...")
+        cursor.execute(
+            f"""
+            INSERT OR IGNORE INTO form_index
+                (form_key, priority, lemma_id, form_text, tags_json, lemma_text, frequency)
+            SELECT normalize_form(f.form_text), ?, l.id, f.form_text,
+                   COALESCE(f.tags_json, '[]'), l.lemma_text, l.frequency_score
+            FROM forms f
+            JOIN lemmas l ON l.id = f.lemma_id{scoped("l.id")}
+            """,
+            (PRIORITY_FORM,),
+        )
+        n_forms = cursor.rowcount
+
+        logging.info("Indexing headwords...")
+        cursor.execute(
+            f"""
+            INSERT OR IGNORE INTO form_index
+                (form_key, priority, lemma_id, form_text, tags_json, lemma_text, frequency)
+            SELECT normalize_form(l.lemma_text), ?, l.id, l.lemma_text, '[]',
+                   l.lemma_text, l.frequency_score
+            FROM lemmas l
+            WHERE NOT EXISTS (
+                SELECT 1 FROM relations r
+                WHERE r.child_lemma_id = l.id AND r.relation_type = 'form_of'
+            ){scoped("l.id")}
+            """,
+            (PRIORITY_HEADWORD,),
+        )
+        n_heads = cursor.rowcount
+
+        logging.info("Redirecting form_of headwords to their parents...")
+        cursor.execute(
+            f"""
+            INSERT OR IGNORE INTO form_index
+                (form_key, priority, lemma_id, form_text, tags_json, lemma_text, frequency)
+            SELECT normalize_form(child.lemma_text), ?, parent.id, child.lemma_text, '[]',
+                   parent.lemma_text, parent.frequency_score
+            FROM relations r
+            JOIN lemmas child ON child.id = r.child_lemma_id
+            JOIN lemmas parent ON parent.lemma_text = r.parent_lemma_text
+            WHERE r.relation_type = 'form_of'{scoped("parent.id")}
+            """,
+            (PRIORITY_FORM_OF,),
+        )
+        n_redirects = cursor.rowcount
+
+        if lemma_ids is None:
+            cursor.execute("ANALYZE form_index")
+    conn.close()
+    logging.info(
+        f"Done. {n_forms} forms, {n_heads} headwords, {n_redirects} form_of redirects indexed."
+    )
+
+
+if __name__ == "__main__":
+    build_form_index()
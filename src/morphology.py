@@ -0,0 +1,82 @@
+"""Integer-coded morphology features for form tags."""
+
+import json
+
+# Dimension -> ordered values. Bit i of the dimension's mask means VALUES[i].
+# Append only: the bit positions are persisted in the database.
+FEATURES = {
+    "case": ["nominative", "genitive", "accusative", "vocative", "dative"],
+    "number": ["singular", "plural", "dual"],
+    "gender": ["masculine", "feminine", "neuter"],
+    "tense": ["present", "imperfect", "past", "future", "perfect", "pluperfect", "aorist"],
+    "voice": ["active", "passive", "middle"],
+    "mood": ["indicative", "subjunctive", "imperative", "optative", "participle", "infinitive"],
+    "person": ["first-person", "second-person", "third-person"],
+}
+
+# Column name for each dimension in the `forms` table
+COLUMNS = {dim: f"f_{dim}" for dim in FEATURES}
+
+# Bits per dimension when all seven masks are packed into one integer
+PACK_WIDTH = 8
+
+# Spellings seen in Kaikki tags and in migration 4's MORPH_MAP output
+ALIASES = {
+    "1st person": "first-person",
+    "2nd person": "second-person",
+    "3rd person": "third-person",
+    "first person": "first-person",
+    "second person": "second-person",
+    "third person": "third-person",
+    "perfective": "aorist",
+    "mediopassive": "passive",
+}
+
+_TAG_TO_BIT = {}
+for _dim, _values in FEATURES.items():
+    for _i, _value in enumerate(_values):
+        _TAG_TO_BIT[_value] = (_dim, 1 << _i)
+for _alias, _value in ALIASES.items():
+    _TAG_TO_BIT[_alias] = _TAG_TO_BIT[_value]
+
+
+def feature_bit(dimension, value):
+    """Bit for one value of a dimension; raises KeyError for unknown names."""
+    return 1 << FEATURES[dimension].index(ALIASES.get(value, value))
+
+
+def encode_tags(tags):
+    """List of tag strings -> {dimension: bitmask}. Unknown tags are ignored."""
+    masks = {dim: 0 for dim in FEATURES}
+    for tag in tags or []:
+        hit = _TAG_TO_BIT.get(str(tag).strip().lower())
+        if hit:
+            dim, bit = hit
+            masks[dim] |= bit
+    return masks
+
+
+def decode_masks(masks):
+    """{dimension: bitmask} -> list of canonical tag strings."""
+    tags = []
+    for dim, values in FEATURES.items():
+        mask = masks.get(dim, 0) or 0
+        tags.extend(v for i, v in enumerate(values) if mask & (1 << i))
+    return tags
+
+
+def pack_tags_json(tags_json):
+    """
+    tags_json text -> all seven masks packed into one integer (PACK_WIDTH bits each).
+    Registered as a SQLite function so the migration stays a single UPDATE.
+    """
+    try:
+        tags = json.loads(tags_json) if tags_json else []
+    except (TypeError, ValueError):
+        return 0
+    if not isinstance(tags, list):
+        return 0
+    packed = 0
+    for i, mask in enumerate(encode_tags(tags).values()):
+        packed |= mask << (i * PACK_WIDTH)
+    return packed
@@ -2,6 +2,7 @@ import pandas as pd
 import json
 import logging
 from src.config import KAIKKI_EL_FILE, KELLY_FILE, PROCESSED_DIR
+from src.kaikki_scanner import SCAN_WORKERS, KaikkiScanner
 
 logging.basicConfig(level=logging.INFO, format="%(message)s")
 logger = logging.getLogger("ParadigmExtractor")
@@ -14,6 +15,7 @@ KELLY_CSV = PROCESSED_DIR / "kelly.csv"
 class ParadigmExtractor:
     def __init__(self):
         self.target_lemmas = set()
+        self.paradigms = {}
 
     def load_targets(self):
         """Loads target lemmas from Kelly (CSV preferred) to avoid processing obscure words."""
@@ -63,6 +65,24 @@ class ParadigmExtractor:
             })
         return valid_forms
 
+    def consume(self, entry):
+        """Kaikki-EL consumer: keeps the first entry with usable forms for each target lemma."""
+        word = entry.get("word")
+        # No POS restriction anymore
+
+        if word not in self.target_lemmas:
+            return
+        if word in self.paradigms:
+            return
+
+        # Extract for ANY word that has forms
+        if "forms" in entry and entry["forms"]:
+            structured_forms = self.extract_structured_forms(entry)
+
+            if structured_forms:
+                # New Structure: Direct list
+                self.paradigms[word] = structured_forms
+
     def extract_all(self):
         """
         Main method to return all paradigms as a dictionary.
@@ -70,34 +90,13 @@ class ParadigmExtractor:
         """
         self.load_targets()
         logger.info(f"Scanning Kaikki dictionary...")
-        paradigms = {}
-        seen_lemmas = set()
-
-        with open(KAIKKI_EL_FILE, "r", encoding="utf-8") as f:
-            for line in f:
-                try:
-                    entry = json.loads(line)
-                    word = entry.get("word")
-                    # No POS restriction anymore
-
-                    if word not in self.target_lemmas:
-                        continue
-                    if word in seen_lemmas:
-                        continue
-
-                    # Extract for ANY word that has forms
-                    if "forms" in entry and entry["forms"]:
-                        structured_forms = self.extract_structured_forms(entry)
-
-                        if structured_forms:
-                            # New Structure: Direct list
-                            paradigms[word] = structured_forms
-                            seen_lemmas.add(word)
-
-                except json.JSONDecodeError:
-                    continue
-
-        return paradigms
+        self.paradigms = {}
+
+        scanner = KaikkiScanner(KAIKKI_EL_FILE, workers=SCAN_WORKERS)
+        scanner.register(self.consume, self.target_lemmas)
+        scanner.scan()
+
+        return self.paradigms
 
     def run(self):
         """
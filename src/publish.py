@@ -0,0 +1,187 @@
+"""Publishes the read-only serving snapshot of the lexicon."""
+
+import argparse
+import logging
+import os
+import sqlite3
+import time
+from pathlib import Path
+
+from src.config import PROCESSED_DIR, SERVING_DB_FILE
+from src.morphology import COLUMNS
+
+logger = logging.getLogger(__name__)
+
+SOURCE_DB_FILE = PROCESSED_DIR / "kombyphantike_v2.db"
+PAGE_SIZE = 8192
+
+# Table -> columns the API reads (None keeps every column). Tables not listed are dropped.
+SERVING_COLUMNS = {
+    "lemmas": [
+        "id", "lemma_text", "pos", "ipa", "greek_def", "modern_def",
+        "ancient_definitions", "ancient_citations", "etymology_text",
+        "lsj_id", "kds_score", "shift_type", "frequency_score",
+    ],
+    "forms": ["id", "lemma_id", "form_text", "tags_json", *COLUMNS.values()],
+    "relations": None,
+    "form_index": None,
+    "paradigm_blobs": None,
+    "paradigm_keys": None,
+}
+
+# forms.form_text / tags_json only back the fallbacks for databases without these tables
+FORM_TEXT_READERS = {"form_index", "paradigm_blobs"}
+
+
+def _column_ddl(col):
+    _, name, ctype, notnull, default, _ = col
+    ddl = f'"{name}" {ctype}'.rstrip()
+    if notnull:
+        ddl += " NOT NULL"
+    if default is not None:
+        ddl += f" DEFAULT {default}"
+    return ddl
+
+
+def _serving_plan(src):
+    """{table: (create_sql, [columns])} for every serving table present in the source."""
+    tables = {
+        name: sql
+        for name, sql in src.execute("SELECT name, sql FROM sqlite_master WHERE type='table'")
+    }
+    plan = {}
+    for table, wanted in SERVING_COLUMNS.items():
+        if table not in tables:
+            continue
+        info = src.execute(f'PRAGMA table_info("{table}")').fetchall()
+        if wanted is None:
+            plan[table] = (tables[table], [col[1] for col in info])
+            continue
+
+        if table == "forms" and FORM_TEXT_READERS <= tables.keys():
+            dropped = {"form_text", "tags_json"}
+            feature = COLUMNS["case"]
+            if feature in {col[1] for col in info} and src.execute(
+                f'SELECT 1 FROM forms WHERE "{feature}" IS NULL LIMIT 1'
+            ).fetchone():
+                # Forms inserted since migration 10 ran: has_feature reads their tags_json
+                dropped.discard("tags_json")
+            wanted = [c for c in wanted if c not in dropped]
+        kept = [col for col in info if col[1] in wanted]
+        pk = [col for col in kept if col[5]]
+        defs = []
+        for col in kept:
+            ddl = _column_ddl(col)
+            if len(pk) == 1 and col is pk[0] and col[2].upper() == "INTEGER":
+                ddl = f'"{col[1]}" INTEGER PRIMARY KEY'
+            defs.append(ddl)
+        if len(pk) > 1:
+            defs.append(f"PRIMARY KEY ({', '.join(col[1] for col in pk)})")
+        plan[table] = (f'CREATE TABLE "{table}" ({", ".join(defs)})', [col[1] for col in kept])
+    return plan
+
+
+def _serving_indexes(src, plan):
+    """CREATE INDEX statements for source indexes whose columns all survive."""
+    statements = []
+    for table, (_, columns) in plan.items():
+        for _, name, unique, origin, _ in src.execute(f'PRAGMA index_list("{table}")'):
+            if origin == "pk":
+                continue
+            index_cols = [row[2] for row in src.execute(f'PRAGMA index_info("{name}")')]
+            if not index_cols or not set(index_cols) <= set(columns):
+                continue
+            if origin == "c":
+                sql = src.execute(
+                    "SELECT sql FROM sqlite_master WHERE type='index' AND name=?", (name,)
+                ).fetchone()[0]
+            else:
+                # Backs a UNIQUE constraint (sqlite_autoindex_*); recreate it explicitly
+                sql = (
+                    f'CREATE {"UNIQUE " if unique else ""}INDEX "uq_{table}_{"_".join(index_cols)}" '
+                    f'ON "{table}" ({", ".join(index_cols)})'
+                )
+            statements.append(sql)
+    return statements
+
+
+def publish_snapshot(source=SOURCE_DB_FILE, target=SERVING_DB_FILE, page_size=PAGE_SIZE):
+    """
+    Writes the compact serving snapshot of `source` to `target` and returns a summary.
+    The source is opened read-only; the target is replaced atomically.
+    """
+    source, target = Path(source), Path(target)
+    if not source.exists():
+        raise FileNotFoundError(f"Database not found at {source}")
+
+    t0 = time.perf_counter()
+    target.parent.mkdir(parents=True, exist_ok=True)
+    staging = target.with_name(target.name + ".staging")
+    pending = target.with_name(target.name + ".tmp")
+    staging.unlink(missing_ok=True)
+    pending.unlink(missing_ok=True)
+
+    conn = sqlite3.connect(staging.resolve().as_uri(), uri=True)
+    try:
+        conn.execute(f"PRAGMA page_size = {int(page_size)}")
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute("ATTACH DATABASE ? AS src", (f"{source.resolve().as_uri()}?mode=ro",))
+
+        src = sqlite3.connect(f"{source.resolve().as_uri()}?mode=ro", uri=True)
+        plan = _serving_plan(src)
+        indexes = _serving_indexes(src, plan)
+        src.close()
+
+        rows = {}
+        for table, (create_sql, columns) in plan.items():
+            conn.execute(create_sql)
+            column_list = ", ".join(f'"{c}"' for c in columns)
+            cursor = conn.execute(
+                f'INSERT INTO main."{table}" ({column_list}) SELECT {column_list} FROM src."{table}"'
+            )
+            rows[table] = cursor.rowcount
+            logger.info(f"  {table}: {rows[table]} rows, {len(columns)} columns")
+        for sql in indexes:
+            conn.execute(sql)
+        conn.commit()
+        conn.execute("DETACH DATABASE src")
+        conn.execute("ANALYZE")
+        conn.commit()
+
+        conn.execute("VACUUM INTO ?", (str(pending),))
+    finally:
+        conn.close()
+        staging.unlink(missing_ok=True)
+
+    os.replace(pending, target)
+    summary = {
+        "source": str(source),
+        "target": str(target),
+        "page_size": int(page_size),
+        "tables": rows,
+        "indexes": len(indexes),
+        "source_bytes": source.stat().st_size,
+        "target_bytes": target.stat().st_size,
+        "seconds": round(time.perf_counter() - t0, 2),
+    }
+    logger.info(
+        f"Published {target} ({summary['target_bytes'] / 1e6:.1f} MB, "
+        f"source {summary['source_bytes'] / 1e6:.1f} MB) in {summary['seconds']}s"
+    )
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Publish the read-only serving snapshot")
+    parser.add_argument("--source", type=Path, default=SOURCE_DB_FILE)
+    parser.add_argument("--out", type=Path, default=SERVING_DB_FILE)
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    publish_snapshot(args.source, args.out, args.page_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""Relation graph over lemmas for multi-hop word-pool expansion."""
+
+import logging
+from collections import namedtuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# One reached word: the seed it came from, the word it was reached through, how, and at which hop
+Expansion = namedtuple("Expansion", ["lemma", "seed", "via", "relation_type", "hop"])
+
+
+class RelationGraph:
+    def __init__(self, lemma_text, child, parent_text, relation_type, frequency=None):
+        """
+        lemma_text: node texts (position = node id).
+        child / parent_text / relation_type: one entry per relation, `child` as node positions.
+        frequency: optional per-lemma score; higher-frequency neighbours fill fan-out slots first.
+        """
+        self.nodes = list(lemma_text)
+        self.node_index = {}
+        for i, text in enumerate(self.nodes):
+            self.node_index.setdefault(text, i)
+        for text in dict.fromkeys(parent_text):
+            if text not in self.node_index:
+                self.node_index[text] = len(self.nodes)
+                self.nodes.append(text)
+
+        # Sorted, so edge order does not depend on row order in the source
+        self.types = sorted(set(relation_type), key=lambda t: (t is None, t or ""))
+        self.type_ids = {t: i for i, t in enumerate(self.types)}
+
+        n_edges = len(parent_text)
+        source = np.asarray(child, dtype=np.int32).reshape(n_edges)
+        target = np.fromiter(map(self.node_index.__getitem__, parent_text), dtype=np.int32, count=n_edges)
+        kind = np.fromiter(map(self.type_ids.__getitem__, relation_type), dtype=np.int16, count=n_edges)
+
+        rank = np.full(len(self.nodes), -np.inf)
+        if frequency is not None:
+            rank[: len(lemma_text)] = np.nan_to_num(np.asarray(frequency, dtype=float), nan=-np.inf)
+
+        order = np.lexsort((target, -rank[target], kind, source))
+        source, target, kind = source[order], target[order], kind[order]
+        # Duplicate rows (same child, type and target) are adjacent after the sort
+        keep = np.ones(n_edges, dtype=bool)
+        keep[1:] = (source[1:] != source[:-1]) | (kind[1:] != kind[:-1]) | (target[1:] != target[:-1])
+
+        self.target = target[keep]
+        self.kind = kind[keep]
+        self.offset = np.searchsorted(source[keep], np.arange(len(self.nodes) + 1)).astype(np.int64)
+
+    @classmethod
+    def from_connection(cls, conn):
+        """Compiles the graph from a kombyphantike_v2.db (or serving snapshot) connection."""
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(lemmas)")}
+        frequency = "frequency_score" if "frequency_score" in columns else "NULL"
+        lemmas = conn.execute(f"SELECT id, lemma_text, {frequency} FROM lemmas ORDER BY id").fetchall()
+        ids, texts, scores = tuple(zip(*lemmas)) or ((), (), ())
+        ids = np.asarray(ids, dtype=np.int64)
+
+        rows = conn.execute(
+            "SELECT child_lemma_id, parent_lemma_text, relation_type FROM relations ORDER BY id"
+        ).fetchall()
+        child_ids, parents, kinds = tuple(zip(*rows)) or ((), (), ())
+        child_ids = np.asarray(child_ids, dtype=np.int64)
+
+        pos = np.searchsorted(ids, child_ids)
+        found = pos < len(ids)
+        found[found] = ids[pos[found]] == child_ids[found]
+        if not found.all():
+            logger.warning(f"Skipping {int((~found).sum())} relations whose child is not a lemma")
+        keep = np.flatnonzero(found)
+
+        return cls(
+            texts,
+            pos[keep],
+            [parents[k] for k in keep],
+            [kinds[k] for k in keep],
+            frequency=[np.nan if s is None else s for s in scores],
+        )
+
+    def __len__(self):
+        """Number of typed edges."""
+        return len(self.target)
+
+    def neighbours(self, lemma, relation_type=None) -> list:
+        """Direct targets of `lemma`, in edge order (optionally of one type)."""
+        i = self.node_index.get(lemma)
+        if i is None:
+            return []
+        edges = range(self.offset[i], self.offset[i + 1])
+        kind = self.type_ids.get(relation_type, -1)
+        return [self.nodes[self.target[e]] for e in edges if relation_type is None or self.kind[e] == kind]
+
+    def expand(self, seeds, hops=1, fanout=None) -> list:
+        """
+        Bounded breadth-first expansion from every seed at once.
+
+        fanout maps relation type -> the most new neighbours taken per node and hop. Only
+        those types are followed (None follows every type without limit). Each word is reported
+        once, at its first hop. Seeds themselves are never reported. Unknown seeds are ignored.
+        Returns Expansion tuples ordered by hop, then frontier order, then edge order.
+        """
+        limits = np.zeros(max(len(self.types), 1), dtype=np.int64)
+        if fanout is None:
+            limits[:] = np.iinfo(np.int64).max
+        else:
+            for rtype, limit in fanout.items():
+                if rtype in self.type_ids:
+                    limits[self.type_ids[rtype]] = limit
+
+        visited = np.zeros(len(self.nodes), dtype=bool)
+        frontier = np.array(
+            list(dict.fromkeys(self.node_index[s] for s in seeds if s in self.node_index)),
+            dtype=np.int32,
+        )
+        visited[frontier] = True
+        roots = frontier
+
+        results = []
+        for hop in range(1, hops + 1):
+            starts = self.offset[frontier]
+            counts = self.offset[frontier + 1] - starts
+            total = int(counts.sum())
+            if not total:
+                break
+
+            # All edges of the frontier, grouped by frontier node
+            owner = np.repeat(np.arange(len(frontier)), counts)
+            edges = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts) + starts[owner]
+            fresh = ~visited[self.target[edges]]
+            owner, edges = owner[fresh], edges[fresh]
+            kind = self.kind[edges]
+
+            # Rank inside each (node, type) run; runs are contiguous because edges sort by type
+            n = len(edges)
+            run_start = np.ones(n, dtype=bool)
+            run_start[1:] = (owner[1:] != owner[:-1]) | (kind[1:] != kind[:-1])
+            rank = np.arange(n) - np.maximum.accumulate(np.where(run_start, np.arange(n), 0))
+            taken = rank < limits[kind]
+            owner, edges, kind = owner[taken], edges[taken], kind[taken]
+
+            # A word reached from several frontier nodes keeps its first path
+            reached = self.target[edges]
+            _, first = np.unique(reached, return_index=True)
+            first.sort()
+            owner, kind, reached = owner[first], kind[first], reached[first]
+
+            for o, k, t in zip(owner.tolist(), kind.tolist(), reached.tolist()):
+                results.append(
+                    Expansion(
+                        self.nodes[t],
+                        self.nodes[roots[o]],
+                        self.nodes[frontier[o]],
+                        self.types[k],
+                        hop,
+                    )
+                )
+            visited[reached] = True
+            frontier, roots = reached, roots[owner]
+        return results
@@ -0,0 +1,652 @@
+"""Deterministic, production-sized lexicon fixtures."""
+
+import argparse
+import csv
+import itertools
+import json
+import logging
+import pickle
+import random
+import sqlite3
+import time
+from pathlib import Path
+
+import numpy as np
+
+from src.config import DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+SCALE_DIR = DATA_DIR / "scale"
+DEFAULT_SEED = 13
+INSERT_BATCH = 50_000
+
+PRESETS = {
+    "10k": {"lemmas": 10_000, "forms_per_lemma": 10.0},
+    "100k": {"lemmas": 100_000, "forms_per_lemma": 10.0},
+    "1m": {"lemmas": 1_000_000, "forms_per_lemma": 10.0},
+}
+
+KELLY_POS_COL = "Μέρος του Λόγου (Part of speech)"
+KELLY_FREQ_COL = "Συχνότητα (Frequency)"
+KELLY_COLUMNS = [
+    "ID",
+    "Lemma",
+    KELLY_POS_COL,
+    "CEF level",
+    KELLY_FREQ_COL,
+    "Modern_Def",
+    "Greek_Def",
+    "Shift_Type",
+    "Semantic_Warning",
+    "Etymology",
+    "AG_Antecedent",
+    "Ancient_Context",
+    "Modern_Examples",
+    "Synonyms",
+    "Similarity_Score",
+]
+KNOT_COLUMNS = [
+    "Knot_ID",
+    "Parent_Concept",
+    "POS_Tag",
+    "Regex_Ending",
+    "Morpho_Constraint",
+    "Description",
+    "Nuance",
+    "Example_Word",
+]
+
+# --- GREEK-LIKE ORTHOGRAPHY ---
+ONSETS = ["", "κ", "λ", "μ", "ν", "π", "τ", "σ", "ρ", "θ", "φ", "χ", "δ", "γ", "β", "ξ",
+          "στ", "πρ", "τρ", "κλ", "γρ", "σκ", "φτ", "χρ", "ψ", "ζ"]
+VOWELS = ["α", "ε", "ο", "ι", "η", "υ", "ω", "ου", "αι", "ει", "οι"]
+CODAS = ["λ", "ν", "ρ", "τ", "κ", "μ", "σ", "φ", "θ", "γ", "χ", "δ", "π"]
+ACCENTED = {"α": "ά", "ε": "έ", "ο": "ό", "ι": "ί", "η": "ή", "υ": "ύ", "ω": "ώ"}
+# Real lexica are dominated by nouns; closed classes are tiny.
+POS_MIX = [("noun", 0.52), ("verb", 0.24), ("adj", 0.17), ("adv", 0.05), ("other", 0.02)]
+POS_GREEK = {
+    "noun": "Ουσιαστικό",
+    "verb": "Ρήμα",
+    "adj": "Επίθετο",
+    "adv": "Επίρρημα",
+    "other": "Σύνδεσμος",
+}
+CEFR = ["A1", "A2", "B1", "B2", "C1", "C2"]
+SHIFT_TYPES = ["Direct Inheritance", "Morphological Evolution", "Semantic Shift", "Modern Coinage"]
+
+# English gloss vocabulary; themes are drawn Zipf-style so some are common and most are rare.
+GLOSSES = [
+    "fate", "water", "house", "light", "war", "sea", "law", "song", "road", "friend",
+    "fire", "earth", "voice", "memory", "truth", "city", "gift", "time", "star", "grief",
+    "honour", "wine", "bread", "ship", "mother", "king", "god", "death", "love", "word",
+    "night", "day", "wind", "stone", "horse", "field", "market", "letter", "school", "body",
+    "hand", "eye", "heart", "blood", "gold", "silver", "iron", "tree", "flower", "river",
+    "mountain", "island", "harbour", "temple", "theatre", "judge", "army", "enemy", "guest", "stranger",
+]
+
+CASES = ["nominative", "genitive", "accusative", "vocative"]
+NUMBERS = ["singular", "plural"]
+PERSONS = ["1st person", "2nd person", "3rd person"]
+
+# Declension classes: (gender, lemma ending, 8 endings in CASES x NUMBERS order)
+NOUN_CLASSES = [
+    ("masculine", "ος", ["ος", "ου", "ο", "ε", "οι", "ων", "ους", "οι"]),
+    ("masculine", "ης", ["ης", "η", "η", "η", "ες", "ων", "ες", "ες"]),
+    ("masculine", "ας", ["ας", "α", "α", "α", "ες", "ων", "ες", "ες"]),
+    ("feminine", "η", ["η", "ης", "η", "η", "ες", "ων", "ες", "ες"]),
+    ("feminine", "α", ["α", "ας", "α", "α", "ες", "ων", "ες", "ες"]),
+    ("neuter", "ο", ["ο", "ου", "ο", "ο", "α", "ων", "α", "α"]),
+    ("neuter", "ι", ["ι", "ιου", "ι", "ι", "ια", "ιων", "ια", "ια"]),
+    ("neuter", "μα", ["μα", "ματος", "μα", "μα", "ματα", "ματων", "ματα", "ματα"]),
+]
+NOUN_CLASS_WEIGHTS = [0.22, 0.1, 0.08, 0.17, 0.13, 0.15, 0.08, 0.07]
+
+VERB_TENSES = [
+    (["present", "indicative", "active"], ["ω", "εις", "ει", "ουμε", "ετε", "ουν"]),
+    (["imperfect", "indicative", "active"], ["α", "ες", "ε", "αμε", "ατε", "αν"]),
+    (["past", "indicative", "active"], ["σα", "σες", "σε", "σαμε", "σατε", "σαν"]),
+    (["subjunctive", "active"], ["σω", "σεις", "σει", "σουμε", "σετε", "σουν"]),
+    (["present", "indicative", "passive"], ["ομαι", "εσαι", "εται", "ομαστε", "εστε", "ονται"]),
+    (["past", "indicative", "passive"], ["θηκα", "θηκες", "θηκε", "θηκαμε", "θηκατε", "θηκαν"]),
+]
+VERB_EXTRA = [
+    ("ε", ["imperative", "active", "2nd person", "singular"]),
+    ("ετε", ["imperative", "active", "2nd person", "plural"]),
+    ("οντας", ["participle", "present", "active"]),
+    ("μενος", ["participle", "passive"]),
+]
+
+# The Waterfall tiers from the LSJ linker, so generated citations exercise every branch.
+CITATION_AUTHORS = [
+    ("Hom.", "Il."), ("S.", "OT"), ("A.", "Ag."), ("E.", "Med."), ("Pi.", "O."),
+    ("Pl.", "R."), ("Arist.", "EN"), ("X.", "An."), ("Hdt.", "1"), ("Th.", "2"),
+    ("Plb.", "3"), ("Luc.", "Tim."), ("Plu.", "Per."), ("IG", "1"),
+]
+
+
+class ScaleFixtureGenerator:
+    """Streams a deterministic lexicon of the requested size to disk."""
+
+    def __init__(
+        self,
+        n_lemmas=10_000,
+        forms_per_lemma=10.0,
+        seed=DEFAULT_SEED,
+        out_dir=None,
+        kelly_size=6_000,
+        n_knots=120,
+        vector_dim=768,
+        form_of_ratio=0.08,
+        lsj_ratio=0.4,
+    ):
+        self.n_lemmas = n_lemmas
+        self.forms_per_lemma = forms_per_lemma
+        self.seed = seed
+        self.out_dir = Path(out_dir or SCALE_DIR / f"{n_lemmas}")
+        self.kelly_size = min(kelly_size, n_lemmas)
+        self.n_knots = n_knots
+        self.vector_dim = vector_dim
+        self.form_of_ratio = form_of_ratio
+        self.lsj_ratio = lsj_ratio
+
+        self.db_path = self.out_dir / "kombyphantike_v2.db"
+        self.kelly_path = self.out_dir / "kelly.csv"
+        self.knots_path = self.out_dir / "knots.csv"
+        self.vectors_path = self.out_dir / "vectors.pkl"
+        self.manifest_path = self.out_dir / "manifest.json"
+
+        self.counts = {}
+        # Parallel arrays indexed by lemma rank (rank 0 = most frequent)
+        self.lemma_text = []
+        self.lemma_pos = []
+        self.lemma_stem = []
+        self.lemma_class = []  # noun class index / 0 for others
+        self.parent_rank = {}  # form_of child rank -> parent rank
+
+    # --- RANDOMNESS ---
+    def _rng(self, stream):
+        """Independent deterministic stream per table, so tables can be rebuilt in isolation."""
+        return random.Random(f"{self.seed}:{stream}")
+
+    def _skewed_rank(self, rng, exponent=3.0):
+        """Draws a lemma rank biased towards the frequent head (hubs in the relation graph)."""
+        return min(int(self.n_lemmas * rng.random() ** exponent), self.n_lemmas - 1)
+
+    # --- ORTHOGRAPHY ---
+    def _stem(self, rng):
+        n_syll = rng.choices([1, 2, 3, 4], [0.2, 0.45, 0.28, 0.07])[0]
+        syllables = [rng.choice(ONSETS) + rng.choice(VOWELS) for _ in range(n_syll)]
+        # Accent the last vowel of the stem (paroxytone lemmas dominate; "ου" -> "ού").
+        last = syllables[-1]
+        for idx in range(len(last) - 1, -1, -1):
+            if last[idx] in ACCENTED:
+                syllables[-1] = last[:idx] + ACCENTED[last[idx]] + last[idx + 1 :]
+                break
+        return "".join(syllables) + rng.choice(CODAS)
+
+    def _paradigm(self, rank):
+        """Full (form, tags) list for a lemma, most common cells first."""
+        pos = self.lemma_pos[rank]
+        stem = self.lemma_stem[rank]
+        if pos == "noun":
+            gender, _, endings = NOUN_CLASSES[self.lemma_class[rank]]
+            cells = []
+            for i, ending in enumerate(endings):
+                tags = [CASES[i % 4], NUMBERS[i // 4], gender]
+                cells.append((stem + ending, tags))
+            return cells
+        if pos == "adj":
+            cells = []
+            for gender, (_, _, endings) in zip(
+                ["masculine", "feminine", "neuter"],
+                [NOUN_CLASSES[0], NOUN_CLASSES[3], NOUN_CLASSES[5]],
+            ):
+                for i, ending in enumerate(endings):
+                    cells.append((stem + ending, [CASES[i % 4], NUMBERS[i // 4], gender]))
+            return cells
+        if pos == "verb":
+            cells = []
+            for base_tags, endings in VERB_TENSES:
+                for i, ending in enumerate(endings):
+                    tags = base_tags + [PERSONS[i % 3], NUMBERS[i // 3]]
+                    cells.append((stem + ending, tags))
+            for ending, tags in VERB_EXTRA:
+                cells.append((stem + ending, list(tags)))
+            return cells
+        return [(self.lemma_text[rank], [])]
+
+    # --- LEMMAS ---
+    def _plan_lemmas(self):
+        rng = self._rng("lemmas")
+        pos_names = [p for p, _ in POS_MIX]
+        pos_weights = [w for _, w in POS_MIX]
+        seen = set()
+        n_form_of = int(self.n_lemmas * self.form_of_ratio)
+        n_base = self.n_lemmas - n_form_of
+
+        while len(self.lemma_text) < n_base:
+            pos = rng.choices(pos_names, pos_weights)[0]
+            stem = self._stem(rng)
+            cls = 0
+            if pos == "noun":
+                cls = rng.choices(range(len(NOUN_CLASSES)), NOUN_CLASS_WEIGHTS)[0]
+                lemma = stem + NOUN_CLASSES[cls][1]
+            elif pos == "adj":
+                lemma = stem + "ος"
+            elif pos == "verb":
+                lemma = stem + "ω"
+            else:
+                lemma = stem + rng.choice(["α", "ως", "ι"])
+            if lemma in seen:
+                continue
+            seen.add(lemma)
+            self.lemma_text.append(lemma)
+            self.lemma_pos.append(pos)
+            self.lemma_stem.append(stem)
+            self.lemma_class.append(cls)
+
+        # form_of children: inflected forms that Wiktionary lists as their own headwords
+        # (e.g. "ισχύει" -> "ισχύω"). They live in the frequency tail.
+        attempts = 0
+        while len(self.lemma_text) < self.n_lemmas and attempts < n_form_of * 20:
+            attempts += 1
+            parent = self._skewed_rank(rng, exponent=1.5) % n_base
+            cells = self._paradigm(parent)
+            if len(cells) < 2:
+                continue
+            form, tags = cells[rng.randrange(1, len(cells))]
+            if form in seen:
+                continue
+            seen.add(form)
+            rank = len(self.lemma_text)
+            self.lemma_text.append(form)
+            self.lemma_pos.append(self.lemma_pos[parent])
+            self.lemma_stem.append(self.lemma_stem[parent])
+            self.lemma_class.append(self.lemma_class[parent])
+            self.parent_rank[rank] = (parent, tags)
+
+        # Shrink if the orthography ran out of unique forms (only at toy sizes)
+        self.n_lemmas = len(self.lemma_text)
+
+    def _gloss(self, rank, offset=0):
+        # Zipf over glosses: low gloss indices dominate
+        bucket = ((rank + 1) * 2654435761 + offset * 40503) % 1000
+        idx = int(len(GLOSSES) * (bucket / 1000.0) ** 2)
+        return GLOSSES[idx]
+
+    def _frequency(self, rank):
+        """Zipf frequency per million for the Kelly 'Frequency' column."""
+        return round(250_000.0 / (rank + 10), 3)
+
+    def _kds(self, rank):
+        level = min(int(rank / max(self.kelly_size, 1) * 6), 5) if rank < self.kelly_size else None
+        score = 10.0 * (level + 1) if level is not None else 80.0
+        score += len(self.lemma_text[rank]) / 2.0
+        return max(1, min(100, int(round(score))))
+
+    def _lemma_rows(self, lsj_ids):
+        rng = self._rng("lemma_rows")
+        for rank, lemma in enumerate(self.lemma_text):
+            pos = self.lemma_pos[rank]
+            gloss = self._gloss(rank)
+            parent = self.parent_rank.get(rank)
+            if parent:
+                parent_lemma = self.lemma_text[parent[0]]
+                greek_def = f"{' '.join(parent[1][:2])} του {parent_lemma}"
+                modern_def = None
+            else:
+                greek_def = f"{gloss}, {self._gloss(rank, 7)} ({POS_GREEK[pos]})"
+                modern_def = f"the {gloss}; {self._gloss(rank, 3)}"
+            lsj_id = lsj_ids.get(rank)
+            ancient_defs = ancient_cits = etym = None
+            if lsj_id:
+                ancient_defs = f"{gloss} | {self._gloss(rank, 11)}"
+                author, work = CITATION_AUTHORS[rank % len(CITATION_AUTHORS)]
+                ancient_cits = f"{lemma} '{gloss}' ({author} {work})"
+                etym = json.dumps({"ancient": lemma, "source": "lsj"}, ensure_ascii=False)
+            yield (
+                rank + 1,
+                lemma,
+                pos,
+                f"/{lemma}/",
+                greek_def,
+                modern_def,
+                modern_def,
+                ancient_defs,
+                ancient_cits,
+                etym,
+                f"From Ancient Greek {lemma}" if lsj_id else None,
+                lsj_id,
+                self._kds(rank),
+                rng.choice(SHIFT_TYPES),
+                None,
+                self._frequency(rank),
+            )
+
+    # --- FORMS ---
+    def _form_rows(self):
+        rng = self._rng("forms")
+        # Expected full paradigm length under POS_MIX, used to hit the forms/lemma target
+        full = {"noun": 8, "adj": 24, "verb": 40, "adv": 1, "other": 1}
+        mean_full = sum(full[p] * w for p, w in POS_MIX)
+        completeness = min(max(self.forms_per_lemma / mean_full, 0.02), 1.0)
+        beta_b = 2.0 * (1.0 - completeness) / completeness if completeness < 1.0 else None
+
+        for rank in range(self.n_lemmas):
+            if rank in self.parent_rank:
+                continue  # form_of children carry no forms of their own
+            cells = self._paradigm(rank)
+            if beta_b:
+                k = max(1, int(round(len(cells) * rng.betavariate(2.0, beta_b))))
+            else:
+                k = len(cells)
+            for form, tags in cells[:k]:
+                yield (rank + 1, form, json.dumps(tags, ensure_ascii=False))
+
+    # --- RELATIONS ---
+    def _relation_rows(self):
+        rng = self._rng("relations")
+        for rank in range(self.n_lemmas):
+            parent = self.parent_rank.get(rank)
+            if parent:
+                yield (rank + 1, self.lemma_text[parent[0]], "form_of")
+                continue
+            # Power-law out-degree: most lemmas have 0-2 links, a few have dozens
+            degree = min(int(rng.paretovariate(1.6)) - 1, 40)
+            for _ in range(degree):
+                rtype = rng.choices(
+                    ["synonyms", "related", "derived", "antonyms"], [0.4, 0.3, 0.2, 0.1]
+                )[0]
+                target = self._skewed_rank(rng)
+                if target != rank:
+                    yield (rank + 1, self.lemma_text[target], rtype)
+
+    # --- LSJ ---
+    def _canonical_key(self, text):
+        """A stand-in for BetaCodeConverter.canonicalize (Latin letters only)."""
+        table = str.maketrans(
+            "αβγδεζηθικλμνξοπρσςτυφχψωάέήίόύώ",
+            "abgdezhqiklmncoprsstufxywaehiouw",
+        )
+        return text.translate(table)
+
+    def _lsj_rows(self):
+        """Returns (rows, {lemma_rank: lsj_id}). LSJ covers the inherited (frequent) head."""
+        rng = self._rng("lsj")
+        rows = []
+        links = {}
+        keys = set()
+        for rank in range(self.n_lemmas):
+            if rank in self.parent_rank:
+                continue
+            # Frequent words are far more likely to be inherited from Ancient Greek
+            p_link = self.lsj_ratio * (2.0 if rank < self.kelly_size else 0.9)
+            if rng.random() >= p_link:
+                continue
+            key = self._canonical_key(self.lemma_text[rank])
+            if key in keys:
+                continue
+            keys.add(key)
+            lsj_id = len(rows) + 1
+            links[rank] = lsj_id
+            rows.append((lsj_id, key, self.lemma_text[rank], self._entry_json(rng, rank)))
+        return rows, links
+
+    def _entry_json(self, rng, rank):
+        senses = []
+        for s in range(rng.choices([1, 2, 3, 5, 8], [0.35, 0.3, 0.2, 0.1, 0.05])[0]):
+            citations = []
+            for _ in range(rng.choices([0, 1, 2, 4], [0.3, 0.4, 0.2, 0.1])[0]):
+                author, work = rng.choice(CITATION_AUTHORS)
+                cit = {
+                    "author": author,
+                    "work": work,
+                    "greek": " ".join(
+                        self.lemma_text[self._skewed_rank(rng, 1.0)]
+                        for _ in range(rng.randint(1, 6))
+                    ),
+                }
+                if rng.random() < 0.5:
+                    cit["translation"] = f"the {self._gloss(rank, s)}"
+                citations.append(cit)
+            senses.append(
+                {
+                    "id": f"n{rank}.{s}",
+                    "definition": f"{self._gloss(rank, s)}, {self._gloss(rank, s + 5)}",
+                    "citations": citations,
+                }
+            )
+        return json.dumps(
+            {"headword": self.lemma_text[rank], "senses": senses}, ensure_ascii=False
+        )
+
+    # --- WRITERS ---
+    def _insert_stream(self, cursor, sql, rows):
+        total = 0
+        rows = iter(rows)
+        while True:
+            chunk = list(itertools.islice(rows, INSERT_BATCH))
+            if not chunk:
+                return total
+            cursor.executemany(sql, chunk)
+            total += len(chunk)
+
+    def write_db(self):
+        self.db_path.unlink(missing_ok=True)
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("PRAGMA journal_mode = OFF")
+        cursor.execute("PRAGMA synchronous = OFF")
+
+        # The union of the columns written by migrations 1-7
+        cursor.execute(
+            """
+            CREATE TABLE lsj_entries (
+                id INTEGER PRIMARY KEY,
+                canonical_key TEXT UNIQUE,
+                headword TEXT,
+                entry_json TEXT
+            )
+            """
+        )
+        cursor.execute(
+            """
+            CREATE TABLE lemmas (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                lemma_text TEXT NOT NULL UNIQUE,
+                pos TEXT,
+                ipa TEXT,
+                greek_def TEXT,
+                modern_def TEXT,
+                english_def TEXT,
+                ancient_definitions TEXT,
+                ancient_citations TEXT,
+                etymology_json TEXT,
+                etymology_text TEXT,
+                lsj_id INTEGER,
+                kds_score INTEGER,
+                shift_type TEXT,
+                semantic_warning TEXT,
+                frequency_score REAL,
+                FOREIGN KEY(lsj_id) REFERENCES lsj_entries(id)
+            )
+            """
+        )
+        cursor.execute(
+            "CREATE TABLE forms (id INTEGER PRIMARY KEY AUTOINCREMENT, lemma_id INTEGER NOT NULL, form_text TEXT NOT NULL, tags_json TEXT, FOREIGN KEY(lemma_id) REFERENCES lemmas(id))"
+        )
+        cursor.execute(
+            "CREATE TABLE relations (id INTEGER PRIMARY KEY AUTOINCREMENT, child_lemma_id INTEGER NOT NULL, parent_lemma_text TEXT NOT NULL, relation_type TEXT, FOREIGN KEY(child_lemma_id) REFERENCES lemmas(id))"
+        )
+
+        lsj_rows, lsj_links = self._lsj_rows()
+        self.counts["lsj_entries"] = self._insert_stream(
+            cursor,
+            "INSERT INTO lsj_entries (id, canonical_key, headword, entry_json) VALUES (?, ?, ?, ?)",
+            lsj_rows,
+        )
+        self.counts["lemmas"] = self._insert_stream(
+            cursor,
+            """
+            INSERT INTO lemmas (id, lemma_text, pos, ipa, greek_def, modern_def, english_def,
+                                ancient_definitions, ancient_citations, etymology_json,
+                                etymology_text, lsj_id, kds_score, shift_type,
+                                semantic_warning, frequency_score)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            self._lemma_rows(lsj_links),
+        )
+        self.counts["forms"] = self._insert_stream(
+            cursor,
+            "INSERT INTO forms (lemma_id, form_text, tags_json) VALUES (?, ?, ?)",
+            self._form_rows(),
+        )
+        self.counts["relations"] = self._insert_stream(
+            cursor,
+            "INSERT INTO relations (child_lemma_id, parent_lemma_text, relation_type) VALUES (?, ?, ?)",
+            self._relation_rows(),
+        )
+        # Same secondary index migration 4 creates
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_forms_lemma ON forms(lemma_id)")
+        conn.commit()
+        conn.close()
+
+    def write_kelly(self):
+        rng = self._rng("kelly")
+        with open(self.kelly_path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(KELLY_COLUMNS)
+            for rank in range(self.kelly_size):
+                lemma = self.lemma_text[rank]
+                pos = self.lemma_pos[rank]
+                gloss = self._gloss(rank)
+                others = [self.lemma_text[self._skewed_rank(rng, 1.0) % self.kelly_size] for _ in range(3)]
+                examples = [
+                    f"Ο {lemma} είναι {others[0]}.",
+                    f"Είδα τον {others[1]} με το {lemma}.",
+                ]
+                writer.writerow(
+                    [
+                        rank + 1,
+                        lemma,
+                        POS_GREEK[pos],
+                        CEFR[min(int(rank / self.kelly_size * 6), 5)],
+                        self._frequency(rank),
+                        f"the {gloss}",
+                        f"{gloss} ({POS_GREEK[pos]})",
+                        rng.choice(SHIFT_TYPES),
+                        "",
+                        f"From Ancient Greek {lemma}",
+                        lemma,
+                        f"{lemma} '{gloss}'",
+                        " || ".join(examples),
+                        others[2],
+                        round(rng.random(), 4),
+                    ]
+                )
+
+    def write_knots(self):
+        rng = self._rng("knots")
+        endings = {
+            "Noun": [(cls[1], cls[0][:4].capitalize()) for cls in NOUN_CLASSES],
+            "Verb": [("ω", ""), ("ώ", ""), ("ομαι", ""), ("άω", "")],
+            "Adjective": [("ος", ""), ("ής", ""), ("ύς", "")],
+        }
+        with open(self.knots_path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(KNOT_COLUMNS)
+            n_syntax = max(1, self.n_knots // 6)
+            for i in range(self.n_knots - n_syntax):
+                pos_tag = rng.choices(["Noun", "Verb", "Adjective"], [0.5, 0.3, 0.2])[0]
+                ending, gender = rng.choice(endings[pos_tag])
+                plural = rng.random() < 0.25
+                writer.writerow(
+                    [
+                        f"K{i + 1:04d}",
+                        f"{pos_tag} in -{ending}",
+                        pos_tag,
+                        ending,
+                        gender if pos_tag == "Noun" else "",
+                        f"{pos_tag} in -{ending}" + (" (plural)" if plural else ""),
+                        f"Stress pattern {i % 7}",
+                        self.lemma_text[rng.randrange(self.kelly_size)],
+                    ]
+                )
+            for j in range(n_syntax):
+                writer.writerow(
+                    [f"S{j + 1:04d}", "Syntax", "Syntax", "", "", f"Syntax rule {j}", "", ""]
+                )
+
+    def write_vectors(self):
+        """One embedding per Kelly row (aligned like src.precompute_vectors)."""
+        rng = np.random.default_rng(self.seed)
+        vectors = rng.standard_normal((self.kelly_size, self.vector_dim), dtype=np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        with open(self.vectors_path, "wb") as f:
+            pickle.dump(vectors, f)
+
+    def build(self):
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        start = time.perf_counter()
+        self._plan_lemmas()
+        self.kelly_size = min(self.kelly_size, self.n_lemmas)
+        logger.info(f"Planned {self.n_lemmas} lemmas ({len(self.parent_rank)} form_of children).")
+
+        self.write_db()
+        self.write_kelly()
+        self.write_knots()
+        if self.vector_dim:
+            self.write_vectors()
+
+        self.counts["kelly"] = self.kelly_size
+        self.counts["knots"] = self.n_knots
+        manifest = {
+            "seed": self.seed,
+            "n_lemmas": self.n_lemmas,
+            "forms_per_lemma": self.forms_per_lemma,
+            "vector_dim": self.vector_dim,
+            "counts": self.counts,
+            "seconds": round(time.perf_counter() - start, 2),
+        }
+        with open(self.manifest_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        logger.info(f"Fixture ready in {self.out_dir}: {self.counts}")
+        return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic lexicon at scale")
+    parser.add_argument("--preset", choices=list(PRESETS))
+    parser.add_argument("--lemmas", type=int)
+    parser.add_argument("--forms-per-lemma", type=float)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--kelly-size", type=int, default=6_000)
+    parser.add_argument("--knots", type=int, default=120)
+    parser.add_argument("--vector-dim", type=int, default=768)
+    parser.add_argument("--out", type=Path)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    params = dict(PRESETS.get(args.preset, PRESETS["10k"]))
+    if args.lemmas:
+        params["lemmas"] = args.lemmas
+    if args.forms_per_lemma:
+        params["forms_per_lemma"] = args.forms_per_lemma
+
+    out_dir = args.out or SCALE_DIR / (args.preset or str(params["lemmas"]))
+    generator = ScaleFixtureGenerator(
+        n_lemmas=params["lemmas"],
+        forms_per_lemma=params["forms_per_lemma"],
+        seed=args.seed,
+        out_dir=out_dir,
+        kelly_size=args.kelly_size,
+        n_knots=args.knots,
+        vector_dim=args.vector_dim,
+    )
+    generator.build()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""Local stand-ins for the Gemini and ElevenLabs APIs."""
+
+import argparse
+import hashlib
+import json
+import logging
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+ROW_ID_PATTERN = re.compile(r'"id":\s*"([^"]+)"')
+
+# A valid MPEG-1 Layer III frame header (128 kbps, 44.1 kHz); the payload is filler.
+MP3_FRAME_HEADER = b"\xff\xfb\x90\x64"
+MP3_FRAME_SIZE = 417
+
+GREEK_WORDS = ["ο", "άνθρωπος", "βλέπει", "τη", "θάλασσα", "και", "το", "φως", "της", "μοίρας"]
+ENGLISH_WORDS = ["the", "man", "sees", "sea", "and", "light", "of", "fate"]
+
+
+class StandInBehaviour:
+    """Latency and failure profile shared by the handler threads of one server."""
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, seed=0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+
+    def draw(self):
+        """Returns (delay_seconds, should_fail) for the next request."""
+        with self._lock:
+            self.requests += 1
+            delay = self.latency_ms + self._rng.uniform(-self.jitter_ms, self.jitter_ms)
+            fail = self._rng.random() < self.error_rate
+            if fail:
+                self.errors += 1
+        return max(delay, 0.0) / 1000.0, fail
+
+
+def _digest(text):
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+
+def fake_worksheet(prompt):
+    """One filled row per row id found in the prompt, derived from the id alone."""
+    rows = []
+    for row_id in ROW_ID_PATTERN.findall(prompt):
+        d = _digest(row_id)
+        greek = " ".join(GREEK_WORDS[b % len(GREEK_WORDS)] for b in d[:6])
+        english = " ".join(ENGLISH_WORDS[b % len(ENGLISH_WORDS)] for b in d[6:12])
+        rows.append(
+            {
+                "id": row_id,
+                "target_sentence": greek.capitalize() + ".",
+                "source_sentence": english.capitalize() + ".",
+                "knot_context": f"Stand-in context {d[12]:02x}",
+            }
+        )
+    return rows
+
+
+def fake_translation(text):
+    """Deterministic English-looking rendering of a Greek text, one word per source word."""
+    d = _digest(text)
+    words = max(1, len(text.split()))
+    return " ".join(ENGLISH_WORDS[d[i % len(d)] % len(ENGLISH_WORDS)] for i in range(words))
+
+
+def fake_mp3(text):
+    """Deterministic MP3-shaped bytes: one frame per ~8 characters of text."""
+    seed = _digest(text)
+    frames = max(1, len(text) // 8)
+    payload = (seed * (MP3_FRAME_SIZE // len(seed) + 1))[: MP3_FRAME_SIZE - len(MP3_FRAME_HEADER)]
+    return b"ID3\x03\x00\x00\x00\x00\x00\x00" + (MP3_FRAME_HEADER + payload) * frames
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    behaviour = None  # set per server class
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        try:
+            return json.loads(raw or b"{}")
+        except json.JSONDecodeError:
+            return {}
+
+    def _send(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status, payload):
+        self._send(status, json.dumps(payload, ensure_ascii=False).encode("utf-8"), "application/json")
+
+    def do_POST(self):
+        payload = self._read_json()
+        delay, fail = self.behaviour.draw()
+        if delay:
+            time.sleep(delay)
+        if fail:
+            self._send_json(503, {"error": {"code": 503, "message": "Stand-in overloaded", "status": "UNAVAILABLE"}})
+            return
+        self.respond(payload)
+
+    def respond(self, payload):
+        """Answers a request that passed the fault draw; subclasses serve their endpoint."""
+        self._send_json(404, {"error": {"code": 404, "message": "Not found"}})
+
+
+class GeminiHandler(_StandInHandler):
+    def respond(self, payload):
+        if not self.path.split("?")[0].endswith(":generateContent"):
+            self._send_json(404, {"error": {"code": 404, "message": "Not found"}})
+            return
+        prompt = "".join(
+            part.get("text", "")
+            for content in payload.get("contents", [])
+            for part in content.get("parts", [])
+        )
+        text = json.dumps(fake_worksheet(prompt), ensure_ascii=False)
+        self._send_json(
+            200,
+            {
+                "candidates": [
+                    {
+                        "content": {"role": "model", "parts": [{"text": text}]},
+                        "finishReason": "STOP",
+                        "index": 0,
+                    }
+                ],
+                "usageMetadata": {
+                    "promptTokenCount": len(prompt) // 4,
+                    "candidatesTokenCount": len(text) // 4,
+                },
+            },
+        )
+
+
+class ElevenLabsHandler(_StandInHandler):
+    def respond(self, payload):
+        if not self.path.startswith("/v1/text-to-speech/"):
+            self._send_json(404, {"detail": "Not found"})
+            return
+        self._send(200, fake_mp3(payload.get("text", "")), "audio/mpeg")
+
+
+class StandInServer:
+    """Runs one stand-in on a background thread (port 0 picks a free port)."""
+
+    def __init__(self, handler, behaviour, host="127.0.0.1", port=0):
+        handler_cls = type(handler.__name__, (handler,), {"behaviour": behaviour})
+        self.behaviour = behaviour
+        self.httpd = ThreadingHTTPServer((host, port), handler_cls)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def start_gemini(latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, seed=0, port=0):
+    return StandInServer(
+        GeminiHandler, StandInBehaviour(latency_ms, jitter_ms, error_rate, seed), port=port
+    ).start()
+
+
+def start_elevenlabs(latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, seed=0, port=0):
+    return StandInServer(
+        ElevenLabsHandler, StandInBehaviour(latency_ms, jitter_ms, error_rate, seed), port=port
+    ).start()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local Gemini / ElevenLabs stand-ins")
+    parser.add_argument("--gemini-port", type=int, default=8701)
+    parser.add_argument("--elevenlabs-port", type=int, default=8702)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    profile = (args.latency_ms, args.jitter_ms, args.error_rate, args.seed)
+    gemini = start_gemini(*profile, port=args.gemini_port)
+    elevenlabs = start_elevenlabs(*profile, port=args.elevenlabs_port)
+    logger.info(f"GEMINI_BASE_URL={gemini.url}")
+    logger.info(f"ELEVENLABS_BASE_URL={elevenlabs.url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        gemini.stop()
+        elevenlabs.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+import contextvars
+import functools
+import json
+import logging
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# The active trace (one per request) and the innermost open span.
+# ContextVars follow the request across FastAPI's threadpool and asyncio tasks.
+_current_trace = contextvars.ContextVar("kombyphantike_trace", default=None)
+_current_span = contextvars.ContextVar("kombyphantike_span", default=None)
+
+
+class Span:
+    """
+    One timed region: wall clock (perf_counter) and CPU (thread_time).
+    cpu=False records wall time only, for spans whose thread also runs other work.
+    """
+
+    __slots__ = (
+        "name",
+        "category",
+        "parent",
+        "depth",
+        "thread_id",
+        "start_wall",
+        "end_wall",
+        "start_cpu",
+        "end_cpu",
+        "args",
+    )
+
+    def __init__(self, name, category, parent, args, cpu=True):
+        self.name = name
+        self.category = category
+        self.parent = parent
+        self.depth = parent.depth + 1 if parent else 0
+        self.thread_id = threading.get_ident()
+        self.args = args
+        self.start_wall = time.perf_counter()
+        self.start_cpu = time.thread_time() if cpu else None
+        self.end_wall = None
+        self.end_cpu = None
+
+    def finish(self):
+        if self.start_cpu is not None:
+            self.end_cpu = time.thread_time()
+        self.end_wall = time.perf_counter()
+
+    @property
+    def wall_ms(self):
+        end = self.end_wall if self.end_wall is not None else time.perf_counter()
+        return (end - self.start_wall) * 1000.0
+
+    @property
+    def cpu_ms(self):
+        if self.start_cpu is None:
+            return None
+        end = self.end_cpu if self.end_cpu is not None else time.thread_time()
+        return (end - self.start_cpu) * 1000.0
+
+
+class Trace:
+    """Collects the spans of a single request (or CLI run)."""
+
+    def __init__(self, name="request"):
+        self.name = name
+        self.origin = time.perf_counter()
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def _add(self, span_obj):
+        with self._lock:
+            self.spans.append(span_obj)
+
+    def summary(self):
+        """
+        Aggregates spans by name: {name: {"count", "wall_ms", "cpu_ms"}} (first-seen order).
+        cpu_ms is None for wall-time-only spans.
+        """
+        totals = {}
+        for s in self.spans:
+            entry = totals.setdefault(s.name, {"count": 0, "wall_ms": 0.0, "cpu_ms": 0.0})
+            entry["count"] += 1
+            entry["wall_ms"] += s.wall_ms
+            cpu_ms = s.cpu_ms
+            if cpu_ms is None or entry["cpu_ms"] is None:
+                entry["cpu_ms"] = None
+            else:
+                entry["cpu_ms"] += cpu_ms
+        return totals
+
+    def server_timing(self):
+        """
+        Renders the summary as a Server-Timing header value.
+        DB calls are aggregated per method so the header stays small.
+        """
+        metrics = []
+        for name, entry in self.summary().items():
+            metric = re.sub(r"[^A-Za-z0-9._-]", "_", name)
+            desc = f'n={entry["count"]}'
+            if entry["cpu_ms"] is not None:
+                desc += f' cpu={entry["cpu_ms"]:.2f}ms'
+            metrics.append(f'{metric};dur={entry["wall_ms"]:.2f};desc="{desc}"')
+        return ", ".join(metrics)
+
+    def to_chrome_trace(self):
+        """Chrome Trace Event Format (chrome://tracing, Perfetto, speedscope)."""
+        pid = os.getpid()
+        events = []
+        for s in self.spans:
+            args = {"depth": s.depth}
+            if s.cpu_ms is not None:
+                args["cpu_ms"] = round(s.cpu_ms, 3)
+            args.update(s.args)
+            events.append(
+                {
+                    "name": s.name,
+                    "cat": s.category,
+                    "ph": "X",
+                    "ts": round((s.start_wall - self.origin) * 1e6, 1),
+                    "dur": round(s.wall_ms * 1000.0, 1),
+                    "pid": pid,
+                    "tid": s.thread_id,
+                    "args": args,
+                }
+            )
+        events.sort(key=lambda e: (e["ts"], -e["dur"]))
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {"trace": self.name},
+        }
+
+    def dump(self, path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome_trace(), f, ensure_ascii=False, default=str)
+        logger.info(f"Trace written to {path}")
+        return path
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+@contextmanager
+def start_trace(name="request"):
+    """Activates a fresh Trace for the enclosed block and yields it."""
+    trace = Trace(name)
+    trace_token = _current_trace.set(trace)
+    span_token = _current_span.set(None)
+    try:
+        yield trace
+    finally:
+        _current_span.reset(span_token)
+        _current_trace.reset(trace_token)
+
+
+@contextmanager
+def span(name, category="stage", cpu=True, **args):
+    """
+    Times the enclosed block as a child of the current span.
+    Without an active trace this is a no-op, so instrumentation is free in batch runs.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+
+    s = Span(name, category, _current_span.get(), args, cpu=cpu)
+    token = _current_span.set(s)
+    try:
+        yield s
+    finally:
+        s.finish()
+        _current_span.reset(token)
+        trace._add(s)
+
+
+def traced(name=None, category="stage"):
+    """Decorator form of span(); defaults to the function's name."""
+
+    def decorator(func):
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current_trace.get() is None:
+                return func(*args, **kwargs)
+            with span(span_name, category):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
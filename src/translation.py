@@ -0,0 +1,207 @@
+"""Machine translation of Greek definitions, with rate limiting and a translation memory."""
+
+import logging
+import os
+import random
+import re
+import threading
+import time
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from src.stand_ins import StandInBehaviour, fake_translation
+
+logger = logging.getLogger(__name__)
+
+TRANSLATION_BACKEND = os.environ.get("TRANSLATION_BACKEND", "google")
+WORKERS = 4  # Concurrent requests in flight
+REQUESTS_PER_SECOND = 1.0  # Starting (and highest) request rate of the bucket
+MIN_REQUESTS_PER_SECOND = 0.05  # Floor the rate never backs off below
+MAX_RETRIES = 4  # Attempts per batch beyond the first
+BACKOFF_SECONDS = 2.0  # First retry delay; doubles with each attempt
+
+WHITESPACE = re.compile(r"\s+")
+
+
+def memory_key(text):
+    """Translation-memory key of a source text: NFC, whitespace collapsed, stripped."""
+    return WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+class GoogleBackend:
+    """The public Google endpoint through deep_translator (no API key)."""
+
+    name = "google"
+
+    def __init__(self, source="el", target="en"):
+        from deep_translator import GoogleTranslator
+
+        self.translator = GoogleTranslator(source=source, target=target)
+
+    def translate_batch(self, texts):
+        return self.translator.translate_batch(list(texts))
+
+
+class StandInBackend:
+    """Offline backend: deterministic fake translations, with the latency and errors of a StandInBehaviour."""
+
+    name = "stand-in"
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, seed=0):
+        self.behaviour = StandInBehaviour(latency_ms, jitter_ms, error_rate, seed)
+
+    def translate_batch(self, texts):
+        delay, fail = self.behaviour.draw()
+        if delay:
+            time.sleep(delay)
+        if fail:
+            raise ConnectionError("Stand-in translator overloaded")
+        return [fake_translation(text) for text in texts]
+
+
+BACKENDS = {backend.name: backend for backend in (GoogleBackend, StandInBackend)}
+
+
+def make_backend(name=None):
+    """Backend instance by name (default: TRANSLATION_BACKEND)."""
+    name = name or TRANSLATION_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown translation backend {name!r}; expected one of {sorted(BACKENDS)}")
+    return BACKENDS[name]()
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second, up to `capacity`
+    banked. `penalize` halves the rate (down to min_rate) after a failure;
+    `reward` adds `step` back (up to the starting rate) after a success.
+    """
+
+    def __init__(self, rate=REQUESTS_PER_SECOND, capacity=1, min_rate=MIN_REQUESTS_PER_SECOND, step=None,
+                 clock=time.monotonic, sleep=time.sleep):
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.step = rate / 10 if step is None else step
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        """Blocks until a token is available, then takes it."""
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            self.sleep(wait)
+
+    def penalize(self):
+        with self._lock:
+            self._refill()
+            self.rate = max(self.min_rate, self.rate / 2)
+            logger.info(f"Translation rate backed off to {self.rate:.2f} requests/s")
+
+    def reward(self):
+        with self._lock:
+            self._refill()
+            self.rate = min(self.max_rate, self.rate + self.step)
+
+
+class TranslationMemory:
+    """Source -> translation, persisted in the database being migrated."""
+
+    TABLE = "translation_memory"
+
+    def __init__(self, conn):
+        self.conn = conn
+        conn.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {self.TABLE} (
+                source_key TEXT PRIMARY KEY,
+                translation TEXT NOT NULL,
+                backend TEXT
+            ) WITHOUT ROWID
+            """
+        )
+        conn.commit()
+
+    def lookup(self, keys) -> dict:
+        """memory_key -> translation, for the keys already translated."""
+        found = {}
+        keys = list(keys)
+        for i in range(0, len(keys), 500):  # Within SQLite's bound-parameter limit
+            chunk = keys[i : i + 500]
+            placeholders = ", ".join("?" for _ in chunk)
+            found.update(
+                self.conn.execute(
+                    f"SELECT source_key, translation FROM {self.TABLE} WHERE source_key IN ({placeholders})", chunk
+                ).fetchall()
+            )
+        return found
+
+    def store(self, cursor, translations, backend=None):
+        """Records memory_key -> translation pairs in the caller's transaction."""
+        cursor.executemany(
+            f"""
+            INSERT INTO {self.TABLE} (source_key, translation, backend) VALUES (?, ?, ?)
+            ON CONFLICT(source_key) DO UPDATE SET translation = excluded.translation, backend = excluded.backend
+            """,
+            ((key, translation, backend) for key, translation in translations.items()),
+        )
+
+
+def translate_with_retry(backend, texts, bucket, retries=MAX_RETRIES, backoff=BACKOFF_SECONDS, sleep=time.sleep):
+    """
+    One batch through the backend, under the bucket. A failure (an exception
+    or a result of the wrong length) backs the bucket off and retries after
+    backoff * 2**attempt seconds, with jitter. Returns the translations, or
+    None once the retries are spent.
+    """
+    for attempt in range(retries + 1):
+        bucket.acquire()
+        try:
+            translations = backend.translate_batch(texts)
+            if len(translations) != len(texts):
+                raise ValueError(f"expected {len(texts)} translations, got {len(translations)}")
+        except Exception as e:
+            bucket.penalize()
+            if attempt == retries:
+                logger.error(f"Translation batch failed after {retries + 1} attempts: {e}")
+                return None
+            delay = backoff * 2**attempt * random.uniform(0.5, 1.5)
+            logger.warning(f"Translation attempt {attempt + 1} failed ({e}); retrying in {delay:.1f}s")
+            sleep(delay)
+            continue
+        bucket.reward()
+        return translations
+    return None
+
+
+def translate_batches(backend, batches, bucket, workers=WORKERS, **retry_options):
+    """
+    Translates lists of source texts on `workers` threads. Yields
+    (texts, translations) in completion order; translations is None for a
+    batch that failed every retry.
+    """
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        futures = {
+            executor.submit(translate_with_retry, backend, texts, bucket, **retry_options): texts
+            for texts in batches
+        }
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+    finally:
+        # On an interrupt, queued batches are dropped rather than sent
+        executor.shutdown(cancel_futures=True)
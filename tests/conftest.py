@@ -0,0 +1,48 @@
+import sys
+from unittest.mock import MagicMock
+
+import pytest
+
+# Test file -> modules it put in sys.modules while being imported: its MagicMocks,
+# and the src modules imported on top of them.
+_file_modules = {}
+
+
+def _owned(name, module):
+    return isinstance(module, MagicMock) or name == "src" or name.startswith("src.")
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_make_collect_report(collector):
+    if not isinstance(collector, pytest.Module):
+        return (yield)
+    before = dict(sys.modules)
+    report = yield
+    installed = {
+        name: module
+        for name, module in sys.modules.items()
+        if before.get(name) is not module and _owned(name, module)
+    }
+    if any(isinstance(module, MagicMock) for module in installed.values()):
+        # Take the mocks back out so the next test file imports the real modules
+        _file_modules[collector.path] = installed
+        for name in installed:
+            if name in before:
+                sys.modules[name] = before[name]
+            else:
+                del sys.modules[name]
+    return report
+
+
+@pytest.fixture(autouse=True)
+def module_mocks(request):
+    """Puts back, for the duration of each test, the module mocks its file installed."""
+    installed = _file_modules.get(request.node.path, {})
+    saved = {name: sys.modules.get(name) for name in installed}
+    sys.modules.update(installed)
+    yield
+    for name, module in saved.items():
+        if module is None:
+            sys.modules.pop(name, None)
+        else:
+            sys.modules[name] = module
@@ -1,5 +1,5 @@
 import sys
-from unittest.mock import MagicMock, AsyncMock, patch
+from unittest.mock import MagicMock, patch
 import base64
 import json
 
@@ -24,7 +24,7 @@ from src.api import app
 
 client = TestClient(app)
 
-@patch("src.api.generate_audio", new_callable=AsyncMock)
+@patch("src.api.generate_audio")
 def test_speak_endpoint(mock_generate_audio):
     # Setup mock
     # Return a valid base64 string (e.g., of "dummy mp3")
@@ -1,5 +1,5 @@
 import sys
-from unittest.mock import MagicMock, AsyncMock, patch
+from unittest.mock import MagicMock, patch
 import base64
 import json
 
@@ -24,7 +24,7 @@ from src.api import app
 
 client = TestClient(app)
 
-@patch("src.api.generate_audio", new_callable=AsyncMock)
+@patch("src.api.generate_audio")
 def test_speak_single_word(mock_generate_audio):
     # Setup mock
     mock_generate_audio.return_value = base64.b64encode(b"dummy mp3 content").decode("utf-8")
@@ -45,7 +45,7 @@ def test_speak_single_word(mock_generate_audio):
     # Verify mock was called correctly
     mock_generate_audio.assert_called_once_with("άνθρωπος")
 
-@patch("src.api.generate_audio", new_callable=AsyncMock)
+@patch("src.api.generate_audio")
 def test_speak_sentence(mock_generate_audio):
     # Setup mock
     mock_generate_audio.return_value = base64.b64encode(b"dummy mp3 content").decode("utf-8")
@@ -0,0 +1,70 @@
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+# Adjust sys.path to include src
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+# Mock spacy before importing kombyphantike
+sys.modules["spacy"] = MagicMock()
+sys.modules["sentence_transformers"] = MagicMock()
+
+from src import benchmark
+
+
+class TestBenchmark(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.fixture = benchmark.SyntheticFixture(300, workdir=self.tmp.name)
+        self.engine = benchmark.build_engine(self.fixture)
+
+    def tearDown(self):
+        self.engine.db.close()
+        self.tmp.cleanup()
+
+    def test_fixture_is_deterministic(self):
+        with tempfile.TemporaryDirectory() as other:
+            again = benchmark.SyntheticFixture(300, workdir=other)
+            self.assertEqual(again.lemmas, self.fixture.lemmas)
+            self.assertEqual(again.sentence(), self.fixture.sentence())
+
+    def test_fixture_drives_engine(self):
+        lemma = self.fixture.lemmas[0][0]
+        self.assertTrue(self.engine.db.get_paradigm(lemma))
+        self.assertIsNotNone(self.engine.db.get_metadata(lemma))
+
+        words = self.engine.select_words(benchmark.THEME, 10)
+        self.assertGreater(len(words), 0)
+
+        tokens = self.engine._tokenize(self.fixture.sentence(), "el")
+        self.assertTrue(all(t["has_paradigm"] for t in tokens))
+
+    def test_cases_produce_timings(self):
+        cases = benchmark.build_cases(
+            self.fixture, self.engine, benchmark.build_converter()
+        )
+        self.assertIn("compile_curriculum", cases)
+        func, ops = cases["db.get_paradigm"]
+        stats = benchmark.time_case(func, ops, repeat=2)
+        self.assertEqual(stats["ops"], ops)
+        self.assertGreater(stats["median_ms"], 0)
+
+    def test_compare_flags_regressions(self):
+        baseline = {"results": {"small": {"a": {"median_ms": 1.0}, "b": {"median_ms": 1.0}}}}
+        current = {
+            "results": {
+                "small": {
+                    "a": {"median_ms": 1.5},
+                    "b": {"median_ms": 1.1},
+                    "c": {"median_ms": 2.0},
+                }
+            }
+        }
+        status = {row[1]: row[5] for row in benchmark.compare(current, baseline, 0.25)}
+        self.assertEqual(status, {"a": "REGRESSION", "b": "OK", "c": "NEW"})
+
+
+if __name__ == "__main__":
+    unittest.main()
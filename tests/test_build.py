@@ -0,0 +1,152 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# Adjust sys.path to include src
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.build import STAGES, Builder, FileHasher, Stage, resolve_target
+
+WORKDIR = None  # Set per test before the pool forks
+
+
+def log_run(name):
+    with open(WORKDIR / "runs.log", "a", encoding="utf-8") as f:
+        f.write(name + "\n")
+
+
+def make_a():
+    log_run("a")
+    text = (WORKDIR / "src.txt").read_text(encoding="utf-8")
+    (WORKDIR / "a.out").write_text(text.strip().upper(), encoding="utf-8")
+
+
+def make_b():
+    log_run("b")
+    with open(WORKDIR / "db.txt", "a", encoding="utf-8") as f:
+        f.write("b\n")
+
+
+def make_c():
+    log_run("c")
+    with open(WORKDIR / "db.txt", "a", encoding="utf-8") as f:
+        f.write("c:" + (WORKDIR / "a.out").read_text(encoding="utf-8") + "\n")
+
+
+def fail():
+    log_run("broken")
+    raise RuntimeError("boom")
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.setattr(sys.modules[__name__], "WORKDIR", tmp_path)
+    (tmp_path / "src.txt").write_text("alpha\n", encoding="utf-8")
+    (tmp_path / "other.txt").write_text("beta", encoding="utf-8")
+    return tmp_path
+
+
+def toy_stages(workdir, broken=False):
+    stages = [
+        Stage("a", (__name__, "make_a"), inputs=[workdir / "src.txt"], outputs=[workdir / "a.out"]),
+        Stage("b", (__name__, "make_b"), inputs=[workdir / "other.txt"], writes=[workdir / "db.txt"]),
+        Stage("c", (__name__, "make_c"), writes=[workdir / "db.txt"], deps=["a", "b"]),
+    ]
+    if broken:
+        stages.insert(0, Stage("broken", (__name__, "fail")))
+        stages[-1].deps.append("broken")
+    return stages
+
+
+def runs(workdir):
+    path = workdir / "runs.log"
+    names = path.read_text(encoding="utf-8").split() if path.exists() else []
+    path.unlink(missing_ok=True)
+    return sorted(names)
+
+
+def build(workdir, targets=None, **kwargs):
+    builder = Builder(toy_stages(workdir, **kwargs), state_file=workdir / "state.json", workers=2)
+    return builder.build(targets)
+
+
+def test_skips_unchanged_stages(workdir):
+    report = build(workdir)
+    assert {name: status for name, (status, _) in report.items()} == {"a": "ran", "b": "ran", "c": "ran"}
+    assert runs(workdir) == ["a", "b", "c"]
+
+    report = build(workdir)
+    assert all(status == "skipped" for status, _ in report.values())
+    assert runs(workdir) == []
+
+    # A missing shared file forces its writers to run again
+    (workdir / "db.txt").unlink()
+    build(workdir)
+    assert runs(workdir) == ["b", "c"]
+
+
+def test_reruns_only_what_changed_inputs_reach(workdir):
+    build(workdir)
+    runs(workdir)
+
+    (workdir / "other.txt").write_text("gamma", encoding="utf-8")
+    build(workdir)
+    assert runs(workdir) == ["b", "c"]
+
+    # a reruns, but reproduces the same output: c is cut off
+    (workdir / "src.txt").write_text("alpha", encoding="utf-8")
+    build(workdir)
+    assert runs(workdir) == ["a"]
+
+    (workdir / "src.txt").write_text("delta", encoding="utf-8")
+    builder = Builder(toy_stages(workdir), state_file=workdir / "state.json")
+    assert builder.plan(["c"]) == ["a", "c"]
+    assert builder.plan(["b"]) == []
+    builder.build(["c"])
+    assert runs(workdir) == ["a", "c"]
+    assert (workdir / "db.txt").read_text(encoding="utf-8").splitlines()[-1] == "c:DELTA"
+
+
+def test_failure_blocks_dependents_and_is_retried(workdir):
+    report = build(workdir, broken=True)
+    assert report["broken"][0] == "failed"
+    assert report["c"][0] == "blocked"
+    assert {report["a"][0], report["b"][0]} == {"ran"}
+    assert runs(workdir) == ["a", "b", "broken"]
+
+    report = build(workdir, broken=True)
+    assert report["broken"][0] == "failed" and report["a"][0] == "skipped"
+    assert runs(workdir) == ["broken"]
+
+
+def test_file_hashes_are_cached_by_size_and_mtime(tmp_path):
+    path = tmp_path / "dump.jsonl"
+    path.write_text("{}\n", encoding="utf-8")
+    hasher = FileHasher()
+    digest = hasher.path(path)
+    entry = hasher.cache[str(path)]
+    entry[2] = "cached"
+    assert hasher.path(path) == "cached"  # not re-read
+    path.write_text("{ }\n", encoding="utf-8")
+    assert hasher.path(path) not in ("cached", digest)
+    assert hasher.path(tmp_path / "absent") == "missing"
+
+
+def test_default_dag_is_declared_in_order():
+    seen = set()
+    for stage in STAGES:
+        assert set(stage.deps) <= seen, stage.name
+        assert all(path.exists() for path in stage.code), stage.name
+        seen.add(stage.name)
+
+
+@pytest.mark.parametrize("stage", STAGES, ids=lambda stage: stage.name)
+def test_default_stage_targets_resolve(stage):
+    try:
+        entry = resolve_target(stage.target)
+    except ModuleNotFoundError as e:
+        if e.name and e.name.split(".")[0] != "src":
+            pytest.skip(f"{stage.name} needs {e.name}, not installed here")
+        raise
+    assert callable(entry), stage.name
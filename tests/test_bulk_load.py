@@ -0,0 +1,98 @@
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+# Adjust sys.path to include src
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.bulk_load import Checkpoint, connect, deferred_indexes, insert_many, phase, stage, upsert
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = connect(tmp_path / "bulk.db")
+    conn.execute("CREATE TABLE lemmas (id INTEGER PRIMARY KEY, lemma_text TEXT UNIQUE, pos TEXT, kds INTEGER)")
+    conn.execute("CREATE INDEX idx_lemmas_kds ON lemmas(kds)")
+    yield conn
+    conn.close()
+
+
+def test_connect_applies_bulk_pragmas(conn):
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 0
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "memory"
+
+
+def test_upsert_inserts_and_updates_in_batches(conn):
+    with phase(conn, "load") as cursor:
+        assert insert_many(cursor, "lemmas", ["lemma_text", "pos"], [("λόγος", "noun")]) == 1
+        rows = ((word, "verb", i) for i, word in enumerate(["γράφω", "λόγος", "σπίτι"]))
+        # pos is kept on conflict; kds is refreshed
+        sent = upsert(
+            cursor, "lemmas", ["lemma_text", "pos", "kds"], rows, key=["lemma_text"],
+            update={"kds": "excluded.kds"}, batch_size=2,
+        )
+    assert sent == 3
+    assert conn.execute("SELECT lemma_text, pos, kds FROM lemmas ORDER BY id").fetchall() == [
+        ("λόγος", "noun", 1), ("γράφω", "verb", 0), ("σπίτι", "verb", 2)
+    ]
+
+
+def test_phase_rolls_back_ddl_and_rows_together(conn):
+    with pytest.raises(sqlite3.IntegrityError):
+        with phase(conn, "broken") as cursor:
+            cursor.execute("ALTER TABLE lemmas ADD COLUMN ipa TEXT")
+            insert_many(cursor, "lemmas", ["lemma_text"], [("λόγος",), ("λόγος",)])
+    assert conn.execute("SELECT COUNT(*) FROM lemmas").fetchone()[0] == 0
+    assert "ipa" not in {row[1] for row in conn.execute("PRAGMA table_info(lemmas)")}
+
+
+def test_stage_feeds_a_set_based_update(conn):
+    with phase(conn, "load") as cursor:
+        insert_many(cursor, "lemmas", ["id", "lemma_text"], [(1, "α"), (2, "β"), (3, "γ")])
+        assert stage(cursor, "scores", {"id": "INTEGER PRIMARY KEY", "kds": "INTEGER"}, [(1, 10), (3, 30)]) == 2
+        cursor.execute("UPDATE lemmas SET kds = s.kds FROM temp.scores AS s WHERE lemmas.id = s.id")
+        # Restaging replaces the table
+        assert stage(cursor, "scores", {"id": "INTEGER PRIMARY KEY"}, [(2,)]) == 1
+    assert conn.execute("SELECT kds FROM lemmas ORDER BY id").fetchall() == [(10,), (None,), (30,)]
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    assert "scores" not in tables
+
+
+def test_deferred_indexes_are_recreated(conn):
+    def indexes():
+        return conn.execute("SELECT name, sql FROM sqlite_master WHERE type='index' AND sql IS NOT NULL").fetchall()
+
+    before = indexes()
+    with phase(conn, "load") as cursor:
+        with deferred_indexes(cursor, "lemmas"):
+            assert indexes() == []
+            insert_many(cursor, "lemmas", ["lemma_text", "kds"], ((str(i), i) for i in range(100)))
+    assert indexes() == before
+    plan = conn.execute("EXPLAIN QUERY PLAN SELECT id FROM lemmas WHERE kds = 5").fetchall()
+    assert "idx_lemmas_kds" in plan[0][-1]
+
+
+def test_checkpoint_commits_with_its_batch(conn):
+    checkpoint = Checkpoint(conn, "4_parse")
+    assert checkpoint.position("lemmas", 0) == 0 and not checkpoint.is_done("schema")
+    with phase(conn, "schema") as cursor:
+        checkpoint.finish(cursor, "schema")
+    with phase(conn, "batch 1") as cursor:
+        insert_many(cursor, "lemmas", ["id", "lemma_text"], [(1, "α")])
+        checkpoint.advance(cursor, "lemmas", 1)
+    with pytest.raises(sqlite3.IntegrityError):
+        with phase(conn, "batch 2") as cursor:
+            checkpoint.advance(cursor, "lemmas", 2)
+            insert_many(cursor, "lemmas", ["id", "lemma_text"], [(2, "α")])  # duplicate lemma_text
+
+    resumed = Checkpoint(conn, "4_parse")
+    assert resumed.position("lemmas") == 1 and resumed.is_done("schema")
+    assert Checkpoint(conn, "other").position("lemmas") is None
+    resumed.clear()
+    assert Checkpoint(conn, "4_parse").position("lemmas") is None
+
+    with phase(conn, "batch") as cursor:
+        checkpoint.advance(cursor, "lemmas", 5)
+    assert Checkpoint(conn, "4_parse", resume=False).position("lemmas") is None
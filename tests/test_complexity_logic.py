@@ -16,6 +16,17 @@ sys.modules["transliterate"] = MagicMock()
 from src.kombyphantike import KombyphantikeEngine
 from src.models import ConstellationGraph, ConstellationNode
 
+def expansion(seed, words, etymology):
+    """Column-wise DatabaseManager.expand_relations result."""
+    return {
+        "seed": [seed] * len(words),
+        "lemma": words,
+        "relation_type": ["synonyms"] * len(words),
+        "pos": ["noun"] * len(words),
+        "modern_def": ["def"] * len(words),
+        "etymology_text": [etymology] * len(words),
+    }
+
 class TestComplexityLogic(unittest.TestCase):
 
     def setUp(self):
@@ -87,30 +98,25 @@ class TestComplexityLogic(unittest.TestCase):
         # Lucid limit = 2
         words_df = pd.DataFrame({"Lemma": ["root"], "Part of speech": ["Noun"]})
 
-        # Mock get_relations to return many
-        self.mock_db.get_relations.return_value = {
-            "synonyms": ["s1", "s2", "s3", "s4", "s5"]
-        }
-        self.mock_db.get_metadata.return_value = {"pos": "noun", "definition": "def", "etymology_text": "etym"}
+        # Mock expand_relations to return many
+        self.mock_db.expand_relations.return_value = expansion("root", ["s1", "s2", "s3", "s4", "s5"], "etym")
 
         result_df = self.engine._expand_word_pool(words_df, complexity="lucid")
 
         # We expect 2 new rows added
         self.assertEqual(len(result_df), 3) # 1 original + 2 new
+        self.mock_db.expand_relations.assert_called_once_with(
+            ["root"], ("synonyms", "related", "derived"), 2, exclude={"root"}
+        )
 
     def test_expand_word_pool_complexity_complex_etymology(self):
         # Complex limit = 6 (or 5+), and Etymology
         words_df = pd.DataFrame({"Lemma": ["root"], "Part of speech": ["Noun"]})
 
-        self.mock_db.get_relations.return_value = {
-            "synonyms": ["s1", "s2", "s3", "s4", "s5", "s6"]
-        }
-        # Mock metadata to include etymology
-        self.mock_db.get_metadata.return_value = {
-            "pos": "noun",
-            "definition": "def",
-            "etymology_text": "Ancient Origin"
-        }
+        # No relation graph compiled: falls back to the joined query, with etymology
+        self.mock_db.expand_relations.return_value = expansion(
+            "root", ["s1", "s2", "s3", "s4", "s5", "s6"], "Ancient Origin"
+        )
 
         result_df = self.engine._expand_word_pool(words_df, complexity="complex")
 
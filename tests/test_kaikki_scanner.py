@@ -0,0 +1,180 @@
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Adjust sys.path to include src
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src import kaikki_scanner
+from src.drill_generator import DrillGenerator
+from src.ingestion_hybrid import HybridIngestor
+from src.kaikki_scanner import KaikkiScanner
+from src.noun_declension_extractor import ParadigmExtractor
+
+ENTRIES = [
+    {
+        "word": "γράφω",
+        "lang_code": "el",
+        "pos": "verb",
+        "etymology_text": "From Ancient Greek γράφω.",
+        "senses": [{"glosses": ["γράφω κείμενο"], "examples": [{"text": "'''Γράφω''' γράμμα."}]}],
+        "forms": [
+            {"form": "έγραψα", "raw_tags": ["Αόριστος", "α' ενικ."]},
+            {"form": "grafo", "tags": ["romanization"]},
+        ],
+    },
+    {
+        "word": "λόγος",
+        "lang_code": "el",
+        "pos": "noun",
+        "senses": [{"glosses": ["ομιλία"], "tags": ["formal"]}],
+        "synonyms": [{"word": "ομιλία"}],
+        "forms": [{"form": "λόγου", "raw_tags": ["γενική", "ενικός"]}],
+    },
+    {"word": "λόγος", "lang_code": "el", "pos": "noun", "etymology_text": "Second etymology",
+     "forms": [{"form": "λόγοι", "raw_tags": ["ονομαστική", "πληθυντικός"]}]},
+    {"word": "σπίτι", "lang_code": "el", "pos": "noun", "forms": [{"form": "σπιτιού"}]},
+]
+
+
+@pytest.fixture
+def dump(tmp_path):
+    path = tmp_path / "kaikki-el.jsonl"
+    lines = [json.dumps(entry, ensure_ascii=False) for entry in ENTRIES]
+    lines.insert(2, "{not json")
+    path.write_text("\n".join(lines) + "\n\n", encoding="utf-8")
+    return path
+
+
+def consumers():
+    targets = {"γράφω", "λόγος"}
+    ingestor = HybridIngestor()
+    ingestor.target_lemmas = set(targets)
+    extractor = ParadigmExtractor()
+    extractor.target_lemmas = set(targets)
+    drills = DrillGenerator.__new__(DrillGenerator)  # skip the Kelly load
+    drills.drills, drills.targets = [], set(targets)
+    return ingestor, extractor, drills
+
+
+def test_dispatches_every_entry_to_every_consumer(dump):
+    seen = []
+    scanner = KaikkiScanner(dump)
+    scanner.register(lambda entry: seen.append(("a", entry["word"])))
+    scanner.register(lambda entry: seen.append(("b", entry["word"])))
+    assert scanner.scan() == len(ENTRIES)
+    assert seen[:4] == [("a", "γράφω"), ("b", "γράφω"), ("a", "λόγος"), ("b", "λόγος")]
+    assert len(seen) == 2 * len(ENTRIES)
+
+
+def test_shared_pass_matches_separate_passes(dump, monkeypatch):
+    separate = consumers()
+    ingestor, extractor, drills = separate
+    ingestor.scan_hellenic_core(path=dump)
+    for consumer in (extractor.consume, drills.consume):
+        scanner = KaikkiScanner(dump)
+        scanner.register(consumer)
+        scanner.scan()
+
+    loads = []
+    real_loads = json.loads
+    monkeypatch.setattr(kaikki_scanner.json, "loads", lambda line: loads.append(line) or real_loads(line))
+    shared = consumers()
+    shared[0].scan_hellenic_core(
+        consumers=[(shared[1].consume, shared[1].target_lemmas), (shared[2].consume, shared[2].targets)],
+        path=dump,
+    )
+    # Each line is parsed at most once; the bad line and σπίτι are rejected before parsing
+    assert len(loads) == 3
+
+    assert shared[0].master_lookup == ingestor.master_lookup
+    assert shared[1].paradigms == extractor.paradigms
+    assert shared[2].drills == drills.drills
+
+    logos = ingestor.master_lookup["λόγος"]
+    assert logos["synonyms"] == ["ομιλία"]
+    assert logos["etymology_text_el"] == "Second etymology"
+    assert ingestor.master_lookup["γράφω"]["examples"] == ["Γράφω γράμμα."]
+    assert [f["form"] for f in extractor.paradigms["λόγος"]] == ["λόγου"]  # first entry wins
+    assert "σπίτι" not in extractor.paradigms
+    assert {d["Drill_Type"] for d in drills.drills} == {"Aorist (Past)", "Genitive Sg", "Nominative Pl"}
+
+
+def test_offset_index_fetches_only_requested_words(dump, tmp_path):
+    index = kaikki_scanner.KaikkiIndex(dump).ensure()
+    assert index.index_path == tmp_path / "kaikki-el.jsonl.idx"
+    assert len(index.offsets(["λόγος"])) == 2
+
+    seen = []
+    scanner = KaikkiScanner(dump, words={"λόγος", " σπίτι", "missing"})
+    scanner.register(seen.append)
+    assert scanner.scan() == 3
+    assert seen == [ENTRIES[1], ENTRIES[2], ENTRIES[3]]
+
+    ingestor, _, _ = consumers()
+    ingestor.scan_hellenic_core(path=dump, words={"λόγος"})
+    full, _, _ = consumers()
+    full.scan_hellenic_core(path=dump)
+    assert ingestor.master_lookup["λόγος"] == full.master_lookup["λόγος"]
+
+
+def test_offset_index_is_revalidated(dump):
+    index = kaikki_scanner.KaikkiIndex(dump)
+    assert not index.is_valid()
+    index.ensure()
+    assert index.is_valid()
+
+    # Same content, new mtime: the hash confirms the index
+    stat = dump.stat()
+    os.utime(dump, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert index.is_valid()
+
+    # Same size, different content: stale, rebuilt on demand
+    data = dump.read_bytes()
+    dump.write_bytes(data.replace("γράφω".encode(), "γράψω".encode()))
+    os.utime(dump, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2 * 10**9))
+    assert not index.is_valid()
+    assert [json.loads(line)["word"] for line in index.ensure().read(["γράψω"])] == ["γράψω"]
+
+    dump.write_text("", encoding="utf-8")
+    assert not index.is_valid()
+
+
+def test_parallel_byte_ranges_match_serial_scan(dump):
+    ranges = kaikki_scanner.byte_ranges(dump, chunk_bytes=64)
+    data = dump.read_bytes()
+    assert len(ranges) > 2
+    assert ranges[0][0] == 0 and ranges[-1][1] == len(data)
+    assert all(end == start for (_, end), (start, _) in zip(ranges, ranges[1:]))
+    assert all(data[end - 1 : end] == b"\n" for _, end in ranges)
+
+    results = []
+    for workers in (1, 2):
+        ingestor, extractor, drills = consumers()
+        ingestor.scan_hellenic_core(
+            consumers=[(extractor.consume, extractor.target_lemmas), (drills.consume, drills.targets)],
+            path=dump,
+            workers=workers,
+        )
+        results.append((ingestor.master_lookup, extractor.paradigms, drills.drills))
+    assert results[0] == results[1]
+
+    seen = []
+    scanner = KaikkiScanner(dump, workers=2, chunk_bytes=64)
+    scanner.register(seen.append)
+    assert scanner.scan() == len(ENTRIES)
+    assert seen == ENTRIES  # file order survives the pool
+
+
+def test_early_rejection_reads_every_word_field():
+    keys = frozenset({"λόγος"})
+    escaped = json.dumps({"word": "λόγος", "senses": []}).encode()  # \u escapes
+    assert kaikki_scanner.mentions(escaped, keys)
+    # A synonym mention passes the byte test but not the headword check after parsing
+    synonym = json.dumps({"word": "ομιλία", "synonyms": [{"word": "λόγος"}]}, ensure_ascii=False).encode()
+    assert kaikki_scanner.mentions(synonym, keys)
+    assert kaikki_scanner.parse_lines([escaped, synonym, b"{bad"], keys) == ([{"word": "λόγος", "senses": []}], 0)
+    assert kaikki_scanner.parse_lines([b"{bad"]) == ([], 1)
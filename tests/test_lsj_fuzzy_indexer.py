@@ -0,0 +1,145 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Adjust sys.path to include src
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src import lsj_fuzzy_indexer as indexer
+from src import enrichment_lsj
+from src.beta_code import BetaCodeConverter
+from src.enrichment_lsj import LSJEnricher
+
+
+VOLUME_A = """<?xml version="1.0" encoding="UTF-8"?>
+<TEI.2><text><body><div1>
+  <entryFree key="lo/gos">
+    <orth>lo/gos</orth>
+    <sense n="A"><tr>word</tr>, <foreign>lo/gos</foreign> the spoken word <bibl><author>Hom.</author> Il. 1.1</bibl>
+      <cit><quote>lo/gos e)sti/n</quote><bibl>Pl. Tht. 206d</bibl><tr>it is an account</tr></cit>
+    </sense>
+  </entryFree>
+  <entryFree key="le/gw">
+    <sense n="A"><tns>aor.</tns> <quote>e)/lexa</quote> <bibl>Th. 1.2</bibl><tr>say</tr> <bibl>S. OT 1</bibl></sense>
+  </entryFree>
+  <entryFree key="ko/smos"><sense n="A"><bibl>IG 1.2</bibl></sense></entryFree>
+</div1></body></text></TEI.2>
+"""
+VOLUME_B = """<?xml version="1.0" encoding="UTF-8"?>
+<TEI.2><text><body><div1>
+  <entryFree key="lo/gos2">
+    <sense n="A"><tr>reckoning</tr>
+      <cit><quote>lo/gon dido/nai</quote><bibl>Hdt. 3.1</bibl><tr>render account</tr></cit>
+      <cit><quote>a)/llos lo/gos w)=n ge</quote><bibl>E. Med. 1</bibl></cit>
+    </sense>
+  </entryFree>
+  <entryFree key="qeo/s"><sense n="A"><tr>god</tr></sense></entryFree>
+</div1></body></text></TEI.2>
+"""
+
+
+def build_converter():
+    """BetaCodeConverter with a minimal table (no mapping files needed)."""
+    table = {"a": "α", "d": "δ", "e": "ε", "g": "γ", "i": "ι", "k": "κ", "l": "λ", "n": "ν",
+             "o": "ο", "s": "ς", "q": "θ", "t": "τ", "w": "ω", "x": "ξ", "/": "́", ")": "̓", "=": "͂"}
+    converter = BetaCodeConverter.__new__(BetaCodeConverter)
+    converter.BETA_TO_UNICODE = table
+    converter.UNICODE_TO_BETA = {v: k for k, v in table.items()}
+    converter.UNICODE_TO_BETA["ό"] = "o/"  # precomposed (NFC) form
+    converter._max_beta_key_len = 1
+    return converter
+
+
+def serial_reference(xml_files, converter):
+    """The former loop: merge as each entry arrives, re-sorting colliding candidates every time."""
+    lsj_index = {}
+    for xml_file in xml_files:
+        _, entries, _ = indexer.extract_entries(xml_file, converter)
+        for canon_key, key, final_def, aorist_form, cits in entries:
+            if canon_key not in lsj_index:
+                lsj_index[canon_key] = {"def": final_def, "aor": aorist_form, "cits_list": cits, "original_key": key}
+                continue
+            existing = lsj_index[canon_key]
+            if final_def:
+                if not existing["def"]:
+                    existing["def"] = final_def
+                elif final_def not in existing["def"]:
+                    existing["def"] += " | " + final_def
+            if aorist_form and aorist_form != existing["aor"]:
+                existing["aor"] = f"{existing['aor']} / {aorist_form}" if existing["aor"] else aorist_form
+            existing["cits_list"].extend(cits)
+            existing["cits_list"].sort(key=indexer.waterfall_key)
+            if key not in existing["original_key"]:
+                existing["original_key"] += "; " + key
+    return indexer.curate_gallery(lsj_index)
+
+
+@pytest.fixture
+def lsj_dir(tmp_path):
+    directory = tmp_path / "lsj_xml"
+    directory.mkdir()
+    (directory / "grc.lsj.perseus-eng1.xml").write_text(VOLUME_A, encoding="utf-8")
+    (directory / "grc.lsj.perseus-eng2.xml").write_text(VOLUME_B, encoding="utf-8")
+    return directory
+
+
+def test_merge_matches_serial_reference(lsj_dir, tmp_path):
+    converter = build_converter()
+    json_path = tmp_path / "lsj_index.json"
+    index = indexer.build_index(lsj_dir, tmp_path / "lsj_oracle.db", workers=1, converter=converter, json_path=json_path)
+
+    assert index == serial_reference(sorted(lsj_dir.glob("*.xml")), converter)
+    assert json.loads(json_path.read_text(encoding="utf-8")) == index
+
+    logos = index["logos"]
+    assert logos["original_key"] == "lo/gos; lo/gos2"
+    assert logos["def"] == f"word; {converter.to_greek('lo/gos')} | reckoning"
+    # Waterfall across volumes: tier 1 with translation (Homer), tier 1 (Euripides, volume 2), tier 2
+    assert [c.rsplit("(", 1)[1] for c in logos["cit"].split(" | ")] == ["Hom. Il. 1.1)", "E. Med. 1)", "Pl. Tht. 206d)"]
+    assert index["legw"]["aor"] == converter.to_greek("e)/lexa")
+    assert "kosmos" not in index  # only an IG citation: filtered out
+
+
+def test_parallel_build_is_byte_identical(lsj_dir, tmp_path):
+    converter = build_converter()
+    outputs = []
+    for workers in (1, 2):
+        oracle, json_path = tmp_path / f"oracle{workers}.db", tmp_path / f"index{workers}.json"
+        indexer.build_index(lsj_dir, oracle, workers=workers, converter=converter, json_path=json_path)
+        outputs.append((oracle.read_bytes(), json_path.read_bytes()))
+    assert outputs[0] == outputs[1]
+
+
+def test_broken_volume_keeps_other_volumes(lsj_dir, tmp_path):
+    (lsj_dir / "grc.lsj.perseus-eng2.xml").write_text("<TEI.2><entryFree", encoding="utf-8")
+    index = indexer.build_index(lsj_dir, tmp_path / "oracle.db", workers=1, converter=build_converter())
+    assert set(index) == {"logos", "legw"}
+
+
+def test_enricher_reads_oracle_store_lazily(lsj_dir, tmp_path, monkeypatch):
+    converter = build_converter()
+    oracle = tmp_path / "lsj_oracle.db"
+    index = indexer.build_index(lsj_dir, oracle, workers=1, converter=converter)
+
+    monkeypatch.setattr(enrichment_lsj, "BetaCodeConverter", lambda: converter)
+    enricher = LSJEnricher(oracle_path=oracle)
+    assert enricher.lsj_data == {}  # nothing loaded up front
+
+    word = converter.to_greek("qeo/s")
+    assert enricher.get_data(word) == index["qeos"]
+    assert enricher.get_data(word) is enricher.get_data(word)  # served from the LRU cache
+    assert enricher.get_data("ἄγνωστον") == {"def": "", "aor": "", "cit": ""}
+    assert enricher.get_data(None) == {"def": "", "aor": "", "cit": ""}
+
+
+def test_enricher_falls_back_to_legacy_json(tmp_path, monkeypatch):
+    legacy = tmp_path / "lsj_index.json"
+    legacy.write_text(json.dumps({"qeos": {"def": "god", "aor": "", "cit": ""}}), encoding="utf-8")
+    converter = build_converter()
+    monkeypatch.setattr(enrichment_lsj, "BetaCodeConverter", lambda: converter)
+    monkeypatch.setattr(enrichment_lsj, "LSJ_INDEX_FILE", legacy)
+
+    enricher = LSJEnricher(oracle_path=tmp_path / "missing.db")
+    assert enricher.get_data(converter.to_greek("qeo/s"))["def"] == "god"
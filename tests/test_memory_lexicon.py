@@ -0,0 +1,93 @@
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+# Adjust sys.path to include src
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.database import DatabaseManager
+from src.memory_lexicon import MemoryLexicon
+from src.publish import publish_snapshot
+from src.scale_fixtures import ScaleFixtureGenerator
+
+MIGRATION_DIR = Path(__file__).resolve().parent.parent / "src" / "migration"
+SERVING_MIGRATIONS = [
+    ("8_index_query_plans.py", "create_indexes"),
+    ("9_build_form_index.py", "build_form_index"),
+    ("10_encode_morphology_features.py", "encode_morphology_features"),
+    ("11_pack_paradigms.py", "pack_paradigms"),
+]
+
+
+def load_module(script):
+    spec = importlib.util.spec_from_file_location(Path(script).stem, MIGRATION_DIR / script)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+migrations = [getattr(load_module(script), entry) for script, entry in SERVING_MIGRATIONS]
+
+
+@pytest.fixture(scope="module")
+def lexicon(tmp_path_factory):
+    out_dir = tmp_path_factory.mktemp("lexicon")
+    generator = ScaleFixtureGenerator(n_lemmas=1_200, seed=11, out_dir=out_dir, vector_dim=0)
+    generator.build()
+    for migrate in migrations:
+        migrate(generator.db_path)
+    return generator
+
+
+def probes(generator, db):
+    """Headwords, form_of children, inflected forms and misses."""
+    lemmas = generator.lemma_text[:60] + generator.lemma_text[-60:]
+    forms = [row[0] for row in db.conn.execute("SELECT form_text FROM forms LIMIT 80 OFFSET 300")]
+    return lemmas + forms + ["άγνωστο", ""]
+
+
+def relation_sets(relations):
+    # get_relations has no ORDER BY; SQLite returns rows in covering-index order
+    return {rtype: sorted(targets) for rtype, targets in relations.items()}
+
+
+def assert_same_answers(generator, memory):
+    db = DatabaseManager(db_path=generator.db_path)
+    for word in probes(generator, db):
+        assert memory.get_paradigm(word) == db.get_paradigm(word), word
+        assert memory.get_metadata(word) == db.get_metadata(word), word
+        assert relation_sets(memory.get_relations(word)) == relation_sets(db.get_relations(word))
+        assert memory.resolve_form(word) == db.resolve_form(word), word
+        assert memory.has_feature(word, "number", "plural") == db.has_feature(word, "number", "plural")
+    for theme, lo, hi in [("a", 0, 100), ("fate", 0, 30), ("Fate", 50, 100), ("", 10, 20)]:
+        expected = db.select_words(theme, lo, hi, 25)
+        rows = memory.select_words(theme, lo, hi, 25)
+        assert [r["id"] for r in rows] == [r["id"] for r in expected]
+        # Serving columns only (SELECT * also returns build-only columns)
+        assert all(row.items() <= full.items() for row, full in zip(rows, expected))
+    db.close()
+
+
+def test_matches_database_manager(lexicon):
+    assert_same_answers(lexicon, MemoryLexicon(lexicon.db_path))
+
+
+def test_loads_from_serving_snapshot(lexicon, tmp_path):
+    # The snapshot drops forms.tags_json; paradigms come from the packed blobs
+    target = tmp_path / "serving.db"
+    publish_snapshot(lexicon.db_path, target)
+    assert_same_answers(lexicon, MemoryLexicon(target))
+
+
+def test_memory_footprint(lexicon):
+    memory = MemoryLexicon(lexicon.db_path)
+    footprint = memory.memory_footprint()
+    assert footprint["arrays"] > 0 and footprint["strings"] > 0
+    assert footprint["total"] == sum(v for k, v in footprint.items() if k != "total")
+
+
+def test_missing_database(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        MemoryLexicon(tmp_path / "missing.db")
@@ -0,0 +1,254 @@
+import importlib.util
+import json
+import sqlite3
+import sys
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import pytest
+
+# Adjust sys.path to include src
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.beta_code import BetaCodeConverter
+from src.lsj_tables import entry_rows
+
+MIGRATION_PATH = Path(__file__).resolve().parent.parent / "src" / "migration" / "1_ingest_lsj_deep.py"
+
+
+def load_module():
+    spec = importlib.util.spec_from_file_location("migration_1", MIGRATION_PATH)
+    module = importlib.util.module_from_spec(spec)
+    # Registered so the process pool can pickle parse_volume by reference
+    sys.modules["migration_1"] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+migration = load_module()
+
+TEI = "http://www.tei-c.org/ns/1.0"
+VOLUME_A = f"""<?xml version="1.0" encoding="UTF-8"?>
+<TEI xmlns="{TEI}"><text><body><div1>
+  <entryFree key="lo/gos">
+    <orth>λόγος</orth>
+    <sense n="A">word, <i>speech</i>
+      <cit><quote>lo/gos</quote><tr>the word</tr></cit> tail text
+      <sense n="A.2">reason
+        <cit><author>Homer</author><title>Il.</title><quote>a)/nqrwpos</quote></cit>
+        <cit><author>Plato</author><quote>xxx</quote></cit>
+      </sense>
+    </sense>
+    <sense id="B">account c. gen. of things</sense>
+  </entryFree>
+  <entryFree headword="ἄνθρωπος"><sense n="A">man</sense></entryFree>
+  <entryFree><sense>no key at all</sense></entryFree>
+</div1></body></text></TEI>
+"""
+VOLUME_B = f"""<?xml version="1.0" encoding="UTF-8"?>
+<TEI xmlns="{TEI}"><text><body><div1>
+  <entryFree key="lo/gos"><orth>λόγος</orth><sense n="C">later volume wins</sense></entryFree>
+  <entryFree key="qeo/s"><orth>θεός</orth><sense n="A">god</sense></entryFree>
+</div1></body></text></TEI>
+"""
+
+
+def build_converter():
+    """BetaCodeConverter with a minimal table (no mapping files needed)."""
+    table = {"a": "α", "g": "γ", "l": "λ", "o": "ο", "s": "ς", "q": "θ", "e": "ε", "n": "ν",
+             "r": "ρ", "p": "π", "w": "ω", "x": "ξ", "/": "́", ")": "̓"}
+    converter = BetaCodeConverter.__new__(BetaCodeConverter)
+    converter.BETA_TO_UNICODE = table
+    converter.UNICODE_TO_BETA = {v: k for k, v in table.items()}
+    converter._max_beta_key_len = 1
+    return converter
+
+
+def serial_reference(files, converter):
+    """The former whole-tree ingest (ET.parse + repeated iter() walks), for comparison."""
+    rows = {}
+    for path in files:
+        for entry in ET.parse(path).getroot().iter(f"{{{TEI}}}entryFree"):
+            headword = entry.get("headword")
+            if not headword:
+                for child in entry:
+                    if migration.strip_ns(child.tag) == "orth":
+                        headword = child.text
+                        break
+            if entry.get("key"):
+                key = converter.canonicalize(entry.get("key"))
+            elif headword:
+                key = converter.canonicalize(converter.to_beta_code(headword))
+            else:
+                continue
+            senses = []
+            for sense in entry.iter(f"{{{TEI}}}sense"):
+                cits = [migration.process_citation(c, converter) for c in sense.iter(f"{{{TEI}}}cit")]
+                senses.append(
+                    {
+                        "id": sense.get("id") or sense.get("n"),
+                        "definition": migration.get_definition_text(sense, converter),
+                        "citations": [c for c in cits if c],
+                    }
+                )
+            rows.pop(key, None)
+            rows[key] = (headword, json.dumps({"headword": headword, "senses": senses}, ensure_ascii=False))
+    return [(key, headword, entry_json) for key, (headword, entry_json) in rows.items()]
+
+
+@pytest.fixture
+def xml_dir(tmp_path):
+    directory = tmp_path / "lsj_xml"
+    directory.mkdir()
+    (directory / "grc.lsj.perseus-eng1.xml").write_text(VOLUME_A, encoding="utf-8")
+    (directory / "grc.lsj.perseus-eng2.xml").write_text(VOLUME_B, encoding="utf-8")
+    return directory
+
+
+def ingested(db_path):
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT canonical_key, headword, entry_json FROM lsj_entries ORDER BY id").fetchall()
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    conn.close()
+    return rows, tables
+
+
+def test_matches_serial_reference(xml_dir, tmp_path):
+    converter = build_converter()
+    db_path = tmp_path / "lsj.db"
+    migration.ingest_lsj(db_path=db_path, xml_dir=xml_dir, workers=1, converter=converter)
+
+    rows, tables = ingested(db_path)
+    assert rows == serial_reference(sorted(xml_dir.glob("*.xml")), converter)
+    assert "lsj_entries_staging" not in tables
+
+    entries = {key: json.loads(entry_json) for key, _, entry_json in rows}
+    assert entries["logos"]["senses"] == [{"id": "C", "definition": "later volume wins", "citations": []}]
+    assert len(entries) == 3 and "qeos" in entries
+
+
+def test_senses_and_citations_follow_entry_json(xml_dir, tmp_path):
+    db_path = tmp_path / "lsj.db"
+    migration.ingest_lsj(db_path=db_path, xml_dir=xml_dir, workers=1, converter=build_converter())
+
+    conn = sqlite3.connect(db_path)
+    expected_senses, expected_citations = [], []
+    for entry_id, entry_json in conn.execute("SELECT id, entry_json FROM lsj_entries ORDER BY id"):
+        senses, citations = entry_rows(json.loads(entry_json))
+        expected_senses += [(entry_id, *row) for row in senses]
+        expected_citations += [(entry_id, *row) for row in citations]
+    senses = conn.execute("SELECT * FROM lsj_senses ORDER BY entry_id, sense_index").fetchall()
+    citations = conn.execute("SELECT * FROM lsj_citations ORDER BY entry_id, sense_index, citation_index").fetchall()
+    conn.close()
+    # The superseded λόγος of the first volume left no rows behind
+    assert senses == expected_senses and len(senses) == 3
+    assert citations == expected_citations == []
+
+
+def test_citation_rows_are_precomputed(xml_dir):
+    _, rows, _ = migration.parse_volume(xml_dir / "grc.lsj.perseus-eng1.xml", build_converter())
+    citations = rows[0][4]
+    assert [(c[0], c[1]) for c in citations] == [(0, 0), (0, 1), (1, 0)]  # Homer under A and A.2
+    homer = citations[1]
+    assert homer[6:] == ("Homer Il.", "Homer", 4, 0, 1)  # bibl, main author, tier, translated, words
+    assert citations[0][3] == "the word" and citations[0][8:] == (4, 1, 1)
+
+
+def test_nested_senses_share_citations(xml_dir):
+    _, rows, error = migration.parse_volume(xml_dir / "grc.lsj.perseus-eng1.xml", build_converter())
+    assert error is None
+    senses = json.loads(rows[0][2])["senses"]
+    assert [s["id"] for s in senses] == ["A", "A.2", "B"]
+    # Homer qualifies without a translation; Plato does not
+    assert [c.get("author") for c in senses[1]["citations"]] == ["Homer"]
+    assert len(senses[0]["citations"]) == 2
+    assert senses[2]["definition"] == "account of things"
+
+
+def test_process_pool_is_deterministic(xml_dir, tmp_path):
+    converter = build_converter()
+    serial, parallel = tmp_path / "serial.db", tmp_path / "parallel.db"
+    migration.ingest_lsj(db_path=serial, xml_dir=xml_dir, workers=1, converter=converter)
+    migration.ingest_lsj(db_path=parallel, xml_dir=xml_dir, workers=2, converter=converter)
+    assert ingested(serial) == ingested(parallel)
+
+
+def test_process_pool_bounds_volumes_in_flight(xml_dir, tmp_path, monkeypatch):
+    for n in range(3, 8):
+        (xml_dir / f"grc.lsj.perseus-eng{n}.xml").write_text(VOLUME_B.replace("θεός", f"θεός {n}"), encoding="utf-8")
+    converter = build_converter()
+    submitted = []
+
+    class SerialPool:
+        def __init__(self, max_workers, initializer, initargs):
+            initializer(*initargs)
+
+        def map(self, fn, files):
+            files = list(files)
+            submitted.append(len(files))
+            return map(fn, files)
+
+        def shutdown(self, **kwargs):
+            pass
+
+    monkeypatch.setattr(migration, "ProcessPoolExecutor", SerialPool)
+    db_path = tmp_path / "lsj.db"
+    migration.ingest_lsj(db_path=db_path, xml_dir=xml_dir, workers=2, converter=converter)
+    assert submitted == [4, 3]  # 2 x workers volumes at a time
+    assert ingested(db_path)[0] == serial_reference(sorted(xml_dir.glob("*.xml")), converter)
+
+
+def test_malformed_volume_keeps_parsed_entries(xml_dir, tmp_path):
+    broken = VOLUME_B.replace("</div1>", "<entryFree key='x'>")
+    (xml_dir / "grc.lsj.perseus-eng2.xml").write_text(broken, encoding="utf-8")
+    name, rows, error = migration.parse_volume(xml_dir / "grc.lsj.perseus-eng2.xml", build_converter())
+    assert error and [row[0] for row in rows] == ["logos", "qeos"]
+
+
+def test_malformed_volume_stops_ingest_and_is_retried(xml_dir, tmp_path, monkeypatch):
+    converter = build_converter()
+    db_path = tmp_path / "lsj.db"
+    volume_b = xml_dir / "grc.lsj.perseus-eng2.xml"
+    volume_b.write_text(VOLUME_B.replace("</div1>", "<entryFree key='x'>"), encoding="utf-8")
+    with pytest.raises(RuntimeError, match="perseus-eng2"):
+        migration.ingest_lsj(db_path=db_path, xml_dir=xml_dir, workers=1, converter=converter)
+    # Only the first volume was applied; none of the broken volume's parsed entries
+    assert ingested(db_path)[0] == serial_reference([xml_dir / "grc.lsj.perseus-eng1.xml"], converter)
+
+    volume_b.write_text(VOLUME_B, encoding="utf-8")
+    parsed = []
+    real_parse = migration.parse_volume
+    monkeypatch.setattr(migration, "parse_volume", lambda path, conv: parsed.append(path.name) or real_parse(path, conv))
+    migration.ingest_lsj(db_path=db_path, xml_dir=xml_dir, workers=1, converter=converter)
+    assert parsed == ["grc.lsj.perseus-eng2.xml"]
+    assert ingested(db_path)[0] == serial_reference(sorted(xml_dir.glob("*.xml")), converter)
+
+
+def test_interrupted_ingest_resumes_after_last_volume(xml_dir, tmp_path, monkeypatch):
+    converter = build_converter()
+    db_path = tmp_path / "lsj.db"
+    applied = []
+    real_stage = migration.stage
+
+    def crash_on_second_volume(cursor, name, columns, rows, batch_size):
+        if name == "lsj_entries_staging":
+            if applied:
+                raise KeyboardInterrupt
+            applied.append(name)
+        return real_stage(cursor, name, columns, rows, batch_size=batch_size)
+
+    monkeypatch.setattr(migration, "stage", crash_on_second_volume)
+    with pytest.raises(KeyboardInterrupt):
+        migration.ingest_lsj(db_path=db_path, xml_dir=xml_dir, workers=1, converter=converter)
+    monkeypatch.setattr(migration, "stage", real_stage)
+
+    parsed = []
+    real_parse = migration.parse_volume
+    monkeypatch.setattr(migration, "parse_volume", lambda path, conv: parsed.append(path.name) or real_parse(path, conv))
+    migration.ingest_lsj(db_path=db_path, xml_dir=xml_dir, workers=1, converter=converter)
+    assert parsed == ["grc.lsj.perseus-eng2.xml"]  # the first volume was committed
+    assert ingested(db_path)[0] == serial_reference(sorted(xml_dir.glob("*.xml")), converter)
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM migration_checkpoints").fetchone()[0] == 0  # cleared on completion
+    conn.close()
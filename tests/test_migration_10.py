@@ -0,0 +1,179 @@
+import importlib.util
+import json
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+# Adjust sys.path to include src
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.database import DatabaseManager
+from src.morphology import COLUMNS, decode_masks, encode_tags, feature_bit, pack_tags_json
+
+
+MIGRATION_SCRIPT = (
+    Path(__file__).resolve().parent.parent
+    / "src"
+    / "migration"
+    / "10_encode_morphology_features.py"
+)
+
+
+def load_module(path):
+    spec = importlib.util.spec_from_file_location("migration10", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+migration = load_module(MIGRATION_SCRIPT)
+
+
+@pytest.fixture
+def raw_db_path(tmp_path):
+    path = tmp_path / "test.db"
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+    cursor.execute("CREATE TABLE lemmas (id INTEGER PRIMARY KEY, lemma_text TEXT UNIQUE)")
+    cursor.execute(
+        "CREATE TABLE forms (id INTEGER PRIMARY KEY, lemma_id INTEGER, form_text TEXT, tags_json TEXT)"
+    )
+    cursor.execute(
+        "CREATE TABLE relations (id INTEGER PRIMARY KEY, child_lemma_id INTEGER, parent_lemma_text TEXT, relation_type TEXT)"
+    )
+    cursor.executemany(
+        "INSERT INTO lemmas VALUES (?, ?)",
+        [(1, "λόγος"), (2, "λόγου"), (3, "ήλιος"), (4, "ώρα")],
+    )
+    cursor.executemany(
+        "INSERT INTO forms (lemma_id, form_text, tags_json) VALUES (?, ?, ?)",
+        [
+            (1, "λόγος", json.dumps(["nominative", "singular"])),
+            (1, "λόγου", json.dumps(["genitive", "singular"])),
+            (1, "λόγοι", json.dumps(["nominative", "plural"])),
+            (3, "ήλιος", json.dumps(["nominative", "singular"])),
+            (3, "ήλιο", None),
+        ],
+    )
+    cursor.execute("INSERT INTO relations VALUES (1, 2, 'λόγος', 'form_of')")
+    conn.commit()
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def db_path(raw_db_path):
+    migration.encode_morphology_features(raw_db_path)
+    return raw_db_path
+
+
+def test_encode_round_trip():
+    masks = encode_tags(["Genitive", "plural", "3rd person", "unknown"])
+    assert masks["case"] == feature_bit("case", "genitive")
+    assert masks["person"] == feature_bit("person", "third-person")
+    assert decode_masks(masks) == ["genitive", "plural", "third-person"]
+
+    # Syncretic cells keep both values
+    assert encode_tags(["nominative", "accusative"])["case"] == 0b101
+    assert pack_tags_json(None) == 0
+    assert pack_tags_json("not json") == 0
+
+
+def test_migration_encodes_columns(db_path):
+    conn = sqlite3.connect(db_path)
+    rows = dict(conn.execute("SELECT form_text, f_case | (f_number << 8) FROM forms"))
+    indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+    conn.close()
+
+    assert rows["λόγου"] == feature_bit("case", "genitive") | feature_bit("number", "singular") << 8
+    assert rows["λόγοι"] == feature_bit("case", "nominative") | feature_bit("number", "plural") << 8
+    assert rows["ήλιο"] == 0
+    assert migration.FEATURE_INDEX in indexes
+
+
+def test_idempotent(db_path):
+    migration.encode_morphology_features(db_path)
+    assert DatabaseManager(db_path=db_path).has_feature_columns
+
+
+def test_has_feature(db_path):
+    db = DatabaseManager(db_path=db_path)
+    assert db.has_feature_columns
+
+    assert db.has_feature("λόγος", "number", "plural") is True
+    assert db.has_feature("ήλιος", "number", "plural") is False
+    assert db.has_feature("λόγου", "number", "plural") is True  # form_of redirect
+    assert db.has_feature("ώρα", "number", "plural") is None  # no forms
+    assert db.has_feature("άγνωστο", "number", "plural") is None
+
+    with pytest.raises(ValueError):
+        db.has_feature("λόγος", "aspect", "perfective")
+    db.close()
+
+
+def test_forms_inserted_later_fall_back_to_tags(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "INSERT INTO forms (lemma_id, form_text, tags_json) VALUES (3, 'ήλιοι', ?)",
+        (json.dumps(["nominative", "plural"]),),
+    )
+    conn.commit()
+    assert conn.execute("SELECT f_number FROM forms WHERE form_text = 'ήλιοι'").fetchone() == (None,)
+    conn.close()
+
+    db = DatabaseManager(db_path=db_path)
+    assert db.has_feature("ήλιος", "number", "plural") is True
+    assert db.has_feature("ήλιος", "case", "genitive") is False
+    db.close()
+
+    migration.encode_morphology_features(db_path)
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT f_number FROM forms WHERE form_text = 'ήλιοι'").fetchone() == (
+        feature_bit("number", "plural"),
+    )
+    conn.close()
+
+
+def test_not_null_columns_become_nullable(raw_db_path):
+    conn = sqlite3.connect(raw_db_path)
+    for column in COLUMNS.values():
+        conn.execute(f"ALTER TABLE forms ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0")
+    conn.commit()
+    conn.close()
+
+    migration.encode_morphology_features(raw_db_path)
+    conn = sqlite3.connect(raw_db_path)
+    notnull = {row[1]: row[3] for row in conn.execute("PRAGMA table_info(forms)")}
+    rows = dict(conn.execute("SELECT form_text, f_number FROM forms"))
+    conn.close()
+    assert all(notnull[column] == 0 for column in COLUMNS.values())
+    assert rows["λόγοι"] == feature_bit("number", "plural")
+
+
+def test_has_feature_uses_feature_index(db_path):
+    db = DatabaseManager(db_path=db_path)
+    statements = []
+    db.conn.set_trace_callback(statements.append)
+    db.has_feature("λόγος", "number", "plural")
+    db.conn.set_trace_callback(None)
+    db.close()
+
+    sql = next(s for s in statements if "EXISTS" in s)
+    conn = sqlite3.connect(db_path)
+    conn.create_function("morph_pack", 1, pack_tags_json)
+    plan = [row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+    conn.close()
+
+    assert not [line for line in plan if line.startswith("SCAN forms")], plan
+    assert any(migration.FEATURE_INDEX in line for line in plan), plan
+
+
+def test_has_feature_without_columns(raw_db_path):
+    db = DatabaseManager(db_path=raw_db_path)
+    assert not db.has_feature_columns
+    assert db.has_feature("λόγος", "number", "plural") is True
+    assert db.has_feature("ήλιος", "number", "plural") is False
+    assert db.has_feature("ώρα", "number", "plural") is None
+    db.close()
@@ -0,0 +1,122 @@
+import importlib.util
+import json
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+# Adjust sys.path to include src
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.database import DatabaseManager, pack_paradigm, unpack_paradigm
+
+MIGRATION_SCRIPT = (
+    Path(__file__).resolve().parent.parent / "src" / "migration" / "11_pack_paradigms.py"
+)
+
+
+def load_module(path):
+    spec = importlib.util.spec_from_file_location("migration11", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+migration = load_module(MIGRATION_SCRIPT)
+
+
+@pytest.fixture
+def raw_db_path(tmp_path):
+    path = tmp_path / "test.db"
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+    cursor.execute(
+        "CREATE TABLE lemmas (id INTEGER PRIMARY KEY, lemma_text TEXT UNIQUE, frequency_score REAL)"
+    )
+    cursor.execute(
+        "CREATE TABLE forms (id INTEGER PRIMARY KEY, lemma_id INTEGER, form_text TEXT, tags_json TEXT)"
+    )
+    cursor.execute(
+        "CREATE TABLE relations (id INTEGER PRIMARY KEY, child_lemma_id INTEGER, parent_lemma_text TEXT, relation_type TEXT)"
+    )
+    cursor.executemany(
+        "INSERT INTO lemmas VALUES (?, ?, ?)",
+        [(1, "λόγος", 400.0), (2, "λογάκι", 1.0), (3, "ώρα", 500.0)],
+    )
+    cursor.executemany(
+        "INSERT INTO forms (lemma_id, form_text, tags_json) VALUES (?, ?, ?)",
+        [
+            (1, "λόγος", json.dumps(["nominative", "singular"])),
+            (1, "λόγου", json.dumps(["genitive", "singular"])),
+            (1, "λόγοι", json.dumps(["nominative", "plural"])),
+            (3, "ώρα", None),
+        ],
+    )
+    cursor.execute("INSERT INTO relations VALUES (1, 2, 'λόγος', 'form_of')")
+    conn.commit()
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def db_path(raw_db_path):
+    migration.pack_paradigms(raw_db_path)
+    return raw_db_path
+
+
+def test_pack_round_trip():
+    blob = pack_paradigm([("λόγου", '["genitive", "singular"]'), ("λόγε", None), ("x", "{bad")])
+    assert isinstance(blob, bytes)
+    assert unpack_paradigm(blob) == [["λόγου", ["genitive", "singular"]], ["λόγε", []], ["x", []]]
+
+
+def test_packed_matches_unpacked(raw_db_path):
+    legacy = DatabaseManager(db_path=raw_db_path)
+    assert not legacy.has_paradigm_blobs
+    expected = {lemma: legacy.get_paradigm(lemma) for lemma in ("λόγος", "ώρα", "άγνωστο")}
+    legacy.close()
+
+    migration.pack_paradigms(raw_db_path)
+    db = DatabaseManager(db_path=raw_db_path)
+    assert db.has_paradigm_blobs
+    for lemma, paradigm in expected.items():
+        assert db.get_paradigm(lemma) == paradigm
+    db.close()
+
+
+def test_redirects_and_member_forms(db_path):
+    db = DatabaseManager(db_path=db_path)
+
+    # 'form_of' headword without forms of its own reads its parent's table
+    assert [c["form"] for c in db.get_paradigm("λογάκι")] == ["λόγος", "λόγου", "λόγοι"]
+
+    # Any member form finds the table and is flagged as the current cell
+    paradigm = db.get_paradigm("λόγου")
+    assert len(paradigm) == 3
+    assert [c["form"] for c in paradigm if c.get("is_current_form")] == ["λόγου"]
+    db.close()
+
+
+def test_get_paradigm_is_one_keyed_read(db_path):
+    db = DatabaseManager(db_path=db_path)
+    statements = []
+    db.conn.set_trace_callback(statements.append)
+    db.get_paradigm("λογάκι")
+    db.conn.set_trace_callback(None)
+    db.close()
+
+    assert len(statements) == 1
+    conn = sqlite3.connect(db_path)
+    plan = [row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {statements[0]}")]
+    conn.close()
+    assert any(line.startswith("SEARCH k USING PRIMARY KEY") for line in plan), plan
+    assert any(line.startswith("SEARCH b USING INTEGER PRIMARY KEY") for line in plan), plan
+
+
+def test_rebuild_is_idempotent(db_path):
+    migration.pack_paradigms(db_path)
+    conn = sqlite3.connect(db_path)
+    n_blobs = conn.execute("SELECT COUNT(*) FROM paradigm_blobs").fetchone()[0]
+    conn.close()
+    assert n_blobs == 2
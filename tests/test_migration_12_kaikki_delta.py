@@ -0,0 +1,221 @@
+import importlib.util
+import json
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+# Adjust sys.path to include src
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+MIGRATION_DIR = Path(__file__).resolve().parent.parent / "src" / "migration"
+
+
+def load_module(script):
+    spec = importlib.util.spec_from_file_location(Path(script).stem, MIGRATION_DIR / script)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+migration = load_module("12_ingest_kaikki_delta.py")
+
+GRAFO = {
+    "word": "γράφω",
+    "lang_code": "el",
+    "pos": "verb",
+    "senses": [{"glosses": ["αποτυπώνω λέξεις"]}],
+    "sounds": [{"ipa": "ˈɣra.fo"}],
+    "forms": [{"form": "έγραψα", "tags": ["past"], "raw_tags": ["Αόριστος"]}],
+}
+LOGOS = {
+    "word": "λόγος",
+    "lang_code": "el",
+    "pos": "noun",
+    "etymology_text": "αρχαία ελληνική λόγος",
+    "senses": [{"glosses": ["ομιλία"]}],
+    "synonyms": [{"word": "ομιλία"}],
+    "derived": [{"word": "λογικός"}],
+    "forms": [{"form": "λόγου", "tags": ["genitive", "singular"]}],
+}
+NEW_WORD = {"word": "σπίτι", "lang_code": "el", "pos": "noun", "senses": [{"glosses": ["οικία"]}]}
+ENGLISH = {"word": "γράφω", "lang_code": "en", "senses": [{"glosses": ["to write"]}]}
+
+
+def write_dump(path, entries):
+    path.write_text("".join(json.dumps(e, ensure_ascii=False) + "\n" for e in entries), encoding="utf-8")
+
+
+@pytest.fixture
+def lexicon(tmp_path):
+    db_path = tmp_path / "lexicon.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        """
+        CREATE TABLE lemmas (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, lemma_text TEXT NOT NULL UNIQUE, pos TEXT, ipa TEXT,
+            greek_def TEXT, modern_def TEXT, english_def TEXT, etymology_json TEXT, etymology_text TEXT,
+            lsj_id INTEGER, kds_score INTEGER, shift_type TEXT, frequency_score REAL
+        )
+        """
+    )
+    conn.execute(
+        "CREATE TABLE forms (id INTEGER PRIMARY KEY AUTOINCREMENT, lemma_id INTEGER NOT NULL, "
+        "form_text TEXT NOT NULL, tags_json TEXT)"
+    )
+    conn.execute(
+        "CREATE TABLE relations (id INTEGER PRIMARY KEY AUTOINCREMENT, child_lemma_id INTEGER NOT NULL, "
+        "parent_lemma_text TEXT NOT NULL, relation_type TEXT)"
+    )
+    conn.executemany(
+        "INSERT INTO lemmas (lemma_text, greek_def, frequency_score) VALUES (?, ?, ?)",
+        [("γράφω", None, 900), ("λόγος", None, 3), ("λόγου", "γενική του λόγος", 3)],
+    )
+    conn.execute("INSERT INTO relations (child_lemma_id, parent_lemma_text, relation_type) VALUES (3, 'λόγος', 'form_of')")
+    # A morphology-parsed form (no source) must survive the delta
+    conn.execute("INSERT INTO forms (lemma_id, form_text, tags_json) VALUES (2, 'λόγου', '[\"genitive\"]')")
+    conn.commit()
+    conn.close()
+    return db_path
+
+
+def snapshot(db_path):
+    conn = sqlite3.connect(db_path)
+    lemmas = {row[0]: row[1:] for row in conn.execute(
+        "SELECT lemma_text, pos, greek_def, etymology_text, ipa, kds_score FROM lemmas"
+    )}
+    forms = conn.execute("SELECT id, lemma_id, form_text, source FROM forms ORDER BY id").fetchall()
+    relations = conn.execute(
+        "SELECT child_lemma_id, parent_lemma_text, relation_type FROM relations ORDER BY id"
+    ).fetchall()
+    conn.close()
+    return lemmas, forms, relations
+
+
+def test_first_ingest_then_no_op(lexicon, tmp_path):
+    dump = tmp_path / "kaikki-el.jsonl"
+    write_dump(dump, [GRAFO, ENGLISH, LOGOS, NEW_WORD])
+
+    summary = migration.ingest_kaikki_delta(lexicon, dump, workers=1)
+    assert summary == {"changed": 2, "removed": 0, "affected": 3}
+
+    lemmas, forms, relations = snapshot(lexicon)
+    assert lemmas["γράφω"][:4] == ("verb", "αποτυπώνω λέξεις", None, "ˈɣra.fo")
+    assert lemmas["λόγος"][:3] == ("noun", "ομιλία", "αρχαία ελληνική λόγος")
+    assert "σπίτι" not in lemmas  # outside the existing vocabulary
+    assert [f[2:] for f in forms] == [("λόγου", None), ("έγραψα", "kaikki"), ("λόγου", "kaikki")]
+    assert (2, "ομιλία", "synonyms") in relations and (2, "λογικός", "derived") in relations
+    # KDS for every touched lemma; the form_of child inherits the easier parent score
+    assert all(row[4] is not None for row in lemmas.values())
+    assert lemmas["λόγου"][1] == "ομιλία"  # propagated from the parent
+    assert migration.ingest_kaikki_delta(lexicon, dump, workers=1) == {"changed": 0, "removed": 0, "affected": 0}
+
+
+def test_only_changed_entries_are_rewritten(lexicon, tmp_path):
+    dump = tmp_path / "kaikki-el.jsonl"
+    write_dump(dump, [GRAFO, LOGOS])
+    migration.ingest_kaikki_delta(lexicon, dump, workers=1)
+    before_lemmas, before_forms, _ = snapshot(lexicon)
+
+    changed = dict(LOGOS, senses=[{"glosses": ["λέξη", "ομιλία"]}], synonyms=[{"word": "λέξη"}])
+    write_dump(dump, [GRAFO, changed, NEW_WORD])
+    summary = migration.ingest_kaikki_delta(lexicon, dump, include_new_words=True, workers=1)
+    assert summary == {"changed": 2, "removed": 0, "affected": 3}  # λόγος, σπίτι, and the child λόγου
+
+    lemmas, forms, relations = snapshot(lexicon)
+    assert lemmas["γράφω"] == before_lemmas["γράφω"]
+    assert lemmas["λόγος"][1] == "λέξη; ομιλία" and lemmas["λόγου"][1] == "ομιλία"  # child keeps its own def now
+    assert lemmas["σπίτι"][:2] == ("noun", "οικία")
+    grafo_forms = [f for f in forms if f[1] == 1]
+    assert grafo_forms == [f for f in before_forms if f[1] == 1]  # untouched rows keep their ids
+    assert [f[2] for f in forms if f[1] == 2] == ["λόγου", "λόγου"]  # replaced, not duplicated
+    assert [r for r in relations if r[0] == 2 and r[2] == "synonyms"] == [(2, "λέξη", "synonyms")]
+
+    write_dump(dump, [GRAFO])
+    assert migration.ingest_kaikki_delta(lexicon, dump, workers=1)["removed"] == 2
+    _, forms, relations = snapshot(lexicon)
+    assert [f[2:] for f in forms if f[1] == 2] == [("λόγου", None)]
+    assert not [r for r in relations if r[0] == 2]
+
+
+def test_rebuilt_tables_invalidate_hashes(lexicon, tmp_path, monkeypatch):
+    dump = tmp_path / "kaikki-el.jsonl"
+    write_dump(dump, [GRAFO, LOGOS])
+    conn = sqlite3.connect(lexicon)
+    conn.execute("UPDATE lemmas SET greek_def = 'από το Kelly' WHERE lemma_text = 'γράφω'")
+    conn.commit()
+    conn.close()
+
+    # The first run treats every known word as changed and overwrites the hydrated definition
+    assert migration.ingest_kaikki_delta(lexicon, dump, workers=1)["changed"] == 2
+    assert snapshot(lexicon)[0]["γράφω"][1] == "αποτυπώνω λέξεις"
+
+    # Migration 3 re-hydrates γράφω from Kelly: the next delta derives it again
+    hydrate = load_module("3_hydrate_lemmas.py")
+    kelly = tmp_path / "kelly.csv"
+    kelly.write_text("Lemma,Greek_Def\nγράφω,από το Kelly\n", encoding="utf-8")
+    monkeypatch.setattr(hydrate, "CSV_PATH", kelly)
+    monkeypatch.setattr(hydrate, "DB_PATH", lexicon)
+    hydrate.hydrate_lemmas()
+    assert snapshot(lexicon)[0]["γράφω"][1] == "από το Kelly"
+    assert migration.ingest_kaikki_delta(lexicon, dump, workers=1)["changed"] == 1
+    assert snapshot(lexicon)[0]["γράφω"][1] == "αποτυπώνω λέξεις"
+
+    # Migration 2 rebuilds lemmas/forms/relations and drops the hashes with them (then, as in the build, hydrate)
+    linker = load_module("2_master_ingestion_linker.py")
+    conn = sqlite3.connect(lexicon)
+    linker.create_schema(conn.cursor())
+    conn.execute("INSERT INTO lemmas (lemma_text) VALUES ('λόγος')")
+    conn.commit()
+    conn.close()
+    hydrate.hydrate_lemmas()
+    assert migration.ingest_kaikki_delta(lexicon, dump, workers=1)["changed"] == 2
+    _, forms, relations = snapshot(lexicon)
+    assert [f[2:] for f in forms] == [("έγραψα", "kaikki"), ("λόγου", "kaikki")]
+    assert relations
+
+
+def serving_tables(db_path):
+    conn = sqlite3.connect(db_path)
+    tables = {
+        "form_index": conn.execute("SELECT * FROM form_index ORDER BY 1, 2, 3, 4, 5").fetchall(),
+        "features": conn.execute(
+            "SELECT id, f_case, f_number, f_gender, f_tense, f_voice, f_mood, f_person FROM forms ORDER BY id"
+        ).fetchall(),
+        "paradigm_blobs": conn.execute("SELECT * FROM paradigm_blobs ORDER BY lemma_id").fetchall(),
+        "paradigm_keys": conn.execute("SELECT * FROM paradigm_keys ORDER BY 1, 2, 3").fetchall(),
+    }
+    conn.close()
+    return tables
+
+
+def test_delta_refreshes_serving_structures(lexicon, tmp_path):
+    from src.database import DatabaseManager
+
+    rebuilds = [
+        load_module("9_build_form_index.py").build_form_index,
+        load_module("10_encode_morphology_features.py").encode_morphology_features,
+        load_module("11_pack_paradigms.py").pack_paradigms,
+    ]
+    dump = tmp_path / "kaikki-el.jsonl"
+    write_dump(dump, [GRAFO, LOGOS])
+    migration.ingest_kaikki_delta(lexicon, dump, workers=1)
+    for rebuild in rebuilds:
+        rebuild(lexicon)
+
+    plural = dict(LOGOS, forms=[{"form": "λόγοι", "tags": ["nominative", "plural"], "raw_tags": []}])
+    write_dump(dump, [GRAFO, plural])
+    migration.ingest_kaikki_delta(lexicon, dump, workers=1)
+
+    db = DatabaseManager(db_path=lexicon)
+    assert [c["lemma"] for c in db.resolve_form("λόγοι")] == ["λόγος"]
+    assert "λόγοι" in [f["form"] for f in db.get_paradigm("λόγος")]
+    assert db.has_feature("λόγος", "number", "plural") is True
+    db.close()
+
+    # The scoped rebuild leaves exactly what a full one would
+    scoped = serving_tables(lexicon)
+    for rebuild in rebuilds:
+        rebuild(lexicon)
+    assert serving_tables(lexicon) == scoped
@@ -0,0 +1,295 @@
+import importlib.util
+import json
+import random
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+# Adjust sys.path to include src
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.beta_code import BetaCodeConverter
+from src.bulk_load import Checkpoint, connect
+from src.lsj_tables import get_author_tier
+
+MIGRATION_PATH = Path(__file__).resolve().parent.parent / "src" / "migration" / "2_master_ingestion_linker.py"
+
+
+def load_module():
+    spec = importlib.util.spec_from_file_location("migration_2", MIGRATION_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+migration = load_module()
+
+AUTHORS = ["Hom.", "S.", "Pl.", "Hdt.", "Th.", "Luc.", "IG", "", None]
+WORKS = ["Il. 1.1", "Ant. 450", "R. 327a", "", None]
+WORDS = ["λόγος", "ἄνθρωπος", "θεός", "it's", 'say "so"', "line\nbreak"]
+
+
+def reference_enrich(rows):
+    """The former per-lemma enrichment (json.loads + Python waterfall), for comparison."""
+    updates = []
+    for lemma_id, _, entry_json_str in rows:
+        if not entry_json_str:
+            continue
+        try:
+            entry_data = json.loads(entry_json_str)
+        except json.JSONDecodeError:
+            continue
+        candidates = []
+        senses = entry_data.get("senses", [])
+        fallback_def = senses[0].get("definition", "") if senses else ""
+        for sense in senses:
+            for cit in sense.get("citations", []):
+                quote = cit.get("greek", "")
+                trans = cit.get("translation", "")
+                author = cit.get("author", "")
+                candidates.append(
+                    {
+                        "quote": quote,
+                        "trans": trans,
+                        "author": f"{author} {cit.get('work', '')}".strip(),
+                        "tier": get_author_tier(author),
+                        "length": len(quote.split()) if quote else 0,
+                        "has_trans": bool(trans),
+                    }
+                )
+        candidates.sort(key=lambda x: (x["tier"], not x["has_trans"], -x["length"]))
+        final_candidates = [c for c in candidates if c["tier"] < 5 and c["length"] > 0]
+        if not final_candidates:
+            if fallback_def:
+                updates.append((fallback_def, "[]", lemma_id))
+            continue
+        gallery = []
+        seen_authors = set()
+        for cand in final_candidates:
+            if len(gallery) >= 3:
+                break
+            main_author = cand["author"].split()[0] if cand["author"] else "Unknown"
+            if main_author in seen_authors and len(final_candidates) > 3:
+                continue
+            formatted = f"{cand['quote']}"
+            if cand["trans"]:
+                formatted += f" '{cand['trans']}'"
+            formatted += f" ({cand['author']})"
+            gallery.append(formatted)
+            seen_authors.add(main_author)
+        final_text = fallback_def + " | " + " | ".join(gallery)
+        updates.append((final_text, json.dumps(final_candidates[:3], ensure_ascii=False), lemma_id))
+    return updates
+
+
+def reference_ancient(rows):
+    """The former stage 1 (clean_lsj_text definitions + citation gallery), for comparison."""
+    updates = []
+    for lemma_id, _, entry_json_str in rows:
+        try:
+            senses = json.loads(entry_json_str).get("senses", [])
+        except (json.JSONDecodeError, AttributeError):
+            senses = []  # The old loop crashed here; such entries now get empty columns
+        semantics = []
+        for sense in senses:
+            d = migration.clean_lsj_text(sense.get("definition", ""))
+            if d and d not in semantics:
+                semantics.append(d)
+        candidates = []
+        for sense in senses:
+            for cit in sense.get("citations", []):
+                quote = cit.get("greek", "")
+                trans = cit.get("translation", "")
+                author = cit.get("author", "")
+                if not quote:
+                    continue
+                candidates.append(
+                    {
+                        "quote": quote,
+                        "trans": trans,
+                        "author": f"{author} {cit.get('work', '')}".strip(),
+                        "tier": get_author_tier(author),
+                        "has_trans": bool(trans),
+                        "len": len(quote.split()),
+                    }
+                )
+        candidates.sort(key=lambda x: (x["tier"], not x["has_trans"], -x["len"]))
+        gallery = []
+        seen_authors = set()
+        for c in candidates:
+            if len(gallery) >= 3:
+                break
+            main_author = c["author"].split()[0] if c["author"] else "Unknown"
+            if main_author in seen_authors and len(candidates) > 5:
+                continue
+            fmt = f"{c['quote']}"
+            if c["trans"]:
+                fmt += f" '{c['trans']}'"
+            fmt += f" ({c['author']})"
+            gallery.append(fmt)
+            seen_authors.add(main_author)
+        updates.append((" | ".join(semantics[:4]), " | ".join(gallery), lemma_id))
+    return updates
+
+
+def random_citation(rng):
+    cit = {}
+    for field, pool in (("author", AUTHORS), ("work", WORKS)):
+        value = rng.choice(pool)
+        if value:
+            cit[field] = value
+    if rng.random() < 0.85:
+        cit["greek"] = " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 4)))
+    if rng.random() < 0.4:
+        cit["translation"] = rng.choice(WORDS)
+    return cit
+
+
+def random_entry(rng):
+    senses = []
+    for n in range(rng.randint(0, 6)):
+        senses.append(
+            {
+                "id": f"A.{n}",
+                "definition": rng.choice(
+                    ["", "word, speech", "reason; account", " [sc. λόγος]  word,\n speech. ", "[Hom.]", f"sense {n};"]
+                ),
+                "citations": [random_citation(rng) for _ in range(rng.choice([0, 1, 2, 4, 7]))],
+            }
+        )
+    return json.dumps({"headword": "x", "senses": senses}, ensure_ascii=False)
+
+
+@pytest.fixture
+def lexicon(tmp_path):
+    rng = random.Random(7)
+    db_path = tmp_path / "lexicon.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE lsj_entries (id INTEGER PRIMARY KEY, canonical_key TEXT UNIQUE, headword TEXT, entry_json TEXT)")
+    conn.execute(
+        "CREATE TABLE lemmas (id INTEGER PRIMARY KEY, lemma_text TEXT UNIQUE, lsj_id INTEGER, "
+        "etymology_text TEXT, etymology_json TEXT, ancient_definitions TEXT, ancient_citations TEXT)"
+    )
+    entries = [(i, f"key{i}", "x", random_entry(rng)) for i in range(1, 80)]
+    entries += [(80, "empty", "x", ""), (81, "broken", "x", "{not json"), (82, "bare", "x", "{}")]
+    conn.executemany("INSERT INTO lsj_entries VALUES (?, ?, ?, ?)", entries)
+    lemmas = []
+    for i in range(1, 121):
+        lsj_id = rng.choice([None, 99] + list(range(1, 83)))  # 99: a dangling link
+        lemmas.append((i, f"lemma{i}", lsj_id, "old", "old", "old", "old"))
+    conn.executemany("INSERT INTO lemmas VALUES (?, ?, ?, ?, ?, ?, ?)", lemmas)
+    conn.commit()
+    conn.close()
+    return db_path
+
+
+def snapshot(db_path):
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT id, etymology_text, etymology_json FROM lemmas ORDER BY id").fetchall()
+    conn.close()
+    return rows
+
+
+def test_set_based_enrichment_matches_reference(lexicon, monkeypatch):
+    conn = sqlite3.connect(lexicon)
+    linked = conn.execute(
+        "SELECT l.id, l.lsj_id, e.entry_json FROM lemmas l JOIN lsj_entries e ON l.lsj_id = e.id"
+    ).fetchall()
+    expected = {lemma_id: ("old", "old") for lemma_id, *_ in snapshot(lexicon)}
+    for text, sublime, lemma_id in reference_enrich(linked):
+        expected[lemma_id] = (text, sublime)
+    conn.close()
+
+    monkeypatch.setattr(migration, "ENRICH_BATCH", 7)
+    conn = connect(lexicon)
+    migration.MasterIngestionLinker.__new__(migration.MasterIngestionLinker).ingest_stage_2(conn)
+    conn.close()
+
+    assert snapshot(lexicon) == [(lemma_id, *expected[lemma_id]) for lemma_id in sorted(expected)]
+    assert sum(1 for _, text, _ in snapshot(lexicon) if text != "old") > 30
+
+
+def test_stage_2_resumes_after_checkpoint(lexicon, monkeypatch):
+    monkeypatch.setattr(migration, "ENRICH_BATCH", 10)
+    conn = connect(lexicon)
+    checkpoint = Checkpoint(conn, migration.MIGRATION)
+    linker = migration.MasterIngestionLinker.__new__(migration.MasterIngestionLinker)
+    linker.ingest_stage_2(conn, checkpoint)
+    full = snapshot(lexicon)
+
+    conn.execute("UPDATE lemmas SET etymology_text = 'old', etymology_json = 'old'")
+    conn.commit()
+    last = checkpoint.position("stage_2")
+    last_linked = conn.execute("SELECT MAX(l.id) FROM lemmas l JOIN lsj_entries e ON l.lsj_id = e.id").fetchone()[0]
+    linker.ingest_stage_2(conn, checkpoint)  # Nothing after the last batch
+    conn.close()
+    assert last == last_linked
+    assert any(row[1] != "old" for row in full)
+    assert all(row[1] == "old" for row in snapshot(lexicon))
+
+
+def ancient_snapshot(db_path):
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT id, ancient_definitions, ancient_citations FROM lemmas ORDER BY id").fetchall()
+    conn.close()
+    return rows
+
+
+def test_set_based_stage_1_matches_reference(lexicon, monkeypatch):
+    conn = sqlite3.connect(lexicon)
+    linked = conn.execute(
+        "SELECT l.id, l.lsj_id, e.entry_json FROM lemmas l JOIN lsj_entries e ON l.lsj_id = e.id"
+    ).fetchall()
+    expected = {lemma_id: ("old", "old") for lemma_id, *_ in ancient_snapshot(lexicon)}
+    for definitions, citations, lemma_id in reference_ancient(linked):
+        expected[lemma_id] = (definitions, citations)
+    conn.close()
+
+    monkeypatch.setattr(migration, "ENRICH_BATCH", 7)
+    conn = connect(lexicon)
+    migration.MasterIngestionLinker.__new__(migration.MasterIngestionLinker).ingest_stage_1(conn)
+    conn.close()
+
+    assert ancient_snapshot(lexicon) == [(lemma_id, *expected[lemma_id]) for lemma_id in sorted(expected)]
+    assert any("|" in definitions for _, definitions, _ in ancient_snapshot(lexicon))
+
+
+def test_main_runs_and_resumes_after_schema(lexicon, monkeypatch):
+    monkeypatch.setattr(migration, "DB_PATH", lexicon)
+    # No mapping files needed: the linker only holds the converter
+    monkeypatch.setattr(migration, "BetaCodeConverter", lambda: BetaCodeConverter.__new__(BetaCodeConverter))
+    ingest_stage_1 = migration.MasterIngestionLinker.ingest_stage_1
+
+    def crash(self, conn, checkpoint=None):
+        raise RuntimeError("interrupted")
+
+    monkeypatch.setattr(migration.MasterIngestionLinker, "ingest_stage_1", crash)
+    with pytest.raises(RuntimeError):
+        migration.main()
+    assert snapshot(lexicon) == []  # The schema step rebuilt lemmas and committed
+
+    # Lemmas loaded after the schema step survive the rerun, which skips it
+    conn = sqlite3.connect(lexicon)
+    conn.execute("INSERT INTO lemmas (id, lemma_text, lsj_id) VALUES (1, 'λόγος', 1), (2, 'ἄγνωστος', 99)")
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr(migration.MasterIngestionLinker, "ingest_stage_1", ingest_stage_1)
+    migration.main()
+
+    conn = sqlite3.connect(lexicon)
+    rows = conn.execute(
+        "SELECT id, ancient_definitions, ancient_citations, etymology_json FROM lemmas ORDER BY id"
+    ).fetchall()
+    entry_json = conn.execute("SELECT entry_json FROM lsj_entries WHERE id = 1").fetchone()[0]
+    leftover = conn.execute("SELECT COUNT(*) FROM migration_checkpoints").fetchone()[0]
+    conn.close()
+    definitions, citations, _ = reference_ancient([(1, 1, entry_json)])[0]
+    assert rows[0][1:3] == (definitions, citations)
+    assert rows[0][3] is not None or not json.loads(entry_json)["senses"]
+    assert rows[1][1:] == (None, None, None)  # Dangling link
+    assert leftover == 0
+
+    migration.main(resume=False)  # A full rerun rebuilds the schema
+    assert snapshot(lexicon) == []
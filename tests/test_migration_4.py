@@ -0,0 +1,135 @@
+import importlib.util
+import json
+import re
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+# Adjust sys.path to include src
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+MIGRATION_PATH = Path(__file__).resolve().parent.parent / "src" / "migration" / "4_parse_greek_morphology.py"
+
+
+def load_module():
+    spec = importlib.util.spec_from_file_location("migration_4", MIGRATION_PATH)
+    module = importlib.util.module_from_spec(spec)
+    # Registered so the process pool can pickle tag_rows by reference
+    sys.modules["migration_4"] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+migration = load_module()
+
+
+def reference_tags(greek_def):
+    """The per-term tagger the combined patterns replace."""
+    normalized_def = greek_def.lower().strip().rstrip(".;")
+    match = re.search(r"(?:^|\s)(?:του\s+ρήματος|του|της|των)\s+([^\s,;]+)", normalized_def)
+    if not match:
+        return None
+    tags = [english for greek, english in migration.MORPH_MAP.items() if greek in normalized_def]
+    for marker, person in (("[α1]", "1st person"), ("[β2]", "2nd person"), ("[γ3]", "3rd person")):
+        if re.search(marker + r"[\'΄ο]\s*πρόσωπο", normalized_def):
+            tags.append(person)
+    return match.group(1).rstrip("."), tags
+
+
+@pytest.mark.parametrize(
+    "greek_def",
+    [
+        "Γενική ενικού του λόγος.",
+        "ονομαστική και αιτιατική πληθυντικού του αρσενικού του καλός",
+        "β' πρόσωπο ενικού της οριστικής ενεστώτα του ρήματος γράφω;",
+        "1ο πρόσωπο και γ΄ πρόσωπο πληθυντικού της υποτακτικής αόριστου της παθητικής φωνής του λύνω",
+        "των καλών, θηλυκού",
+        "αυτός που γράφει",
+        "ιστορία του λόγου",
+        "στο ουδέτερο",
+        "",
+    ],
+)
+def test_combined_patterns_match_the_per_term_tagger(greek_def):
+    assert migration.tag_definition(greek_def) == reference_tags(greek_def)
+
+
+def test_contained_terms_are_all_tagged():
+    # "αρσενικού" also contains "ενικού", and "ουδέτερου" contains "ουδέτερο", as substring checks always found
+    greek_def = "αρσενικού και ουδέτερου του καλός"
+    assert migration.tag_definition(greek_def) == ("καλός", ["singular", "masculine", "neuter", "neuter"])
+    assert migration.tag_definition(greek_def) == reference_tags(greek_def)
+
+
+@pytest.fixture
+def lexicon(tmp_path, monkeypatch):
+    db_path = tmp_path / "lexicon.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE lemmas (id INTEGER PRIMARY KEY AUTOINCREMENT, lemma_text TEXT UNIQUE, greek_def TEXT)")
+    rows = [("λόγος", "ομιλία"), ("γράφω", "αποτυπώνω λέξεις")]
+    for i in range(30):
+        rows.append((f"λόγου{i}", "γενική ενικού του λόγος"))
+        rows.append((f"έγραψα{i}", "α' πρόσωπο ενικού αόριστου του ρήματος γράφω"))
+        rows.append((f"ορφανό{i}", "γενική του ανύπαρκτος"))
+    conn.executemany("INSERT INTO lemmas (lemma_text, greek_def) VALUES (?, ?)", rows)
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr(migration, "DB_PATH", db_path)
+    monkeypatch.setattr(migration, "MISSING_PARENTS_LOG", tmp_path / "missing_parents.log")
+    monkeypatch.setattr(migration, "CHUNK_ROWS", 7)
+    return db_path
+
+
+def dump(db_path):
+    conn = sqlite3.connect(db_path)
+    forms = conn.execute("SELECT lemma_id, form_text, tags_json FROM forms ORDER BY id").fetchall()
+    relations = conn.execute("SELECT child_lemma_id, parent_lemma_text, relation_type FROM relations ORDER BY id").fetchall()
+    conn.execute("DELETE FROM forms")
+    conn.execute("DELETE FROM relations")
+    conn.commit()
+    conn.close()
+    return forms, relations
+
+
+def test_parallel_chunks_match_serial_pass(lexicon):
+    migration.parse_greek_morphology(workers=1)
+    serial = dump(lexicon)
+    migration.parse_greek_morphology(workers=2)
+    assert dump(lexicon) == serial
+
+    forms, relations = serial
+    assert len(forms) == len(relations) == 60
+    assert forms[:2] == [
+        (1, "λόγου0", json.dumps(["genitive", "singular"])),
+        (2, "έγραψα0", json.dumps(["singular", "past", "1st person"])),
+    ]
+    assert relations[1] == (4, "γράφω", "form_of")
+    assert (lexicon.parent / "missing_parents.log").read_text(encoding="utf-8").count("ανύπαρκτος") == 30
+
+
+def test_interrupted_load_resumes_after_last_chunk(lexicon, monkeypatch):
+    migration.parse_greek_morphology(workers=1)
+    expected = dump(lexicon)
+
+    loads = []
+    real_insert_many = migration.insert_many
+
+    def crash_on_third_chunk(cursor, table, columns, rows):
+        if table == "forms":
+            loads.append(len(rows))
+            if len(loads) == 3:
+                raise KeyboardInterrupt
+        return real_insert_many(cursor, table, columns, rows)
+
+    monkeypatch.setattr(migration, "insert_many", crash_on_third_chunk)
+    with pytest.raises(KeyboardInterrupt):
+        migration.parse_greek_morphology(workers=1)
+    monkeypatch.setattr(migration, "insert_many", real_insert_many)
+
+    conn = sqlite3.connect(lexicon)
+    assert conn.execute("SELECT position FROM migration_checkpoints").fetchall() == [(14,)]  # two chunks of 7
+    conn.close()
+    migration.parse_greek_morphology(workers=1)
+    assert dump(lexicon) == expected  # no chunk lost or loaded twice
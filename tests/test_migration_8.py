@@ -0,0 +1,123 @@
+import importlib.util
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+# Adjust sys.path to include src
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.database import DatabaseManager
+from src.scale_fixtures import ScaleFixtureGenerator
+
+
+MIGRATION_DIR = Path(__file__).resolve().parent.parent / "src" / "migration"
+
+
+def load_module(name, path):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+migration = load_module("migration8", MIGRATION_DIR / "8_index_query_plans.py")
+migration5 = load_module("migration5", MIGRATION_DIR / "5_infer_difficulty_scores.py")
+migration6 = load_module("migration6", MIGRATION_DIR / "6_propagate_metadata.py")
+
+# Queries issued by the migrations themselves (5: KDS inheritance, 6: metadata propagation)
+MIGRATION_QUERIES = {
+    "migration5.kds_inheritance": migration5.INHERITANCE_QUERY,
+    "migration6.propagate": migration6.PROPAGATE_QUERY,
+}
+
+
+@pytest.fixture(scope="module")
+def db_path(tmp_path_factory):
+    out_dir = tmp_path_factory.mktemp("lexicon")
+    generator = ScaleFixtureGenerator(n_lemmas=2_000, seed=3, out_dir=out_dir, vector_dim=0)
+    generator.build()
+    migration.create_indexes(generator.db_path)
+    return generator.db_path
+
+
+def capture_manager_queries(path):
+    """Runs every DatabaseManager lookup once and records the SQL it issues."""
+    db = DatabaseManager(db_path=path)
+    lemma, child = db.conn.execute(
+        """
+        SELECT parent.lemma_text, child.lemma_text FROM relations r
+        JOIN lemmas child ON child.id = r.child_lemma_id
+        JOIN lemmas parent ON parent.lemma_text = r.parent_lemma_text
+        WHERE r.relation_type = 'form_of' LIMIT 1
+        """
+    ).fetchone()
+
+    statements = []
+    db.conn.set_trace_callback(statements.append)
+    db.get_paradigm(lemma)
+    db.get_paradigm(child + "_missing")  # forces the form_of redirect join
+    db.get_metadata(lemma)
+    db.get_relations(lemma)
+    db.select_words("fate", 10, 40, 100)
+    db.conn.set_trace_callback(None)
+    db.close()
+    return [s for s in statements if s.lstrip().upper().startswith("SELECT")]
+
+
+def plan_for(path, query):
+    conn = sqlite3.connect(path)
+    try:
+        return migration.explain(conn.cursor(), query)
+    finally:
+        conn.close()
+
+
+def test_indexes_created(db_path):
+    conn = sqlite3.connect(db_path)
+    names = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+    has_stats = conn.execute("SELECT COUNT(*) FROM sqlite_stat1").fetchone()[0]
+    conn.close()
+
+    for name, _, _ in migration.INDEXES:
+        assert name in names
+    assert has_stats > 0
+
+
+def test_idempotent(db_path):
+    migration.create_indexes(db_path)
+    migration.create_indexes(db_path)
+
+
+def test_database_manager_queries_use_indexes(db_path):
+    statements = capture_manager_queries(db_path)
+    assert len(statements) >= 6
+
+    for sql in statements:
+        plan = plan_for(db_path, sql)
+        scans = [line for line in plan if line.startswith("SCAN")]
+        assert not scans, f"Full scan in {sql.strip()[:60]!r}: {plan}"
+
+    plans = " | ".join(" ".join(plan_for(db_path, sql)) for sql in statements)
+    assert "idx_relations_child_type" in plans or "idx_relations_type_child" in plans
+    assert "idx_forms_lemma" in plans
+    assert "idx_lemmas_kds" in plans
+
+
+@pytest.mark.parametrize("name", sorted(MIGRATION_QUERIES))
+def test_migration_queries_use_indexes(db_path, name):
+    plan = plan_for(db_path, MIGRATION_QUERIES[name])
+    assert not [line for line in plan if line.startswith("SCAN")], f"{name}: {plan}"
+    assert any("idx_relations" in line for line in plan), f"{name}: {plan}"
+
+
+def test_relations_scan_without_migration(tmp_path):
+    # Guards the test itself: without the migration the relation lookups do scan.
+    generator = ScaleFixtureGenerator(n_lemmas=300, seed=3, out_dir=tmp_path, vector_dim=0)
+    generator.build()
+    plan = plan_for(
+        generator.db_path,
+        "SELECT relation_type, parent_lemma_text FROM relations WHERE child_lemma_id = 5",
+    )
+    assert any(line.startswith("SCAN relations") for line in plan)
@@ -0,0 +1,189 @@
+import importlib.util
+import json
+import sqlite3
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+# Adjust sys.path to include src
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+# Mock spacy before importing kombyphantike
+sys.modules["spacy"] = MagicMock()
+sys.modules["sentence_transformers"] = MagicMock()
+from src.database import DatabaseManager, normalize_form
+from src.kombyphantike import KombyphantikeEngine
+
+MIGRATION_SCRIPT = (
+    Path(__file__).resolve().parent.parent / "src" / "migration" / "9_build_form_index.py"
+)
+
+
+def load_module(path):
+    spec = importlib.util.spec_from_file_location("migration9", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+migration = load_module(MIGRATION_SCRIPT)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "test.db"
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+    cursor.execute(
+        "CREATE TABLE lemmas (id INTEGER PRIMARY KEY, lemma_text TEXT UNIQUE, greek_def TEXT, frequency_score REAL)"
+    )
+    cursor.execute(
+        "CREATE TABLE forms (id INTEGER PRIMARY KEY, lemma_id INTEGER, form_text TEXT, tags_json TEXT)"
+    )
+    cursor.execute(
+        "CREATE TABLE relations (id INTEGER PRIMARY KEY, child_lemma_id INTEGER, parent_lemma_text TEXT, relation_type TEXT)"
+    )
+    cursor.executemany(
+        "INSERT INTO lemmas VALUES (?, ?, ?, ?)",
+        [
+            (1, "είμαι", "υπάρχω", 900.0),
+            (2, "λόγος", "ομιλία", 400.0),
+            (3, "λόγου", "γενική του λόγος", 1.0),
+            (4, "ώρα", "χρόνος", 500.0),
+        ],
+    )
+    cursor.executemany(
+        "INSERT INTO forms (lemma_id, form_text, tags_json) VALUES (?, ?, ?)",
+        [
+            (1, "είμαι", json.dumps(["present", "1st person", "singular"])),
+            (1, "είναι", json.dumps(["present", "3rd person", "singular"])),
+            (1, "είναι", json.dumps(["present", "3rd person", "plural"])),
+            (2, "λόγος", json.dumps(["nominative", "singular"])),
+            (2, "λόγου", json.dumps(["genitive", "singular"])),
+        ],
+    )
+    cursor.execute("INSERT INTO relations VALUES (1, 3, 'λόγος', 'form_of')")
+    conn.commit()
+    conn.close()
+    migration.build_form_index(path)
+    return path
+
+
+def test_normalize_form():
+    assert normalize_form("ΛΌΓΟΣ") == "λόγος"
+    assert normalize_form(" Είναι ") == "είναι"
+
+
+def test_resolve_form(db_path):
+    db = DatabaseManager(db_path=db_path)
+    assert db.has_form_index
+
+    hits = db.resolve_form("Είναι")
+    assert {h["lemma"] for h in hits} == {"είμαι"}
+    assert ["present", "3rd person", "singular"] in [h["tags"] for h in hits]
+
+    # The form_of headword resolves to its parent, inflected cell first
+    hits = db.resolve_form("λόγου")
+    assert hits[0]["lemma"] == "λόγος"
+    assert hits[0]["tags"] == ["genitive", "singular"]
+
+    # Headword without a paradigm
+    assert db.resolve_form("Ώρα")[0]["lemma"] == "ώρα"
+    assert db.resolve_form("άγνωστο") == []
+    db.close()
+
+
+def test_resolve_form_is_one_index_probe(db_path):
+    conn = sqlite3.connect(db_path)
+    plan = [
+        row[-1]
+        for row in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT lemma_id, lemma_text, form_text, tags_json "
+            "FROM form_index WHERE form_key = ? ORDER BY priority, frequency DESC",
+            ("είναι",),
+        )
+    ]
+    conn.close()
+    assert any(line.startswith("SEARCH form_index USING PRIMARY KEY") for line in plan)
+
+
+def test_resolve_form_without_index(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute("DROP TABLE form_index")
+    conn.commit()
+    conn.close()
+
+    db = DatabaseManager(db_path=db_path)
+    assert not db.has_form_index
+    assert db.resolve_form("είναι")[0]["lemma"] == "είμαι"
+    db.close()
+
+
+def test_tokenize_resolves_through_form_index(db_path):
+    token = MagicMock()
+    token.text = "Είναι"
+    token.lemma_ = "είναι"  # spaCy returns the form, not the lemma
+    token.pos_ = "AUX"
+    token.tag_ = "AUX"
+    token.dep_ = "cop"
+    token.is_alpha = True
+    token.morph.to_dict.return_value = {}
+
+    engine = KombyphantikeEngine.__new__(KombyphantikeEngine)
+    engine.db = DatabaseManager(db_path=db_path)
+    engine.nlp_el = MagicMock(return_value=[token])
+
+    tokens = engine._tokenize("Είναι", "el")
+    engine.db.close()
+
+    assert tokens[0]["lemma"] == "είμαι"
+    # Homographic cells (3sg / 3pl) are both valid analyses
+    assert tokens[0]["form_tags"][:2] == ["present", "3rd person"]
+    assert tokens[0]["has_paradigm"]
+
+
+def test_tokenize_falls_back_to_lowercase_without_candidates():
+    token = MagicMock()
+    token.text = "Λόγος"  # Sentence-initial, and not in the form index
+    token.lemma_ = "Λόγος"
+    token.morph.to_dict.return_value = {}
+
+    engine = KombyphantikeEngine.__new__(KombyphantikeEngine)
+    engine.db = MagicMock()
+    engine.db.resolve_form.return_value = []
+    engine.db.get_paradigm.return_value = []
+    engine.db.get_metadata.side_effect = lambda word: {"ancient_context": "λόγος"} if word == "λόγος" else {}
+    engine.nlp_el = MagicMock(return_value=[token])
+
+    tokens = engine._tokenize("Λόγος", "el")
+
+    assert tokens[0]["ancient_context"] == "λόγος"
+    engine.db.get_paradigm.assert_called_once_with("Λόγος")
+
+
+def test_tokenize_looks_up_each_lemma_once():
+    tokens = []
+    for text in ("λόγου", "λόγο", "λόγου"):
+        token = MagicMock()
+        token.text = text
+        token.lemma_ = "λόγος"
+        token.morph.to_dict.return_value = {}
+        tokens.append(token)
+
+    engine = KombyphantikeEngine.__new__(KombyphantikeEngine)
+    engine.db = MagicMock()
+    engine.db.resolve_form.side_effect = lambda text: [
+        {"lemma_id": 1, "lemma": "λόγος", "form": text, "tags": ["genitive"]}
+    ]
+    engine.db.get_paradigm.return_value = [{"form": "λόγου", "tags": ["genitive"]}]
+    engine.db.get_metadata.return_value = {"ancient_context": "λόγος"}
+    engine.nlp_el = MagicMock(return_value=tokens)
+
+    result = engine._tokenize("λόγου λόγο λόγου", "el")
+
+    assert [t["paradigm"] for t in result] == [[{"form": "λόγου", "tags": ["genitive"]}]] * 3
+    assert engine.db.resolve_form.call_count == 3
+    engine.db.get_paradigm.assert_called_once_with("λόγος")
+    engine.db.get_metadata.assert_called_once_with("λόγος")
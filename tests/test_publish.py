@@ -0,0 +1,169 @@
+import importlib.util
+import os
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+# Adjust sys.path to include src
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import src.database as database
+from src.database import DatabaseManager
+from src.publish import publish_snapshot
+from src.scale_fixtures import ScaleFixtureGenerator
+
+MIGRATION_DIR = Path(__file__).resolve().parent.parent / "src" / "migration"
+SERVING_MIGRATIONS = [
+    ("8_index_query_plans.py", "create_indexes"),
+    ("9_build_form_index.py", "build_form_index"),
+    ("10_encode_morphology_features.py", "encode_morphology_features"),
+    ("11_pack_paradigms.py", "pack_paradigms"),
+]
+
+
+def load_module(script):
+    spec = importlib.util.spec_from_file_location(Path(script).stem, MIGRATION_DIR / script)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+migrations = [getattr(load_module(script), entry) for script, entry in SERVING_MIGRATIONS]
+
+
+@pytest.fixture(scope="module")
+def published(tmp_path_factory):
+    out_dir = tmp_path_factory.mktemp("lexicon")
+    generator = ScaleFixtureGenerator(n_lemmas=1_500, seed=5, out_dir=out_dir, vector_dim=0)
+    generator.build()
+    for migrate in migrations:
+        migrate(generator.db_path)
+    target = out_dir / "serving.db"
+    summary = publish_snapshot(generator.db_path, target, page_size=16384)
+    return generator, target, summary
+
+
+def columns(conn, table):
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def test_snapshot_is_trimmed(published):
+    generator, target, summary = published
+    assert summary["target_bytes"] < summary["source_bytes"]
+
+    conn = sqlite3.connect(target)
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    lemma_cols, form_cols = columns(conn, "lemmas"), columns(conn, "forms")
+    conn.close()
+
+    assert "lsj_entries" not in tables
+    assert {"lemmas", "forms", "relations", "form_index", "paradigm_blobs", "paradigm_keys"} <= tables
+    assert "english_def" not in lemma_cols and "etymology_json" not in lemma_cols
+    assert "tags_json" not in form_cols and "f_number" in form_cols
+    assert {"idx_relations_child_type", "idx_lemmas_kds", "idx_forms_lemma_features"} <= indexes
+    assert "uq_lemmas_lemma_text" in indexes
+    assert page_size == 16384
+
+
+def test_snapshot_serves_same_answers(published):
+    generator, target, _ = published
+    build = DatabaseManager(db_path=generator.db_path)
+    serving = DatabaseManager(db_path=target, read_only=True)
+
+    for lemma in generator.lemma_text[:40]:
+        assert serving.get_paradigm(lemma) == build.get_paradigm(lemma)
+        assert serving.get_metadata(lemma) == build.get_metadata(lemma)
+        assert serving.get_relations(lemma) == build.get_relations(lemma)
+        assert serving.has_feature(lemma, "number", "plural") == build.has_feature(
+            lemma, "number", "plural"
+        )
+    form = build.conn.execute("SELECT form_text FROM forms LIMIT 1 OFFSET 7").fetchone()[0]
+    assert serving.resolve_form(form) == build.resolve_form(form)
+    assert [r["lemma_text"] for r in serving.select_words("a", 0, 100, 20)] == [
+        r["lemma_text"] for r in build.select_words("a", 0, 100, 20)
+    ]
+    build.close()
+    serving.close()
+
+
+def test_unencoded_forms_keep_tags(published, tmp_path):
+    generator, _, _ = published
+    source = tmp_path / "source.db"
+    conn = sqlite3.connect(generator.db_path)
+    conn.execute("VACUUM INTO ?", (str(source),))
+    conn.close()
+    conn = sqlite3.connect(source)
+    lemma_id, lemma = conn.execute(
+        "SELECT id, lemma_text FROM lemmas l WHERE EXISTS (SELECT 1 FROM forms WHERE lemma_id = l.id) "
+        "AND NOT EXISTS (SELECT 1 FROM forms WHERE lemma_id = l.id AND f_case & 16) LIMIT 1"
+    ).fetchone()
+    conn.execute(
+        "INSERT INTO forms (lemma_id, form_text, tags_json) VALUES (?, 'νέος', '[\"dative\"]')", (lemma_id,)
+    )
+    conn.commit()
+    conn.close()
+
+    target = tmp_path / "serving.db"
+    publish_snapshot(source, target)
+    conn = sqlite3.connect(target)
+    assert "tags_json" in columns(conn, "forms")
+    conn.close()
+    serving = DatabaseManager(db_path=target, read_only=True)
+    assert serving.has_feature(lemma, "case", "dative") is True
+    serving.close()
+
+
+def test_snapshot_is_read_only(published):
+    _, target, _ = published
+    db = DatabaseManager(db_path=target, read_only=True)
+    assert db.conn.execute("PRAGMA mmap_size").fetchone()[0] > 0
+    with pytest.raises(sqlite3.OperationalError):
+        db.conn.execute("DELETE FROM lemmas")
+    db.close()
+
+
+@pytest.fixture
+def default_paths(published, monkeypatch):
+    generator, target, _ = published
+    monkeypatch.setattr(database, "SERVING_DB_FILE", target)
+    monkeypatch.setattr(database, "PROCESSED_DIR", generator.db_path.parent)
+    monkeypatch.delenv("KOMBYPHANTIKE_SERVE_SNAPSHOT", raising=False)
+    return generator.db_path, target
+
+
+def test_default_path_is_build_db_without_switch(default_paths):
+    build, _ = default_paths
+    db = DatabaseManager()
+    assert db.db_path == build and not db.read_only
+    db.close()
+
+
+def test_switch_selects_snapshot(default_paths, monkeypatch, caplog):
+    build, target = default_paths
+    monkeypatch.setenv("KOMBYPHANTIKE_SERVE_SNAPSHOT", "1")
+    os.utime(build, (target.stat().st_mtime - 10,) * 2)
+    db = DatabaseManager()
+    assert db.db_path == target and db.read_only
+    db.close()
+    assert "re-run python -m src.publish" not in caplog.text
+
+    # A migration rewrote the build database after publication
+    os.utime(build, (target.stat().st_mtime + 10,) * 2)
+    DatabaseManager().close()
+    assert "re-run python -m src.publish" in caplog.text
+
+
+def test_switch_without_snapshot(default_paths, monkeypatch, tmp_path):
+    monkeypatch.setenv("KOMBYPHANTIKE_SERVE_SNAPSHOT", "1")
+    monkeypatch.setattr(database, "SERVING_DB_FILE", tmp_path / "missing.db")
+    with pytest.raises(FileNotFoundError):
+        DatabaseManager()
+
+
+def test_missing_source(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        publish_snapshot(tmp_path / "missing.db", tmp_path / "serving.db")
@@ -0,0 +1,179 @@
+import importlib.util
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+# Adjust sys.path to include src
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.database import DatabaseManager
+from src.memory_lexicon import MemoryLexicon
+from src.relation_graph import RelationGraph
+from src.scale_fixtures import ScaleFixtureGenerator
+
+MIGRATION_DIR = Path(__file__).resolve().parent.parent / "src" / "migration"
+
+
+def load_module(script):
+    spec = importlib.util.spec_from_file_location(Path(script).stem, MIGRATION_DIR / script)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+create_indexes = load_module("8_index_query_plans.py").create_indexes
+
+
+def small_graph():
+    #   a -derived-> b -derived-> d
+    #   a -derived-> c            b -related-> e
+    #   a -synonyms-> x (not a lemma)
+    lemmas = ["a", "b", "c", "d", "e"]
+    frequency = [5.0, 1.0, 3.0, 2.0, 4.0]
+    edges = [
+        (0, "b", "derived"),
+        (0, "c", "derived"),
+        (0, "c", "derived"),  # duplicate row
+        (0, "x", "synonyms"),
+        (1, "d", "derived"),
+        (1, "e", "related"),
+        (2, "a", "related"),
+    ]
+    child, parent, rtype = zip(*edges)
+    return RelationGraph(lemmas, child, parent, rtype, frequency=frequency)
+
+
+def test_csr_layout():
+    graph = small_graph()
+    assert len(graph) == 6
+    # Frequent targets first; unknown targets become leaf nodes
+    assert graph.neighbours("a", "derived") == ["c", "b"]
+    assert graph.neighbours("a", "synonyms") == ["x"]
+    assert graph.neighbours("x") == []
+    assert graph.neighbours("missing") == []
+
+
+def test_bounded_multi_hop_expansion():
+    graph = small_graph()
+    hits = graph.expand(["a"], hops=2, fanout={"derived": 1, "related": 5})
+    assert [(h.lemma, h.via, h.relation_type, h.hop) for h in hits] == [
+        ("c", "a", "derived", 1),
+        # 'a' is already visited, so c has nothing new at hop 2
+    ]
+
+    hits = graph.expand(["a"], hops=2, fanout={"derived": 2, "related": 5})
+    assert [(h.lemma, h.hop) for h in hits] == [("c", 1), ("b", 1), ("d", 2), ("e", 2)]
+    assert all(h.seed == "a" for h in hits)
+    assert "x" not in {h.lemma for h in hits}  # synonyms are not followed
+
+    assert [h.lemma for h in graph.expand(["a"], hops=1)] == ["c", "b", "x"]
+    assert graph.expand(["a"], hops=0) == []
+    assert graph.expand(["unknown"], hops=3) == []
+
+
+def test_seed_set_expands_together():
+    graph = small_graph()
+    hits = graph.expand(["b", "c"], hops=1)
+    # Seeds are never reported; edges come grouped by type, then by frequency
+    assert [(h.lemma, h.seed) for h in hits] == [("d", "b"), ("e", "b"), ("a", "c")]
+
+
+@pytest.fixture(scope="module")
+def lexicon(tmp_path_factory):
+    out_dir = tmp_path_factory.mktemp("graph")
+    generator = ScaleFixtureGenerator(n_lemmas=1_500, seed=3, out_dir=out_dir, vector_dim=0)
+    generator.build()
+    create_indexes(generator.db_path)
+    return generator
+
+
+def test_matches_get_relations(lexicon):
+    db = DatabaseManager(db_path=lexicon.db_path)
+    graph = db.relation_graph()
+    assert graph is db.relation_graph()
+    memory_graph = MemoryLexicon(lexicon.db_path).relation_graph()
+
+    for lemma in lexicon.lemma_text[:200]:
+        relations = db.get_relations(lemma)
+        for rtype, targets in relations.items():
+            assert sorted(graph.neighbours(lemma, rtype)) == sorted(set(targets))
+            assert memory_graph.neighbours(lemma, rtype) == graph.neighbours(lemma, rtype)
+
+    seeds = lexicon.lemma_text[:50]
+    fanout = {"synonyms": 2, "related": 2, "derived": 3}
+    hits = graph.expand(seeds, hops=2, fanout=fanout)
+    assert hits == memory_graph.expand(seeds, hops=2, fanout=fanout)
+    assert len({h.lemma for h in hits}) == len(hits)
+    assert not {h.lemma for h in hits} & set(seeds)
+    for h in hits:
+        if h.hop == 1:
+            assert h.via == h.seed
+        assert h.lemma in db.get_relations(h.via)[h.relation_type]
+    db.close()
+
+
+def test_expand_relations_is_set_based(lexicon):
+    db = DatabaseManager(db_path=lexicon.db_path)
+    memory = MemoryLexicon(lexicon.db_path)
+    seeds = lexicon.lemma_text[:80]
+    types = ("synonyms", "related", "derived")
+
+    queries = []
+    db.conn.set_trace_callback(queries.append)
+    found = db.expand_relations(seeds, types, 2)
+    db.conn.set_trace_callback(None)
+    assert len(queries) == 1
+
+    assert found == memory.expand_relations(seeds, types, 2)
+    assert found["lemma"] and len(set(found["lemma"])) == len(found["lemma"])
+    assert not set(found["lemma"]) & set(seeds)
+    per_seed = {}
+    for seed, word, rtype in zip(found["seed"], found["lemma"], found["relation_type"]):
+        per_seed[seed] = per_seed.get(seed, 0) + 1
+        assert word in db.get_relations(seed)[rtype]
+    assert max(per_seed.values()) <= 2
+
+    pool = {word.upper().lower() for word in found["lemma"][::2]}
+    narrowed = db.expand_relations(seeds, types, 2, exclude=pool)
+    assert narrowed == memory.expand_relations(seeds, types, 2, exclude=pool)
+    assert not {word.lower() for word in narrowed["lemma"]} & pool
+
+    details = db.get_expansion_details(found["lemma"])
+    assert details == memory.get_expansion_details(found["lemma"])
+    for word, pos in zip(found["lemma"], found["pos"]):
+        if word in details:
+            assert details[word]["pos"] == pos
+    db.close()
+
+
+def expansion_db(path, with_frequency=True):
+    conn = sqlite3.connect(path)
+    extra = ", etymology_text TEXT, frequency_score REAL" if with_frequency else ""
+    conn.execute(f"CREATE TABLE lemmas (id INTEGER PRIMARY KEY, lemma_text TEXT UNIQUE, pos TEXT, modern_def TEXT{extra})")
+    conn.execute("CREATE TABLE relations (id INTEGER PRIMARY KEY, child_lemma_id INTEGER, parent_lemma_text TEXT, relation_type TEXT)")
+    lemmas = [(1, "ρίζα"), (2, "Λόγος"), (3, "θεός"), (4, "άνθρωπος")]
+    for lemma_id, text in lemmas:
+        values = (lemma_id, text, "noun", "def") + (("etym", 10.0 - lemma_id) if with_frequency else ())
+        conn.execute(f"INSERT INTO lemmas VALUES ({', '.join('?' * len(values))})", values)
+    conn.executemany(
+        "INSERT INTO relations (child_lemma_id, parent_lemma_text, relation_type) VALUES (1, ?, ?)",
+        [("Λόγος", "related"), ("θεός", "derived"), ("άνθρωπος", "synonyms")],
+    )
+    conn.commit()
+    conn.close()
+    return path
+
+
+@pytest.mark.parametrize("with_frequency", [True, False])
+def test_expand_relations_excludes_pool_case_insensitively(tmp_path, with_frequency):
+    db = DatabaseManager(db_path=expansion_db(tmp_path / "x.db", with_frequency))
+    assert db.has_expansion_columns == with_frequency
+    types = ("synonyms", "related", "derived")
+
+    # "λόγος" is in the pool: its capitalized relative must not use up one of the two slots
+    found = db.expand_relations(["ρίζα"], types, 2, exclude={"ρίζα", "λόγος"})
+    db.close()
+    assert sorted(found["lemma"]) == ["άνθρωπος", "θεός"]
+    assert found["pos"] == ["noun", "noun"]
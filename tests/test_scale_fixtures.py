@@ -0,0 +1,91 @@
+import pickle
+import sqlite3
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Adjust sys.path to include src
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.scale_fixtures import KELLY_COLUMNS, ScaleFixtureGenerator
+
+
+class TestScaleFixtures(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.generator = ScaleFixtureGenerator(
+            n_lemmas=1_500, seed=7, out_dir=Path(cls.tmp.name) / "a", vector_dim=8
+        )
+        cls.manifest = cls.generator.build()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def _rows(self, db_path, table):
+        conn = sqlite3.connect(db_path)
+        rows = conn.execute(f"SELECT * FROM {table} ORDER BY id").fetchall()
+        conn.close()
+        return rows
+
+    def test_same_seed_same_fixture(self):
+        again = ScaleFixtureGenerator(
+            n_lemmas=1_500, seed=7, out_dir=Path(self.tmp.name) / "b", vector_dim=8
+        )
+        again.build()
+        for name in ("kelly_path", "knots_path", "vectors_path"):
+            self.assertEqual(
+                getattr(again, name).read_bytes(), getattr(self.generator, name).read_bytes()
+            )
+        for table in ("lemmas", "forms", "relations", "lsj_entries"):
+            self.assertEqual(
+                self._rows(again.db_path, table), self._rows(self.generator.db_path, table)
+            )
+
+    def test_counts_and_shape(self):
+        counts = self.manifest["counts"]
+        self.assertEqual(counts["lemmas"], 1_500)
+        # forms_per_lemma is a target for the mean, not an exact count
+        self.assertGreater(counts["forms"], 1_500 * 6)
+        self.assertLess(counts["forms"], 1_500 * 14)
+        self.assertGreater(counts["lsj_entries"], 0)
+
+        header = self.generator.kelly_path.read_text(encoding="utf-8").splitlines()[0]
+        self.assertEqual(header.split(","), KELLY_COLUMNS)
+
+        with open(self.generator.vectors_path, "rb") as f:
+            vectors = pickle.load(f)
+        self.assertEqual(vectors.shape, (self.generator.kelly_size, 8))
+
+    def test_relations_resolve(self):
+        conn = sqlite3.connect(self.generator.db_path)
+        dangling = conn.execute(
+            """
+            SELECT COUNT(*) FROM relations r
+            LEFT JOIN lemmas l ON l.lemma_text = r.parent_lemma_text
+            WHERE l.id IS NULL
+            """
+        ).fetchone()[0]
+        form_of = conn.execute(
+            """
+            SELECT child.lemma_text, parent.lemma_text FROM relations r
+            JOIN lemmas child ON child.id = r.child_lemma_id
+            JOIN lemmas parent ON parent.lemma_text = r.parent_lemma_text
+            WHERE r.relation_type = 'form_of'
+            LIMIT 1
+            """
+        ).fetchone()
+        linked = conn.execute(
+            "SELECT COUNT(*) FROM lemmas l JOIN lsj_entries e ON e.id = l.lsj_id"
+        ).fetchone()[0]
+        conn.close()
+
+        self.assertEqual(dangling, 0)
+        self.assertIsNotNone(form_of)
+        self.assertEqual(linked, self.manifest["counts"]["lsj_entries"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import json
+import sys
+import unittest
+from pathlib import Path
+
+import requests
+
+# Adjust sys.path to include src
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.loadtest import Recorder, percentile
+from src.stand_ins import (
+    StandInBehaviour,
+    StandInServer,
+    _StandInHandler,
+    fake_mp3,
+    fake_worksheet,
+    start_elevenlabs,
+    start_gemini,
+)
+
+
+class TestStandIns(unittest.TestCase):
+    def test_fake_worksheet_is_deterministic(self):
+        prompt = 'Fill these rows:\n[{"id": "rule_K1_λόγος_0"}, {"id": "rule_K2_ύδωρ_1"}]'
+        rows = fake_worksheet(prompt)
+        self.assertEqual([r["id"] for r in rows], ["rule_K1_λόγος_0", "rule_K2_ύδωρ_1"])
+        self.assertEqual(rows, fake_worksheet(prompt))
+        self.assertTrue(rows[0]["target_sentence"])
+
+    def test_fake_mp3_grows_with_text(self):
+        short, long = fake_mp3("γειά"), fake_mp3("γειά σου κόσμε " * 10)
+        self.assertTrue(short.startswith(b"ID3"))
+        self.assertGreater(len(long), len(short))
+        self.assertEqual(short, fake_mp3("γειά"))
+
+    def test_gemini_stand_in(self):
+        server = start_gemini()
+        try:
+            response = requests.post(
+                server.url + "/v1beta/models/gemini-2.5-flash:generateContent",
+                json={"contents": [{"parts": [{"text": '[{"id": "rule_a"}]'}]}]},
+                timeout=5,
+            )
+        finally:
+            server.stop()
+        self.assertEqual(response.status_code, 200)
+        text = response.json()["candidates"][0]["content"]["parts"][0]["text"]
+        self.assertEqual(json.loads(text)[0]["id"], "rule_a")
+
+    def test_elevenlabs_stand_in_errors(self):
+        server = start_elevenlabs(error_rate=1.0)
+        try:
+            response = requests.post(
+                server.url + "/v1/text-to-speech/voice", json={"text": "γειά"}, timeout=5
+            )
+        finally:
+            server.stop()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(server.behaviour.errors, 1)
+
+
+    def test_base_handler_answers_not_found(self):
+        server = StandInServer(_StandInHandler, StandInBehaviour()).start()
+        try:
+            response = requests.post(server.url + "/anything", json={}, timeout=5)
+        finally:
+            server.stop()
+        self.assertEqual(response.status_code, 404)
+
+class TestLoadTestReport(unittest.TestCase):
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertIsNone(percentile([], 50))
+
+    def test_recorder_summary(self):
+        recorder = Recorder()
+        for latency in (10.0, 20.0, 30.0):
+            recorder.record("speak", latency, ok=latency < 30.0)
+        summary = recorder.summary(elapsed=2.0)
+        self.assertEqual(summary["speak"]["requests"], 3)
+        self.assertEqual(summary["speak"]["errors"], 1)
+        self.assertEqual(summary["speak"]["throughput_rps"], 1.5)
+        self.assertEqual(summary["relations"]["requests"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
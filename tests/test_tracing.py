@@ -0,0 +1,133 @@
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+# Adjust sys.path to include src
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+# --- MOCKING HEAVY DEPENDENCIES ---
+sys.modules["transliterate"] = MagicMock()
+sys.modules["sentence_transformers"] = MagicMock()
+sys.modules["elevenlabs"] = MagicMock()
+sys.modules["google"] = MagicMock()
+sys.modules["google.genai"] = MagicMock()
+sys.modules["spacy"] = MagicMock()
+sys.modules["src.kombyphantike"] = MagicMock()
+sys.modules["src.audio"] = MagicMock()
+# ----------------------------------
+
+from fastapi.testclient import TestClient
+from src.api import app
+from src.tracing import current_trace, span, start_trace, traced
+
+
+class TestTracing(unittest.TestCase):
+    def test_span_is_noop_without_trace(self):
+        self.assertIsNone(current_trace())
+        with span("orphan") as s:
+            self.assertIsNone(s)
+
+    def test_nested_spans_and_summary(self):
+        @traced("db.lookup", category="db")
+        def lookup():
+            return sum(range(1000))
+
+        with start_trace("unit") as trace:
+            with span("compile_curriculum"):
+                with span("select_words"):
+                    lookup()
+                    lookup()
+
+        names = [s.name for s in trace.spans]
+        self.assertEqual(names.count("db.lookup"), 2)
+
+        by_name = {s.name: s for s in trace.spans}
+        self.assertEqual(by_name["compile_curriculum"].depth, 0)
+        self.assertEqual(by_name["select_words"].parent, by_name["compile_curriculum"])
+        self.assertEqual(by_name["db.lookup"].depth, 2)
+        self.assertGreaterEqual(
+            by_name["compile_curriculum"].wall_ms, by_name["select_words"].wall_ms
+        )
+
+        summary = trace.summary()
+        self.assertEqual(summary["db.lookup"]["count"], 2)
+        self.assertIn("cpu_ms", summary["select_words"])
+
+        header = trace.server_timing()
+        self.assertIn("compile_curriculum;dur=", header)
+        self.assertIn('db.lookup;dur=', header)
+        self.assertIn('desc="n=2 cpu=', header)
+
+    def test_chrome_trace_format(self):
+        with start_trace("unit") as trace:
+            with span("outer", theme="Fate"):
+                with span("inner"):
+                    pass
+
+        events = trace.to_chrome_trace()["traceEvents"]
+        self.assertEqual([e["name"] for e in events], ["outer", "inner"])
+        for event in events:
+            self.assertEqual(event["ph"], "X")
+            self.assertIn("cpu_ms", event["args"])
+        self.assertEqual(events[0]["args"]["theme"], "Fate")
+        self.assertLessEqual(events[0]["ts"], events[1]["ts"])
+
+
+class TestServerTimingHeader(unittest.TestCase):
+    def _traced_relations(self, lemma_text):
+        with span("db.get_relations", category="db"):
+            return {"synonyms": ["χαρά"]}
+
+    @patch("src.api.KombyphantikeEngine")
+    def test_server_timing_header(self, MockEngine):
+        MockEngine.return_value.db.get_relations.side_effect = self._traced_relations
+
+        with TestClient(app) as client:
+            response = client.get("/relations/ευτυχία")
+
+        self.assertEqual(response.status_code, 200)
+        header = response.headers["Server-Timing"]
+        self.assertRegex(header, r'request;dur=[0-9.]+;desc="n=1"')
+        self.assertIn("db.get_relations;dur=", header)
+        self.assertNotIn("X-Trace-File", response.headers)
+
+    @patch("src.api.KombyphantikeEngine")
+    def test_trace_header_ignored_when_dumps_disabled(self, MockEngine):
+        MockEngine.return_value.db.get_relations.side_effect = self._traced_relations
+
+        with tempfile.TemporaryDirectory() as tmp:
+            with patch("src.api.TRACES_DIR", Path(tmp)), patch("src.api.DUMP_TRACES", False):
+                with TestClient(app) as client:
+                    response = client.get(
+                        "/relations/ευτυχία", headers={"X-Kombyphantike-Trace": "1"}
+                    )
+            self.assertEqual(list(Path(tmp).iterdir()), [])
+        self.assertNotIn("X-Trace-File", response.headers)
+
+    @patch("src.api.KombyphantikeEngine")
+    def test_chrome_trace_dump_on_request(self, MockEngine):
+        MockEngine.return_value.db.get_relations.side_effect = self._traced_relations
+
+        with tempfile.TemporaryDirectory() as tmp:
+            with patch("src.api.TRACES_DIR", Path(tmp)), patch("src.api.DUMP_TRACES", True):
+                with TestClient(app) as client:
+                    response = client.get(
+                        "/relations/ευτυχία", headers={"X-Kombyphantike-Trace": "1"}
+                    )
+
+                trace_file = Path(tmp) / response.headers["X-Trace-File"]
+                self.assertTrue(trace_file.exists())
+                with open(trace_file, "r", encoding="utf-8") as f:
+                    dump = json.load(f)
+
+        names = {e["name"] for e in dump["traceEvents"]}
+        self.assertEqual(names, {"request", "db.get_relations"})
+        request_event = next(e for e in dump["traceEvents"] if e["name"] == "request")
+        self.assertNotIn("cpu_ms", request_event["args"])
+
+
+if __name__ == "__main__":
+    unittest.main()
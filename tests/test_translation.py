@@ -0,0 +1,170 @@
+import importlib.util
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.stand_ins import fake_translation
+from src.translation import StandInBackend, TokenBucket, make_backend, memory_key, translate_with_retry
+
+MIGRATION_PATH = Path(__file__).resolve().parent.parent / "src" / "migration" / "7_translate_missing_defs.py"
+
+
+def load_migration():
+    spec = importlib.util.spec_from_file_location("migration_7_translate", MIGRATION_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+migration = load_migration()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class CountingBackend(StandInBackend):
+    """Stand-in that records every text it is asked to translate."""
+
+    def __init__(self, **behaviour):
+        super().__init__(**behaviour)
+        self.sent = []
+        self._lock = threading.Lock()
+
+    def translate_batch(self, texts):
+        with self._lock:
+            self.sent.extend(texts)
+        return super().translate_batch(texts)
+
+
+@pytest.fixture
+def lexicon(tmp_path):
+    db_path = tmp_path / "lexicon.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE lemmas (id INTEGER PRIMARY KEY, lemma_text TEXT, greek_def TEXT, modern_def TEXT)")
+    conn.executemany(
+        "INSERT INTO lemmas (id, lemma_text, greek_def, modern_def) VALUES (?, ?, ?, ?)",
+        [
+            (1, "λόγος", "ομιλία, λέξη", None),
+            (2, "λόγια", "ομιλία,  λέξη ", None),  # same definition, other whitespace
+            (3, "ύδωρ", "νερό", ""),
+            (4, "λέξεις", "πληθυντικός του λέξη", None),  # morphological pointer, skipped
+            (5, "φως", "φέγγος", "light"),  # already translated
+        ],
+    )
+    conn.commit()
+    conn.close()
+    return db_path
+
+
+def modern_defs(db_path):
+    conn = sqlite3.connect(db_path)
+    rows = dict(conn.execute("SELECT id, modern_def FROM lemmas").fetchall())
+    conn.close()
+    return rows
+
+
+def test_token_bucket_paces_and_adapts():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2.0, capacity=2, min_rate=0.5, step=0.5, clock=clock, sleep=clock.sleep)
+    bucket.acquire()
+    bucket.acquire()
+    assert clock.now == 0.0  # the burst is banked
+    bucket.acquire()
+    assert clock.now == pytest.approx(0.5)
+
+    bucket.penalize()
+    bucket.penalize()
+    bucket.penalize()
+    assert bucket.rate == 0.5  # halved down to the floor
+    bucket.reward()
+    assert bucket.rate == 1.0
+    for _ in range(5):
+        bucket.reward()
+    assert bucket.rate == 2.0  # never above the starting rate
+
+
+def test_retry_backs_off_then_gives_up():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=100.0, capacity=10, clock=clock, sleep=clock.sleep)
+    calls = []
+
+    class Flaky:
+        def translate_batch(self, texts):
+            calls.append(texts)
+            if len(calls) < 3:
+                raise ConnectionError("429")
+            return [t.upper() for t in texts]
+
+    assert translate_with_retry(Flaky(), ["α"], bucket, retries=4, backoff=1.0, sleep=clock.sleep) == ["Α"]
+    assert len(calls) == 3 and clock.now >= 0.5 + 1.0  # two jittered backoffs: ~1s, ~2s
+    assert bucket.rate < 100.0
+
+    failing = StandInBackend(error_rate=1.0)
+    assert translate_with_retry(failing, ["α"], bucket, retries=2, backoff=0.0, sleep=clock.sleep) is None
+    assert failing.behaviour.requests == 3
+
+
+def test_make_backend_by_name():
+    assert isinstance(make_backend("stand-in"), StandInBackend)
+    with pytest.raises(ValueError):
+        make_backend("babel-fish")
+
+
+def test_migration_translates_each_definition_once(lexicon, tmp_path):
+    backend = CountingBackend()
+    migration.run_migration(lexicon, checkpoint_path=tmp_path / "none.txt", backend=backend, workers=3)
+
+    key = memory_key("ομιλία, λέξη")
+    assert sorted(backend.sent) == sorted([key, "νερό"])  # normalized duplicates sent once
+    assert modern_defs(lexicon) == {
+        1: fake_translation(key),
+        2: fake_translation(key),
+        3: fake_translation("νερό"),
+        4: None,
+        5: "light",
+    }
+
+    # A fresh pass over the table is answered by the persistent memory alone
+    conn = sqlite3.connect(lexicon)
+    conn.execute("UPDATE lemmas SET modern_def = NULL WHERE id IN (1, 2, 3)")
+    conn.commit()
+    conn.close()
+    later = CountingBackend()
+    migration.run_migration(lexicon, checkpoint_path=tmp_path / "none.txt", backend=later, resume=False)
+    assert later.sent == []
+    assert modern_defs(lexicon)[3] == fake_translation("νερό")
+
+
+def test_migration_windows_and_checkpoint(lexicon, tmp_path, monkeypatch):
+    monkeypatch.setattr(migration, "BATCH_SIZE", 1)
+    monkeypatch.setattr(migration, "WINDOW_BATCHES", 1)
+    backend = CountingBackend(error_rate=0.0)
+    migration.run_migration(lexicon, checkpoint_path=tmp_path / "none.txt", backend=backend, workers=2)
+    conn = sqlite3.connect(lexicon)
+    assert conn.execute("SELECT position FROM migration_checkpoints").fetchone() == (3,)
+    conn.close()
+
+    # Only lemmas above the high-water mark are visited on the next run
+    conn = sqlite3.connect(lexicon)
+    conn.execute("INSERT INTO lemmas (id, lemma_text, greek_def) VALUES (6, 'ήλιος', 'άστρο')")
+    conn.execute("UPDATE lemmas SET modern_def = NULL WHERE id = 1")
+    conn.commit()
+    conn.close()
+    later = CountingBackend()
+    migration.run_migration(lexicon, checkpoint_path=tmp_path / "none.txt", backend=later)
+    assert later.sent == ["άστρο"]
+    assert modern_defs(lexicon)[1] is None